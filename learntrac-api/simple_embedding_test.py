@@ -168,7 +168,7 @@ def check_implementation_completeness():
         'process_documents_batch',
         '_chunk_document',
         '_generate_chunk_embeddings', 
-        '_generate_embedding_with_retry',
+        '_adapt_batch_size',
         '_assess_batch_quality',
         '_filter_low_quality_embeddings',
         'get_pipeline_statistics',
@@ -3,9 +3,10 @@ JWT Token Handler for AWS Cognito Integration
 Handles JWT validation and user authentication for LearnTrac API
 """
 
+import asyncio
 import json
 import time
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from functools import lru_cache
 import httpx
 from jose import jwt, jwk, JWTError
@@ -15,6 +16,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 import logging
 
 from ..config import settings
+from .token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,61 +24,134 @@ security = HTTPBearer()
 
 
 class CognitoJWTVerifier:
-    """Verifies JWT tokens from AWS Cognito"""
+    """
+    Verifies JWT tokens from AWS Cognito.
+
+    Signing keys are fetched asynchronously and served stale while a
+    background refresh runs, so requests never wait on Cognito once keys are
+    loaded. A token with an unknown key id triggers one immediate refresh
+    (rate limited) to pick up rotated keys. Verified tokens are cached by
+    digest until their exp; entries signed by a key that leaves the JWKS are
+    dropped.
+    """
     
-    def __init__(self):
-        self.region = settings.aws_region
-        self.user_pool_id = settings.cognito_pool_id
-        self.client_id = settings.cognito_client_id
-        self.jwks_url = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
+    def __init__(
+        self,
+        region: Optional[str] = None,
+        user_pool_id: Optional[str] = None,
+        client_id: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        token_cache_size: Optional[int] = None
+    ):
+        self.region = region or settings.aws_region
+        self.user_pool_id = user_pool_id or settings.cognito_pool_id
+        self.client_id = client_id or settings.cognito_client_id
         self.issuer = f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}"
+        self.jwks_url = jwks_url or f"{self.issuer}/.well-known/jwks.json"
         self._jwks = None
-        self._jwks_last_fetched = 0
-        self._jwks_cache_duration = 3600  # 1 hour
+        self._signing_keys: Dict[str, Any] = {}
+        self._jwks_last_fetched = 0.0
+        self._jwks_last_attempt = 0.0
+        self._jwks_cache_duration = settings.jwks_cache_ttl
+        self._jwks_min_refresh_interval = 30  # Unknown kids and failed refreshes
+        self._jwks_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        
+        self.token_cache = TokenCache(
+            max_entries=token_cache_size or settings.token_cache_size
+        )
     
-    @property
-    def jwks(self) -> Dict:
-        """Get JWKS with caching"""
-        current_time = time.time()
-        if (self._jwks is None or 
-            current_time - self._jwks_last_fetched > self._jwks_cache_duration):
-            self._jwks = self._fetch_jwks()
-            self._jwks_last_fetched = current_time
+    async def get_jwks(self) -> Dict:
+        """Get JWKS, fetching on first use and refreshing in the background when stale"""
+        if self._jwks is None:
+            await self._refresh_jwks()
+        elif time.time() - self._jwks_last_fetched > self._jwks_cache_duration:
+            self._schedule_refresh()
         return self._jwks
     
-    def _fetch_jwks(self) -> Dict:
+    async def _fetch_jwks(self) -> Dict:
         """Fetch JWKS from Cognito"""
         try:
-            with httpx.Client() as client:
-                response = client.get(self.jwks_url)
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(self.jwks_url)
                 response.raise_for_status()
                 return response.json()
         except Exception as e:
             logger.error(f"Failed to fetch JWKS: {e}")
             raise HTTPException(status_code=500, detail="Failed to fetch JWKS")
     
-    def _get_rsa_key(self, token: str) -> Optional[Dict]:
-        """Get RSA key from JWKS based on token kid"""
+    async def _refresh_jwks(self) -> None:
+        """Fetch JWKS once, however many requests ask for it concurrently"""
+        attempt = self._jwks_last_attempt
+        async with self._jwks_lock:
+            if self._jwks_last_attempt != attempt and self._jwks is not None:
+                return  # Refreshed while waiting for the lock
+            self._jwks_last_attempt = time.time()
+            self._set_jwks(await self._fetch_jwks())
+    
+    def _schedule_refresh(self) -> None:
+        """Start a background JWKS refresh unless one is running or just failed"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        if time.time() - self._jwks_last_attempt < self._jwks_min_refresh_interval:
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+    
+    async def _background_refresh(self) -> None:
+        """Refresh JWKS, keeping the current keys if Cognito is unreachable"""
         try:
-            unverified_header = jwt.get_unverified_header(token)
-        except JWTError:
-            return None
-        
-        for key in self.jwks.get("keys", []):
-            if key["kid"] == unverified_header["kid"]:
-                return {
+            await self._refresh_jwks()
+        except Exception as e:
+            logger.warning(f"Background JWKS refresh failed, serving cached keys: {e}")
+    
+    def _set_jwks(self, jwks: Dict) -> None:
+        """Replace the key set and drop cached tokens signed by retired keys"""
+        signing_keys = {}
+        for key in jwks.get("keys", []):
+            try:
+                signing_keys[key["kid"]] = jwk.construct({
                     "kty": key["kty"],
                     "kid": key["kid"],
                     "use": key["use"],
                     "n": key["n"],
                     "e": key["e"]
-                }
-        return None
+                }, algorithm="RS256")
+            except (KeyError, JWTError) as e:
+                logger.warning(f"Skipping unusable JWKS key: {e}")
+        
+        for kid in self.token_cache.tags() - signing_keys.keys():
+            self.token_cache.invalidate_tag(kid)
+        
+        self._jwks = jwks
+        self._signing_keys = signing_keys
+        self._jwks_last_fetched = time.time()
     
-    def verify_token(self, token: str) -> Dict:
+    async def _get_rsa_key(self, kid: Optional[str]) -> Optional[Any]:
+        """Get RSA key from JWKS based on token kid"""
+        if not kid:
+            return None
+        
+        await self.get_jwks()
+        key = self._signing_keys.get(kid)
+        if key is None and time.time() - self._jwks_last_attempt >= self._jwks_min_refresh_interval:
+            # Keys may have rotated since the last fetch
+            await self._refresh_jwks()
+            key = self._signing_keys.get(kid)
+        return key
+    
+    async def verify_token(self, token: str) -> Dict:
         """Verify and decode JWT token"""
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return dict(cached)
+        
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError:
+            kid = None
+        
         # Get RSA key
-        rsa_key = self._get_rsa_key(token)
+        rsa_key = await self._get_rsa_key(kid)
         if not rsa_key:
             raise HTTPException(status_code=401, detail="Unable to find appropriate key")
         
@@ -95,8 +170,8 @@ class CognitoJWTVerifier:
             if payload.get("token_use") not in ["id", "access"]:
                 raise HTTPException(status_code=401, detail="Invalid token use")
             
-            return payload
-            
+        except HTTPException:
+            raise
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token has expired")
         except jwt.JWTClaimsError:
@@ -104,6 +179,19 @@ class CognitoJWTVerifier:
         except Exception as e:
             logger.error(f"Token verification failed: {e}")
             raise HTTPException(status_code=401, detail="Invalid token")
+        
+        if isinstance(payload.get("exp"), (int, float)):
+            self.token_cache.put(token, payload, payload["exp"], tag=kid)
+        return dict(payload)
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Verified-token cache and JWKS statistics"""
+        stats = self.token_cache.get_statistics()
+        stats["signing_keys"] = len(self._signing_keys)
+        stats["jwks_age_seconds"] = (
+            time.time() - self._jwks_last_fetched if self._jwks is not None else None
+        )
+        return stats
 
 
 # Create singleton instance
@@ -192,7 +280,7 @@ async def get_current_user(
     token = credentials.credentials
     
     try:
-        payload = jwt_verifier.verify_token(token)
+        payload = await jwt_verifier.verify_token(token)
         return AuthenticatedUser(payload)
     except Exception as e:
         logger.error(f"Authentication failed: {e}")
@@ -14,12 +14,13 @@ import base64
 import json
 import time
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from fastapi import HTTPException, Request, Security
 from fastapi.security import HTTPBearer
 import asyncio
 
 from ..config import settings
+from .session_cache import SessionCache, create_shared_store
 
 logger = logging.getLogger(__name__)
 
@@ -86,13 +87,33 @@ class ModernSessionValidator:
         self.trac_base_url = getattr(settings, 'trac_base_url', 'http://localhost:8000')
         self.redis_url = getattr(settings, 'redis_url', 'redis://localhost:6379')
         
-        # Session cache for performance
-        self.session_cache = {}
-        self.cache_ttl = 300  # 5 minutes
+        # Validated sessions, shared between workers when a shared tier is configured
+        self.cache_ttl = getattr(settings, 'session_cache_ttl', 300)
+        self.session_cache = SessionCache(
+            max_entries=getattr(settings, 'session_cache_size', 10000),
+            ttl_seconds=self.cache_ttl,
+            shared_store=self._create_shared_store(),
+            sync_interval=getattr(settings, 'session_cache_sync_interval', 1.0)
+        )
         
         if not self.secret_key:
             logger.warning("trac_auth_secret not configured - token validation will fail")
     
+    def _create_shared_store(self):
+        """Shared session cache tier from settings; per-worker caching if unavailable"""
+        url = getattr(settings, 'session_cache_url', '')
+        if not url:
+            logger.warning(
+                "session_cache_url not configured - sessions are cached per worker, so a logout "
+                "only revokes the token in the worker handling it; other workers may keep "
+                f"accepting it for up to {self.cache_ttl}s"
+            )
+        try:
+            return create_shared_store(url)
+        except Exception as e:
+            logger.error(f"Shared session cache unavailable ({e}); caching per worker only")
+            return None
+    
     async def validate_request(self, request: Request) -> Optional[AuthenticatedUser]:
         """
         Validate authentication from request
@@ -104,7 +125,7 @@ class ModernSessionValidator:
         """
         try:
             # Method 1: Modern session token
-            session_token = self._extract_session_token(request)
+            session_token = self.extract_session_token(request)
             if session_token:
                 user = await self._validate_session_token(session_token)
                 if user:
@@ -131,7 +152,7 @@ class ModernSessionValidator:
             logger.error(f"Authentication validation error: {e}")
             return None
     
-    def _extract_session_token(self, request: Request) -> Optional[str]:
+    def extract_session_token(self, request: Request) -> Optional[str]:
         """Extract session token from request"""
         # Try cookie first (standard Trac auth)
         session_token = request.cookies.get('trac_auth_token')
@@ -150,13 +171,9 @@ class ModernSessionValidator:
         """Validate modern session token"""
         try:
             # Check cache first
-            cache_key = f"session:{session_token[:20]}"
-            if cache_key in self.session_cache:
-                cached_data = self.session_cache[cache_key]
-                if cached_data['expires'] > time.time():
-                    return cached_data['user']
-                else:
-                    del self.session_cache[cache_key]
+            cached_user = await self.session_cache.get(session_token)
+            if cached_user is not None:
+                return self._user_from_cache(cached_user)
             
             # Verify token signature
             if not self._verify_token_signature(session_token):
@@ -174,6 +191,10 @@ class ModernSessionValidator:
                 logger.info("Session token has expired")
                 return None
             
+            if await self.session_cache.is_revoked(session_token):
+                logger.info("Session token was logged out")
+                return None
+            
             # Validate session with Redis/storage
             if not await self._validate_session_storage(session_token, payload):
                 logger.warning("Session not found in storage")
@@ -191,10 +212,7 @@ class ModernSessionValidator:
             )
             
             # Cache for performance
-            self.session_cache[cache_key] = {
-                'user': user,
-                'expires': time.time() + self.cache_ttl
-            }
+            await self.session_cache.put(session_token, asdict(user), payload['expires_at'])
             
             return user
             
@@ -202,6 +220,35 @@ class ModernSessionValidator:
             logger.error(f"Session token validation error: {e}")
             return None
     
+    @staticmethod
+    def _user_from_cache(data: Dict[str, Any]) -> AuthenticatedUser:
+        """User from a cached validation, not sharing lists with the cache"""
+        return AuthenticatedUser(**{
+            **data,
+            'permissions': list(data.get('permissions') or []),
+            'groups': list(data.get('groups') or [])
+        })
+    
+    async def invalidate_session(self, session_token: str) -> None:
+        """Log a session token out of every worker's cache"""
+        # Forged tokens are never cached; don't let them fill the revocation log
+        if not self._verify_token_signature(session_token):
+            return
+
+        payload = self._extract_token_payload(session_token) or {}
+        expires_at = payload.get('expires_at')
+        if not isinstance(expires_at, (int, float)):
+            expires_at = time.time() + getattr(settings, 'session_timeout', 3600)
+        await self.session_cache.revoke(session_token, expires_at)
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Session cache hit/miss counters"""
+        return self.session_cache.get_statistics()
+    
+    async def close(self) -> None:
+        """Close the shared session cache tier"""
+        await self.session_cache.close()
+    
     def _verify_token_signature(self, session_token: str) -> bool:
         """Verify HMAC signature of session token"""
         try:
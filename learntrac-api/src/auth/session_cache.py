@@ -0,0 +1,418 @@
+"""
+Session Cache - Validated sessions shared across API workers
+
+Two-tier cache in front of session token validation:
+- Per-worker bounded LRU/TTL tier keyed by the SHA-256 digest of the
+  whole token (see token_cache.TokenCache)
+- Optional shared tier every worker reads and writes: SQLite for a single
+  host, Redis in production
+- Logout revokes a token in the shared tier; every worker applies new
+  revocations before serving from its own tier (at most sync_interval
+  seconds late) and refuses to re-cache a revoked token
+- Hit/miss counters per tier
+"""
+
+import json
+import math
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .token_cache import TokenCache, token_digest
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSessionStore(ABC):
+    """
+    Shared tier of the session cache.
+
+    Keys are token digests. Values are JSON-serializable dicts that expire
+    at a Unix time. Revocations are an append-only log read by cursor.
+    """
+
+    name = "shared"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Cached value and expiry for a key, or None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        """Cache a value until expires_at"""
+
+    @abstractmethod
+    async def revoke(self, key: str, expires_at: float) -> None:
+        """Delete a key and log its revocation until expires_at"""
+
+    @abstractmethod
+    async def revocations_since(self, cursor: Any) -> Tuple[List[Tuple[str, float]], Any]:
+        """
+        Revocations logged after a cursor.
+
+        Args:
+            cursor: Value returned by the previous call (None for all
+                unexpired revocations)
+
+        Returns:
+            (key, expires_at) pairs and the cursor for the next call
+        """
+
+    async def close(self) -> None:
+        """Release connections"""
+
+
+class SQLiteSessionStore(SharedSessionStore):
+    """
+    Shared tier in a SQLite file, for workers on one host.
+
+    Queries run in a thread so they never block the event loop. WAL mode
+    lets workers read while another one writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._io_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize SQLite database"""
+        with self._io_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS session_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS session_revocations (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        key TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_session_cache_expires ON session_cache(expires_at)"
+                )
+
+    async def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        await asyncio.to_thread(self._set, key, json.dumps(value), expires_at)
+
+    async def revoke(self, key: str, expires_at: float) -> None:
+        await asyncio.to_thread(self._revoke, key, expires_at)
+
+    async def revocations_since(self, cursor: Any) -> Tuple[List[Tuple[str, float]], Any]:
+        return await asyncio.to_thread(self._revocations_since, cursor or 0)
+
+    async def close(self) -> None:
+        with self._io_lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._io_lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM session_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _set(self, key: str, value: str, expires_at: float) -> None:
+        with self._io_lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_cache VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+
+    def _revoke(self, key: str, expires_at: float) -> None:
+        now = time.time()
+        with self._io_lock, self._conn:
+            self._conn.execute("DELETE FROM session_cache WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT INTO session_revocations (key, expires_at) VALUES (?, ?)",
+                (key, expires_at)
+            )
+            # Expired rows are useless to every worker; prune them on logout
+            self._conn.execute("DELETE FROM session_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute("DELETE FROM session_revocations WHERE expires_at <= ?", (now,))
+
+    def _revocations_since(self, cursor: int) -> Tuple[List[Tuple[str, float]], int]:
+        with self._io_lock:
+            rows = self._conn.execute(
+                "SELECT id, key, expires_at FROM session_revocations WHERE id > ? ORDER BY id",
+                (cursor,)
+            ).fetchall()
+        if not rows:
+            return [], cursor
+        return [(key, expires_at) for _, key, expires_at in rows], rows[-1][0]
+
+
+class RedisSessionStore(SharedSessionStore):
+    """
+    Shared tier in Redis, for workers on several hosts.
+
+    Entries are keys that Redis expires with the token. Revocations go to a
+    capped stream that workers read from their last seen id.
+    """
+
+    name = "redis"
+    MAX_REVOCATIONS = 100000  # Approximate stream length cap
+
+    def __init__(self, redis_url: str, prefix: str = "learntrac:session_cache"):
+        import redis.asyncio as aioredis
+
+        self.redis = aioredis.Redis.from_url(redis_url, decode_responses=True)
+        self.prefix = prefix
+        self.stream = f"{prefix}:revocations"
+
+    async def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        data = await self.redis.get(f"{self.prefix}:{key}")
+        if data is None:
+            return None
+        entry = json.loads(data)
+        return entry["value"], entry["expires_at"]
+
+    async def set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        ttl = math.ceil(expires_at - time.time())
+        if ttl > 0:
+            data = json.dumps({"value": value, "expires_at": expires_at})
+            await self.redis.set(f"{self.prefix}:{key}", data, ex=ttl)
+
+    async def revoke(self, key: str, expires_at: float) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(f"{self.prefix}:{key}")
+            pipe.xadd(
+                self.stream,
+                {"key": key, "expires_at": repr(expires_at)},
+                maxlen=self.MAX_REVOCATIONS,
+                approximate=True
+            )
+            await pipe.execute()
+
+    async def revocations_since(self, cursor: Any) -> Tuple[List[Tuple[str, float]], Any]:
+        start = f"({cursor}" if cursor else "-"
+        messages = await self.redis.xrange(self.stream, min=start, max="+")
+        if not messages:
+            return [], cursor
+        revocations = [(fields["key"], float(fields["expires_at"])) for _, fields in messages]
+        return revocations, messages[-1][0]
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+
+def create_shared_store(url: str) -> Optional[SharedSessionStore]:
+    """
+    Shared tier for a URL.
+
+    Args:
+        url: "redis://..." / "rediss://...", "sqlite:///path/to/file.db", or
+            empty for no shared tier
+
+    Returns:
+        Shared store or None
+    """
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported session cache URL: {url}")
+
+
+class SessionCache:
+    """
+    Two-tier cache of validated sessions.
+
+    Values are JSON-serializable dicts. Every lookup first applies
+    revocations from the shared tier (polled at most every sync_interval
+    seconds), so a token revoked in one worker stops being served by all of
+    them within sync_interval. Shared tier errors are logged and treated as
+    misses; the per-worker tier keeps working.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 300,
+        shared_store: Optional[SharedSessionStore] = None,
+        sync_interval: float = 1.0
+    ):
+        """
+        Initialize session cache.
+
+        Args:
+            max_entries: Maximum sessions in the per-worker tier
+            ttl_seconds: Longest reuse of a validation result
+            shared_store: Shared tier (None for per-worker caching only)
+            sync_interval: Seconds between revocation polls of the shared tier
+        """
+        self.local = TokenCache(max_entries=max_entries, max_ttl=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.shared_store = shared_store
+        self.sync_interval = sync_interval
+
+        # Digests of revoked tokens until the tokens expire
+        self.revoked: Dict[str, float] = {}
+        self._revocation_cursor: Any = None
+        self._last_sync = 0.0
+
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    async def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a validated session.
+
+        Args:
+            token: Session token
+
+        Returns:
+            Cached value or None
+        """
+        await self.sync_revocations()
+        key = token_digest(token)
+        if key in self.revoked:
+            return None
+
+        value = self.local.get_by_digest(key)
+        if value is not None or self.shared_store is None:
+            return value
+
+        try:
+            entry = await self.shared_store.get(key)
+        except Exception as e:
+            logger.warning(f"Shared session cache lookup failed: {e}")
+            self.shared_errors += 1
+            entry = None
+
+        if entry is None:
+            self.shared_misses += 1
+            return None
+
+        value, expires_at = entry
+        self.shared_hits += 1
+        self.local.put_by_digest(key, value, expires_at)
+        return value
+
+    async def put(self, token: str, value: Dict[str, Any], expires_at: float) -> None:
+        """
+        Cache a validated session in both tiers.
+
+        Args:
+            token: Session token
+            value: Validation result
+            expires_at: Unix time the token expires
+        """
+        key = token_digest(token)
+        if key in self.revoked:
+            return
+
+        expires_at = min(expires_at, time.time() + self.ttl_seconds)
+        self.local.put_by_digest(key, value, expires_at)
+
+        if self.shared_store is not None:
+            try:
+                await self.shared_store.set(key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"Shared session cache write failed: {e}")
+                self.shared_errors += 1
+
+    async def is_revoked(self, token: str) -> bool:
+        """Whether a token was revoked in any worker"""
+        await self.sync_revocations()
+        return token_digest(token) in self.revoked
+
+    async def revoke(self, token: str, expires_at: float) -> None:
+        """
+        Revoke a token in every worker (logout).
+
+        Args:
+            token: Session token
+            expires_at: Unix time the token expires; the revocation is kept
+                until then
+        """
+        key = token_digest(token)
+        self.local.invalidate_digest(key)
+        self._prune_revoked(time.time())
+        self.revoked[key] = expires_at
+
+        if self.shared_store is not None:
+            try:
+                await self.shared_store.revoke(key, expires_at)
+            except Exception as e:
+                logger.error(f"Failed to share session revocation: {e}")
+                self.shared_errors += 1
+
+    async def sync_revocations(self, force: bool = False) -> None:
+        """Apply revocations logged by other workers"""
+        now = time.time()
+        if self.shared_store is None or (not force and now - self._last_sync < self.sync_interval):
+            return
+        self._last_sync = now
+
+        try:
+            revocations, self._revocation_cursor = await self.shared_store.revocations_since(
+                self._revocation_cursor
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read session revocations: {e}")
+            self.shared_errors += 1
+            return
+
+        self._prune_revoked(now)
+        for key, expires_at in revocations:
+            if expires_at > now:
+                self.local.invalidate_digest(key)
+                self.revoked[key] = expires_at
+
+    def _prune_revoked(self, now: float) -> None:
+        """Forget revocations of tokens that have expired anyway"""
+        if any(expires <= now for expires in self.revoked.values()):
+            self.revoked = {key: expires for key, expires in self.revoked.items() if expires > now}
+
+    async def close(self) -> None:
+        """Close the shared tier"""
+        if self.shared_store is not None:
+            await self.shared_store.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit/miss counters of both tiers"""
+        local = self.local.get_statistics()
+        lookups = local["hits"] + local["misses"]
+        hits = local["hits"] + self.shared_hits
+        return {
+            "entries": local["entries"],
+            "max_entries": local["max_entries"],
+            "local_hits": local["hits"],
+            "shared_hits": self.shared_hits,
+            "misses": lookups - hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": local["evictions"],
+            "revoked": len(self.revoked),
+            "shared_tier": self.shared_store.name if self.shared_store is not None else None,
+            "shared_errors": self.shared_errors
+        }
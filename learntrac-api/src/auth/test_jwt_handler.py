@@ -0,0 +1,236 @@
+"""
+Unit tests for CognitoJWTVerifier
+
+Tests the verified-token cache, stale-while-revalidate JWKS refresh and key
+rotation against a local JWKS stand-in, and benchmarks per-request auth
+overhead with and without the cache.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from .jwt_handler import CognitoJWTVerifier
+
+CLIENT_ID = "test-client"
+
+
+def make_signing_key(kid):
+    """RSA private key in PEM and its public JWK"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public_jwk = jwk.RSAKey(pem, "RS256").public_key().to_dict()
+    public_jwk.update({"kid": kid, "use": "sig"})
+    return pem, public_jwk
+
+
+class JWKSStandIn:
+    """Local HTTP server serving a JWKS document, counting fetches"""
+
+    def __init__(self):
+        self.keys = []
+        self.fetches = 0
+        self.delay = 0.0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.fetches += 1
+                time.sleep(stand_in.delay)
+                body = json.dumps({"keys": stand_in.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/.well-known/jwks.json"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestCognitoJWTVerifier:
+    """Test suite for CognitoJWTVerifier"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.key_a = make_signing_key("key-a")
+        cls.key_b = make_signing_key("key-b")
+
+    def setup_method(self):
+        self.jwks = JWKSStandIn()
+        self.jwks.keys = [self.key_a[1]]
+        self.verifier = CognitoJWTVerifier(
+            region="local",
+            user_pool_id="pool",
+            client_id=CLIENT_ID,
+            jwks_url=self.jwks.url
+        )
+
+    def teardown_method(self):
+        self.jwks.close()
+
+    def make_token(self, key=None, lifetime=3600, **claims):
+        pem, public_jwk = key or self.key_a
+        payload = {
+            "sub": "user-1",
+            "aud": CLIENT_ID,
+            "iss": self.verifier.issuer,
+            "token_use": "id",
+            "exp": int(time.time()) + lifetime
+        }
+        payload.update(claims)
+        return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": public_jwk["kid"]})
+
+    def test_cached_token_skips_verification(self):
+        """A repeated token is answered from the cache with the same claims"""
+        token = self.make_token()
+
+        async def run():
+            first = await self.verifier.verify_token(token)
+            second = await self.verifier.verify_token(token)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first == second
+        assert first["sub"] == "user-1"
+        assert self.jwks.fetches == 1
+        stats = self.verifier.get_cache_statistics()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_invalid_tokens_are_rejected_and_not_cached(self):
+        """Wrong audience, token use or signature fail every time"""
+        tokens = [
+            self.make_token(aud="other-client"),
+            self.make_token(token_use="refresh"),
+            self.make_token()[:-4] + "AAAA"
+        ]
+
+        async def run():
+            for token in tokens:
+                for _ in range(2):
+                    with pytest.raises(HTTPException) as exc_info:
+                        await self.verifier.verify_token(token)
+                    assert exc_info.value.status_code == 401
+
+        asyncio.run(run())
+        assert len(self.verifier.token_cache) == 0
+
+    def test_cache_entry_expires_with_token(self):
+        """A cached token stops verifying at its exp"""
+        token = self.make_token(lifetime=1)
+
+        async def run():
+            await self.verifier.verify_token(token)
+            await asyncio.sleep(2.1)  # jose compares exp in whole seconds
+            with pytest.raises(HTTPException):
+                await self.verifier.verify_token(token)
+
+        asyncio.run(run())
+        assert len(self.verifier.token_cache) == 0
+
+    def test_stale_keys_served_during_background_refresh(self):
+        """Stale keys answer immediately while one refresh runs in the background"""
+        token = self.make_token()
+        self.jwks.delay = 0.3
+
+        async def run():
+            await self.verifier.get_jwks()
+            self.verifier._jwks_last_fetched -= self.verifier._jwks_cache_duration + 1
+            self.verifier._jwks_last_attempt -= self.verifier._jwks_min_refresh_interval
+
+            start = time.perf_counter()
+            await asyncio.gather(*(self.verifier.verify_token(token) for _ in range(5)))
+            elapsed = time.perf_counter() - start
+
+            await self.verifier._refresh_task
+            return elapsed
+
+        elapsed = asyncio.run(run())
+
+        assert elapsed < 0.2
+        assert self.jwks.fetches == 2
+
+    def test_key_rotation(self):
+        """A new kid triggers one refresh; tokens of a retired key are dropped"""
+        old_token = self.make_token()
+        new_token = self.make_token(key=self.key_b)
+
+        async def run():
+            await self.verifier.verify_token(old_token)
+            self.jwks.keys = [self.key_b[1]]
+            self.verifier._jwks_last_attempt -= self.verifier._jwks_min_refresh_interval
+
+            await self.verifier.verify_token(new_token)
+            with pytest.raises(HTTPException):
+                await self.verifier.verify_token(old_token)
+
+        asyncio.run(run())
+        assert self.jwks.fetches == 2
+
+    def test_unknown_kid_refresh_is_rate_limited(self):
+        """Tokens with made-up kids cannot force a JWKS fetch per request"""
+        unknown = self.make_token(key=(self.key_a[0], {"kid": "unknown"}))
+
+        async def run():
+            for _ in range(5):
+                with pytest.raises(HTTPException):
+                    await self.verifier.verify_token(unknown)
+
+        asyncio.run(run())
+        assert self.jwks.fetches == 1
+
+    def test_benchmark_auth_overhead(self):
+        """Offline benchmark; prints per-request auth time with and without the cache"""
+        tokens = [self.make_token(sub=f"user-{i}") for i in range(50)]
+        rounds = 20
+
+        async def run():
+            await self.verifier.get_jwks()
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for token in tokens:
+                    self.verifier.token_cache.clear()
+                    await self.verifier.verify_token(token)
+            uncached = (time.perf_counter() - start) / (rounds * len(tokens))
+
+            for token in tokens:
+                await self.verifier.verify_token(token)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for token in tokens:
+                    await self.verifier.verify_token(token)
+            cached = (time.perf_counter() - start) / (rounds * len(tokens))
+            return uncached, cached
+
+        uncached, cached = asyncio.run(run())
+
+        assert self.jwks.fetches == 1
+        assert cached < uncached
+        print(f"\nper request: full RS256 verification {uncached * 1e6:.1f}us, "
+              f"cached {cached * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,248 @@
+"""
+Unit tests for SessionCache
+
+Tests the per-worker LRU/TTL tier, the SQLite shared tier between two
+caches standing in for two workers, logout revocation across workers and
+the ModernSessionValidator integration.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from .session_cache import SessionCache, SharedSessionStore, SQLiteSessionStore, create_shared_store
+from .modern_session_handler import ModernSessionValidator
+
+SECRET = "test-secret"
+
+
+def make_session_token(user_id="alice", lifetime=3600, secret=SECRET):
+    """Session token in the Trac Modern Auth format"""
+    payload = {
+        "user_id": user_id,
+        "permissions": ["LEARNING_PARTICIPATE"],
+        "groups": ["students"],
+        "session_id": f"session-{user_id}",
+        "expires_at": int(time.time()) + lifetime
+    }
+    payload_b64 = base64.b64encode(json.dumps(payload).encode()).decode()
+    signature = hmac.new(secret.encode(), payload_b64.encode(), hashlib.sha256).hexdigest()
+    return f"{payload_b64}.{signature}"
+
+
+class TestSessionCache:
+    """Test suite for SessionCache"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "sessions.db")
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def make_worker(self, **kwargs):
+        kwargs.setdefault("sync_interval", 0)
+        return SessionCache(shared_store=SQLiteSessionStore(self.db_path), **kwargs)
+
+    def test_full_token_digest_key(self):
+        """Tokens sharing a long prefix get separate entries"""
+        cache = SessionCache()
+        prefix = "x" * 40
+
+        async def run():
+            await cache.put(prefix + "a", {"user": "a"}, time.time() + 60)
+            return await cache.get(prefix + "a"), await cache.get(prefix + "b")
+
+        assert asyncio.run(run()) == ({"user": "a"}, None)
+
+    def test_local_tier_is_bounded_and_expires(self):
+        """The per-worker tier evicts LRU entries and honours the TTL"""
+        cache = SessionCache(max_entries=2, ttl_seconds=0.05)
+
+        async def run():
+            for name in ("a", "b", "c"):
+                await cache.put(name, {"user": name}, time.time() + 60)
+            evicted = await cache.get("a")
+            await asyncio.sleep(0.06)
+            return evicted, await cache.get("c")
+
+        assert asyncio.run(run()) == (None, None)
+        assert cache.get_statistics()["evictions"] == 1
+
+    def test_shared_tier_between_workers(self):
+        """A session validated in one worker is served by another"""
+        worker_a = self.make_worker()
+        worker_b = self.make_worker()
+
+        async def run():
+            await worker_a.put("token", {"user": "alice"}, time.time() + 60)
+            first = await worker_b.get("token")
+            second = await worker_b.get("token")
+            return first, second
+
+        assert asyncio.run(run()) == ({"user": "alice"}, {"user": "alice"})
+        stats = worker_b.get_statistics()
+        assert stats["shared_hits"] == 1
+        assert stats["local_hits"] == 1
+        assert stats["misses"] == 0
+        assert stats["shared_tier"] == "sqlite"
+
+    def test_revocation_reaches_every_worker(self):
+        """Logout in one worker drops the session from the others' local tiers"""
+        worker_a = self.make_worker()
+        worker_b = self.make_worker()
+
+        async def run():
+            await worker_a.put("token", {"user": "alice"}, time.time() + 60)
+            assert await worker_b.get("token") is not None
+
+            await worker_a.revoke("token", time.time() + 60)
+            await worker_b.put("token", {"user": "alice"}, time.time() + 60)
+            return await worker_b.get("token"), await worker_b.is_revoked("token")
+
+        assert asyncio.run(run()) == (None, True)
+        assert len(worker_b) == 0
+
+    def test_new_worker_loads_earlier_revocations(self):
+        """A worker started after a logout still refuses the token"""
+        worker_a = self.make_worker()
+
+        async def run():
+            await worker_a.revoke("token", time.time() + 60)
+            worker_b = self.make_worker()
+            return await worker_b.is_revoked("token")
+
+        assert asyncio.run(run())
+
+    def test_shared_tier_failure_falls_back_to_local(self):
+        """Errors in the shared tier are counted and treated as misses"""
+        worker = self.make_worker()
+
+        async def run():
+            await worker.put("token", {"user": "alice"}, time.time() + 60)
+            await worker.shared_store.close()
+            local = await worker.get("token")
+            missing = await worker.get("other")
+            return local, missing
+
+        assert asyncio.run(run()) == ({"user": "alice"}, None)
+        assert worker.get_statistics()["shared_errors"] > 0
+
+    def test_create_shared_store(self):
+        """Store URLs select the shared tier"""
+        assert create_shared_store("") is None
+        assert isinstance(create_shared_store(f"sqlite:///{self.db_path}"), SQLiteSessionStore)
+        with pytest.raises(ValueError):
+            create_shared_store("memcached://localhost")
+
+    def test_shared_store_interface_is_abstract(self):
+        """Stores must implement every shared tier operation"""
+        class IncompleteStore(SharedSessionStore):
+            async def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            SharedSessionStore()
+        with pytest.raises(TypeError):
+            IncompleteStore()
+
+
+class TestValidatorSessionCache:
+    """Test ModernSessionValidator with the session cache"""
+
+    def setup_method(self):
+        self.validator = ModernSessionValidator()
+        self.validator.secret_key = SECRET
+        self.signature_checks = 0
+        verify = self.validator._verify_token_signature
+
+        def counting_verify(token):
+            self.signature_checks += 1
+            return verify(token)
+
+        self.validator._verify_token_signature = counting_verify
+
+    def test_cached_session_skips_validation(self):
+        """A repeated token is validated once and returns independent users"""
+        token = make_session_token()
+
+        async def run():
+            first = await self.validator._validate_session_token(token)
+            first.permissions.append("TRAC_ADMIN")
+            return await self.validator._validate_session_token(token)
+
+        user = asyncio.run(run())
+
+        assert user.username == "alice"
+        assert user.permissions == ["LEARNING_PARTICIPATE"]
+        assert self.signature_checks == 1
+        stats = self.validator.get_cache_statistics()
+        assert stats["local_hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_invalid_and_logged_out_tokens(self):
+        """Bad signatures are never cached; logged-out tokens stop validating"""
+        token = make_session_token()
+
+        async def run():
+            forged = await self.validator._validate_session_token(make_session_token(secret="other"))
+            assert await self.validator._validate_session_token(token) is not None
+            await self.validator.invalidate_session(token)
+            return forged, await self.validator._validate_session_token(token)
+
+        assert asyncio.run(run()) == (None, None)
+        assert len(self.validator.session_cache) == 0
+
+    def test_extract_session_token(self):
+        """Cookie first, then bearer and custom headers"""
+        def request(cookies=None, headers=None):
+            return SimpleNamespace(cookies=cookies or {}, headers=headers or {})
+
+        assert self.validator.extract_session_token(request(
+            {"trac_auth_token": "cookie"}, {"Authorization": "Bearer bearer"}
+        )) == "cookie"
+        assert self.validator.extract_session_token(request(headers={"Authorization": "Bearer bearer"})) == "bearer"
+        assert self.validator.extract_session_token(request(headers={"X-Session-Token": "custom"})) == "custom"
+        assert self.validator.extract_session_token(request()) is None
+
+    def test_warns_without_shared_tier(self, caplog):
+        """Per-worker caching is logged since logout then only reaches one worker"""
+        with caplog.at_level(logging.WARNING):
+            assert self.validator._create_shared_store() is None
+        assert "only revokes the token in the worker handling it" in caplog.text
+
+    def test_benchmark_cached_validation(self):
+        """Offline benchmark; prints per-request validation time with and without the cache"""
+        tokens = [make_session_token(f"user-{i}") for i in range(50)]
+        rounds = 20
+
+        async def run():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for token in tokens:
+                    self.validator.session_cache.local.clear()
+                    await self.validator._validate_session_token(token)
+            uncached = (time.perf_counter() - start) / (rounds * len(tokens))
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for token in tokens:
+                    await self.validator._validate_session_token(token)
+            cached = (time.perf_counter() - start) / (rounds * len(tokens))
+            return uncached, cached
+
+        uncached, cached = asyncio.run(run())
+        print(f"\nper request: validation {uncached * 1e6:.1f}us, cached {cached * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,177 @@
+"""
+Token Cache - Reuse the result of verifying a bearer token
+
+Caches what a token verified to (claims, users) so repeated requests with
+the same token skip signature checks:
+- Keys are SHA-256 digests of the whole token, never the token itself
+- Bounded LRU; every entry expires with the token it was verified from
+- Entries can be tagged (e.g. with the signing key id) and dropped by tag
+- Hit-rate statistics
+"""
+
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set
+
+
+def token_digest(token: str) -> str:
+    """Cache key of a token"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class _CachedToken:
+    """A cached verification result"""
+    value: Any
+    expires_at: float
+    tag: Optional[str]
+
+
+class TokenCache:
+    """
+    LRU cache of token verification results, each valid until an expiry.
+
+    Callers pass the expiry of the token itself (e.g. its exp claim), so a
+    cached result is never returned after the token would have stopped
+    verifying. max_ttl additionally caps how long a result is reused.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_ttl: Optional[float] = None):
+        """
+        Initialize token cache.
+
+        Args:
+            max_entries: Maximum cached tokens
+            max_ttl: Longest reuse of a verification result in seconds
+                (None to reuse until the token expires)
+        """
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+
+        self.entries: OrderedDict[str, _CachedToken] = OrderedDict()
+        self._tag_keys: Dict[str, Set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, token: str) -> Optional[Any]:
+        """
+        Look up the cached result for a token.
+
+        Args:
+            token: Bearer token
+
+        Returns:
+            Cached value or None
+        """
+        return self.get_by_digest(token_digest(token))
+
+    def get_by_digest(self, key: str) -> Optional[Any]:
+        """Look up a cached result by token digest"""
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires_at <= time.time():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, token: str, value: Any, expires_at: float, tag: Optional[str] = None) -> None:
+        """
+        Cache the result of verifying a token.
+
+        Args:
+            token: Bearer token
+            value: Verification result
+            expires_at: Unix time the token expires
+            tag: Group the entry can be invalidated with
+        """
+        self.put_by_digest(token_digest(token), value, expires_at, tag)
+
+    def put_by_digest(self, key: str, value: Any, expires_at: float, tag: Optional[str] = None) -> None:
+        """Cache a result by token digest"""
+        if self.max_ttl is not None:
+            expires_at = min(expires_at, time.time() + self.max_ttl)
+        if expires_at <= time.time():
+            return
+
+        self._remove(key)
+        while len(self.entries) >= self.max_entries:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+        self.entries[key] = _CachedToken(value=value, expires_at=expires_at, tag=tag)
+        if tag is not None:
+            self._tag_keys.setdefault(tag, set()).add(key)
+
+    def invalidate(self, token: str) -> bool:
+        """Drop a token's entry; returns whether one was cached"""
+        return self.invalidate_digest(token_digest(token))
+
+    def invalidate_digest(self, key: str) -> bool:
+        """Drop an entry by token digest"""
+        found = key in self.entries
+        self._remove(key)
+        self.invalidations += found
+        return found
+
+    def invalidate_tag(self, tag: str) -> int:
+        """
+        Drop every entry with a tag.
+
+        Args:
+            tag: Entry tag (e.g. a signing key id that was retired)
+
+        Returns:
+            Number of entries removed
+        """
+        keys = self._tag_keys.get(tag, set()).copy()
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def tags(self) -> Set[str]:
+        """Tags of cached entries"""
+        return set(self._tag_keys)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self.entries.clear()
+        self._tag_keys.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Cache size and hit-rate statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its tag record"""
+        entry = self.entries.pop(key, None)
+        if entry is None or entry.tag is None:
+            return
+        keys = self._tag_keys.get(entry.tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tag_keys[entry.tag]
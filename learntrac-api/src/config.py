@@ -66,6 +66,19 @@ class Settings(BaseSettings):
     session_timeout: int = int(os.getenv("SESSION_TIMEOUT", "3600"))  # 1 hour
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
     
+    # Validated session cache
+    session_cache_size: int = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+    session_cache_ttl: int = int(os.getenv("SESSION_CACHE_TTL", "300"))  # 5 minutes
+    session_cache_url: str = os.getenv("SESSION_CACHE_URL", "")  # redis://... or sqlite:///path; empty for per-worker only (logout then only reaches one worker)
+    session_cache_sync_interval: float = float(os.getenv("SESSION_CACHE_SYNC_INTERVAL", "1"))  # Logout propagation delay
+
+    # Cognito JWT verification
+    aws_region: str = os.getenv("AWS_REGION", "us-east-2")
+    cognito_pool_id: str = os.getenv("COGNITO_POOL_ID", "")
+    cognito_client_id: str = os.getenv("COGNITO_CLIENT_ID", "")
+    jwks_cache_ttl: int = int(os.getenv("JWKS_CACHE_TTL", "3600"))  # 1 hour
+    token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
     # API Keys for service-to-service auth
     valid_api_keys: list = os.getenv("VALID_API_KEYS", "").split(",") if os.getenv("VALID_API_KEYS") else []
     internal_api_key: str = os.getenv("INTERNAL_API_KEY", "")
@@ -73,6 +86,20 @@ class Settings(BaseSettings):
     # API Keys
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     
+    # Textbook ingestion jobs
+    ingestion_workers: int = int(os.getenv("INGESTION_WORKERS", "2"))
+    ingestion_queue_size: int = int(os.getenv("INGESTION_QUEUE_SIZE", "20"))
+    ingestion_upload_dir: str = os.getenv("INGESTION_UPLOAD_DIR", "")  # Empty for the system temp dir
+    max_upload_size_mb: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "200"))
+    
+    # Vector search result cache
+    search_cache_size: int = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+    search_cache_ttl: int = int(os.getenv("SEARCH_CACHE_TTL", "900"))  # 15 minutes
+    search_cache_similarity: float = float(os.getenv("SEARCH_CACHE_SIMILARITY", "0"))  # 0 disables near-duplicate reuse
+    
+    # Neo4j query result cache
+    neo4j_cache_ttl: int = int(os.getenv("NEO4J_CACHE_TTL", "3600"))  # 1 hour; bounds staleness from writes made outside this service
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
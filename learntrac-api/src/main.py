@@ -16,6 +16,8 @@ from .services.generation_service import generation_service
 from .services.llm_service import llm_service
 from .services.ticket_service import ticket_service
 from .services.evaluation_service import evaluation_service
+from .services.ingestion_jobs import ingestion_job_manager
+from .auth.modern_session_handler import session_validator
 
 # Configure logging
 logging.basicConfig(
@@ -64,18 +66,24 @@ async def lifespan(app: FastAPI):
     await evaluation_service.initialize(db_manager.pool)
     app.state.evaluation_service = evaluation_service
     
+    # Start background textbook ingestion workers
+    await ingestion_job_manager.start()
+    app.state.ingestion_job_manager = ingestion_job_manager
+    
     logger.info("LearnTrac API started successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down LearnTrac API...")
+    await ingestion_job_manager.close()
     await db_manager.close()
     # Redis removed - no longer needed
     await neo4j_client.close()
     await neo4j_aura_client.close()
     await llm_service.close()
     await ticket_service.close()
+    await session_validator.close()
 
 app = FastAPI(
     title="LearnTrac API",
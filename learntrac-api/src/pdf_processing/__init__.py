@@ -9,16 +9,18 @@ This module provides comprehensive PDF processing capabilities including:
 - Complete processing pipeline with quality metrics
 """
 
-from .pdf_processor import PDFProcessor, ExtractionResult, ExtractionMethod
-from .text_cleaner import TextCleaner, CleaningResult, TextIssueType
+from .pdf_processor import PDFProcessor, ExtractionResult, ExtractionMethod, PageAnalysisOptions, PageContent, PageRange, PageRangeTimeoutError
+from .text_cleaner import TextCleaner, CleaningResult, CleaningStream, TextIssueType
 from .structure_detector import StructureDetector, DetectionResult, StructureType, StructureElement
 from .content_filter import ContentFilter, FilteringResult, ContentType
 from .pipeline import PDFProcessingPipeline, ProcessingResult, ProcessingStatus, QualityMetrics
+from .worker_pool import ExecutionMode
 
 __all__ = [
     # Core components
     'PDFProcessor',
     'TextCleaner', 
+    'CleaningStream',
     'StructureDetector',
     'ContentFilter',
     
@@ -34,10 +36,17 @@ __all__ = [
     
     # Data classes and enums
     'ExtractionMethod',
+    'PageAnalysisOptions',
+    'PageContent',
+    'PageRange',
     'TextIssueType',
     'StructureType',
     'StructureElement',
     'ContentType',
     'ProcessingStatus',
-    'QualityMetrics'
+    'QualityMetrics',
+    'ExecutionMode',
+    
+    # Exceptions
+    'PageRangeTimeoutError'
 ]
\ No newline at end of file
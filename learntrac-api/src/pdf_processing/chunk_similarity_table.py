@@ -0,0 +1,392 @@
+"""
+Chunk Similarity Table - Precomputed top-k chunk neighbours
+
+Builds and maintains a chunk-to-chunk nearest neighbour table:
+- Blocked matrix multiplication in memory-bounded tiles
+- Exact top-k selection per chunk with self-matches excluded
+- Incremental updates when new chunks are added
+- O(1) neighbour and pair-similarity lookups
+"""
+
+import time
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Sequence, Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def blocked_top_k(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    block_size: int = 1024,
+    exclude: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k inner products computed tile by tile.
+
+    Only a (block_size x block_size) score tile plus the running top-k are
+    held in memory at any time, so peak memory does not grow with corpus size.
+
+    Args:
+        queries: Normalized query matrix (Q, D)
+        corpus: Normalized corpus matrix (N, D)
+        k: Neighbours to keep per query
+        block_size: Rows/columns per tile
+        exclude: Optional corpus index per query to skip (e.g. the query itself)
+
+    Returns:
+        (indices, scores) arrays of shape (Q, k'), sorted by score descending,
+        where k' = min(k, N). Missing entries have index -1 and score -inf.
+    """
+    n_queries, n_corpus = len(queries), len(corpus)
+    k = min(k, n_corpus)
+    top_indices = np.full((n_queries, k), -1, dtype=np.int64)
+    top_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    if k == 0 or n_queries == 0:
+        return top_indices, top_scores
+
+    for q_start in range(0, n_queries, block_size):
+        q_end = min(q_start + block_size, n_queries)
+        q_block = queries[q_start:q_end]
+        best_indices = top_indices[q_start:q_end]
+        best_scores = top_scores[q_start:q_end]
+
+        for c_start in range(0, n_corpus, block_size):
+            c_end = min(c_start + block_size, n_corpus)
+            tile = q_block @ corpus[c_start:c_end].T
+
+            if exclude is not None:
+                local = exclude[q_start:q_end] - c_start
+                rows = np.flatnonzero((local >= 0) & (local < c_end - c_start))
+                tile[rows, local[rows]] = -np.inf
+
+            tile_indices = np.broadcast_to(
+                np.arange(c_start, c_end, dtype=np.int64), tile.shape
+            )
+            merged_scores = np.concatenate([best_scores, tile], axis=1)
+            merged_indices = np.concatenate([best_indices, tile_indices], axis=1)
+
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_indices = np.take_along_axis(merged_indices, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        top_scores[q_start:q_end] = np.take_along_axis(best_scores, order, axis=1)
+        top_indices[q_start:q_end] = np.take_along_axis(best_indices, order, axis=1)
+
+    top_indices[np.isneginf(top_scores)] = -1
+    return top_indices, top_scores
+
+
+class ChunkSimilarityTable:
+    """
+    Top-k neighbour table over chunk embeddings.
+
+    Neighbour lists are stored as dictionaries keyed by neighbour id, so both
+    "neighbours of a chunk" and "similarity of a pair" are O(1) lookups.
+    """
+
+    def __init__(
+        self,
+        k: int = 20,
+        block_size: int = 1024,
+        min_similarity: float = 0.0
+    ):
+        """
+        Initialize similarity table.
+
+        Args:
+            k: Neighbours stored per chunk
+            block_size: Tile size for blocked matrix multiplication
+            min_similarity: Neighbours below this score are not stored
+        """
+        self.k = k
+        self.block_size = block_size
+        self.min_similarity = min_similarity
+
+        self.neighbours: Dict[str, Dict[str, float]] = {}
+        self.chunk_metadata: Dict[str, Dict[str, Any]] = {}
+
+        self._ids: List[str] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+
+        self.last_build_time: Optional[float] = None
+        self.last_update_time: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.neighbours)
+
+    @property
+    def has_vectors(self) -> bool:
+        """Whether embeddings are loaded (required for incremental updates)"""
+        return len(self._ids) > 0
+
+    def build(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        metadata: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Compute the full neighbour table.
+
+        Args:
+            ids: Chunk ids, one per vector
+            vectors: Array-like of shape (N, D)
+            metadata: Optional per-chunk display metadata
+        """
+        start_time = time.time()
+        self._ids = [str(i) for i in ids]
+        self._id_to_row = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._vectors = self._normalize(vectors)
+        self.chunk_metadata = dict(metadata or {})
+
+        indices, scores = blocked_top_k(
+            self._vectors,
+            self._vectors,
+            self.k,
+            self.block_size,
+            exclude=np.arange(len(self._ids))
+        )
+        self.neighbours = {
+            chunk_id: self._to_neighbour_dict(indices[row], scores[row])
+            for row, chunk_id in enumerate(self._ids)
+        }
+
+        self.last_build_time = time.time() - start_time
+        logger.info(
+            f"Built similarity table for {len(self._ids)} chunks "
+            f"(k={self.k}) in {self.last_build_time:.2f}s"
+        )
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        metadata: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Add or replace chunks and update affected neighbour lists.
+
+        New chunks get a full top-k list; existing chunks only merge in the
+        new chunks as candidates, so the cost is O(N * new) instead of O(N^2).
+        Chunks that listed a replaced chunk lost that entry, so their lists
+        are recomputed in full as well.
+
+        Args:
+            ids: Chunk ids, one per vector
+            vectors: Array-like of shape (M, D)
+            metadata: Optional per-chunk display metadata
+
+        Returns:
+            Ids of every chunk whose neighbour list changed
+        """
+        start_time = time.time()
+        new_ids = [str(i) for i in ids]
+        new_vectors = self._normalize(vectors)
+        if not new_ids:
+            return []
+
+        replaced = [chunk_id for chunk_id in new_ids if chunk_id in self._id_to_row]
+        stale_ids = set(self.remove(replaced)) if replaced else set()
+
+        old_count = len(self._ids)
+        if old_count:
+            self._vectors = np.vstack([self._vectors, new_vectors])
+        else:
+            self._vectors = new_vectors
+        for chunk_id in new_ids:
+            self._id_to_row[chunk_id] = len(self._ids)
+            self._ids.append(chunk_id)
+        if metadata:
+            self.chunk_metadata.update(metadata)
+
+        new_rows = np.arange(old_count, len(self._ids))
+
+        # Full neighbour lists for the new chunks
+        indices, scores = blocked_top_k(
+            new_vectors, self._vectors, self.k, self.block_size, exclude=new_rows
+        )
+        for offset, chunk_id in enumerate(new_ids):
+            self.neighbours[chunk_id] = self._to_neighbour_dict(indices[offset], scores[offset])
+
+        # Lists that lost a replaced chunk are recomputed against everything
+        changed = set(new_ids)
+        stale_ids -= changed
+        if stale_ids:
+            stale_rows = np.array([self._id_to_row[chunk_id] for chunk_id in stale_ids])
+            indices, scores = blocked_top_k(
+                self._vectors[stale_rows], self._vectors, self.k, self.block_size, exclude=stale_rows
+            )
+            for offset, row in enumerate(stale_rows):
+                self.neighbours[self._ids[row]] = self._to_neighbour_dict(indices[offset], scores[offset])
+            changed.update(stale_ids)
+
+        # Other existing chunks only need the new chunks as extra candidates
+        if old_count:
+            indices, scores = blocked_top_k(
+                self._vectors[:old_count], new_vectors, self.k, self.block_size
+            )
+            for row in range(old_count):
+                if self._ids[row] in stale_ids:
+                    continue
+                candidates = self._to_neighbour_dict(indices[row] + old_count, scores[row], valid=indices[row] >= 0)
+                if self._merge_neighbours(self._ids[row], candidates):
+                    changed.add(self._ids[row])
+
+        self.last_update_time = time.time() - start_time
+        logger.info(
+            f"Added {len(new_ids)} chunks to similarity table; "
+            f"{len(changed)} neighbour lists changed in {self.last_update_time:.2f}s"
+        )
+        return list(changed)
+
+    def remove(self, ids: Sequence[str]) -> List[str]:
+        """
+        Remove chunks from the table.
+
+        Neighbour lists that referenced a removed chunk simply lose that
+        entry; they are refilled on the next full build.
+
+        Args:
+            ids: Chunk ids to remove
+
+        Returns:
+            Ids of remaining chunks whose neighbour lists changed
+        """
+        removed = {str(i) for i in ids} & set(self._id_to_row)
+        if not removed:
+            return []
+
+        keep_rows = [row for row, chunk_id in enumerate(self._ids) if chunk_id not in removed]
+        self._vectors = self._vectors[keep_rows]
+        self._ids = [self._ids[row] for row in keep_rows]
+        self._id_to_row = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+
+        changed = []
+        for chunk_id in removed:
+            self.neighbours.pop(chunk_id, None)
+            self.chunk_metadata.pop(chunk_id, None)
+        for chunk_id, neighbour_scores in self.neighbours.items():
+            if removed.intersection(neighbour_scores):
+                for removed_id in removed:
+                    neighbour_scores.pop(removed_id, None)
+                changed.append(chunk_id)
+        return changed
+
+    def load_rows(self, rows: Iterator[Tuple[str, str, float]]) -> None:
+        """
+        Load neighbour lists from stored (chunk_id, neighbour_id, score) rows.
+
+        Args:
+            rows: Stored neighbour rows
+        """
+        loaded: Dict[str, List[Tuple[str, float]]] = {}
+        for chunk_id, neighbour_id, score in rows:
+            loaded.setdefault(chunk_id, []).append((neighbour_id, float(score)))
+
+        self.neighbours = {
+            chunk_id: dict(sorted(pairs, key=lambda p: p[1], reverse=True)[:self.k])
+            for chunk_id, pairs in loaded.items()
+        }
+
+    def iter_rows(self, chunk_ids: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, str, float]]:
+        """
+        Iterate (chunk_id, neighbour_id, score) rows for persistence.
+
+        Args:
+            chunk_ids: Restrict to these chunks (default all)
+        """
+        for chunk_id in (chunk_ids if chunk_ids is not None else list(self.neighbours)):
+            for neighbour_id, score in self.neighbours.get(chunk_id, {}).items():
+                yield chunk_id, neighbour_id, score
+
+    def get_neighbours(self, chunk_id: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Get stored neighbours of a chunk, most similar first.
+
+        Args:
+            chunk_id: Chunk id
+            limit: Maximum neighbours to return
+
+        Returns:
+            List of (neighbour_id, score)
+        """
+        neighbour_scores = self.neighbours.get(chunk_id)
+        if not neighbour_scores:
+            return []
+        items = list(neighbour_scores.items())
+        return items[:limit] if limit is not None else items
+
+    def get_similarity(self, chunk_id: str, other_id: str) -> Optional[float]:
+        """
+        Get the stored similarity of a chunk pair.
+
+        Args:
+            chunk_id: First chunk id
+            other_id: Second chunk id
+
+        Returns:
+            Similarity if either chunk lists the other as a neighbour, else None
+        """
+        score = self.neighbours.get(chunk_id, {}).get(other_id)
+        if score is None:
+            score = self.neighbours.get(other_id, {}).get(chunk_id)
+        return score
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get table statistics"""
+        return {
+            "chunks": len(self.neighbours),
+            "k": self.k,
+            "stored_pairs": sum(len(n) for n in self.neighbours.values()),
+            "vectors_loaded": len(self._ids),
+            "last_build_time": self.last_build_time,
+            "last_update_time": self.last_update_time
+        }
+
+    def _merge_neighbours(self, chunk_id: str, candidates: Dict[str, float]) -> bool:
+        """Merge candidate neighbours into a chunk's list, keeping the top k"""
+        current = self.neighbours.setdefault(chunk_id, {})
+        if not candidates:
+            return False
+
+        floor = min(current.values()) if len(current) >= self.k else -np.inf
+        better = {n: s for n, s in candidates.items() if s > floor}
+        if not better:
+            return False
+
+        merged = {**current, **better}
+        self.neighbours[chunk_id] = dict(
+            sorted(merged.items(), key=lambda p: p[1], reverse=True)[:self.k]
+        )
+        return True
+
+    def _to_neighbour_dict(
+        self,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        valid: Optional[np.ndarray] = None
+    ) -> Dict[str, float]:
+        """Convert a top-k row into an ordered neighbour dictionary"""
+        neighbour_scores = {}
+        for position, (index, score) in enumerate(zip(indices, scores)):
+            if index < 0 or (valid is not None and not valid[position]):
+                continue
+            if score < self.min_similarity:
+                break
+            neighbour_scores[self._ids[index]] = float(score)
+        return neighbour_scores
+
+    @staticmethod
+    def _normalize(vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1) if matrix.size else matrix.reshape(0, 0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
@@ -7,10 +7,13 @@ mathematical expressions, and pedagogical relationships.
 
 import re
 import logging
+from array import array
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Optional, Tuple, Set
 from dataclasses import dataclass, field
 
 from .chunk_metadata import ChunkMetadata, ContentType
+from .interval_index import IntervalIndex, merge_intervals, join_labels, join_distinct_labels, keep_first_label
 from .structure_detector import StructureElement, StructureType
 
 
@@ -32,6 +35,188 @@ class ChunkBoundary:
     context: str = ""  # Text context around boundary
 
 
+class BoundaryPlanner:
+    """
+    Chunk boundary lookups over one section, indexed once.
+    
+    Paragraph, sentence and word boundaries are found with one regex pass
+    each and stored as sorted position arrays, so choosing a boundary near a
+    target is a few binary searches instead of scanning a window. Results
+    are identical to running the boundary regexes over the window around
+    each target, including matches cut short at the window edges and
+    tie-breaking between equally scored candidates.
+    """
+    
+    # (boundary type, quality score) in the order candidates are compared
+    BOUNDARY_TYPES = (('paragraph', 0.9), ('sentence', 0.7), ('word', 0.5))
+    
+    def __init__(self,
+                 text: str,
+                 protected_regions: List[Tuple[int, int, str]],
+                 min_chunk_size: int,
+                 window: int = 200):
+        """
+        Index a section for boundary planning.
+        
+        Args:
+            text: Section text
+            protected_regions: Non-overlapping (start, end, type) regions
+                relative to the section
+            min_chunk_size: Minimum distance of a boundary from the chunk start
+            window: Search distance on each side of the target position
+        """
+        self.text = text
+        self.min_chunk_size = min_chunk_size
+        self.window = window
+        
+        self._regions = IntervalIndex(protected_regions)
+        
+        # Maximal whitespace runs; word boundaries are their ends
+        self._run_starts = array('q')
+        self._run_ends = array('q')
+        for match in re.finditer(r'\s+', text):
+            self._run_starts.append(match.start())
+            self._run_ends.append(match.end())
+        
+        # Sentence ends: punctuation followed by a whitespace run
+        self._sentence_starts = array('q')
+        self._sentence_ends = array('q')
+        for match in re.finditer(r'[.!?]\s+', text):
+            self._sentence_starts.append(match.start())
+            self._sentence_ends.append(match.end())
+        
+        # Paragraph breaks: at most one per run, from its first to last newline
+        self._newlines = array('q', (m.start() for m in re.finditer(r'\n', text)))
+        self._paragraph_ends = array('q')
+        self._paragraph_run_starts = array('q')
+        self._paragraph_run_ends = array('q')
+        for match in re.finditer(r'\n\s*\n', text):
+            run = bisect_right(self._run_starts, match.start()) - 1
+            self._paragraph_ends.append(match.end())
+            self._paragraph_run_starts.append(self._run_starts[run])
+            self._paragraph_run_ends.append(self._run_ends[run])
+    
+    def find_best_boundary(self, start_pos: int, target_pos: int) -> ChunkBoundary:
+        """Find the best boundary position near target"""
+        search_start = max(start_pos + self.min_chunk_size, target_pos - self.window)
+        search_end = min(len(self.text), target_pos + self.window)
+        
+        # Check if target position is within a protected region
+        region = self._regions.containing(target_pos)
+        if region is not None:
+            pstart, pend, ptype = region
+            if pend < search_end:
+                return ChunkBoundary(
+                    position=pend,
+                    boundary_type='protected_region',
+                    quality_score=0.9,
+                    context=f"After {ptype}"
+                )
+            elif pstart > search_start:
+                return ChunkBoundary(
+                    position=pstart,
+                    boundary_type='protected_region',
+                    quality_score=0.8,
+                    context=f"Before {ptype}"
+                )
+        
+        best = None
+        best_score = None
+        if search_start < search_end:
+            for (boundary_type, quality), positions in zip(
+                self.BOUNDARY_TYPES,
+                (self._paragraph_positions(search_start, search_end),
+                 self._sentence_positions(search_start, search_end),
+                 self._word_positions(search_start, search_end))
+            ):
+                position = self._closest(positions, target_pos)
+                if position is None:
+                    continue
+                candidate = ChunkBoundary(
+                    position=position,
+                    boundary_type=boundary_type,
+                    quality_score=quality
+                )
+                score = self._score(candidate, target_pos)
+                if best is None or score > best_score:
+                    best, best_score = candidate, score
+        
+        if best is None:
+            # Forced boundary at target position
+            return ChunkBoundary(
+                position=target_pos,
+                boundary_type='forced',
+                quality_score=0.2
+            )
+        return best
+    
+    def _paragraph_positions(self, start: int, end: int) -> List[int]:
+        """Paragraph boundaries regex-matched within text[start:end]"""
+        # Runs entirely inside the window match as in the full text
+        lo = bisect_left(self._paragraph_run_starts, start)
+        hi = bisect_right(self._paragraph_run_ends, end)
+        positions = list(self._paragraph_ends[lo:hi]) if lo < hi else []
+        
+        # Runs cut by the window edges only see their newlines inside it
+        first_run = bisect_right(self._run_starts, start) - 1
+        if first_run >= 0 and self._run_starts[first_run] < start < self._run_ends[first_run]:
+            edge = self._clipped_paragraph_end(first_run, start, end)
+            if edge is not None:
+                positions.insert(0, edge)
+        
+        last_run = bisect_left(self._run_starts, end) - 1
+        if (last_run >= 0 and self._run_starts[last_run] >= start
+                and self._run_ends[last_run] > end):
+            edge = self._clipped_paragraph_end(last_run, start, end)
+            if edge is not None:
+                positions.append(edge)
+        
+        return positions
+    
+    def _clipped_paragraph_end(self, run: int, start: int, end: int) -> Optional[int]:
+        """End of the paragraph match in a whitespace run clipped to [start, end)"""
+        lo = bisect_left(self._newlines, max(self._run_starts[run], start))
+        hi = bisect_left(self._newlines, min(self._run_ends[run], end))
+        return self._newlines[hi - 1] + 1 if hi - lo >= 2 else None
+    
+    def _sentence_positions(self, start: int, end: int) -> List[int]:
+        """Sentence boundaries regex-matched within text[start:end]"""
+        lo = bisect_left(self._sentence_starts, start)
+        hi = bisect_left(self._sentence_starts, end - 1)
+        positions = list(self._sentence_ends[lo:hi])
+        if positions and positions[-1] > end:
+            positions[-1] = end
+        return positions
+    
+    def _word_positions(self, start: int, end: int) -> List[int]:
+        """Word boundaries regex-matched within text[start:end]"""
+        lo = bisect_right(self._run_ends, start)
+        hi = bisect_left(self._run_starts, end)
+        positions = list(self._run_ends[lo:hi])
+        if positions and positions[-1] > end:
+            positions[-1] = end
+        return positions
+    
+    @staticmethod
+    def _closest(positions: List[int], target_pos: int) -> Optional[int]:
+        """Position nearest the target, the earlier one on ties"""
+        if not positions:
+            return None
+        index = bisect_left(positions, target_pos)
+        if index == 0:
+            return positions[0]
+        if index == len(positions):
+            return positions[-1]
+        before, after = positions[index - 1], positions[index]
+        return before if target_pos - before <= after - target_pos else after
+    
+    def _score(self, candidate: ChunkBoundary, target_pos: int) -> float:
+        """Score a boundary candidate based on quality and distance to target"""
+        distance = abs(candidate.position - target_pos)
+        distance_score = max(0, 1.0 - distance / self.window)
+        return candidate.quality_score * 0.7 + distance_score * 0.3
+
+
 class MathematicalContentDetector:
     """Detects and preserves mathematical content as complete units"""
     
@@ -92,24 +277,8 @@ class MathematicalContentDetector:
     
     def _merge_overlapping_regions(self, regions: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
         """Merge overlapping mathematical content regions"""
-        if not regions:
-            return []
-        
-        # Sort by start position
-        sorted_regions = sorted(regions, key=lambda x: x[0])
-        merged = [sorted_regions[0]]
-        
-        for current in sorted_regions[1:]:
-            last = merged[-1]
-            
-            # If regions overlap or are very close (within 10 chars)
-            if current[0] <= last[1] + 10:
-                # Merge regions
-                merged[-1] = (last[0], max(last[1], current[1]), f"{last[2]}+{current[2]}")
-            else:
-                merged.append(current)
-        
-        return merged
+        # Regions that overlap or are very close (within 10 chars) merge
+        return merge_intervals(regions, gap=10, combine=join_labels)
 
 
 class DefinitionDetector:
@@ -246,21 +415,7 @@ class ExampleDetector:
     
     def _merge_overlapping_regions(self, regions: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
         """Merge overlapping example regions"""
-        if not regions:
-            return []
-        
-        sorted_regions = sorted(regions, key=lambda x: x[0])
-        merged = [sorted_regions[0]]
-        
-        for current in sorted_regions[1:]:
-            last = merged[-1]
-            
-            if current[0] <= last[1]:
-                merged[-1] = (last[0], max(last[1], current[1]), last[2])
-            else:
-                merged.append(current)
-        
-        return merged
+        return merge_intervals(regions, combine=keep_first_label)
 
 
 class ContentAwareChunker:
@@ -331,7 +486,7 @@ class ContentAwareChunker:
         metadata_base = metadata_base or {}
         
         # Find protected content regions
-        protected_regions = self._find_protected_regions(text)
+        protected_regions = IntervalIndex(self._find_protected_regions(text))
         
         # Organize structure elements by hierarchy
         structured_sections = self._organize_by_structure(structure_elements, text)
@@ -383,25 +538,8 @@ class ContentAwareChunker:
     
     def _merge_all_protected_regions(self, regions: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
         """Merge all overlapping protected regions"""
-        if not regions:
-            return []
-        
-        # Sort by start position
-        sorted_regions = sorted(regions, key=lambda x: x[0])
-        merged = [sorted_regions[0]]
-        
-        for current in sorted_regions[1:]:
-            last = merged[-1]
-            
-            # If regions overlap or are very close
-            if current[0] <= last[1] + 20:
-                # Merge regions, combining types
-                new_type = f"{last[2]}+{current[2]}" if last[2] != current[2] else last[2]
-                merged[-1] = (last[0], max(last[1], current[1]), new_type)
-            else:
-                merged.append(current)
-        
-        return merged
+        # Regions that overlap or are very close merge, combining types
+        return merge_intervals(regions, gap=20, combine=join_distinct_labels)
     
     def _organize_by_structure(self, 
                               elements: List[StructureElement], 
@@ -476,7 +614,7 @@ class ContentAwareChunker:
     def _chunk_section(self,
                       text: str,
                       section_info: Dict[str, any],
-                      protected_regions: List[Tuple[int, int, str]],
+                      protected_regions: IntervalIndex,
                       book_id: str,
                       metadata_base: Dict[str, any]) -> Tuple[List[str], List[ChunkMetadata], List[str]]:
         """Chunk a single structured section"""
@@ -498,11 +636,11 @@ class ContentAwareChunker:
             return [section_text], [chunk_metadata], []
         
         # Find relevant protected regions for this section
-        section_protected = []
-        for start, end, ptype in protected_regions:
-            if start >= section_start and end <= section_info['end']:
-                # Adjust positions relative to section
-                section_protected.append((start - section_start, end - section_start, ptype))
+        section_protected = [
+            # Adjust positions relative to section
+            (start - section_start, end - section_start, ptype)
+            for start, end, ptype in protected_regions.within(section_start, section_info['end'])
+        ]
         
         # Find optimal chunk boundaries
         boundaries = self._find_chunk_boundaries(section_text, section_protected)
@@ -574,6 +712,7 @@ class ContentAwareChunker:
                               text: str, 
                               protected_regions: List[Tuple[int, int, str]]) -> List[ChunkBoundary]:
         """Find optimal chunk boundaries within text"""
+        planner = BoundaryPlanner(text, protected_regions, self.min_chunk_size)
         boundaries = []
         current_pos = 0
         
@@ -591,94 +730,13 @@ class ContentAwareChunker:
                 break
             
             # Find best boundary near target position
-            best_boundary = self._find_best_boundary(
-                text, current_pos, target_pos, protected_regions
-            )
+            best_boundary = planner.find_best_boundary(current_pos, target_pos)
             
             boundaries.append(best_boundary)
             current_pos = best_boundary.position
         
         return boundaries
     
-    def _find_best_boundary(self,
-                           text: str,
-                           start_pos: int,
-                           target_pos: int,
-                           protected_regions: List[Tuple[int, int, str]]) -> ChunkBoundary:
-        """Find the best boundary position near target"""
-        # Search window around target position
-        search_start = max(start_pos + self.min_chunk_size, target_pos - 200)
-        search_end = min(len(text), target_pos + 200)
-        
-        # Check if target position is within a protected region
-        for pstart, pend, ptype in protected_regions:
-            if pstart <= target_pos <= pend:
-                # Move boundary to after protected region
-                if pend < search_end:
-                    return ChunkBoundary(
-                        position=pend,
-                        boundary_type='protected_region',
-                        quality_score=0.9,
-                        context=f"After {ptype}"
-                    )
-                # Or before protected region
-                elif pstart > search_start:
-                    return ChunkBoundary(
-                        position=pstart,
-                        boundary_type='protected_region',
-                        quality_score=0.8,
-                        context=f"Before {ptype}"
-                    )
-        
-        # Look for natural boundaries in search window
-        candidates = []
-        
-        # Paragraph breaks (highest quality)
-        for match in re.finditer(r'\n\s*\n', text[search_start:search_end]):
-            pos = search_start + match.end()
-            candidates.append(ChunkBoundary(
-                position=pos,
-                boundary_type='paragraph',
-                quality_score=0.9
-            ))
-        
-        # Sentence boundaries (good quality)
-        for match in re.finditer(r'[.!?]\s+', text[search_start:search_end]):
-            pos = search_start + match.end()
-            candidates.append(ChunkBoundary(
-                position=pos,
-                boundary_type='sentence',
-                quality_score=0.7
-            ))
-        
-        # Word boundaries (acceptable quality)
-        for match in re.finditer(r'\s+', text[search_start:search_end]):
-            pos = search_start + match.end()
-            candidates.append(ChunkBoundary(
-                position=pos,
-                boundary_type='word',
-                quality_score=0.5
-            ))
-        
-        if not candidates:
-            # Forced boundary at target position
-            return ChunkBoundary(
-                position=target_pos,
-                boundary_type='forced',
-                quality_score=0.2
-            )
-        
-        # Choose best candidate based on quality and distance to target
-        best_candidate = max(candidates, key=lambda c: self._score_boundary_candidate(c, target_pos))
-        return best_candidate
-    
-    def _score_boundary_candidate(self, candidate: ChunkBoundary, target_pos: int) -> float:
-        """Score a boundary candidate based on quality and distance"""
-        distance = abs(candidate.position - target_pos)
-        distance_score = max(0, 1.0 - distance / 200)  # Penalty for distance from target
-        
-        return candidate.quality_score * 0.7 + distance_score * 0.3
-    
     def _create_chunk_metadata(self,
                               text: str,
                               chunk_id: str,
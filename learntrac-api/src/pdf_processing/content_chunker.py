@@ -8,7 +8,7 @@ and fallback strategies based on document structure quality assessment.
 import logging
 import time
 import threading
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -18,6 +18,7 @@ from .structure_quality_assessor import StructureQualityAssessor, QualityAssessm
 from .content_aware_chunker import ContentAwareChunker, ChunkingResult as ContentAwareResult
 from .fallback_chunker import FallbackChunker, FallbackChunkingResult
 from .structure_detector import DetectionResult, StructureElement
+from .worker_pool import WorkerPool, WorkerPoolConfig, ExecutionMode
 
 
 class ChunkingMode(Enum):
@@ -108,7 +109,9 @@ class ContentChunker:
                  enable_preprocessing: bool = True,
                  enable_postprocessing: bool = True,
                  thread_safe: bool = True,
-                 max_workers: int = 4):
+                 max_workers: int = 4,
+                 execution_mode: ExecutionMode = ExecutionMode.THREAD,
+                 document_timeout: Optional[float] = None):
         """
         Initialize hybrid content chunker.
         
@@ -120,7 +123,9 @@ class ContentChunker:
             enable_preprocessing: Enable text preprocessing
             enable_postprocessing: Enable chunk validation and enhancement
             thread_safe: Enable thread-safe operations
-            max_workers: Maximum threads for batch processing
+            max_workers: Maximum threads or worker processes for batch processing
+            execution_mode: Default execution mode for batch processing
+            document_timeout: Per-document time limit in seconds in process mode
         """
         
         self.structure_quality_threshold = structure_quality_threshold
@@ -128,6 +133,25 @@ class ContentChunker:
         self.enable_postprocessing = enable_postprocessing
         self.thread_safe = thread_safe
         self.max_workers = max_workers
+        self.execution_mode = execution_mode
+        self.document_timeout = document_timeout
+        
+        # Settings used to build equivalent chunkers in worker processes
+        self._component_settings = {
+            'structure_quality_threshold': structure_quality_threshold,
+            'min_chapters_for_structure': min_chapters_for_structure,
+            'content_aware_target_size': content_aware_target_size,
+            'content_aware_min_size': content_aware_min_size,
+            'content_aware_max_size': content_aware_max_size,
+            'content_aware_overlap': content_aware_overlap,
+            'fallback_target_size': fallback_target_size,
+            'fallback_min_size': fallback_min_size,
+            'fallback_max_size': fallback_max_size,
+            'fallback_overlap': fallback_overlap,
+            'enable_preprocessing': enable_preprocessing,
+            'enable_postprocessing': enable_postprocessing
+        }
+        self._worker_pool: Optional[WorkerPool] = None
         
         self.logger = logging.getLogger(__name__)
         
@@ -293,26 +317,31 @@ class ContentChunker:
     
     def chunk_batch(self, 
                    requests: List[ChunkingRequest],
-                   max_workers: Optional[int] = None) -> BatchChunkingResult:
+                   max_workers: Optional[int] = None,
+                   execution_mode: Optional[ExecutionMode] = None) -> BatchChunkingResult:
         """
         Process multiple chunking requests in parallel.
         
         Args:
             requests: List of chunking requests
             max_workers: Override default max workers
+            execution_mode: Override default execution mode
             
         Returns:
             BatchChunkingResult with aggregated results
         """
         start_time = time.time()
         max_workers = max_workers or self.max_workers
+        execution_mode = execution_mode or self.execution_mode
         
         self.logger.info(f"Starting batch chunking: {len(requests)} documents with {max_workers} workers")
         
         results = []
         errors = []
         
-        if max_workers == 1:
+        if execution_mode == ExecutionMode.PROCESS:
+            results, errors = self._chunk_batch_in_processes(requests, max_workers)
+        elif max_workers == 1:
             # Sequential processing
             for request in requests:
                 try:
@@ -378,6 +407,45 @@ class ContentChunker:
             errors=errors
         )
     
+    def _chunk_batch_in_processes(self,
+                                  requests: List[ChunkingRequest],
+                                  max_workers: int) -> Tuple[List[HybridChunkingResult], List[str]]:
+        """Chunk requests on long-lived worker processes, results in input order"""
+        if self._worker_pool is None or self._worker_pool.config.max_workers != max_workers:
+            self.close()
+            self._worker_pool = WorkerPool(ContentChunker, self._component_settings, WorkerPoolConfig(
+                mode=ExecutionMode.PROCESS,
+                max_workers=max_workers,
+                task_timeout=self.document_timeout
+            ))
+        
+        outcomes = self._worker_pool.run('chunk_content', [
+            (request.text, request.book_id, request.structure_elements,
+             request.metadata_base, request.force_strategy)
+            for request in requests
+        ])
+        
+        results = []
+        errors = []
+        for request, outcome in zip(requests, outcomes):
+            if outcome.succeeded:
+                result = outcome.result
+                results.append(result)
+                # Workers keep their own statistics, so record the document here too
+                self._update_processing_stats(result.strategy_used, len(result.chunks), result.processing_time)
+            else:
+                error_msg = f"Failed to process {request.book_id}: {outcome.error}"
+                errors.append(error_msg)
+                self.logger.error(error_msg)
+        
+        return results, errors
+    
+    def close(self) -> None:
+        """Shut down worker processes started for batch chunking"""
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+            self._worker_pool = None
+    
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text before chunking"""
         # Basic text cleaning and normalization
@@ -7,11 +7,15 @@ and performance enhancements for educational content embedding systems.
 
 import os
 import json
+import mmap
 import pickle
 import sqlite3
 import hashlib
 import time
 import threading
+import heapq
+import random
+import itertools
 import logging
 from typing import Dict, List, Optional, Tuple, Any, Set, Union
 from dataclasses import dataclass, field, asdict
@@ -77,6 +81,7 @@ class CacheConfig:
     # Compression settings
     compression_type: CompressionType = CompressionType.GZIP
     compression_threshold: int = 1000  # Compress embeddings larger than this
+    vector_storage_dtype: str = "float32"  # On-disk vector precision ("float32" or "float16")
     
     # Optimization settings
     enable_optimization: bool = True
@@ -89,6 +94,8 @@ class CacheConfig:
     enable_background_cleanup: bool = True
     cleanup_interval: int = 3600  # 1 hour
     batch_write_size: int = 100
+    write_behind_interval: float = 5.0  # Max seconds buffered writes wait before flushing
+    adaptive_sample_size: int = 16  # Entries scored per ADAPTIVE eviction
     thread_safe: bool = True
 
 
@@ -258,25 +265,60 @@ class EmbeddingOptimizer:
 
 
 class PersistentCache:
-    """Persistent cache using SQLite"""
+    """
+    Persistent cache with raw vector storage.
+    
+    Embeddings are appended as raw float32/float16 bytes to a vector file that
+    is memory-mapped for reads; SQLite holds only keys, vector offsets and
+    metadata. Loaded embeddings are read-only zero-copy views into the map.
+    Deleted vectors leave dead space in the file until compact() is called.
+    
+    Compaction commits the new offsets together with a pending-swap marker
+    before the rewritten file replaces the old one; opening the cache
+    finishes an interrupted swap, so offsets always match the vector file.
+    """
+    
+    VECTOR_ALIGNMENT = 8  # Byte alignment of each stored vector
+    QUERY_BATCH_SIZE = 500  # Keys per IN (...) query (SQLite variable limit)
+    SUPPORTED_DTYPES = ("float32", "float16")
     
-    def __init__(self, cache_dir: str, db_file: str = "embeddings.db"):
+    def __init__(self, cache_dir: str, db_file: str = "embeddings.db", vector_dtype: str = "float32"):
+        if vector_dtype not in self.SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {vector_dtype}")
+        
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.db_path = self.cache_dir / db_file
+        self.vector_path = self.db_path.with_suffix(".vectors")
+        self.compacted_path = self.vector_path.with_suffix(".vectors.tmp")
+        self.vector_dtype = np.dtype(vector_dtype)
         self.logger = logging.getLogger(__name__)
         
+        self._io_lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._vector_map: Optional[mmap.mmap] = None
+        
         self._init_database()
+        self._finish_interrupted_compaction()
+        self._vector_file = open(self.vector_path, "ab")
+        self.migrate_legacy_database()
     
     def _init_database(self):
         """Initialize SQLite database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS embeddings (
+        with self._io_lock:
+            # One long-lived connection; WAL lets readers proceed during writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        
+        with self._io_lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_index (
                     key TEXT PRIMARY KEY,
                     model TEXT NOT NULL,
                     content_type TEXT NOT NULL,
-                    embedding BLOB NOT NULL,
+                    vector_offset INTEGER NOT NULL,
+                    dimensions INTEGER NOT NULL,
+                    dtype TEXT NOT NULL,
                     metadata TEXT NOT NULL,
                     created_time REAL NOT NULL,
                     last_accessed REAL NOT NULL,
@@ -290,93 +332,185 @@ class PersistentCache:
             """)
             
             # Create indices for better performance
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_model ON embeddings(model)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_content_type ON embeddings(content_type)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_created_time ON embeddings(created_time)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_accessed ON embeddings(last_accessed)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_index_model ON embedding_index(model)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_index_content_type ON embedding_index(content_type)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_index_created_time ON embedding_index(created_time)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_index_last_accessed ON embedding_index(last_accessed)")
+            
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_state (
+                    name TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+    
+    def _finish_interrupted_compaction(self):
+        """Complete or discard a compaction that stopped before its file swap"""
+        with self._io_lock:
+            pending = self._conn.execute(
+                "SELECT 1 FROM cache_state WHERE name = 'pending_vector_swap'"
+            ).fetchone()
+            
+            if pending:
+                # Offsets already point into the compacted file
+                if self.compacted_path.exists():
+                    os.replace(self.compacted_path, self.vector_path)
+                    self.logger.warning("Finished an interrupted vector file compaction")
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache_state WHERE name = 'pending_vector_swap'")
+            elif self.compacted_path.exists():
+                # Offsets were never committed; the old file is still current
+                self.compacted_path.unlink()
+    
+    def migrate_legacy_database(self) -> int:
+        """
+        Move embeddings from the legacy pickled-BLOB table into the vector file.
+        
+        Runs once: the legacy table is dropped after a successful migration.
+        
+        Returns:
+            Number of entries migrated
+        """
+        try:
+            with self._io_lock:
+                legacy = self._conn.execute("""
+                    SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'embeddings'
+                """).fetchone()
+                if legacy is None:
+                    return 0
+                
+                migrated = 0
+                failed = 0
+                with self._conn:
+                    cursor = self._conn.execute("SELECT * FROM embeddings")
+                    for row in cursor:
+                        try:
+                            embedding_blob = row[3]
+                            if row[9]:  # compressed
+                                embedding_blob = gzip.decompress(embedding_blob)
+                            embedding = np.asarray(pickle.loads(embedding_blob))
+                        except Exception as e:
+                            self.logger.warning(f"Skipping unreadable legacy entry {row[0]}: {e}")
+                            failed += 1
+                            continue
+                        
+                        offset, dimensions = self._append_vector(embedding)
+                        self._conn.execute("""
+                            INSERT OR REPLACE INTO embedding_index
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """, (
+                            row[0], row[1], row[2], offset, dimensions,
+                            self.vector_dtype.name, row[4], row[5], row[6],
+                            row[7], row[8], row[9], row[10], row[11], row[12]
+                        ))
+                        migrated += 1
+                    
+                    self._vector_file.flush()
+                    self._conn.execute("DROP TABLE embeddings")
+                
+                self._conn.execute("VACUUM")
+            
+            self.logger.info(f"Migrated {migrated} legacy cache entries to {self.vector_path.name} "
+                             f"({failed} unreadable entries dropped)")
+            return migrated
+        
+        except Exception as e:
+            self.logger.error(f"Failed to migrate legacy cache database: {e}")
+            return 0
     
     def store(self, entry: CacheEntry):
         """Store cache entry in database"""
+        self.store_many([entry])
+    
+    def store_many(self, entries: List[CacheEntry]):
+        """Store several cache entries in one transaction"""
+        if not entries:
+            return
+        
         try:
-            # Serialize embedding
-            embedding_blob = pickle.dumps(entry.embedding)
-            if entry.compressed:
-                embedding_blob = gzip.compress(embedding_blob)
-            
-            metadata_json = json.dumps(entry.metadata)
-            
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO embeddings 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    entry.key, entry.model.value, entry.content_type.value,
-                    embedding_blob, metadata_json, entry.created_time,
-                    entry.last_accessed, entry.access_count, entry.ttl,
-                    entry.compressed, entry.optimized, entry.quality_score,
-                    entry.generation_time
-                ))
+            with self._io_lock:
+                rows = []
+                for entry in entries:
+                    offset, dimensions = self._append_vector(entry.embedding)
+                    rows.append((
+                        entry.key, entry.model.value, entry.content_type.value,
+                        offset, dimensions, self.vector_dtype.name,
+                        json.dumps(entry.metadata, default=self._json_default), entry.created_time,
+                        entry.last_accessed, entry.access_count, entry.ttl,
+                        entry.compressed, entry.optimized, entry.quality_score,
+                        entry.generation_time
+                    ))
+                self._vector_file.flush()
+                
+                with self._conn:
+                    self._conn.executemany("""
+                        INSERT OR REPLACE INTO embedding_index 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
         
         except Exception as e:
-            self.logger.error(f"Failed to store cache entry {entry.key}: {e}")
+            self.logger.error(f"Failed to store {len(entries)} cache entries: {e}")
     
     def load(self, key: str) -> Optional[CacheEntry]:
         """Load cache entry from database"""
+        return self.load_many([key]).get(key)
+    
+    def load_many(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        """
+        Load several cache entries with IN (...) queries.
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            Entries found, keyed by cache key
+        """
+        entries = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT * FROM embeddings WHERE key = ?
-                """, (key,))
-                row = cursor.fetchone()
-                
-                if row is None:
-                    return None
-                
-                # Deserialize data
-                embedding_blob = row[3]
-                if row[9]:  # compressed
-                    embedding_blob = gzip.decompress(embedding_blob)
-                embedding = pickle.loads(embedding_blob)
-                
-                metadata = json.loads(row[4])
-                
-                return CacheEntry(
-                    key=row[0],
-                    model=EmbeddingModel(row[1]),
-                    content_type=ContentType(row[2]),
-                    embedding=embedding,
-                    metadata=metadata,
-                    created_time=row[5],
-                    last_accessed=row[6],
-                    access_count=row[7],
-                    ttl=row[8],
-                    compressed=row[9],
-                    optimized=row[10],
-                    quality_score=row[11],
-                    generation_time=row[12]
-                )
+            with self._io_lock:
+                for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                    batch = keys[start:start + self.QUERY_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    cursor = self._conn.execute(f"""
+                        SELECT * FROM embedding_index WHERE key IN ({placeholders})
+                    """, batch)
+                    for row in cursor.fetchall():
+                        entries[row[0]] = self._row_to_entry(row)
         
         except Exception as e:
-            self.logger.error(f"Failed to load cache entry {key}: {e}")
-            return None
+            self.logger.error(f"Failed to load {len(keys)} cache entries: {e}")
+        
+        return entries
     
     def update_access(self, key: str):
         """Update access statistics for entry"""
+        self.update_access_many({key: (1, time.time())})
+    
+    def update_access_many(self, accesses: Dict[str, Tuple[int, float]]):
+        """
+        Apply coalesced access updates in one transaction.
+        
+        Args:
+            accesses: Key -> (access count increment, last access time)
+        """
+        if not accesses:
+            return
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    UPDATE embeddings 
-                    SET last_accessed = ?, access_count = access_count + 1
+            with self._io_lock, self._conn:
+                self._conn.executemany("""
+                    UPDATE embedding_index 
+                    SET last_accessed = MAX(last_accessed, ?), access_count = access_count + ?
                     WHERE key = ?
-                """, (time.time(), key))
+                """, [(accessed, count, key) for key, (count, accessed) in accesses.items()])
         except Exception as e:
-            self.logger.error(f"Failed to update access for {key}: {e}")
+            self.logger.error(f"Failed to update access for {len(accesses)} entries: {e}")
     
     def delete(self, key: str):
         """Delete cache entry"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+            with self._io_lock, self._conn:
+                self._conn.execute("DELETE FROM embedding_index WHERE key = ?", (key,))
         except Exception as e:
             self.logger.error(f"Failed to delete cache entry {key}: {e}")
     
@@ -384,9 +518,9 @@ class PersistentCache:
         """Remove expired entries and return count removed"""
         try:
             current_time = time.time()
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    DELETE FROM embeddings 
+            with self._io_lock, self._conn:
+                cursor = self._conn.execute("""
+                    DELETE FROM embedding_index 
                     WHERE ttl IS NOT NULL AND (created_time + ttl) < ?
                 """, (current_time,))
                 return cursor.rowcount
@@ -394,31 +528,175 @@ class PersistentCache:
             self.logger.error(f"Failed to cleanup expired entries: {e}")
             return 0
     
+    def clear(self):
+        """Remove all entries and truncate the vector file"""
+        try:
+            with self._io_lock:
+                with self._conn:
+                    self._conn.execute("DELETE FROM embedding_index")
+                # Replace rather than truncate so outstanding views stay mapped
+                open(self.compacted_path, "wb").close()
+                self._close_vector_map()
+                self._vector_file.close()
+                os.replace(self.compacted_path, self.vector_path)
+                self._vector_file = open(self.vector_path, "ab")
+        except Exception as e:
+            self.logger.error(f"Failed to clear persistent cache: {e}")
+    
+    def compact(self) -> int:
+        """
+        Rewrite the vector file without dead space.
+        
+        Views returned before compaction stay valid: they keep the old
+        file mapping alive until released.
+        
+        Returns:
+            Bytes reclaimed
+        """
+        try:
+            with self._io_lock:
+                size_before = self.vector_path.stat().st_size
+                rows = self._conn.execute("""
+                    SELECT key, vector_offset, dimensions, dtype FROM embedding_index
+                    ORDER BY vector_offset
+                """).fetchall()
+                
+                new_offsets = []
+                with open(self.compacted_path, "wb") as compacted_file:
+                    for key, offset, dimensions, dtype in rows:
+                        vector = self._read_vector(offset, dimensions, dtype)
+                        position = compacted_file.tell()
+                        padding = -position % self.VECTOR_ALIGNMENT
+                        compacted_file.write(b"\0" * padding)
+                        new_offsets.append((position + padding, key))
+                        compacted_file.write(vector.tobytes())
+                    compacted_file.flush()
+                    os.fsync(compacted_file.fileno())
+                
+                # New offsets and the swap marker land in one transaction
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embedding_index SET vector_offset = ? WHERE key = ?",
+                        new_offsets
+                    )
+                    self._conn.execute("""
+                        INSERT OR REPLACE INTO cache_state (name, value)
+                        VALUES ('pending_vector_swap', ?)
+                    """, (self.compacted_path.name,))
+                
+                self._close_vector_map()
+                self._vector_file.close()
+                os.replace(self.compacted_path, self.vector_path)
+                self._vector_file = open(self.vector_path, "ab")
+                
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache_state WHERE name = 'pending_vector_swap'")
+                
+                reclaimed = size_before - self.vector_path.stat().st_size
+            
+            self.logger.info(f"Compacted vector file, reclaimed {reclaimed} bytes")
+            return reclaimed
+        
+        except Exception as e:
+            self.logger.error(f"Failed to compact vector file: {e}")
+            return 0
+    
+    def close(self):
+        """Close the database connection and vector file"""
+        with self._io_lock:
+            self._close_vector_map()
+            self._vector_file.close()
+            self._conn.close()
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get cache statistics from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("SELECT COUNT(*) FROM embeddings")
-                total_entries = cursor.fetchone()[0]
+            with self._io_lock:
+                cursor = self._conn.execute("""
+                    SELECT COUNT(*), COALESCE(SUM(dimensions * CASE dtype WHEN 'float16' THEN 2 ELSE 4 END), 0)
+                    FROM embedding_index
+                """)
+                total_entries, live_bytes = cursor.fetchone()
                 
-                cursor = conn.execute("""
-                    SELECT model, COUNT(*) FROM embeddings GROUP BY model
+                cursor = self._conn.execute("""
+                    SELECT model, COUNT(*) FROM embedding_index GROUP BY model
                 """)
                 model_counts = dict(cursor.fetchall())
                 
-                cursor = conn.execute("""
-                    SELECT content_type, COUNT(*) FROM embeddings GROUP BY content_type
+                cursor = self._conn.execute("""
+                    SELECT content_type, COUNT(*) FROM embedding_index GROUP BY content_type
                 """)
                 content_type_counts = dict(cursor.fetchall())
                 
-                return {
-                    'total_entries': total_entries,
-                    'model_distribution': model_counts,
-                    'content_type_distribution': content_type_counts
-                }
+                vector_file_bytes = self.vector_path.stat().st_size
+            
+            return {
+                'total_entries': total_entries,
+                'model_distribution': model_counts,
+                'content_type_distribution': content_type_counts,
+                'vector_dtype': self.vector_dtype.name,
+                'vector_file_bytes': vector_file_bytes,
+                'dead_vector_bytes': max(0, vector_file_bytes - live_bytes)
+            }
         except Exception as e:
             self.logger.error(f"Failed to get statistics: {e}")
             return {}
+    
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        """Serialize numpy scalars and arrays found in entry metadata"""
+        if isinstance(value, (np.generic, np.ndarray)):
+            return value.tolist()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    def _row_to_entry(self, row: Tuple) -> CacheEntry:
+        """Build a cache entry from an embedding_index row"""
+        return CacheEntry(
+            key=row[0],
+            model=EmbeddingModel(row[1]),
+            content_type=ContentType(row[2]),
+            embedding=self._read_vector(row[3], row[4], row[5]),
+            metadata=json.loads(row[6]),
+            created_time=row[7],
+            last_accessed=row[8],
+            access_count=row[9],
+            ttl=row[10],
+            compressed=bool(row[11]),
+            optimized=bool(row[12]),
+            quality_score=row[13],
+            generation_time=row[14]
+        )
+    
+    def _append_vector(self, embedding: np.ndarray) -> Tuple[int, int]:
+        """Append a vector to the vector file, returning (offset, dimensions)"""
+        vector = np.ascontiguousarray(embedding, dtype=self.vector_dtype).ravel()
+        position = self._vector_file.tell()
+        padding = -position % self.VECTOR_ALIGNMENT
+        if padding:
+            self._vector_file.write(b"\0" * padding)
+        self._vector_file.write(vector.tobytes())
+        return position + padding, len(vector)
+    
+    def _read_vector(self, offset: int, dimensions: int, dtype: str) -> np.ndarray:
+        """Zero-copy view of a stored vector"""
+        dtype = np.dtype(dtype)
+        end = offset + dimensions * dtype.itemsize
+        if self._vector_map is None or len(self._vector_map) < end:
+            # The file has grown since it was mapped
+            self._remap_vectors()
+        return np.frombuffer(self._vector_map, dtype=dtype, count=dimensions, offset=offset)
+    
+    def _remap_vectors(self):
+        """Map the current vector file contents for reading"""
+        self._vector_file.flush()
+        # Existing views hold their own reference to the previous map
+        self._vector_map = None
+        with open(self.vector_path, "rb") as vector_file:
+            self._vector_map = mmap.mmap(vector_file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _close_vector_map(self):
+        """Drop the reader map (closed once outstanding views are released)"""
+        self._vector_map = None
 
 
 class AdvancedEmbeddingCache:
@@ -442,6 +720,17 @@ class AdvancedEmbeddingCache:
         self.memory_cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self.access_frequencies: Dict[str, int] = defaultdict(int)
         
+        # Eviction bookkeeping, updated incrementally on every insert/access/removal
+        self._entry_sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
+        self._frequency_buckets: Dict[int, OrderedDict[str, None]] = {}  # LFU: hits -> keys, oldest first
+        self._min_frequency = 0
+        self._expiry_heap: List[Tuple[float, int, str]] = []  # TTL: (expires_at, seq, key)
+        self._expiry_sequence = itertools.count()
+        self._sample_keys: List[str] = []  # ADAPTIVE: indexable key set for sampling
+        self._sample_positions: Dict[str, int] = {}
+        self._random = random.Random()
+        
         # Thread safety
         self._lock = threading.RLock() if config.thread_safe else None
         
@@ -449,9 +738,14 @@ class AdvancedEmbeddingCache:
         self.persistent_cache = None
         if config.enable_persistence:
             self.persistent_cache = PersistentCache(
-                config.cache_directory, config.database_file
+                config.cache_directory, config.database_file, config.vector_storage_dtype
             )
         
+        # Write-behind buffers for the persistent cache
+        self._pending_writes: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._pending_access: Dict[str, Tuple[int, float]] = {}
+        self._last_flush = time.time()
+        
         # Optimizer
         self.optimizer = EmbeddingOptimizer() if config.enable_optimization else None
         
@@ -478,47 +772,66 @@ class AdvancedEmbeddingCache:
         Returns:
             EmbeddingResult if found in cache, None otherwise
         """
+        return self.get_many([text], model, content_type)[0]
+    
+    def get_many(self,
+                 texts: List[str],
+                 model: EmbeddingModel,
+                 content_types: Union[ContentType, List[ContentType]]) -> List[Optional[EmbeddingResult]]:
+        """
+        Get embeddings for several texts at once.
         
-        key = self._generate_key(text, model, content_type)
+        Memory hits are served directly; the remaining keys are resolved
+        from the persistent cache with batched IN (...) queries.
+        
+        Args:
+            texts: Text contents
+            model: Embedding model used
+            content_types: One content type for all texts, or one per text
+            
+        Returns:
+            One EmbeddingResult (or None on a miss) per text, in input order
+        """
+        if isinstance(content_types, ContentType):
+            content_types = [content_types] * len(texts)
+        keys = [
+            self._generate_key(text, model, content_type)
+            for text, content_type in zip(texts, content_types)
+        ]
         
         with self._lock if self._lock else self._dummy_context():
-            self.stats.total_requests += 1
+            self.stats.total_requests += len(keys)
             
-            # Check memory cache first
-            entry = self._get_from_memory(key)
-            if entry is None and self.persistent_cache:
-                # Check persistent cache
-                entry = self._get_from_persistent(key)
+            # Check memory cache and unflushed writes first
+            entries: Dict[str, CacheEntry] = {}
+            for key in keys:
+                entry = self._get_from_memory(key) or self._get_from_pending(key)
                 if entry:
-                    # Promote to memory cache
+                    entries[key] = entry
+            
+            missing = [key for key in dict.fromkeys(keys) if key not in entries]
+            if missing and self.persistent_cache:
+                # Check persistent cache and promote hits to memory
+                for key, entry in self._get_many_from_persistent(missing).items():
                     self._store_in_memory(entry)
+                    entries[key] = entry
             
-            if entry:
-                # Update access patterns
-                entry.update_access()
-                self.access_frequencies[key] += 1
-                
-                # Update statistics
-                self.stats.cache_hits += 1
-                
-                # Create EmbeddingResult
-                result = EmbeddingResult(
-                    text=text,
-                    embedding=entry.embedding,
-                    model=entry.model,
-                    dimensions=len(entry.embedding),
-                    generation_time=entry.generation_time,
-                    token_count=len(text.split()),  # Rough estimate
-                    quality_score=entry.quality_score,
-                    metadata=entry.metadata
-                )
-                
-                self.logger.debug(f"Cache hit for key: {key[:20]}...")
-                return result
-            else:
-                self.stats.cache_misses += 1
-                self.logger.debug(f"Cache miss for key: {key[:20]}...")
-                return None
+            results = []
+            for text, key in zip(texts, keys):
+                entry = entries.get(key)
+                if entry:
+                    # Update access patterns
+                    entry.update_access()
+                    self._record_access(key)
+                    self.stats.cache_hits += 1
+                    results.append(self._to_embedding_result(text, entry))
+                    self.logger.debug(f"Cache hit for key: {key[:20]}...")
+                else:
+                    self.stats.cache_misses += 1
+                    results.append(None)
+                    self.logger.debug(f"Cache miss for key: {key[:20]}...")
+            
+            return results
     
     def put(self, 
            text: str, 
@@ -536,54 +849,134 @@ class AdvancedEmbeddingCache:
             embedding_result: Embedding result to cache
             chunk_metadata: Optional chunk metadata
         """
+        self.put_many([text], model, content_type, [embedding_result], [chunk_metadata])
+    
+    def put_many(self,
+                 texts: List[str],
+                 model: EmbeddingModel,
+                 content_types: Union[ContentType, List[ContentType]],
+                 embedding_results: List[EmbeddingResult],
+                 chunk_metadata: Optional[List[Optional[ChunkMetadata]]] = None):
+        """
+        Store several embeddings at once.
         
-        key = self._generate_key(text, model, content_type)
+        Entries go to the memory cache immediately and to the persistent
+        cache through the write-behind buffer.
+        
+        Args:
+            texts: Original texts
+            model: Embedding model used
+            content_types: One content type for all texts, or one per text
+            embedding_results: Embedding results to cache, one per text
+            chunk_metadata: Optional chunk metadata, one per text
+        """
+        if isinstance(content_types, ContentType):
+            content_types = [content_types] * len(texts)
+        chunk_metadata = chunk_metadata or [None] * len(texts)
         
         with self._lock if self._lock else self._dummy_context():
-            # Determine TTL based on content type
-            ttl = self.config.content_type_ttl.get(content_type, self.config.default_ttl)
+            for text, content_type, embedding_result, metadata in zip(
+                texts, content_types, embedding_results, chunk_metadata
+            ):
+                entry = self._create_entry(text, model, content_type, embedding_result, metadata)
+                
+                # Store in memory cache
+                self._store_in_memory(entry)
+                
+                # Queue for persistent cache if enabled
+                if self.persistent_cache:
+                    self._pending_writes[entry.key] = entry
+                    self._pending_access.pop(entry.key, None)
+                
+                self.logger.debug(f"Cached embedding for key: {entry.key[:20]}...")
             
-            # Optimize embedding if enabled
-            optimized_embedding = embedding_result.embedding
-            optimization_metadata = {}
+            self._maybe_flush()
+    
+    def flush(self):
+        """Write buffered entries and access updates to the persistent cache"""
+        if not self.persistent_cache:
+            return
+        
+        with self._lock if self._lock else self._dummy_context():
+            pending = list(self._pending_writes.values())
+            for start in range(0, len(pending), self.config.batch_write_size):
+                self.persistent_cache.store_many(pending[start:start + self.config.batch_write_size])
+            self._pending_writes.clear()
             
-            if self.optimizer and self.config.enable_optimization:
-                optimized_embedding, optimization_metadata = self.optimizer.optimize_embedding(
-                    embedding_result.embedding,
-                    self.config.optimization_techniques,
-                    content_type
-                )
+            self.persistent_cache.update_access_many(self._pending_access)
+            self._pending_access.clear()
             
-            # Create cache entry
-            entry = CacheEntry(
-                key=key,
-                embedding=optimized_embedding,
-                metadata={
-                    'original_text_length': len(text),
-                    'token_count': embedding_result.token_count,
-                    'optimization': optimization_metadata,
-                    **(chunk_metadata.custom_metadata if chunk_metadata else {})
-                },
-                model=model,
-                content_type=content_type,
-                created_time=time.time(),
-                last_accessed=time.time(),
-                access_count=1,
-                ttl=ttl,
-                compressed=self.config.compression_type != CompressionType.NONE,
-                optimized=bool(optimization_metadata),
-                quality_score=embedding_result.quality_score,
-                generation_time=embedding_result.generation_time
+            self._last_flush = time.time()
+    
+    def close(self):
+        """Flush pending writes and close the persistent cache"""
+        self.flush()
+        if self.persistent_cache:
+            self.persistent_cache.close()
+    
+    def _maybe_flush(self):
+        """Flush once a batch is full or the buffer has been held too long"""
+        buffered = len(self._pending_writes) + len(self._pending_access)
+        if not buffered:
+            return
+        if (buffered >= self.config.batch_write_size or
+                time.time() - self._last_flush >= self.config.write_behind_interval):
+            self.flush()
+    
+    def _create_entry(self,
+                      text: str,
+                      model: EmbeddingModel,
+                      content_type: ContentType,
+                      embedding_result: EmbeddingResult,
+                      chunk_metadata: Optional[ChunkMetadata]) -> CacheEntry:
+        """Build a cache entry for an embedding result"""
+        # Determine TTL based on content type
+        ttl = self.config.content_type_ttl.get(content_type, self.config.default_ttl)
+        
+        # Optimize embedding if enabled
+        optimized_embedding = embedding_result.embedding
+        optimization_metadata = {}
+        
+        if self.optimizer and self.config.enable_optimization:
+            optimized_embedding, optimization_metadata = self.optimizer.optimize_embedding(
+                embedding_result.embedding,
+                self.config.optimization_techniques,
+                content_type
             )
-            
-            # Store in memory cache
-            self._store_in_memory(entry)
-            
-            # Store in persistent cache if enabled
-            if self.persistent_cache:
-                self.persistent_cache.store(entry)
-            
-            self.logger.debug(f"Cached embedding for key: {key[:20]}...")
+        
+        return CacheEntry(
+            key=self._generate_key(text, model, content_type),
+            embedding=optimized_embedding,
+            metadata={
+                'original_text_length': len(text),
+                'token_count': embedding_result.token_count,
+                'optimization': optimization_metadata,
+                **(chunk_metadata.custom_metadata if chunk_metadata else {})
+            },
+            model=model,
+            content_type=content_type,
+            created_time=time.time(),
+            last_accessed=time.time(),
+            access_count=1,
+            ttl=ttl,
+            compressed=self.config.compression_type != CompressionType.NONE,
+            optimized=bool(optimization_metadata),
+            quality_score=embedding_result.quality_score,
+            generation_time=embedding_result.generation_time
+        )
+    
+    def _to_embedding_result(self, text: str, entry: CacheEntry) -> EmbeddingResult:
+        """Create an EmbeddingResult from a cache entry"""
+        return EmbeddingResult(
+            text=text,
+            embedding=entry.embedding,
+            model=entry.model,
+            dimensions=len(entry.embedding),
+            generation_time=entry.generation_time,
+            token_count=len(text.split()),  # Rough estimate
+            quality_score=entry.quality_score,
+            metadata=entry.metadata
+        )
     
     def _get_from_memory(self, key: str) -> Optional[CacheEntry]:
         """Get entry from memory cache"""
@@ -595,30 +988,49 @@ class AdvancedEmbeddingCache:
             return entry
         elif entry and entry.is_expired():
             # Remove expired entry
-            del self.memory_cache[key]
-            if key in self.access_frequencies:
-                del self.access_frequencies[key]
+            self._remove_from_memory(key)
         return None
     
-    def _get_from_persistent(self, key: str) -> Optional[CacheEntry]:
-        """Get entry from persistent cache"""
-        entry = self.persistent_cache.load(key)
+    def _get_from_pending(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry that is still waiting in the write-behind buffer"""
+        entry = self._pending_writes.get(key)
         if entry and not entry.is_expired():
-            self.persistent_cache.update_access(key)
+            self._store_in_memory(entry)
             return entry
-        elif entry and entry.is_expired():
-            self.persistent_cache.delete(key)
         return None
     
+    def _get_many_from_persistent(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        """Get entries from persistent cache, queueing coalesced access updates"""
+        entries = {}
+        now = time.time()
+        for key, entry in self.persistent_cache.load_many(keys).items():
+            if entry.is_expired():
+                self.persistent_cache.delete(key)
+                continue
+            count, _ = self._pending_access.get(key, (0, now))
+            self._pending_access[key] = (count + 1, now)
+            entries[key] = entry
+        
+        self._maybe_flush()
+        return entries
+    
     def _store_in_memory(self, entry: CacheEntry):
         """Store entry in memory cache with eviction policy"""
         
+        if len(self._entry_sizes) != len(self.memory_cache):
+            # memory_cache was modified directly; resynchronize bookkeeping
+            self._rebuild_tracking()
+        
+        if entry.key in self.memory_cache:
+            self._remove_from_memory(entry.key)
+        
         # Check if we need to evict
         while len(self.memory_cache) >= self.config.max_size:
             self._evict_from_memory()
         
         # Store entry
         self.memory_cache[entry.key] = entry
+        self._track_insert(entry)
         
         # Update statistics
         self.stats.cache_size = len(self.memory_cache)
@@ -630,97 +1042,185 @@ class AdvancedEmbeddingCache:
         if not self.memory_cache:
             return
         
-        if self.config.strategy == CacheStrategy.LRU:
-            # Remove least recently used (first item in OrderedDict)
-            key, entry = self.memory_cache.popitem(last=False)
-        
-        elif self.config.strategy == CacheStrategy.LFU:
-            # Remove least frequently used
-            if self.access_frequencies:
-                key = min(self.access_frequencies.keys(), 
-                         key=lambda k: self.access_frequencies[k])
-                entry = self.memory_cache.pop(key)
-                del self.access_frequencies[key]
-            else:
-                key, entry = self.memory_cache.popitem(last=False)
+        if self.config.strategy == CacheStrategy.LFU:
+            # Remove least frequently used (oldest key in the lowest bucket)
+            key = self._select_lfu_eviction_candidate()
         
         elif self.config.strategy == CacheStrategy.TTL:
             # Remove expired entries first, then oldest
-            current_time = time.time()
-            expired_keys = [
-                k for k, v in self.memory_cache.items() 
-                if v.is_expired()
-            ]
-            
-            if expired_keys:
-                key = expired_keys[0]
-                entry = self.memory_cache.pop(key)
-            else:
-                key, entry = self.memory_cache.popitem(last=False)
+            key = self._pop_expired_key() or next(iter(self.memory_cache))
         
         elif self.config.strategy == CacheStrategy.ADAPTIVE:
             # Adaptive strategy based on access patterns and content type
             key = self._select_adaptive_eviction_candidate()
-            entry = self.memory_cache.pop(key)
         
-        else:  # Default to LRU
-            key, entry = self.memory_cache.popitem(last=False)
+        else:  # LRU and default: first item in OrderedDict
+            key = next(iter(self.memory_cache))
         
+        self._remove_from_memory(key)
         self.logger.debug(f"Evicted cache entry: {key[:20]}...")
     
+    def _select_lfu_eviction_candidate(self) -> str:
+        """Oldest key in the lowest frequency bucket"""
+        bucket = self._frequency_buckets.get(self._min_frequency)
+        if not bucket:
+            self._min_frequency = min(self._frequency_buckets)
+            bucket = self._frequency_buckets[self._min_frequency]
+        return next(iter(bucket))
+    
+    def _pop_expired_key(self) -> Optional[str]:
+        """Pop the earliest expired key still in memory, if any"""
+        now = time.time()
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            expires_at, _, key = heapq.heappop(self._expiry_heap)
+            entry = self.memory_cache.get(key)
+            # Skip heap records left behind by removed or replaced entries
+            if entry is not None and entry.ttl is not None and entry.created_time + entry.ttl == expires_at:
+                return key
+        return None
+    
     def _select_adaptive_eviction_candidate(self) -> str:
         """Select eviction candidate using adaptive strategy"""
         
-        # Score entries based on multiple factors
-        scores = {}
+        # Score a random sample of entries rather than the whole cache
+        sample_size = min(self.config.adaptive_sample_size, len(self._sample_keys))
+        positions = self._random.sample(range(len(self._sample_keys)), sample_size)
         current_time = time.time()
         
-        for key, entry in self.memory_cache.items():
-            score = 0.0
-            
-            # Age factor (older = higher score = more likely to evict)
-            age = current_time - entry.created_time
-            score += age / 86400  # Normalize by day
-            
-            # Access frequency factor (less frequent = higher score)
-            frequency = self.access_frequencies.get(key, 1)
-            score += 1.0 / frequency
-            
-            # Recency factor (less recent = higher score)
-            recency = current_time - entry.last_accessed
-            score += recency / 3600  # Normalize by hour
-            
-            # Content type factor (some content types are more valuable)
-            if entry.content_type == ContentType.DEFINITION:
-                score -= 0.5  # Keep definitions longer
-            elif entry.content_type == ContentType.MATH:
-                score -= 0.3  # Keep math content longer
-            
-            # Quality factor (lower quality = higher score)
-            score += (1.0 - entry.quality_score)
-            
-            scores[key] = score
+        scores = {}
+        for position in positions:
+            key = self._sample_keys[position]
+            scores[key] = self._adaptive_eviction_score(key, self.memory_cache[key], current_time)
         
         # Return key with highest score (most suitable for eviction)
         return max(scores.keys(), key=lambda k: scores[k])
     
+    def _adaptive_eviction_score(self, key: str, entry: CacheEntry, current_time: float) -> float:
+        """Score an entry for eviction; higher means more suitable"""
+        score = 0.0
+        
+        # Age factor (older = higher score = more likely to evict)
+        age = current_time - entry.created_time
+        score += age / 86400  # Normalize by day
+        
+        # Access frequency factor (less frequent = higher score)
+        frequency = self.access_frequencies.get(key, 1) or 1
+        score += 1.0 / frequency
+        
+        # Recency factor (less recent = higher score)
+        recency = current_time - entry.last_accessed
+        score += recency / 3600  # Normalize by hour
+        
+        # Content type factor (some content types are more valuable)
+        if entry.content_type == ContentType.DEFINITION:
+            score -= 0.5  # Keep definitions longer
+        elif entry.content_type == ContentType.MATH:
+            score -= 0.3  # Keep math content longer
+        
+        # Quality factor (lower quality = higher score)
+        score += (1.0 - entry.quality_score)
+        
+        return score
+    
+    def _track_insert(self, entry: CacheEntry):
+        """Register a newly stored entry with the eviction structures"""
+        key = entry.key
+        
+        # Embedding size plus metadata estimate (4 bytes per character)
+        size = entry.embedding.nbytes + len(str(entry.metadata)) * 4
+        self._entry_sizes[key] = size
+        self._memory_bytes += size
+        
+        frequency = self.access_frequencies.get(key, 0)
+        self._frequency_buckets.setdefault(frequency, OrderedDict())[key] = None
+        self._min_frequency = min(self._min_frequency, frequency) if len(self._entry_sizes) > 1 else frequency
+        
+        if entry.ttl is not None:
+            heapq.heappush(
+                self._expiry_heap,
+                (entry.created_time + entry.ttl, next(self._expiry_sequence), key)
+            )
+            if len(self._expiry_heap) > 2 * len(self.memory_cache) + 64:
+                self._rebuild_expiry_heap()
+        
+        self._sample_positions[key] = len(self._sample_keys)
+        self._sample_keys.append(key)
+    
+    def _record_access(self, key: str):
+        """Move a key to the next LFU frequency bucket"""
+        if key not in self._entry_sizes:
+            return
+        frequency = self.access_frequencies[key]
+        self.access_frequencies[key] = frequency + 1
+        
+        bucket = self._frequency_buckets.get(frequency)
+        if bucket is None or key not in bucket:
+            return
+        del bucket[key]
+        if not bucket:
+            del self._frequency_buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        self._frequency_buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+    
+    def _remove_from_memory(self, key: str) -> Optional[CacheEntry]:
+        """Remove an entry and its bookkeeping in O(1)"""
+        entry = self.memory_cache.pop(key, None)
+        
+        self._memory_bytes -= self._entry_sizes.pop(key, 0)
+        
+        frequency = self.access_frequencies.pop(key, 0)
+        bucket = self._frequency_buckets.get(frequency)
+        if bucket is not None and key in bucket:
+            del bucket[key]
+            if not bucket:
+                del self._frequency_buckets[frequency]
+        
+        # Swap-remove from the sampling index
+        position = self._sample_positions.pop(key, None)
+        if position is not None:
+            last_key = self._sample_keys.pop()
+            if last_key != key:
+                self._sample_keys[position] = last_key
+                self._sample_positions[last_key] = position
+        
+        # Expiry heap records are discarded lazily
+        return entry
+    
+    def _rebuild_expiry_heap(self):
+        """Drop stale expiry records"""
+        self._expiry_heap = [
+            (entry.created_time + entry.ttl, next(self._expiry_sequence), key)
+            for key, entry in self.memory_cache.items()
+            if entry.ttl is not None
+        ]
+        heapq.heapify(self._expiry_heap)
+    
+    def _rebuild_tracking(self):
+        """Recompute all eviction bookkeeping from memory_cache"""
+        entries = list(self.memory_cache.values())
+        frequencies = {e.key: self.access_frequencies.get(e.key, 0) for e in entries}
+        
+        self._entry_sizes = {}
+        self._memory_bytes = 0
+        self._frequency_buckets = {}
+        self._min_frequency = 0
+        self._expiry_heap = []
+        self._sample_keys = []
+        self._sample_positions = {}
+        self.access_frequencies = defaultdict(int, frequencies)
+        
+        for entry in entries:
+            self._track_insert(entry)
+    
     def _generate_key(self, text: str, model: EmbeddingModel, content_type: ContentType) -> str:
         """Generate cache key for text, model, and content type"""
         content = f"{text}||{model.value}||{content_type.value}"
         return hashlib.sha256(content.encode()).hexdigest()
     
     def _calculate_memory_usage(self) -> float:
-        """Calculate approximate memory usage in MB"""
-        total_bytes = 0
-        
-        for entry in self.memory_cache.values():
-            # Embedding size
-            total_bytes += entry.embedding.nbytes
-            
-            # Metadata size (rough estimate)
-            total_bytes += len(str(entry.metadata)) * 4  # Assume 4 bytes per character
-        
-        return total_bytes / (1024 * 1024)  # Convert to MB
+        """Approximate memory usage in MB, maintained incrementally"""
+        return self._memory_bytes / (1024 * 1024)  # Convert to MB
     
     def _start_background_cleanup(self):
         """Start background cleanup thread"""
@@ -744,21 +1244,21 @@ class AdvancedEmbeddingCache:
         with self._lock if self._lock else self._dummy_context():
             initial_size = len(self.memory_cache)
             
-            # Remove expired entries from memory cache
-            current_time = time.time()
-            expired_keys = [
-                key for key, entry in self.memory_cache.items()
-                if entry.is_expired()
-            ]
+            if len(self._entry_sizes) != len(self.memory_cache):
+                self._rebuild_tracking()
             
-            for key in expired_keys:
-                del self.memory_cache[key]
-                if key in self.access_frequencies:
-                    del self.access_frequencies[key]
+            # Remove expired entries from memory cache, earliest expiry first
+            expired_keys = []
+            key = self._pop_expired_key()
+            while key is not None:
+                self._remove_from_memory(key)
+                expired_keys.append(key)
+                key = self._pop_expired_key()
             
             # Cleanup persistent cache if enabled
             persistent_cleaned = 0
             if self.persistent_cache:
+                self.flush()
                 persistent_cleaned = self.persistent_cache.cleanup_expired()
             
             memory_cleaned = len(expired_keys)
@@ -779,10 +1279,12 @@ class AdvancedEmbeddingCache:
         with self._lock if self._lock else self._dummy_context():
             self.memory_cache.clear()
             self.access_frequencies.clear()
+            self._rebuild_tracking()
             
             if self.persistent_cache:
-                # Clear persistent cache (would need to implement in PersistentCache)
-                pass
+                self._pending_writes.clear()
+                self._pending_access.clear()
+                self.persistent_cache.clear()
             
             self.stats.cache_size = 0
             self.stats.memory_usage_mb = 0.0
@@ -793,6 +1295,8 @@ class AdvancedEmbeddingCache:
         """Get comprehensive cache statistics"""
         
         # Update current statistics
+        if len(self._entry_sizes) != len(self.memory_cache):
+            self._rebuild_tracking()
         self.stats.cache_size = len(self.memory_cache)
         self.stats.memory_usage_mb = self._calculate_memory_usage()
         
@@ -905,6 +1409,7 @@ def create_memory_efficient_cache_config() -> CacheConfig:
         max_memory_mb=256,
         enable_persistence=True,
         compression_type=CompressionType.QUANTIZATION_8BIT,
+        vector_storage_dtype="float16",
         enable_optimization=True,
         optimization_techniques=[
             OptimizationTechnique.DIMENSIONALITY_REDUCTION,
@@ -14,7 +14,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import json
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 # Note: In production, these would be actual model imports
 # For now, we'll simulate embeddings with mathematical functions
@@ -41,7 +41,8 @@ class EmbeddingConfig:
     model: EmbeddingModel
     dimensions: int
     max_tokens: int
-    batch_size: int = 10
+    batch_size: int = 10  # Maximum texts per provider request
+    max_batch_tokens: int = 8192  # Token budget per provider request
     api_key: Optional[str] = None
     api_base: Optional[str] = None
     custom_instructions: Optional[str] = None
@@ -127,11 +128,25 @@ class EmbeddingCache:
 
 
 class MockEmbeddingProvider:
-    """Mock embedding provider for testing and development"""
+    """
+    Mock embedding provider for testing and development.
+    
+    In batch mode a provider request costs one fixed round trip plus a small
+    per-text cost, mimicking hosted APIs and sentence-transformers batching;
+    with batch mode off every text is a separate request.
+    """
     
-    def __init__(self, model: EmbeddingModel):
+    def __init__(self,
+                 model: EmbeddingModel,
+                 batch_mode: bool = True,
+                 request_latency: float = 0.01,
+                 per_text_latency: float = 0.0005):
         self.model = model
         self.dimensions = self._get_model_dimensions(model)
+        self.batch_mode = batch_mode
+        self.request_latency = request_latency
+        self.per_text_latency = per_text_latency
+        self.request_count = 0
         
     def _get_model_dimensions(self, model: EmbeddingModel) -> int:
         """Get dimensions for different models"""
@@ -150,15 +165,42 @@ class MockEmbeddingProvider:
     def generate_embedding(self, text: str) -> Tuple[np.ndarray, int]:
         """Generate mock embedding based on text characteristics"""
         # Simulate processing time
-        time.sleep(0.01)
+        if self.request_latency:
+            time.sleep(self.request_latency)
+        self.request_count += 1
+        
+        return self._embed(text)
+    
+    def generate_embeddings(self, texts: List[str]) -> List[Tuple[np.ndarray, int]]:
+        """
+        Generate mock embeddings for several texts in one request.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            (embedding, token_count) per text, in input order
+        """
+        if not self.batch_mode:
+            return [self.generate_embedding(text) for text in texts]
+        
+        # Simulate one round trip plus per-text encoding time
+        latency = self.request_latency + self.per_text_latency * len(texts)
+        if latency:
+            time.sleep(latency)
+        self.request_count += 1
         
+        return [self._embed(text) for text in texts]
+    
+    def _embed(self, text: str) -> Tuple[np.ndarray, int]:
+        """Deterministic embedding for a text"""
         # Create deterministic embedding based on text
         text_hash = hashlib.md5(text.encode()).hexdigest()
         seed = int(text_hash[:8], 16)
-        np.random.seed(seed)
+        rng = np.random.RandomState(seed)
         
         # Generate embedding with text-based features
-        embedding = np.random.normal(0, 1, self.dimensions)
+        embedding = rng.normal(0, 1, self.dimensions)
         
         # Add semantic features based on content
         if any(word in text.lower() for word in ['definition', 'define']):
@@ -226,6 +268,7 @@ class EmbeddingGenerator:
             'cache_misses': 0,
             'total_tokens': 0,
             'total_time': 0.0,
+            'provider_requests': 0,
             'model_usage': {}
         }
     
@@ -272,31 +315,15 @@ class EmbeddingGenerator:
         # Generate embedding
         provider = self.providers[config.model]
         embedding, token_count = provider.generate_embedding(processed_text)
-        
-        # Post-process embedding
-        if config.normalize and np.linalg.norm(embedding) > 0:
-            embedding = embedding / np.linalg.norm(embedding)
+        self.stats['provider_requests'] += 1
         
         generation_time = time.time() - start_time
         
         # Create result
-        result = EmbeddingResult(
-            text=text,
-            embedding=embedding,
-            model=config.model,
-            dimensions=len(embedding),
-            generation_time=generation_time,
-            token_count=token_count,
-            metadata={
-                'processed_text_length': len(processed_text),
-                'original_text_length': len(text),
-                'config': {
-                    'model': config.model.value,
-                    'normalize': config.normalize,
-                    'max_tokens': config.max_tokens
-                }
-            }
+        result = self._build_result(
+            text, processed_text, embedding, token_count, generation_time, config
         )
+        embedding = result.embedding
         
         # Cache result
         if self.cache and config.cache_embeddings:
@@ -315,15 +342,19 @@ class EmbeddingGenerator:
                                  config: Optional[EmbeddingConfig] = None,
                                  max_workers: Optional[int] = None) -> BatchEmbeddingResult:
         """
-        Generate embeddings for multiple texts in parallel.
+        Generate embeddings for multiple texts using provider batch requests.
+        
+        Cached texts are served from the cache; the remaining unique texts
+        are grouped into micro-batches bounded by config.batch_size texts and
+        config.max_batch_tokens tokens, and micro-batches are sent in parallel.
         
         Args:
             texts: List of texts to embed
             config: Optional embedding configuration override
-            max_workers: Override default max workers
+            max_workers: Override default max workers (concurrent requests)
             
         Returns:
-            BatchEmbeddingResult with all embeddings and statistics
+            BatchEmbeddingResult with successful embeddings in input order
         """
         
         if not texts:
@@ -336,38 +367,77 @@ class EmbeddingGenerator:
         self.logger.info(f"Generating batch embeddings: {len(texts)} texts, "
                         f"{config.model.value}, {max_workers} workers")
         
-        results = []
-        errors = []
+        results_by_index: Dict[int, EmbeddingResult] = {}
+        errors_by_index: Dict[int, str] = {}
+        
+        # Serve cache hits and collect unique misses
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if not text.strip():
+                errors_by_index[i] = f"Failed to embed text {i}: Cannot generate embedding for empty text"
+                continue
+            
+            if self.cache and config.cache_embeddings:
+                cached_result = self.cache.get(text, config.model)
+                if cached_result:
+                    self.stats['cache_hits'] += 1
+                    results_by_index[i] = cached_result
+                    continue
+                self.stats['cache_misses'] += 1
+            
+            pending.setdefault(text, []).append(i)
+        
+        # Send misses to the provider in token-bounded micro-batches
+        micro_batches = self.plan_micro_batches(list(pending), config)
+        
+        def embed_batch(batch: List[str]):
+            batch_start = time.time()
+            processed = [self._preprocess_text(text, config) for text in batch]
+            embeddings = self.providers[config.model].generate_embeddings(processed)
+            return processed, embeddings, time.time() - batch_start
         
-        if max_workers == 1:
-            # Sequential processing
-            for i, text in enumerate(texts):
+        if max_workers == 1 or len(micro_batches) <= 1:
+            outcomes = []
+            for batch in micro_batches:
                 try:
-                    result = self.generate_embedding(text, config)
-                    results.append(result)
+                    outcomes.append(embed_batch(batch))
                 except Exception as e:
-                    error_msg = f"Failed to embed text {i}: {str(e)}"
-                    errors.append(error_msg)
-                    self.logger.error(error_msg)
+                    outcomes.append(e)
         else:
-            # Parallel processing
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_index = {}
-                for i, text in enumerate(texts):
-                    future = executor.submit(self.generate_embedding, text, config)
-                    future_to_index[future] = i
-                
-                # Collect results
-                for future in as_completed(future_to_index):
-                    index = future_to_index[future]
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(micro_batches))) as executor:
+                futures = [executor.submit(embed_batch, batch) for batch in micro_batches]
+                outcomes = []
+                for future in futures:
                     try:
-                        result = future.result()
-                        results.append(result)
+                        outcomes.append(future.result())
                     except Exception as e:
-                        error_msg = f"Failed to embed text {index}: {str(e)}"
-                        errors.append(error_msg)
-                        self.logger.error(error_msg)
+                        outcomes.append(e)
+        
+        for batch, outcome in zip(micro_batches, outcomes):
+            self.stats['provider_requests'] += 1
+            if isinstance(outcome, Exception):
+                for text in batch:
+                    for i in pending[text]:
+                        errors_by_index[i] = f"Failed to embed text {i}: {str(outcome)}"
+                continue
+            
+            processed, embeddings, batch_time = outcome
+            per_text_time = batch_time / len(batch)
+            for text, processed_text, (embedding, token_count) in zip(batch, processed, embeddings):
+                result = self._build_result(
+                    text, processed_text, embedding, token_count, per_text_time, config
+                )
+                if self.cache and config.cache_embeddings:
+                    self.cache.put(text, config.model, result)
+                self._update_stats(config.model, token_count, per_text_time)
+                for i in pending[text]:
+                    results_by_index[i] = result
+        
+        for i in sorted(errors_by_index):
+            self.logger.error(errors_by_index[i])
+        
+        results = [results_by_index[i] for i in sorted(results_by_index)]
+        errors = [errors_by_index[i] for i in sorted(errors_by_index)]
         
         total_time = time.time() - start_time
         successful_count = len(results)
@@ -378,9 +448,10 @@ class EmbeddingGenerator:
         avg_time_per_text = total_time / max(1, len(texts))
         
         batch_stats = self._calculate_batch_statistics(results, total_time)
+        batch_stats['provider_requests'] = len(micro_batches)
         
         self.logger.info(f"Batch embedding complete: {successful_count}/{len(texts)} "
-                        f"successful in {total_time:.2f}s")
+                        f"successful in {total_time:.2f}s ({len(micro_batches)} provider requests)")
         
         return BatchEmbeddingResult(
             results=results,
@@ -395,6 +466,127 @@ class EmbeddingGenerator:
             errors=errors
         )
     
+    def generate_embeddings(self,
+                            texts: List[str],
+                            config: Optional[EmbeddingConfig] = None) -> List[EmbeddingResult]:
+        """
+        Embed one micro-batch with a single provider request.
+        
+        Cache hits are served from the cache and only misses are sent. Unlike
+        generate_batch_embeddings, a failed request raises, so callers can
+        split and retry the batch.
+        
+        Args:
+            texts: Texts to embed (callers bound the size, see plan_micro_batches)
+            config: Optional embedding configuration override
+            
+        Returns:
+            One EmbeddingResult per text, in input order
+        """
+        config = config or self.default_config
+        if any(not text.strip() for text in texts):
+            raise ValueError("Cannot generate embedding for empty text")
+        
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if self.cache and config.cache_embeddings:
+                cached_result = self.cache.get(text, config.model)
+                if cached_result:
+                    self.stats['cache_hits'] += 1
+                    results[i] = cached_result
+                    continue
+                self.stats['cache_misses'] += 1
+            pending.setdefault(text, []).append(i)
+        
+        if pending:
+            start_time = time.time()
+            misses = list(pending)
+            processed = [self._preprocess_text(text, config) for text in misses]
+            embeddings = self.providers[config.model].generate_embeddings(processed)
+            self.stats['provider_requests'] += 1
+            per_text_time = (time.time() - start_time) / len(misses)
+            
+            for text, processed_text, (embedding, token_count) in zip(misses, processed, embeddings):
+                result = self._build_result(
+                    text, processed_text, embedding, token_count, per_text_time, config
+                )
+                if self.cache and config.cache_embeddings:
+                    self.cache.put(text, config.model, result)
+                self._update_stats(config.model, token_count, per_text_time)
+                for i in pending[text]:
+                    results[i] = result
+        
+        return results
+    
+    def plan_micro_batches(self,
+                           texts: List[str],
+                           config: Optional[EmbeddingConfig] = None,
+                           batch_size: Optional[int] = None) -> List[List[str]]:
+        """
+        Group texts into provider requests bounded by text count and token budget.
+        
+        Args:
+            texts: Texts to group, order preserved
+            config: Embedding configuration supplying the limits
+            batch_size: Override for the maximum texts per request
+            
+        Returns:
+            Consecutive groups of texts
+        """
+        config = config or self.default_config
+        batch_size = batch_size or config.batch_size
+        batches = []
+        current: List[str] = []
+        current_tokens = 0
+        
+        for text in texts:
+            # Texts are truncated to max_tokens during preprocessing
+            tokens = min(self._estimate_tokens(text), config.max_tokens)
+            if current and (len(current) >= batch_size or
+                            current_tokens + tokens > config.max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token estimate matching the providers' approximation"""
+        return max(1, int(len(text.split()) * 1.3))
+    
+    def _build_result(self,
+                      text: str,
+                      processed_text: str,
+                      embedding: np.ndarray,
+                      token_count: int,
+                      generation_time: float,
+                      config: EmbeddingConfig) -> EmbeddingResult:
+        """Post-process a provider embedding into an EmbeddingResult"""
+        if config.normalize and np.linalg.norm(embedding) > 0:
+            embedding = embedding / np.linalg.norm(embedding)
+        
+        return EmbeddingResult(
+            text=text,
+            embedding=embedding,
+            model=config.model,
+            dimensions=len(embedding),
+            generation_time=generation_time,
+            token_count=token_count,
+            metadata={
+                'processed_text_length': len(processed_text),
+                'original_text_length': len(text),
+                'config': {
+                    'model': config.model.value,
+                    'normalize': config.normalize,
+                    'max_tokens': config.max_tokens
+                }
+            }
+        )
+    
     def _preprocess_text(self, text: str, config: EmbeddingConfig) -> str:
         """Preprocess text before embedding"""
         # Basic text cleaning
@@ -501,6 +693,7 @@ class EmbeddingGenerator:
             'cache_misses': 0,
             'total_tokens': 0,
             'total_time': 0.0,
+            'provider_requests': 0,
             'model_usage': {}
         }
     
@@ -9,6 +9,10 @@ import logging
 import time
 import json
 import os
+import random
+import threading
+import heapq
+from collections import deque
 from typing import List, Dict, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
@@ -67,6 +71,8 @@ class PipelineConfig:
     mode: PipelineMode = PipelineMode.STANDARD
     retry_strategy: RetryStrategy = RetryStrategy.ADAPTIVE
     max_retries: int = 3
+    retry_base_delay: float = 0.5  # Seconds before the first retry of a transient error
+    retry_max_delay: float = 30.0
     parallel_processing: bool = True
     max_workers: int = 4
     
@@ -194,6 +200,10 @@ class EmbeddingPipeline:
         # Initialize components
         self._initialize_components()
         
+        # Adaptive chunk batch size, shared by concurrent documents
+        self._current_batch_size = self.config.batch_size
+        self._batch_size_lock = threading.Lock()
+        
         # Pipeline statistics
         self.stats = {
             'documents_processed': 0,
@@ -500,73 +510,138 @@ class EmbeddingPipeline:
     def _generate_chunk_embeddings(self,
                                  chunking_result: HybridChunkingResult,
                                  document_id: str) -> List[ChunkEmbeddingResult]:
-        """Generate embeddings for all chunks"""
-        
-        chunk_results = []
+        """
+        Generate embeddings for all chunks in adaptive batches.
+        
+        Chunks are sent in micro-batches of up to the current adaptive batch
+        size. Transient provider errors (rate limits, timeouts, unavailable
+        service) retry the same batch once an exponential backoff with jitter
+        has passed; other batches are sent in the meantime, and the worker
+        only waits when nothing else is ready. Other failures split the batch in half to isolate the bad input, and
+        a chunk on its own is retried straight away. Every sub-batch has its
+        own budget of max_retries retries. Retries use the fallback embedding
+        config when one is set. Each chunk's processing_time is its share of
+        every request it was part of, and retry_count is its failed attempts.
+        """
         
-        for i, (chunk_text, chunk_metadata) in enumerate(
-            zip(chunking_result.chunks, chunking_result.metadata_list)
-        ):
-            chunk_id = f"{document_id}_chunk_{i}"
-            
-            chunk_result = ChunkEmbeddingResult(
-                chunk_id=chunk_id,
+        chunk_results = [
+            ChunkEmbeddingResult(
+                chunk_id=f"{document_id}_chunk_{i}",
                 chunk_text=chunk_text,
                 chunk_metadata=chunk_metadata
             )
-            
-            # Generate embedding with retry logic
-            embedding_result = self._generate_embedding_with_retry(
-                chunk_text, chunk_result
+            for i, (chunk_text, chunk_metadata) in enumerate(
+                zip(chunking_result.chunks, chunking_result.metadata_list)
             )
+        ]
+        if not chunk_results:
+            return chunk_results
+        
+        texts = [chunk_result.chunk_text for chunk_result in chunk_results]
+        
+        # Initial batches follow the adaptive size and the provider token budget
+        queue = deque()
+        offset = 0
+        for batch_texts in self.embedding_generator.plan_micro_batches(
+            texts, self.config.embedding_config, self._current_batch_size
+        ):
+            queue.append((list(range(offset, offset + len(batch_texts))), 0))
+            offset += len(batch_texts)
+        
+        # Queue entries are (chunk indices, failed attempts of that sub-batch);
+        # batches backing off wait in a heap of (not before, sequence, indices, attempts)
+        delayed = []
+        while queue or delayed:
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, _, ready_indices, ready_attempts = heapq.heappop(delayed)
+                queue.appendleft((ready_indices, ready_attempts))
             
-            if embedding_result:
-                chunk_result.embedding_result = embedding_result
+            if not queue:
+                # Only backing-off batches are left
+                not_before, _, indices, attempts = heapq.heappop(delayed)
+                time.sleep(max(0.0, not_before - time.monotonic()))
+                queue.append((indices, attempts))
+            
+            indices, attempts = queue.popleft()
+            batch = [chunk_results[i] for i in indices]
+            
+            # Chunks in a batch always share the same failure history
+            if batch[0].retry_count and self.config.fallback_embedding_config:
+                embedding_config = self.config.fallback_embedding_config
             else:
-                chunk_result.error = "Failed to generate embedding after retries"
+                embedding_config = self.config.embedding_config
             
-            chunk_results.append(chunk_result)
-        
-        return chunk_results
-    
-    def _generate_embedding_with_retry(self,
-                                     text: str,
-                                     chunk_result: ChunkEmbeddingResult) -> Optional[EmbeddingResult]:
-        """Generate embedding with retry logic"""
-        
-        last_error = None
-        config = self.config.embedding_config
-        
-        for attempt in range(self.config.max_retries + 1):
+            start_time = time.time()
             try:
-                start_time = time.time()
-                
-                # Try main config first, then fallback config
-                if attempt == 0:
-                    embedding_config = config
-                elif self.config.fallback_embedding_config:
-                    embedding_config = self.config.fallback_embedding_config
-                else:
-                    embedding_config = config
-                
-                result = self.embedding_generator.generate_embedding(text, embedding_config)
-                chunk_result.processing_time = time.time() - start_time
-                chunk_result.retry_count = attempt
-                
-                return result
-                
+                results = self.embedding_generator.generate_embeddings(
+                    [chunk_result.chunk_text for chunk_result in batch], embedding_config
+                )
             except Exception as e:
-                last_error = e
-                chunk_result.retry_count = attempt + 1
+                share = (time.time() - start_time) / len(batch)
+                for chunk_result in batch:
+                    chunk_result.processing_time += share
+                    chunk_result.retry_count += 1
+                    chunk_result.error = str(e)
                 
-                if attempt < self.config.max_retries:
-                    self.logger.warning(f"Embedding generation failed (attempt {attempt + 1}): {e}")
-                    time.sleep(0.1 * (2 ** attempt))  # Exponential backoff
+                self._adapt_batch_size(success=False, failed_size=len(batch))
+                attempts += 1
+                transient = self._is_transient_error(e)
+                
+                if transient and attempts <= self.config.max_retries:
+                    delay = self._retry_delay(attempts)
+                    self.logger.warning(f"Embedding batch of {len(batch)} failed "
+                                        f"(attempt {attempts}), retrying in {delay:.2f}s: {e}")
+                    heapq.heappush(delayed, (time.monotonic() + delay, indices[0], indices, attempts))
+                elif not transient and len(batch) > 1:
+                    # Split to isolate the bad input; each half gets its own retry budget
+                    self.logger.warning(f"Embedding batch of {len(batch)} failed, splitting: {e}")
+                    middle = len(indices) // 2
+                    queue.appendleft((indices[middle:], 0))
+                    queue.appendleft((indices[:middle], 0))
+                elif not transient and attempts <= self.config.max_retries:
+                    self.logger.warning(f"Embedding generation failed "
+                                        f"(attempt {attempts}): {e}")
+                    queue.appendleft((indices, attempts))
                 else:
-                    self.logger.error(f"Embedding generation failed after {self.config.max_retries + 1} attempts: {e}")
+                    self.logger.error(f"Embedding batch of {len(batch)} failed after "
+                                      f"{attempts} attempts: {e}")
+                continue
+            
+            share = (time.time() - start_time) / len(batch)
+            for chunk_result, embedding_result in zip(batch, results):
+                chunk_result.processing_time += share
+                chunk_result.embedding_result = embedding_result
+                chunk_result.error = None
+            
+            self._adapt_batch_size(success=True)
         
-        chunk_result.error = str(last_error)
-        return None
+        return chunk_results
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt"""
+        ceiling = min(self.config.retry_max_delay,
+                      self.config.retry_base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+    
+    @staticmethod
+    def _is_transient_error(error: Exception) -> bool:
+        """Whether a provider error is worth retrying unchanged after a pause"""
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        name = type(error).__name__
+        return any(marker in name for marker in ('RateLimit', 'Timeout', 'Unavailable', 'Connection'))
+    
+    def _adapt_batch_size(self, success: bool, failed_size: int = 0):
+        """Grow the batch size after successes, halve it after a failure"""
+        with self._batch_size_lock:
+            if success:
+                self._current_batch_size = min(self.config.batch_size, self._current_batch_size * 2)
+            else:
+                self._current_batch_size = max(1, min(self._current_batch_size, failed_size) // 2)
     
     def _assess_batch_quality(self, 
                             chunk_results: List[ChunkEmbeddingResult]) -> Optional[BatchQualityAssessment]:
@@ -770,6 +845,7 @@ class EmbeddingPipeline:
         
         self.config = new_config
         self._initialize_components()
+        self._current_batch_size = new_config.batch_size
         self.logger.info("Pipeline configuration updated and components reinitialized")
 
 
@@ -18,6 +18,12 @@ from collections import defaultdict
 from .embedding_generator import EmbeddingResult, EmbeddingModel
 from .chunk_metadata import ChunkMetadata, ContentType
 
+# Rows per block when computing statistics for a batch of embeddings
+_STATISTICS_BLOCK_ROWS = 1024
+
+# Histogram bins for distribution entropy
+_ENTROPY_BINS = 50
+
 
 class QualityMetric(Enum):
     """Types of quality metrics"""
@@ -53,6 +59,25 @@ class EmbeddingQualityAssessment:
     assessment_metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class EmbeddingStatistics:
+    """Distribution statistics of one embedding vector, as Python numbers"""
+    dimensions: int
+    norm: float
+    mean: float
+    std: float
+    variance: float
+    min: float
+    max: float
+    non_zero_dimensions: int  # |x| > 1e-6
+    significant_dimensions: int  # |x| above mean |x|
+    high_magnitude_dimensions: int  # |x| above its 80th percentile
+    skewness: float
+    kurtosis: float
+    entropy: float
+    effective_dimensions: float
+
+
 @dataclass
 class BatchQualityAssessment:
     """Quality assessment for batch of embeddings"""
@@ -126,28 +151,40 @@ class EmbeddingQualityAssessor:
         self.logger.debug(f"Assessing embedding quality: {embedding_result.model.value}, "
                          f"{embedding_result.dimensions}D")
         
+        embedding_statistics = self._calculate_embedding_statistics(embedding_result.embedding)
+        return self._build_assessment(embedding_result, chunk_metadata, embedding_statistics, start_time)
+    
+    def _build_assessment(self,
+                          embedding_result: EmbeddingResult,
+                          chunk_metadata: Optional[ChunkMetadata],
+                          embedding_statistics: EmbeddingStatistics,
+                          start_time: float) -> EmbeddingQualityAssessment:
+        """Assess an embedding from its precomputed statistics"""
+        
         # Calculate individual quality metrics
         quality_scores = []
         
         # Semantic coherence
-        semantic_score = self._assess_semantic_coherence(embedding_result, chunk_metadata)
+        semantic_score = self._assess_semantic_coherence(
+            embedding_result, chunk_metadata, embedding_statistics
+        )
         quality_scores.append(semantic_score)
         
         # Dimensionality usage
-        dimensionality_score = self._assess_dimensionality_usage(embedding_result)
+        dimensionality_score = self._assess_dimensionality_usage(embedding_result, embedding_statistics)
         quality_scores.append(dimensionality_score)
         
         # Educational appropriateness
         if chunk_metadata:
             educational_score = self._assess_educational_appropriateness(
-                embedding_result, chunk_metadata
+                embedding_result, chunk_metadata, embedding_statistics
             )
             quality_scores.append(educational_score)
         
         # Content type specific assessments
         if chunk_metadata:
             content_scores = self._assess_content_type_quality(
-                embedding_result, chunk_metadata
+                embedding_result, chunk_metadata, embedding_statistics
             )
             quality_scores.extend(content_scores)
         
@@ -160,7 +197,7 @@ class EmbeddingQualityAssessor:
         
         # Generate content analysis
         content_analysis = self._analyze_content_characteristics(
-            embedding_result, chunk_metadata
+            embedding_result, chunk_metadata, embedding_statistics
         )
         
         # Generate recommendations
@@ -204,6 +241,10 @@ class EmbeddingQualityAssessor:
         """
         Assess quality of multiple embeddings.
         
+        Embedding statistics are computed for the whole batch at once with
+        matrix operations; the assessments are the same as calling
+        assess_embedding_quality for each embedding.
+        
         Args:
             embedding_results: List of embedding results
             chunk_metadata_list: Optional list of chunk metadata
@@ -220,6 +261,10 @@ class EmbeddingQualityAssessor:
         
         self.logger.info(f"Assessing batch quality: {len(embedding_results)} embeddings")
         
+        embedding_statistics = self._calculate_batch_embedding_statistics(
+            [embedding_result.embedding for embedding_result in embedding_results]
+        )
+        
         # Assess individual embeddings
         individual_assessments = []
         for i, embedding_result in enumerate(embedding_results):
@@ -227,7 +272,9 @@ class EmbeddingQualityAssessor:
             if chunk_metadata_list and i < len(chunk_metadata_list):
                 chunk_metadata = chunk_metadata_list[i]
             
-            assessment = self.assess_embedding_quality(embedding_result, chunk_metadata)
+            assessment = self._build_assessment(
+                embedding_result, chunk_metadata, embedding_statistics[i], time.time()
+            )
             individual_assessments.append(assessment)
         
         # Calculate batch statistics
@@ -271,16 +318,16 @@ class EmbeddingQualityAssessor:
     
     def _assess_semantic_coherence(self,
                                  embedding_result: EmbeddingResult,
-                                 chunk_metadata: Optional[ChunkMetadata]) -> QualityScore:
+                                 chunk_metadata: Optional[ChunkMetadata],
+                                 embedding_statistics: EmbeddingStatistics) -> QualityScore:
         """Assess semantic coherence of embedding"""
         
-        embedding = embedding_result.embedding
         text = embedding_result.text
         
         # Analyze embedding distribution
-        embedding_norm = np.linalg.norm(embedding)
-        embedding_mean = np.mean(embedding)
-        embedding_std = np.std(embedding)
+        embedding_norm = embedding_statistics.norm
+        embedding_mean = embedding_statistics.mean
+        embedding_std = embedding_statistics.std
         
         # Calculate semantic coherence score
         coherence_score = 0.8  # Base score
@@ -310,7 +357,7 @@ class EmbeddingQualityAssessor:
             'embedding_mean': float(embedding_mean),
             'embedding_std': float(embedding_std),
             'text_word_count': word_count,
-            'distribution_analysis': self._analyze_embedding_distribution(embedding)
+            'distribution_analysis': self._analyze_embedding_distribution(embedding_statistics)
         }
         
         recommendations = []
@@ -326,19 +373,19 @@ class EmbeddingQualityAssessor:
             recommendations=recommendations
         )
     
-    def _assess_dimensionality_usage(self, embedding_result: EmbeddingResult) -> QualityScore:
+    def _assess_dimensionality_usage(self,
+                                   embedding_result: EmbeddingResult,
+                                   embedding_statistics: EmbeddingStatistics) -> QualityScore:
         """Assess how well the embedding uses its dimensional space"""
         
-        embedding = embedding_result.embedding
-        dimensions = len(embedding)
+        dimensions = embedding_statistics.dimensions
         
         # Analyze dimensional usage
-        non_zero_dims = np.sum(np.abs(embedding) > 1e-6)
+        non_zero_dims = embedding_statistics.non_zero_dimensions
         usage_ratio = non_zero_dims / dimensions
         
         # Analyze dimensional distribution
-        abs_values = np.abs(embedding)
-        significant_dims = np.sum(abs_values > np.mean(abs_values))
+        significant_dims = embedding_statistics.significant_dimensions
         significance_ratio = significant_dims / dimensions
         
         # Calculate usage score
@@ -379,11 +426,11 @@ class EmbeddingQualityAssessor:
     
     def _assess_educational_appropriateness(self,
                                           embedding_result: EmbeddingResult,
-                                          chunk_metadata: ChunkMetadata) -> QualityScore:
+                                          chunk_metadata: ChunkMetadata,
+                                          embedding_statistics: EmbeddingStatistics) -> QualityScore:
         """Assess how well embedding captures educational content"""
         
         text = embedding_result.text
-        embedding = embedding_result.embedding
         content_type = chunk_metadata.content_type
         
         appropriateness_score = 0.7  # Base score
@@ -415,7 +462,9 @@ class EmbeddingQualityAssessor:
         
         if chunk_metadata.difficulty > 0:
             # Embedding should vary with difficulty
-            difficulty_signal = self._analyze_difficulty_signal(embedding, chunk_metadata.difficulty)
+            difficulty_signal = self._analyze_difficulty_signal(
+                embedding_statistics, chunk_metadata.difficulty
+            )
             appropriateness_score += difficulty_signal * 0.1
         
         appropriateness_score = max(0.0, min(1.0, appropriateness_score))
@@ -443,14 +492,17 @@ class EmbeddingQualityAssessor:
     
     def _assess_content_type_quality(self,
                                    embedding_result: EmbeddingResult,
-                                   chunk_metadata: ChunkMetadata) -> List[QualityScore]:
+                                   chunk_metadata: ChunkMetadata,
+                                   embedding_statistics: EmbeddingStatistics) -> List[QualityScore]:
         """Assess quality specific to content type"""
         
         content_type = chunk_metadata.content_type
         quality_scores = []
         
         if content_type == ContentType.MATH:
-            math_score = self._assess_mathematical_preservation(embedding_result, chunk_metadata)
+            math_score = self._assess_mathematical_preservation(
+                embedding_result, chunk_metadata, embedding_statistics
+            )
             quality_scores.append(math_score)
         
         elif content_type == ContentType.DEFINITION:
@@ -465,11 +517,11 @@ class EmbeddingQualityAssessor:
     
     def _assess_mathematical_preservation(self,
                                         embedding_result: EmbeddingResult,
-                                        chunk_metadata: ChunkMetadata) -> QualityScore:
+                                        chunk_metadata: ChunkMetadata,
+                                        embedding_statistics: EmbeddingStatistics) -> QualityScore:
         """Assess preservation of mathematical content in embedding"""
         
         text = embedding_result.text
-        embedding = embedding_result.embedding
         
         # Analyze mathematical content
         math_symbols = set('∫∑∂∇π≈≠≤≥±∞√') & set(text)
@@ -486,7 +538,7 @@ class EmbeddingQualityAssessor:
             preservation_score += 0.1
         
         # Analyze if embedding captures mathematical structure
-        math_signal_strength = self._analyze_mathematical_signal(embedding)
+        math_signal_strength = self._analyze_mathematical_signal(embedding_statistics)
         preservation_score += math_signal_strength * 0.1
         
         preservation_score = max(0.0, min(1.0, preservation_score))
@@ -674,22 +726,22 @@ class EmbeddingQualityAssessor:
     
     def _analyze_content_characteristics(self,
                                        embedding_result: EmbeddingResult,
-                                       chunk_metadata: Optional[ChunkMetadata]) -> Dict[str, Any]:
+                                       chunk_metadata: Optional[ChunkMetadata],
+                                       embedding_statistics: EmbeddingStatistics) -> Dict[str, Any]:
         """Analyze content characteristics"""
         
         text = embedding_result.text
-        embedding = embedding_result.embedding
         
         analysis = {
             'text_length': len(text),
             'word_count': len(text.split()),
             'sentence_count': len([s for s in text.split('.') if s.strip()]),
             'embedding_statistics': {
-                'mean': float(np.mean(embedding)),
-                'std': float(np.std(embedding)),
-                'min': float(np.min(embedding)),
-                'max': float(np.max(embedding)),
-                'norm': float(np.linalg.norm(embedding))
+                'mean': float(embedding_statistics.mean),
+                'std': float(embedding_statistics.std),
+                'min': float(embedding_statistics.min),
+                'max': float(embedding_statistics.max),
+                'norm': float(embedding_statistics.norm)
             }
         }
         
@@ -731,14 +783,14 @@ class EmbeddingQualityAssessor:
     
     # Helper methods
     
-    def _analyze_embedding_distribution(self, embedding: np.ndarray) -> Dict[str, float]:
+    def _analyze_embedding_distribution(self, embedding_statistics: EmbeddingStatistics) -> Dict[str, float]:
         """Analyze the distribution of embedding values"""
         
         return {
-            'skewness': float(self._calculate_skewness(embedding)),
-            'kurtosis': float(self._calculate_kurtosis(embedding)),
-            'entropy': float(self._calculate_entropy(embedding)),
-            'effective_dimensions': float(self._calculate_effective_dimensions(embedding))
+            'skewness': float(embedding_statistics.skewness),
+            'kurtosis': float(embedding_statistics.kurtosis),
+            'entropy': float(embedding_statistics.entropy),
+            'effective_dimensions': float(embedding_statistics.effective_dimensions)
         }
     
     def _find_educational_indicators(self, text: str) -> List[str]:
@@ -759,23 +811,23 @@ class EmbeddingQualityAssessor:
         
         return indicators
     
-    def _analyze_difficulty_signal(self, embedding: np.ndarray, difficulty: float) -> float:
+    def _analyze_difficulty_signal(self, embedding_statistics: EmbeddingStatistics, difficulty: float) -> float:
         """Analyze if embedding varies appropriately with difficulty"""
         
         # Simple heuristic: higher difficulty should correlate with higher variance
-        embedding_variance = np.var(embedding)
+        embedding_variance = embedding_statistics.variance
         expected_variance = 0.1 + difficulty * 0.2  # Scale with difficulty
         
         variance_match = 1.0 - abs(embedding_variance - expected_variance) / expected_variance
         return max(0.0, min(1.0, variance_match))
     
-    def _analyze_mathematical_signal(self, embedding: np.ndarray) -> float:
+    def _analyze_mathematical_signal(self, embedding_statistics: EmbeddingStatistics) -> float:
         """Analyze mathematical signal strength in embedding"""
         
         # Look for patterns that might indicate mathematical content
         # This is a simplified heuristic
-        high_magnitude_dims = np.sum(np.abs(embedding) > np.percentile(np.abs(embedding), 80))
-        signal_strength = high_magnitude_dims / len(embedding)
+        high_magnitude_dims = embedding_statistics.high_magnitude_dimensions
+        signal_strength = high_magnitude_dims / embedding_statistics.dimensions
         
         return min(1.0, signal_strength * 2)  # Scale to 0-1
     
@@ -908,6 +960,166 @@ class EmbeddingQualityAssessor:
     
     # Statistical helper methods
     
+    def _calculate_embedding_statistics(self, embedding: np.ndarray) -> EmbeddingStatistics:
+        """Calculate distribution statistics of one embedding"""
+        
+        abs_values = np.abs(embedding)
+        return EmbeddingStatistics(
+            dimensions=len(embedding),
+            norm=float(np.linalg.norm(embedding)),
+            mean=float(np.mean(embedding)),
+            std=float(np.std(embedding)),
+            variance=float(np.var(embedding)),
+            min=float(np.min(embedding)),
+            max=float(np.max(embedding)),
+            non_zero_dimensions=int(np.sum(abs_values > 1e-6)),
+            significant_dimensions=int(np.sum(abs_values > np.mean(abs_values))),
+            high_magnitude_dimensions=int(np.sum(abs_values > np.percentile(abs_values, 80))),
+            skewness=self._calculate_skewness(embedding),
+            kurtosis=self._calculate_kurtosis(embedding),
+            entropy=self._calculate_entropy(embedding),
+            effective_dimensions=self._calculate_effective_dimensions(embedding)
+        )
+    
+    def _calculate_batch_embedding_statistics(self, embeddings: List[np.ndarray]) -> List[EmbeddingStatistics]:
+        """
+        Calculate distribution statistics of many embeddings with matrix operations.
+        
+        Embeddings of equal dimensions are stacked and processed in row blocks.
+        Embeddings the matrix path cannot handle (non-finite values, ranges
+        too narrow for the entropy histogram) use the single-vector path,
+        which raises the same errors as assess_embedding_quality.
+        """
+        
+        statistics_list: List[Optional[EmbeddingStatistics]] = [None] * len(embeddings)
+        
+        rows_by_dimensions = defaultdict(list)
+        for i, embedding in enumerate(embeddings):
+            rows_by_dimensions[len(embedding)].append(i)
+        
+        for rows in rows_by_dimensions.values():
+            for block_start in range(0, len(rows), _STATISTICS_BLOCK_ROWS):
+                block_rows = rows[block_start:block_start + _STATISTICS_BLOCK_ROWS]
+                matrix = np.stack([np.asarray(embeddings[i]) for i in block_rows])
+                
+                finite = np.isfinite(matrix).all(axis=1)
+                if finite.any():
+                    finite_rows = [i for i, keep in zip(block_rows, finite) if keep]
+                    for i, embedding_statistics in zip(finite_rows, self._calculate_matrix_statistics(matrix[finite])):
+                        statistics_list[i] = embedding_statistics
+        
+        for i, embedding_statistics in enumerate(statistics_list):
+            if embedding_statistics is None:
+                statistics_list[i] = self._calculate_embedding_statistics(embeddings[i])
+        
+        return statistics_list
+    
+    def _calculate_matrix_statistics(self, matrix: np.ndarray) -> List[Optional[EmbeddingStatistics]]:
+        """Statistics of each row of a finite N x D matrix (None where entropy is undefined)"""
+        
+        dimensions = matrix.shape[1]
+        abs_values = np.abs(matrix)
+        
+        norms = np.linalg.norm(matrix, axis=1)
+        means = np.mean(matrix, axis=1)
+        stds = np.std(matrix, axis=1)
+        variances = np.var(matrix, axis=1)
+        minimums = matrix.min(axis=1)
+        maximums = matrix.max(axis=1)
+        
+        non_zero = np.sum(abs_values > 1e-6, axis=1)
+        significant = np.sum(abs_values > np.mean(abs_values, axis=1, keepdims=True), axis=1)
+        high_magnitude = np.sum(abs_values > np.percentile(abs_values, 80, axis=1, keepdims=True), axis=1)
+        
+        # Standardized moments, zero for constant rows and short vectors
+        with np.errstate(divide='ignore', invalid='ignore'):
+            standardized = (matrix - means[:, None]) / stds[:, None]
+        constant = stds == 0
+        standardized[constant] = 0
+        standardized_squared = standardized * standardized
+        skewness = np.zeros(len(matrix))
+        kurtosis = np.zeros(len(matrix))
+        if dimensions >= 3:
+            skewness = np.mean(standardized_squared * standardized, axis=1)
+        if dimensions >= 4:
+            kurtosis = np.where(constant, 0.0, np.mean(standardized_squared * standardized_squared, axis=1) - 3)
+        
+        # Participation ratio
+        squared = matrix * matrix
+        sum_squared = np.sum(squared, axis=1)
+        sum_fourth = np.sum(squared * squared, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_dimensions = np.where(sum_fourth == 0, 0.0, sum_squared ** 2 / sum_fourth)
+        
+        entropy = self._calculate_histogram_entropy(matrix)
+        
+        return [
+            EmbeddingStatistics(
+                dimensions=dimensions,
+                norm=float(norms[i]),
+                mean=float(means[i]),
+                std=float(stds[i]),
+                variance=float(variances[i]),
+                min=float(minimums[i]),
+                max=float(maximums[i]),
+                non_zero_dimensions=int(non_zero[i]),
+                significant_dimensions=int(significant[i]),
+                high_magnitude_dimensions=int(high_magnitude[i]),
+                skewness=float(skewness[i]),
+                kurtosis=float(kurtosis[i]),
+                entropy=float(entropy[i]),
+                effective_dimensions=float(effective_dimensions[i])
+            ) if not np.isnan(entropy[i]) else None
+            for i in range(len(matrix))
+        ]
+    
+    def _calculate_histogram_entropy(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Entropy of each row's density histogram, as _calculate_entropy.
+        
+        Bin edges and bin assignment follow np.histogram with automatic
+        range: edges span [min, max] (widened by 0.5 for constant rows) and
+        values exactly on an inner edge fall into the upper bin. Rows whose
+        range is too narrow for distinct edges, where np.histogram raises,
+        get NaN.
+        """
+        
+        rows = len(matrix)
+        first_edges = matrix.min(axis=1)
+        last_edges = matrix.max(axis=1)
+        constant = first_edges == last_edges
+        first_edges = np.where(constant, first_edges - 0.5, first_edges)
+        last_edges = np.where(constant, last_edges + 0.5, last_edges)
+        
+        bin_type = np.result_type(first_edges, last_edges, matrix)
+        if np.issubdtype(bin_type, np.integer):
+            bin_type = np.result_type(bin_type, float)
+        bin_edges = np.linspace(first_edges, last_edges, _ENTROPY_BINS + 1, dtype=bin_type, axis=1)
+        binnable = np.all(bin_edges[:, :-1] < bin_edges[:, 1:], axis=1)
+        
+        values = matrix.astype(bin_type, copy=False)
+        first = first_edges.astype(bin_type)[:, None]
+        width = (last_edges - first_edges).astype(bin_type)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indices = ((values - first) / width * _ENTROPY_BINS).astype(np.intp)
+        indices[~binnable] = 0
+        indices[indices == _ENTROPY_BINS] -= 1
+        
+        # Correct rounding against the actual edges
+        indices -= values < np.take_along_axis(bin_edges, indices, axis=1)
+        indices += ((values >= np.take_along_axis(bin_edges, indices + 1, axis=1))
+                    & (indices != _ENTROPY_BINS - 1))
+        
+        offsets = np.arange(rows)[:, None] * _ENTROPY_BINS
+        counts = np.bincount((indices + offsets).ravel(), minlength=rows * _ENTROPY_BINS)
+        counts = counts.reshape(rows, _ENTROPY_BINS)
+        
+        bin_widths = np.diff(bin_edges, axis=1).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            density = counts / bin_widths / counts.sum(axis=1, keepdims=True)
+            terms = np.where(density > 0, density * np.log2(density), 0.0)
+        return np.where(binnable, -np.sum(terms, axis=1), np.nan)
+    
     def _calculate_skewness(self, data: np.ndarray) -> float:
         """Calculate skewness of data"""
         if len(data) < 3:
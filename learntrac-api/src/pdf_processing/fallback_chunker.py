@@ -11,6 +11,7 @@ from typing import List, Dict, Optional, Tuple, Set
 from dataclasses import dataclass, field
 
 from .chunk_metadata import ChunkMetadata, ContentType
+from .interval_index import IntervalIndex
 
 
 @dataclass
@@ -102,7 +103,7 @@ class SentenceTokenizer:
         
         return valid_boundaries
     
-    def _find_math_regions(self, text: str) -> List[Tuple[int, int]]:
+    def _find_math_regions(self, text: str) -> IntervalIndex:
         """Find regions containing mathematical content"""
         math_regions = []
         
@@ -111,19 +112,7 @@ class SentenceTokenizer:
                 math_regions.append((match.start(), match.end()))
         
         # Merge overlapping regions
-        if math_regions:
-            math_regions.sort()
-            merged = [math_regions[0]]
-            
-            for start, end in math_regions[1:]:
-                if start <= merged[-1][1]:
-                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-                else:
-                    merged.append((start, end))
-            
-            return merged
-        
-        return []
+        return IntervalIndex.merged(math_regions)
     
     def _find_potential_boundaries(self, text: str) -> List[SentenceBoundary]:
         """Find all potential sentence boundaries"""
@@ -158,12 +147,9 @@ class SentenceTokenizer:
         
         return boundaries
     
-    def _is_in_math_region(self, position: int, math_regions: List[Tuple[int, int]]) -> bool:
+    def _is_in_math_region(self, position: int, math_regions: IntervalIndex) -> bool:
         """Check if position falls within a mathematical region"""
-        for start, end in math_regions:
-            if start <= position <= end:
-                return True
-        return False
+        return position in math_regions
     
     def _validate_sentence_boundary(self, text: str, boundary: SentenceBoundary) -> bool:
         """Validate if a potential boundary is actually a sentence end"""
@@ -0,0 +1,158 @@
+"""
+Interval Index - Sorted protected regions with logarithmic queries
+
+Shared by the chunkers and the text cleaner for regions of text that must
+not be split or rewritten (math, definitions, examples):
+- Merging of overlapping or nearby regions with a label policy
+- Containment, overlap, enclosure and nearest-edge queries by binary search
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+Interval = Tuple[int, int, Any]
+
+
+def join_labels(last: Any, current: Any) -> Any:
+    """Label policy: concatenate labels with '+'"""
+    return f"{last}+{current}"
+
+
+def join_distinct_labels(last: Any, current: Any) -> Any:
+    """Label policy: concatenate labels with '+' unless they are equal"""
+    return f"{last}+{current}" if last != current else last
+
+
+def keep_first_label(last: Any, current: Any) -> Any:
+    """Label policy: keep the label of the earliest region"""
+    return last
+
+
+def merge_intervals(intervals: Iterable[Sequence],
+                    gap: int = 0,
+                    combine: Callable[[Any, Any], Any] = keep_first_label) -> List[Interval]:
+    """
+    Merge overlapping or nearby intervals.
+
+    Intervals are (start, end) or (start, end, label) and are visited in
+    order of start position (stable for equal starts). An interval starting
+    at most gap characters after the end of the previous merged interval is
+    absorbed into it.
+
+    Args:
+        intervals: Intervals to merge
+        gap: Largest distance between intervals that are still merged
+        combine: Label of a merged interval from the labels of its parts
+
+    Returns:
+        Sorted, disjoint (start, end, label) intervals; label is None for
+        (start, end) input
+    """
+    merged: List[Interval] = []
+    for interval in sorted(intervals, key=lambda r: r[0]):
+        start, end = interval[0], interval[1]
+        label = interval[2] if len(interval) > 2 else None
+
+        if merged and start <= merged[-1][1] + gap:
+            last_start, last_end, last_label = merged[-1]
+            merged[-1] = (last_start, max(last_end, end), combine(last_label, label))
+        else:
+            merged.append((start, end, label))
+
+    return merged
+
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping intervals queried by binary search.
+
+    Intervals may touch but not overlap, so starts and ends are both
+    sorted. Use merged() to build an index from arbitrary regions.
+    """
+
+    def __init__(self, intervals: Iterable[Sequence] = ()):
+        """
+        Index non-overlapping intervals.
+
+        Args:
+            intervals: (start, end) or (start, end, label) intervals
+        """
+        self.intervals: List[Interval] = [
+            (r[0], r[1], r[2] if len(r) > 2 else None)
+            for r in sorted(intervals, key=lambda r: (r[0], r[1]))
+        ]
+        self._starts = array('q', (r[0] for r in self.intervals))
+        self._ends = array('q', (r[1] for r in self.intervals))
+
+        # Start and end of every interval in text order
+        self._edges = array('q')
+        for start, end, _ in self.intervals:
+            self._edges.append(start)
+            self._edges.append(end)
+
+    @classmethod
+    def merged(cls,
+               intervals: Iterable[Sequence],
+               gap: int = 0,
+               combine: Callable[[Any, Any], Any] = keep_first_label) -> 'IntervalIndex':
+        """Index of intervals merged with merge_intervals"""
+        return cls(merge_intervals(intervals, gap, combine))
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def __iter__(self):
+        return iter(self.intervals)
+
+    def __contains__(self, position: int) -> bool:
+        return self.containing(position) is not None
+
+    def containing(self, position: int, inclusive: bool = True) -> Optional[Interval]:
+        """
+        Interval containing a position.
+
+        Args:
+            position: Text position
+            inclusive: Whether the interval edges count as inside
+
+        Returns:
+            The containing interval (the later one where two touch) or None
+        """
+        if inclusive:
+            index = bisect_right(self._starts, position) - 1
+            if index >= 0 and position <= self._ends[index]:
+                return self.intervals[index]
+        else:
+            index = bisect_left(self._starts, position) - 1
+            if index >= 0 and position < self._ends[index]:
+                return self.intervals[index]
+        return None
+
+    def overlapping(self, start: int, end: int) -> List[Interval]:
+        """Intervals sharing at least one character with [start, end)"""
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        return self.intervals[lo:hi]
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Whether any interval shares a character with [start, end)"""
+        return bisect_right(self._ends, start) < bisect_left(self._starts, end)
+
+    def within(self, start: int, end: int) -> List[Interval]:
+        """Intervals lying entirely inside [start, end]"""
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._ends, end)
+        return self.intervals[lo:hi]
+
+    def nearest_edge(self, position: int) -> Optional[int]:
+        """Interval start or end closest to a position, the earlier one on ties"""
+        if not self._edges:
+            return None
+        index = bisect_left(self._edges, position)
+        if index == 0:
+            return self._edges[0]
+        if index == len(self._edges):
+            return self._edges[-1]
+        before, after = self._edges[index - 1], self._edges[index]
+        return before if position - before <= after - position else after
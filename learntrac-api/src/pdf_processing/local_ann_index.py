@@ -0,0 +1,512 @@
+"""
+Local Approximate Nearest Neighbour Index for Vector Search Fallback
+
+Provides an in-process IVF (inverted file) index over a float32 matrix:
+- Coarse k-means quantizer with configurable list count and probe width
+- Exact search for small corpora where clustering does not pay off
+- Incremental upserts and removals without a full rebuild
+- Vectorized batch search with a single matrix product per probe set
+- Recall and latency reporting against exact search
+"""
+
+import time
+import threading
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ANNIndexConfig:
+    """Configuration for a local ANN index"""
+    n_lists: int = 0  # Number of IVF lists (0 = sqrt(N) chosen at train time)
+    n_probe: int = 8  # Lists scanned per query
+    min_train_size: int = 2048  # Below this size, search is exact
+    kmeans_iterations: int = 10
+    kmeans_sample_size: int = 50000  # Vectors sampled for centroid training
+    retrain_growth_factor: float = 2.0  # Retrain once the index doubles in size
+    recall_sample_size: int = 50  # Queries used when estimating recall
+    random_seed: int = 42
+
+
+@dataclass
+class ANNIndexStats:
+    """Runtime statistics for a local ANN index"""
+    size: int = 0
+    dimensions: int = 0
+    n_lists: int = 0
+    trained: bool = False
+    build_time: float = 0.0
+    total_queries: int = 0
+    total_search_time: float = 0.0
+    last_recall: Optional[float] = None
+    last_recall_k: Optional[int] = None
+    latencies_ms: List[float] = field(default_factory=list)
+
+    @property
+    def average_latency_ms(self) -> float:
+        if not self.total_queries:
+            return 0.0
+        return self.total_search_time * 1000 / self.total_queries
+
+    @property
+    def p95_latency_ms(self) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        return float(np.percentile(self.latencies_ms, 95))
+
+
+class LocalANNIndex:
+    """
+    In-memory IVF index over L2-normalized float32 vectors.
+
+    Scores are cosine similarities. Rows are stored in a growable matrix;
+    removed or replaced rows are tombstoned and reclaimed on the next retrain.
+    """
+
+    _LATENCY_WINDOW = 1000
+
+    def __init__(self, dimensions: int, config: Optional[ANNIndexConfig] = None):
+        """
+        Initialize local ANN index.
+
+        Args:
+            dimensions: Vector dimensionality
+            config: Index configuration
+        """
+        self.dimensions = dimensions
+        self.config = config or ANNIndexConfig()
+        self.stats = ANNIndexStats(dimensions=dimensions)
+
+        self._vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self._size = 0  # Rows in use (including tombstones)
+        self._ids: List[Optional[str]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._list_rows: Optional[List[np.ndarray]] = None
+        self._trained_size = 0
+
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def build(self, ids: Sequence[str], vectors: Any) -> None:
+        """
+        Replace the index contents and train the quantizer.
+
+        Args:
+            ids: Identifiers, one per vector
+            vectors: Array-like of shape (N, dimensions)
+        """
+        start_time = time.time()
+        with self._lock:
+            self._vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+            self._size = 0
+            self._ids = []
+            self._id_to_row = {}
+            self._alive = np.zeros(0, dtype=bool)
+            self._centroids = None
+            self._assignments = np.zeros(0, dtype=np.int32)
+            self._list_rows = None
+            self._trained_size = 0
+
+            self._append(ids, vectors)
+            if len(self) >= self.config.min_train_size:
+                self._train()
+
+        self.stats.build_time = time.time() - start_time
+        self._refresh_stats()
+        logger.info(
+            f"Built local ANN index with {len(self)} vectors "
+            f"({self.stats.n_lists} lists) in {self.stats.build_time:.2f}s"
+        )
+
+    def add(self, ids: Sequence[str], vectors: Any) -> int:
+        """
+        Insert or replace vectors.
+
+        Args:
+            ids: Identifiers, one per vector
+            vectors: Array-like of shape (N, dimensions)
+
+        Returns:
+            Number of vectors written
+        """
+        with self._lock:
+            added = self._append(ids, vectors)
+
+            if self.is_trained:
+                growth = len(self) / max(self._trained_size, 1)
+                if growth >= self.config.retrain_growth_factor:
+                    self._train()
+            elif len(self) >= self.config.min_train_size:
+                self._train()
+
+        self._refresh_stats()
+        return added
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """
+        Remove vectors by identifier.
+
+        Args:
+            ids: Identifiers to remove
+
+        Returns:
+            Number of vectors removed
+        """
+        removed = 0
+        with self._lock:
+            for item_id in ids:
+                row = self._id_to_row.pop(item_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._ids[row] = None
+                    removed += 1
+
+        self._refresh_stats()
+        return removed
+
+    def search(
+        self,
+        query_vector: Any,
+        k: int = 10,
+        n_probe: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the approximate top-k neighbours of one query.
+
+        Args:
+            query_vector: Query vector
+            k: Number of neighbours
+            n_probe: Override for lists scanned
+
+        Returns:
+            List of (id, cosine score) sorted by score descending
+        """
+        return self.search_batch([query_vector], k, n_probe)[0]
+
+    def search_batch(
+        self,
+        query_vectors: Any,
+        k: int = 10,
+        n_probe: Optional[int] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Find approximate top-k neighbours for several queries.
+
+        Args:
+            query_vectors: Array-like of shape (Q, dimensions)
+            k: Number of neighbours per query
+            n_probe: Override for lists scanned
+
+        Returns:
+            One result list per query, in input order
+        """
+        queries = self._normalize(np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dimensions))
+        start_time = time.time()
+        results = self._search_normalized(queries, k, n_probe)
+        elapsed = time.time() - start_time
+        self._record_latency(elapsed, len(queries))
+        return results
+
+    def exact_search_batch(self, query_vectors: Any, k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Exact top-k by brute force over all live vectors.
+
+        Args:
+            query_vectors: Array-like of shape (Q, dimensions)
+            k: Number of neighbours per query
+
+        Returns:
+            One result list per query, in input order
+        """
+        queries = self._normalize(np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dimensions))
+        with self._lock:
+            if not len(self) or k <= 0:
+                return [[] for _ in range(len(queries))]
+            return self._exact_batch(queries, k)
+
+    def measure_recall(
+        self,
+        k: int = 10,
+        query_vectors: Optional[Any] = None,
+        sample_size: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Estimate recall@k of the approximate search against exact search.
+
+        Args:
+            k: Neighbours compared per query
+            query_vectors: Queries to use (defaults to a sample of stored vectors)
+            sample_size: Number of stored vectors sampled when no queries given
+
+        Returns:
+            Recall and latency figures for both search modes
+        """
+        with self._lock:
+            if query_vectors is None:
+                live_rows = np.flatnonzero(self._alive[:self._size])
+                if not len(live_rows):
+                    return {"recall": 1.0, "k": k, "queries": 0}
+                rng = np.random.default_rng(self.config.random_seed)
+                count = min(sample_size or self.config.recall_sample_size, len(live_rows))
+                rows = rng.choice(live_rows, size=count, replace=False)
+                query_vectors = self._vectors[rows].copy()
+
+            queries = np.asarray(query_vectors, dtype=np.float32).reshape(-1, self.dimensions)
+
+            queries = self._normalize(queries)
+
+            # Not recorded in the latency statistics, which describe served queries
+            exact_start = time.time()
+            exact = self._exact_batch(queries, k) if len(self) and k > 0 else [[] for _ in queries]
+            exact_time = time.time() - exact_start
+
+            approx_start = time.time()
+            approx = self._search_normalized(queries, k)
+            approx_time = time.time() - approx_start
+
+        hits = 0
+        total = 0
+        for exact_results, approx_results in zip(exact, approx):
+            expected = {item_id for item_id, _ in exact_results}
+            hits += len(expected.intersection(item_id for item_id, _ in approx_results))
+            total += len(expected)
+
+        recall = hits / total if total else 1.0
+        self.stats.last_recall = recall
+        self.stats.last_recall_k = k
+
+        query_count = max(len(queries), 1)
+        return {
+            "recall": recall,
+            "k": k,
+            "queries": len(queries),
+            "exact_latency_ms": exact_time * 1000 / query_count,
+            "approximate_latency_ms": approx_time * 1000 / query_count
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            "size": self.stats.size,
+            "dimensions": self.stats.dimensions,
+            "n_lists": self.stats.n_lists,
+            "n_probe": self.config.n_probe,
+            "trained": self.stats.trained,
+            "build_time": self.stats.build_time,
+            "total_queries": self.stats.total_queries,
+            "average_latency_ms": self.stats.average_latency_ms,
+            "p95_latency_ms": self.stats.p95_latency_ms,
+            "last_recall": self.stats.last_recall,
+            "last_recall_k": self.stats.last_recall_k,
+            "memory_bytes": int(self._vectors.nbytes)
+        }
+
+    def _search_normalized(
+        self,
+        queries: np.ndarray,
+        k: int,
+        n_probe: Optional[int] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """Approximate top-k for normalized queries, without recording latency"""
+        with self._lock:
+            if not len(self) or k <= 0:
+                return [[] for _ in range(len(queries))]
+            if not self.is_trained:
+                return self._exact_batch(queries, k)
+            return self._ivf_batch(queries, k, n_probe or self.config.n_probe)
+
+    def _append(self, ids: Sequence[str], vectors: Any) -> int:
+        """Write vectors into the matrix, tombstoning replaced rows"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.size == 0:
+            return 0
+        matrix = matrix.reshape(-1, self.dimensions)
+        if len(ids) != len(matrix):
+            raise ValueError("ids and vectors must have the same length")
+
+        matrix = self._normalize(matrix)
+        self._ensure_capacity(self._size + len(matrix))
+
+        start = self._size
+        end = start + len(matrix)
+        self._vectors[start:end] = matrix
+        self._alive[start:end] = True
+
+        for offset, item_id in enumerate(ids):
+            item_id = str(item_id)
+            previous = self._id_to_row.get(item_id)
+            if previous is not None:
+                self._alive[previous] = False
+                self._ids[previous] = None
+            self._id_to_row[item_id] = start + offset
+            self._ids.append(item_id)
+
+        # A repeated id inside one batch leaves only its last row alive
+        for row in range(start, end):
+            if self._id_to_row.get(self._ids[row]) != row:
+                self._alive[row] = False
+
+        self._size = end
+
+        if self.is_trained:
+            self._assignments[start:end] = self._assign(matrix)
+            self._list_rows = None
+
+        return len(matrix)
+
+    def _ensure_capacity(self, required: int) -> None:
+        """Grow backing arrays geometrically"""
+        capacity = len(self._vectors)
+        if required <= capacity:
+            return
+
+        new_capacity = max(required, capacity * 2, 1024)
+        vectors = np.zeros((new_capacity, self.dimensions), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        assignments = np.zeros(new_capacity, dtype=np.int32)
+        assignments[:len(self._assignments)] = self._assignments[:new_capacity]
+
+        self._vectors = vectors
+        self._alive = alive
+        self._assignments = assignments
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows"""
+        live_rows = np.flatnonzero(self._alive[:self._size])
+        if len(live_rows) == self._size:
+            return
+
+        self._vectors = self._vectors[live_rows].copy()
+        self._ids = [self._ids[row] for row in live_rows]
+        self._id_to_row = {item_id: row for row, item_id in enumerate(self._ids)}
+        self._alive = np.ones(len(live_rows), dtype=bool)
+        self._assignments = np.zeros(len(live_rows), dtype=np.int32)
+        self._size = len(live_rows)
+
+    def _train(self) -> None:
+        """Train the coarse quantizer with spherical k-means"""
+        self._compact()
+        data = self._vectors[:self._size]
+        n_lists = self.config.n_lists or int(np.sqrt(len(data)))
+        n_lists = max(1, min(n_lists, len(data)))
+
+        rng = np.random.default_rng(self.config.random_seed)
+        if len(data) > self.config.kmeans_sample_size:
+            sample = data[rng.choice(len(data), self.config.kmeans_sample_size, replace=False)]
+        else:
+            sample = data
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.config.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_lists)
+
+            empty = counts == 0
+            if np.any(empty):
+                # Reseed empty lists from random sample points
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = self._normalize(sums)
+
+        self._centroids = centroids
+        self._assignments = np.zeros(len(self._vectors), dtype=np.int32)
+        self._assignments[:self._size] = self._assign(data)
+        self._list_rows = None
+        self._trained_size = len(self)
+
+    def _assign(self, matrix: np.ndarray) -> np.ndarray:
+        """Assign normalized vectors to their nearest centroid"""
+        return np.argmax(matrix @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _get_list_rows(self) -> List[np.ndarray]:
+        """Rows per IVF list, rebuilt lazily after writes"""
+        if self._list_rows is None:
+            live_rows = np.flatnonzero(self._alive[:self._size])
+            labels = self._assignments[live_rows]
+            order = np.argsort(labels, kind="stable")
+            sorted_rows = live_rows[order]
+            boundaries = np.searchsorted(labels[order], np.arange(len(self._centroids) + 1))
+            self._list_rows = [
+                sorted_rows[boundaries[i]:boundaries[i + 1]]
+                for i in range(len(self._centroids))
+            ]
+        return self._list_rows
+
+    def _exact_batch(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """Brute-force search over all live rows"""
+        live_rows = np.flatnonzero(self._alive[:self._size])
+        if len(live_rows) == self._size:
+            matrix = self._vectors[:self._size]
+        else:
+            matrix = self._vectors[live_rows]
+        scores = queries @ matrix.T
+        return [self._top_k(live_rows, row_scores, k) for row_scores in scores]
+
+    def _ivf_batch(self, queries: np.ndarray, k: int, n_probe: int) -> List[List[Tuple[str, float]]]:
+        """Probe the nearest lists of each query"""
+        list_rows = self._get_list_rows()
+        n_probe = max(1, min(n_probe, len(self._centroids)))
+        centroid_scores = queries @ self._centroids.T
+
+        if n_probe < len(self._centroids):
+            probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        else:
+            probes = np.tile(np.arange(len(self._centroids)), (len(queries), 1))
+
+        results = []
+        for query, probe in zip(queries, probes):
+            candidates = np.concatenate([list_rows[list_id] for list_id in probe])
+            if not len(candidates):
+                results.append([])
+                continue
+            scores = self._vectors[candidates] @ query
+            results.append(self._top_k(candidates, scores, k))
+        return results
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Select the k highest scoring rows"""
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._ids[rows[i]], float(scores[i])) for i in top]
+
+    def _record_latency(self, elapsed: float, query_count: int) -> None:
+        """Track per-query latency"""
+        if not query_count:
+            return
+        self.stats.total_queries += query_count
+        self.stats.total_search_time += elapsed
+        self.stats.latencies_ms.append(elapsed * 1000 / query_count)
+        if len(self.stats.latencies_ms) > self._LATENCY_WINDOW:
+            del self.stats.latencies_ms[:-self._LATENCY_WINDOW]
+
+    def _refresh_stats(self) -> None:
+        self.stats.size = len(self)
+        self.stats.trained = self.is_trained
+        self.stats.n_lists = len(self._centroids) if self.is_trained else 0
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32, copy=False)
@@ -9,6 +9,7 @@ Manages connections to Neo4j database with support for:
 - Performance monitoring
 """
 
+import re
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple, Union
@@ -20,11 +21,21 @@ import time
 from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession, AsyncTransaction
 from neo4j.exceptions import (
     Neo4jError, ServiceUnavailable, SessionExpired,
-    TransientError, DatabaseUnavailable
+    TransientError, DatabaseUnavailable, ClientError, CypherSyntaxError
 )
 
 logger = logging.getLogger(__name__)
 
+# String literals and escaped names are copied as-is; $name parameters are rewritten
+_PARAMETER_PATTERN = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\$(\w+)""")
+
+# Clauses whose meaning changes when the query runs once per unwound row
+_NON_UNWINDABLE_PATTERN = re.compile(
+    r"(?<!STARTS\s)(?<!ENDS\s)\bWITH\b|\b(?:LIMIT|SKIP|UNION|ORDER\s+BY)\b"
+    r"|\b(?:count|collect|sum|avg|min|max)\s*\(",
+    re.IGNORECASE
+)
+
 
 @dataclass
 class ConnectionConfig:
@@ -47,6 +58,10 @@ class ConnectionConfig:
     # Performance settings
     batch_size: int = 1000
     query_timeout_seconds: int = 30
+    
+    # Bulk write settings
+    bulk_writes: bool = True  # Send each batch as one UNWIND statement
+    max_batch_bytes: int = 4 * 1024 * 1024  # Approximate parameter payload per batch
 
 
 @dataclass
@@ -65,6 +80,20 @@ class ConnectionStats:
     last_error_time: Optional[datetime] = None
 
 
+def _estimate_payload_bytes(value: Any) -> int:
+    """Rough size of a query parameter value on the wire"""
+    if isinstance(value, str):
+        return len(value) + 8
+    if isinstance(value, dict):
+        return sum(len(key) + _estimate_payload_bytes(item) for key, item in value.items()) + 8
+    if isinstance(value, (list, tuple)):
+        # Embeddings dominate payloads; avoid walking every float
+        if value and isinstance(value[0], (int, float)):
+            return 9 * len(value) + 8
+        return sum(_estimate_payload_bytes(item) for item in value) + 8
+    return 9
+
+
 class Neo4jConnectionManager:
     """
     Manages Neo4j database connections with advanced features.
@@ -342,57 +371,195 @@ class Neo4jConnectionManager:
         self,
         query: str,
         data: List[Dict[str, Any]],
-        batch_size: Optional[int] = None
+        batch_size: Optional[int] = None,
+        bulk: Optional[bool] = None,
+        max_batch_bytes: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Execute batch write operations.
         
+        In bulk mode each batch is sent as one statement: the per-record query
+        is prefixed with UNWIND $rows AS __bulk_row_0 (numbered past any name
+        the query already uses) and its $name parameters become
+        __bulk_row_0.name. Queries that already UNWIND $rows are sent
+        unchanged. Queries using WITH, LIMIT, ORDER BY, UNION or aggregation
+        are run once per record, as is everything when bulk mode is off. If
+        the rewritten statement is rejected by the server, the batch falls
+        back to the original query once per record, and after a syntax error
+        so do all later batches.
+        
+        Batches end at batch_size rows or max_batch_bytes of estimated payload,
+        whichever comes first, and are written in order. A failed batch is
+        retried by splitting it in half until the failing records are isolated.
+        
         Args:
             query: Cypher query with parameters
             data: List of parameter dictionaries
             batch_size: Batch size (uses config default if not specified)
+            bulk: Use UNWIND statements (uses config default if not specified)
+            max_batch_bytes: Payload limit per batch (uses config default if not specified)
             
         Returns:
-            Summary of batch execution
+            Summary of batch execution, including throughput in rows/s
         """
         batch_size = batch_size or self.config.batch_size
+        max_batch_bytes = max_batch_bytes or self.config.max_batch_bytes
+        bulk = self.config.bulk_writes if bulk is None else bulk
         total_records = len(data)
-        processed = 0
-        failed = 0
-        errors = []
+        start_time = time.time()
         
-        logger.info(f"Starting batch write of {total_records} records in batches of {batch_size}")
+        bulk_query = self._build_bulk_query(query) if bulk else None
+        mode = "unwind" if bulk_query else "per_record"
         
-        for i in range(0, total_records, batch_size):
-            batch = data[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            
-            try:
-                async with self.session() as session:
-                    async with self.transaction(session) as tx:
-                        for params in batch:
-                            await tx.run(query, params)
-                
-                processed += len(batch)
-                logger.debug(f"Batch {batch_num} completed: {len(batch)} records")
-                
-            except Exception as e:
-                failed += len(batch)
-                error_msg = f"Batch {batch_num} failed: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+        logger.info(
+            f"Starting {mode} batch write of {total_records} records "
+            f"(batches of up to {batch_size} records / {max_batch_bytes} bytes)"
+        )
+        
+        state = {
+            "processed": 0, "failed": 0, "batches": 0, "splits": 0, "errors": [],
+            "bulk_rejected": False
+        }
+        for batch in self._split_batches(data, batch_size, max_batch_bytes):
+            await self._write_batch(query, bulk_query, batch, state)
         
+        elapsed = time.time() - start_time
+        processed = state["processed"]
+        if state["bulk_rejected"]:
+            mode = "per_record"
         summary = {
             "total": total_records,
             "processed": processed,
-            "failed": failed,
+            "failed": state["failed"],
             "success_rate": processed / total_records if total_records > 0 else 0,
-            "errors": errors
+            "errors": state["errors"],
+            "mode": mode,
+            "batches": state["batches"],
+            "batch_splits": state["splits"],
+            "elapsed_seconds": elapsed,
+            "rows_per_second": processed / elapsed if elapsed > 0 else 0.0
         }
         
-        logger.info(f"Batch write completed: {processed}/{total_records} successful")
+        logger.info(
+            f"Batch write completed: {processed}/{total_records} successful "
+            f"({summary['rows_per_second']:.0f} rows/s)"
+        )
         return summary
     
+    async def _write_batch(
+        self,
+        query: str,
+        bulk_query: Optional[str],
+        batch: List[Dict[str, Any]],
+        state: Dict[str, Any]
+    ) -> None:
+        """Write one batch, retrying transient errors and splitting on failure"""
+        if state["bulk_rejected"] and bulk_query != query:
+            bulk_query = None
+        
+        for attempt in range(self.config.max_retry_attempts):
+            try:
+                async with self.session() as session:
+                    async with self.transaction(session) as tx:
+                        if bulk_query:
+                            result = await tx.run(bulk_query, {"rows": batch})
+                            await result.consume()
+                        else:
+                            for params in batch:
+                                await tx.run(query, params)
+                
+                state["batches"] += 1
+                state["processed"] += len(batch)
+                logger.debug(f"Batch completed: {len(batch)} records")
+                return
+            
+            except ClientError as e:
+                if not bulk_query or bulk_query == query:
+                    error = e
+                    break
+                
+                # The rewritten statement failed; splitting would only repeat it
+                if isinstance(e, CypherSyntaxError):
+                    state["bulk_rejected"] = True
+                logger.warning(f"Bulk statement rejected, writing {len(batch)} records one by one: {e}")
+                for params in batch:
+                    await self._write_batch(query, None, [params], state)
+                return
+                
+            except (ServiceUnavailable, SessionExpired, TransientError) as e:
+                self.stats.retry_count += 1
+                if attempt < self.config.max_retry_attempts - 1:
+                    delay = self.config.retry_delay_seconds * (self.config.retry_backoff_factor ** attempt)
+                    logger.warning(f"Batch of {len(batch)} failed (attempt {attempt + 1}), retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                error = e
+                
+            except Exception as e:
+                error = e
+            
+            break
+        
+        if len(batch) > 1:
+            # Isolate the failing records instead of dropping the whole batch
+            state["splits"] += 1
+            middle = len(batch) // 2
+            logger.warning(f"Batch of {len(batch)} failed, retrying as two halves: {error}")
+            await self._write_batch(query, bulk_query, batch[:middle], state)
+            await self._write_batch(query, bulk_query, batch[middle:], state)
+            return
+        
+        state["failed"] += 1
+        error_msg = f"Record failed: {str(error)}"
+        state["errors"].append(error_msg)
+        self._record_error(str(error))
+        logger.error(error_msg)
+    
+    @staticmethod
+    def _build_bulk_query(query: str) -> Optional[str]:
+        """Rewrite a per-record query as an UNWIND statement, or None if it cannot be"""
+        # Drop string literals before looking for clauses
+        code = _PARAMETER_PATTERN.sub(lambda m: "''" if m.group(1) else m.group(0), query)
+        if re.search(r"\bUNWIND\s+\$rows\b", code, re.IGNORECASE):
+            return query
+        if _NON_UNWINDABLE_PATTERN.search(code):
+            return None
+        
+        # Row alias that cannot collide with a variable or name in the query
+        number = 0
+        while f"__bulk_row_{number}" in query:
+            number += 1
+        alias = f"__bulk_row_{number}"
+        
+        body = _PARAMETER_PATTERN.sub(
+            lambda m: m.group(1) if m.group(1) else f"{alias}.{m.group(2)}",
+            query
+        )
+        return f"UNWIND $rows AS {alias}\n{body}"
+    
+    @staticmethod
+    def _split_batches(
+        records: List[Dict[str, Any]],
+        batch_size: int,
+        max_batch_bytes: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Split records into batches bounded by count and estimated payload size"""
+        batches = []
+        batch: List[Dict[str, Any]] = []
+        batch_bytes = 0
+        
+        for params in records:
+            row_bytes = _estimate_payload_bytes(params)
+            if batch and (len(batch) >= batch_size or batch_bytes + row_bytes > max_batch_bytes):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(params)
+            batch_bytes += row_bytes
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get connection statistics.
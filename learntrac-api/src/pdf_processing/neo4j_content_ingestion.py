@@ -11,20 +11,33 @@ Manages the ingestion of processed educational content into Neo4j including:
 
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple, Set
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable, Awaitable
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import hashlib
 import json
 
 from .neo4j_connection_manager import Neo4jConnectionManager
 from .neo4j_vector_index_manager import Neo4jVectorIndexManager, VectorIndexConfig
+from .neo4j_query_optimizer import Neo4jQueryCache, label_tag
 from .chunk_metadata import ChunkMetadata, ContentType
 from .structure_detector import StructureElement, StructureType
 from .pipeline import ProcessingResult
 
 logger = logging.getLogger(__name__)
 
+# Called with (textbook_id, chunk_ids, removed_chunk_ids) after a textbook is
+# ingested; chunk_ids is None when the ingestion path does not report them
+IngestionListener = Callable[[str, Optional[List[str]], List[str]], Awaitable[None]]
+
+# Node labels written when a textbook is ingested or deleted
+INGESTION_LABELS = ("Textbook", "Chapter", "Section", "Chunk", "Concept")
+
+
+def chunk_content_hash(text: str) -> str:
+    """Content address of a chunk, stored as Chunk.content_hash"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
 
 @dataclass
 class TextbookMetadata:
@@ -38,6 +51,7 @@ class TextbookMetadata:
     processing_version: str
     quality_metrics: Dict[str, float]
     statistics: Dict[str, int]
+    owner_id: Optional[str] = None  # Uploading user; only set when the textbook is first created
 
 
 @dataclass
@@ -50,6 +64,8 @@ class IngestionResult:
     errors: List[str]
     warnings: List[str]
     processing_time: float
+    chunks_skipped: List[str] = field(default_factory=list)
+    chunks_deleted: List[str] = field(default_factory=list)
     
     def summary(self) -> str:
         """Generate summary string"""
@@ -57,12 +73,32 @@ class IngestionResult:
 Ingestion {'Successful' if self.success else 'Failed'} for {self.textbook_id}
 Nodes created: {sum(self.nodes_created.values())} ({', '.join(f'{k}: {v}' for k, v in self.nodes_created.items())})
 Relationships created: {sum(self.relationships_created.values())} ({', '.join(f'{k}: {v}' for k, v in self.relationships_created.items())})
+Chunks unchanged (skipped): {len(self.chunks_skipped)}, deleted: {len(self.chunks_deleted)}
 Processing time: {self.processing_time:.2f}s
 Errors: {len(self.errors)}
 Warnings: {len(self.warnings)}
 """
 
 
+@dataclass
+class ChunkDiff:
+    """Chunk-level difference between a new chunking and the stored textbook"""
+    new: List[str]  # Chunk ids not stored yet
+    changed: List[str]  # Stored chunk ids whose content hash differs
+    unchanged: List[str]  # Same id and content hash; not rewritten
+    removed: List[str]  # Stored chunk ids that are no longer produced
+    reusable_embeddings: Dict[str, List[float]]  # Content hash -> stored embedding
+    
+    @property
+    def to_write(self) -> Set[str]:
+        """Chunk ids that have to be written"""
+        return set(self.new) | set(self.changed)
+    
+    def stored_embedding(self, content_hash: str) -> Optional[List[float]]:
+        """Embedding already stored for identical content, if any"""
+        return self.reusable_embeddings.get(content_hash)
+
+
 class Neo4jContentIngestion:
     """
     Manages content ingestion into Neo4j for educational content.
@@ -80,7 +116,8 @@ class Neo4jContentIngestion:
         self,
         connection_manager: Neo4jConnectionManager,
         index_manager: Neo4jVectorIndexManager,
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        query_cache: Optional[Neo4jQueryCache] = None
     ):
         """
         Initialize content ingestion pipeline.
@@ -89,24 +126,43 @@ class Neo4jContentIngestion:
             connection_manager: Neo4j connection manager
             index_manager: Vector index manager
             batch_size: Batch size for operations
+            query_cache: Optional query cache to invalidate after writes
         """
         self.connection = connection_manager
         self.index_manager = index_manager
         self.batch_size = batch_size
+        self.query_cache = query_cache
+        self.ingestion_listeners: List[IngestionListener] = []
+    
+    def add_ingestion_listener(self, listener: IngestionListener) -> None:
+        """
+        Register a coroutine to run after each successful ingestion.
+        
+        Args:
+            listener: Async callable receiving (textbook_id, chunk_ids, removed_chunk_ids)
+        """
+        self.ingestion_listeners.append(listener)
         
     async def ingest_processing_result(
         self,
         processing_result: ProcessingResult,
-        chunks: List[Tuple[ChunkMetadata, str, List[float]]],
-        textbook_metadata: Optional[TextbookMetadata] = None
+        chunks: List[Tuple[ChunkMetadata, str, Optional[List[float]]]],
+        textbook_metadata: Optional[TextbookMetadata] = None,
+        chunk_diff: Optional[ChunkDiff] = None
     ) -> IngestionResult:
         """
         Ingest a complete processing result into Neo4j.
         
+        Only new or changed chunks are written; stored chunks that are no
+        longer produced are deleted. A chunk may have no embedding when
+        identical content is already stored (see diff_chunks).
+        
         Args:
             processing_result: Result from PDF processing pipeline
             chunks: List of (metadata, text, embedding) tuples
             textbook_metadata: Optional textbook metadata override
+            chunk_diff: Diff computed by the caller with diff_chunks, e.g. to
+                embed only new or changed chunks; computed here if omitted
             
         Returns:
             Ingestion result with statistics
@@ -203,25 +259,38 @@ class Neo4jContentIngestion:
             )
             relationships_created["structural"] = rel_count
             
+            # Diff chunks against the stored textbook by content hash
+            content_hashes = {
+                chunk_metadata.chunk_id: chunk_content_hash(text)
+                for chunk_metadata, text, _ in chunks
+            }
+            if chunk_diff is None:
+                chunk_diff = await self.diff_chunks(
+                    textbook_metadata.textbook_id,
+                    list(content_hashes.items())
+                )
+            to_write = chunk_diff.to_write
+            
             # Process chunks
-            logger.info(f"Processing {len(chunks)} chunks")
+            logger.info(f"Processing {len(chunks)} chunks ({len(to_write)} new or changed)")
             chunk_batch = []
+            structure_batch = []
             concept_set = set()
             
             for i, (chunk_metadata, text, embedding) in enumerate(chunks):
+                # Collect concepts
+                if hasattr(chunk_metadata, 'concepts') and chunk_metadata.concepts:
+                    concept_set.update(chunk_metadata.concepts)
+                
                 chunk_data = {
                     "chunk_id": chunk_metadata.chunk_id,
-                    "content_type": chunk_metadata.content_type.value,
-                    "text": text,
-                    "embedding": embedding,
                     "textbook_id": textbook_metadata.textbook_id,
                     "chapter": chunk_metadata.chapter,
                     "section": chunk_metadata.section,
                     "difficulty_score": chunk_metadata.difficulty,
                     "confidence_score": chunk_metadata.confidence_score,
                     "start_position": chunk_metadata.start_position,
-                    "end_position": chunk_metadata.end_position,
-                    "metadata": asdict(chunk_metadata)
+                    "end_position": chunk_metadata.end_position
                 }
                 
                 # Find parent chapter and section
@@ -236,11 +305,27 @@ class Neo4jContentIngestion:
                     "section_id"
                 )
                 
-                chunk_batch.append(chunk_data)
+                if chunk_metadata.chunk_id not in to_write:
+                    # Same content, but it may now sit in another chapter or section
+                    structure_batch.append(chunk_data)
+                    if len(structure_batch) >= self.batch_size:
+                        await self._batch_update_chunk_structure(structure_batch)
+                        structure_batch = []
+                    continue
                 
-                # Collect concepts
-                if hasattr(chunk_metadata, 'concepts') and chunk_metadata.concepts:
-                    concept_set.update(chunk_metadata.concepts)
+                content_hash = content_hashes[chunk_metadata.chunk_id]
+                if embedding is None:
+                    embedding = chunk_diff.stored_embedding(content_hash)
+                
+                chunk_data.update({
+                    "content_type": chunk_metadata.content_type.value,
+                    "text": text,
+                    "content_hash": content_hash,
+                    "embedding": embedding,
+                    "metadata": asdict(chunk_metadata)
+                })
+                
+                chunk_batch.append(chunk_data)
                 
                 # Process batch when full
                 if len(chunk_batch) >= self.batch_size:
@@ -252,6 +337,12 @@ class Neo4jContentIngestion:
             if chunk_batch:
                 await self._batch_create_chunks(chunk_batch)
                 nodes_created["chunks"] += len(chunk_batch)
+            if structure_batch:
+                await self._batch_update_chunk_structure(structure_batch)
+            
+            if chunk_diff.removed:
+                logger.info(f"Deleting {len(chunk_diff.removed)} removed chunks")
+                await self.delete_chunks(chunk_diff.removed, textbook_metadata.textbook_id)
             
             # Create sequential relationships
             logger.info("Creating sequential relationships")
@@ -275,6 +366,14 @@ class Neo4jContentIngestion:
                 )
                 relationships_created["conceptual"] = concept_rel_count
             
+            # Notify downstream consumers (e.g. similarity precomputation)
+            warnings.extend(await self.notify_textbook_ingested(
+                textbook_metadata.textbook_id,
+                [chunk_metadata.chunk_id for chunk_metadata, _, _ in chunks
+                 if chunk_metadata.chunk_id in to_write],
+                chunk_diff.removed
+            ))
+            
             # Calculate processing time
             processing_time = (datetime.utcnow() - start_time).total_seconds()
             
@@ -287,13 +386,19 @@ class Neo4jContentIngestion:
                 relationships_created=relationships_created,
                 errors=errors,
                 warnings=warnings,
-                processing_time=processing_time
+                processing_time=processing_time,
+                chunks_skipped=chunk_diff.unchanged,
+                chunks_deleted=chunk_diff.removed
             )
             
         except Exception as e:
             logger.error(f"Ingestion failed: {e}")
             errors.append(str(e))
             
+            # Part of the textbook may already be written
+            if textbook_metadata:
+                await self._invalidate_cached_reads(INGESTION_LABELS, textbook_metadata.textbook_id)
+            
             return IngestionResult(
                 success=False,
                 textbook_id=textbook_metadata.textbook_id if textbook_metadata else "unknown",
@@ -304,6 +409,109 @@ class Neo4jContentIngestion:
                 processing_time=(datetime.utcnow() - start_time).total_seconds()
             )
     
+    async def diff_chunks(
+        self,
+        textbook_id: str,
+        chunks: List[Tuple[str, str]]
+    ) -> ChunkDiff:
+        """
+        Compare a new chunking of a textbook with its stored chunks.
+        
+        Chunks are matched by id and compared by content hash. Chunks stored
+        before content hashes were recorded count as changed. For new or
+        changed chunks whose content is already stored under any id of the
+        textbook, the stored embedding is returned for reuse.
+        
+        Args:
+            textbook_id: Textbook identifier
+            chunks: List of (chunk_id, content_hash) tuples
+            
+        Returns:
+            ChunkDiff describing what has to be written, skipped and deleted
+        """
+        stored = await self.connection.execute_query("""
+            MATCH (c:Chunk)
+            WHERE c.textbook_id = $textbook_id
+               OR (c)-[:BELONGS_TO_TEXTBOOK]->(:Textbook {textbook_id: $textbook_id})
+            RETURN c.chunk_id as chunk_id, c.content_hash as content_hash
+        """, {"textbook_id": textbook_id})
+        stored_hashes = {record["chunk_id"]: record["content_hash"] for record in stored}
+        
+        new, changed, unchanged = [], [], []
+        for chunk_id, content_hash in chunks:
+            if chunk_id not in stored_hashes:
+                new.append(chunk_id)
+            elif stored_hashes[chunk_id] != content_hash:
+                changed.append(chunk_id)
+            else:
+                unchanged.append(chunk_id)
+        
+        chunk_ids = {chunk_id for chunk_id, _ in chunks}
+        removed = [chunk_id for chunk_id in stored_hashes if chunk_id not in chunk_ids]
+        
+        # Content moved to another id (e.g. renumbered chunks) keeps its embedding
+        write_ids = set(new) | set(changed)
+        wanted_hashes = {content_hash for chunk_id, content_hash in chunks if chunk_id in write_ids}
+        reusable_hashes = list(wanted_hashes & {h for h in stored_hashes.values() if h})
+        reusable_embeddings = {}
+        if reusable_hashes:
+            records = await self.connection.execute_query("""
+                MATCH (c:Chunk)
+                WHERE c.content_hash IN $hashes AND c.embedding IS NOT NULL
+                  AND (c.textbook_id = $textbook_id
+                       OR (c)-[:BELONGS_TO_TEXTBOOK]->(:Textbook {textbook_id: $textbook_id}))
+                RETURN c.content_hash as content_hash, c.embedding as embedding
+            """, {"textbook_id": textbook_id, "hashes": reusable_hashes})
+            reusable_embeddings = {record["content_hash"]: record["embedding"] for record in records}
+        
+        logger.info(
+            f"Chunk diff for {textbook_id}: {len(new)} new, {len(changed)} changed, "
+            f"{len(unchanged)} unchanged, {len(removed)} removed, "
+            f"{len(reusable_embeddings)} reusable embeddings"
+        )
+        
+        return ChunkDiff(
+            new=new,
+            changed=changed,
+            unchanged=unchanged,
+            removed=removed,
+            reusable_embeddings=reusable_embeddings
+        )
+    
+    async def delete_chunks(
+        self,
+        chunk_ids: List[str],
+        textbook_id: Optional[str] = None
+    ) -> int:
+        """
+        Delete chunks and their relationships.
+        
+        Args:
+            chunk_ids: Ids of the chunks to delete
+            textbook_id: Textbook the chunks belong to, if known; limits
+                which cached query results are invalidated
+            
+        Returns:
+            Number of chunks deleted
+        """
+        if not chunk_ids:
+            return 0
+        
+        results = await self.connection.execute_query("""
+            UNWIND $chunk_ids as chunk_id
+            MATCH (c:Chunk {chunk_id: chunk_id})
+            DETACH DELETE c
+            RETURN count(*) as count
+        """, {"chunk_ids": chunk_ids})
+        
+        # Local ANN indexes cannot drop vectors by chunk id; rebuild on next use
+        if self.index_manager is not None:
+            self.index_manager.invalidate_local_index()
+        
+        await self._invalidate_cached_reads(("Chunk", "Concept"), textbook_id)
+        
+        return results[0]["count"] if results else 0
+    
     async def update_textbook_embeddings(
         self,
         textbook_id: str,
@@ -341,6 +549,14 @@ class Neo4jContentIngestion:
                 self.batch_size
             )
             
+            await self.index_manager.refresh_local_indexes(
+                "Chunk",
+                "chunk_id",
+                [chunk_id for chunk_id, _ in chunks]
+            )
+            
+            await self._invalidate_cached_reads(("Chunk",), textbook_id)
+            
             return result["success_rate"] > 0.9
             
         except Exception as e:
@@ -369,6 +585,9 @@ class Neo4jContentIngestion:
                 {"textbook_id": textbook_id}
             )
             
+            self.index_manager.invalidate_local_index()
+            await self._invalidate_cached_reads(INGESTION_LABELS, textbook_id)
+            
             logger.info(f"Deleted textbook: {textbook_id}")
             return True
             
@@ -376,6 +595,49 @@ class Neo4jContentIngestion:
             logger.error(f"Failed to delete textbook: {e}")
             return False
     
+    async def notify_textbook_ingested(
+        self,
+        textbook_id: str,
+        chunk_ids: Optional[List[str]] = None,
+        removed_chunk_ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Run ingestion listeners for a textbook written by any ingestion path.
+        
+        Args:
+            textbook_id: Textbook identifier
+            chunk_ids: Ids of the chunks written (None if not known)
+            removed_chunk_ids: Ids of the chunks deleted by the ingestion
+            
+        Returns:
+            Listener failures as warning messages
+        """
+        await self._invalidate_cached_reads(INGESTION_LABELS, textbook_id)
+        
+        warnings = []
+        for listener in self.ingestion_listeners:
+            try:
+                await listener(textbook_id, chunk_ids, removed_chunk_ids or [])
+            except Exception as e:
+                logger.error(f"Ingestion listener failed for {textbook_id}: {e}")
+                warnings.append(f"Ingestion listener failed: {e}")
+        return warnings
+    
+    async def _invalidate_cached_reads(
+        self,
+        labels: Tuple[str, ...],
+        textbook_id: Optional[str] = None
+    ) -> None:
+        """Drop cached query results that read the written labels for this textbook"""
+        if self.query_cache is None:
+            return
+        
+        count = await self.query_cache.invalidate_tags(
+            [label_tag(label) for label in labels],
+            [textbook_id] if textbook_id else None
+        )
+        logger.debug(f"Invalidated {count} cached query results for textbook {textbook_id}")
+    
     def _create_textbook_metadata(self, processing_result: ProcessingResult) -> TextbookMetadata:
         """Create textbook metadata from processing result"""
         # Generate unique ID from file path
@@ -425,7 +687,8 @@ class Neo4jContentIngestion:
         """Create or update textbook node"""
         query = """
             MERGE (t:Textbook {textbook_id: $textbook_id})
-            SET t += $properties
+            SET t += $properties,
+                t.owner_id = coalesce(t.owner_id, $owner_id)
         """
         
         properties = {
@@ -449,7 +712,8 @@ class Neo4jContentIngestion:
             query,
             {
                 "textbook_id": metadata.textbook_id,
-                "properties": properties
+                "properties": properties,
+                "owner_id": metadata.owner_id
             }
         )
     
@@ -505,9 +769,12 @@ class Neo4jContentIngestion:
             UNWIND $chunks as chunk
             MERGE (c:Chunk {chunk_id: chunk.chunk_id})
             SET c += {
+                textbook_id: chunk.textbook_id,
                 content_type: chunk.content_type,
                 text: chunk.text,
+                content_hash: chunk.content_hash,
                 embedding: chunk.embedding,
+                similarity_indexed_at: null,
                 difficulty_score: chunk.difficulty_score,
                 confidence_score: chunk.confidence_score,
                 start_position: chunk.start_position,
@@ -517,6 +784,61 @@ class Neo4jContentIngestion:
                 created_at: datetime()
             }
             WITH c, chunk
+            OPTIONAL MATCH (c)-[old:BELONGS_TO_CHAPTER|BELONGS_TO_SECTION]->()
+            DELETE old
+            WITH DISTINCT c, chunk
+            OPTIONAL MATCH ()-[old_has:HAS_CHUNK]->(c)
+            DELETE old_has
+            WITH DISTINCT c, chunk
+            MATCH (t:Textbook {textbook_id: chunk.textbook_id})
+            MERGE (c)-[:BELONGS_TO_TEXTBOOK]->(t)
+            WITH c, chunk
+            WHERE chunk.parent_chapter_id IS NOT NULL
+            MATCH (ch:Chapter {chapter_id: chunk.parent_chapter_id})
+            MERGE (c)-[:BELONGS_TO_CHAPTER]->(ch)
+            WITH c, chunk
+            WHERE chunk.parent_section_id IS NOT NULL
+            MATCH (s:Section {section_id: chunk.parent_section_id})
+            MERGE (c)-[:BELONGS_TO_SECTION]->(s)
+            MERGE (s)-[:HAS_CHUNK]->(c)
+        """
+        
+        await self.connection.execute_query(
+            query,
+            {"chunks": chunks}
+        )
+        
+        # Keep any local ANN fallback index in step with the new embeddings
+        await self.index_manager.refresh_local_indexes(
+            "Chunk",
+            "chunk_id",
+            [chunk["chunk_id"] for chunk in chunks]
+        )
+    
+    async def _batch_update_chunk_structure(self, chunks: List[Dict[str, Any]]) -> None:
+        """
+        Update position metadata and chapter/section links of unchanged chunks.
+        
+        Text, embedding and similarity state are left as they are.
+        """
+        query = """
+            UNWIND $chunks as chunk
+            MATCH (c:Chunk {chunk_id: chunk.chunk_id})
+            SET c += {
+                textbook_id: chunk.textbook_id,
+                difficulty_score: chunk.difficulty_score,
+                confidence_score: chunk.confidence_score,
+                start_position: chunk.start_position,
+                end_position: chunk.end_position,
+                updated_at: datetime()
+            }
+            WITH c, chunk
+            OPTIONAL MATCH (c)-[old:BELONGS_TO_CHAPTER|BELONGS_TO_SECTION]->()
+            DELETE old
+            WITH DISTINCT c, chunk
+            OPTIONAL MATCH ()-[old_has:HAS_CHUNK]->(c)
+            DELETE old_has
+            WITH DISTINCT c, chunk
             MATCH (t:Textbook {textbook_id: chunk.textbook_id})
             MERGE (c)-[:BELONGS_TO_TEXTBOOK]->(t)
             WITH c, chunk
@@ -4,6 +4,7 @@ Neo4j Query Optimizer and Cache Manager
 Provides query optimization and caching for Neo4j operations including:
 - Query plan analysis and optimization
 - Result caching with TTL and LRU eviction
+- Tag-based invalidation of cached results by label and textbook
 - Query pattern recognition and rewriting
 - Batch query optimization
 - Performance monitoring and statistics
@@ -14,7 +15,8 @@ import hashlib
 import json
 import asyncio
 import re
-from typing import Dict, Any, List, Optional, Tuple, Set, Union
+import itertools
+from typing import Dict, Any, List, Optional, Tuple, Set, Union, Iterable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -25,6 +27,29 @@ from .neo4j_connection_manager import Neo4jConnectionManager
 
 logger = logging.getLogger(__name__)
 
+# Every name in a label or type expression: (c:Chunk), (n:A:B), WHERE n:Chunk,
+# (n:A|B), [:MENTIONS]. Over-matching (e.g. map keys) only adds harmless tags.
+_LABEL_PATTERN = re.compile(r'[:|&]\s*!?\s*(?:`([^`]+)`|([A-Za-z_]\w*))')
+
+# String literals, dropped before looking for labels
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+# Labels chosen at run time, so the labels read cannot be known from the text
+_DYNAMIC_LABEL_PATTERN = re.compile(r'\blabels\s*\(|:\s*\$\s*(?:any|all)?\s*\(', re.IGNORECASE)
+
+# Items measured per list/dict level when estimating result size
+_SIZE_SAMPLE = 16
+
+
+def label_tag(label: str) -> str:
+    """Cache tag for results that read nodes with a label"""
+    return f"label:{label}"
+
+
+def textbook_tag(textbook_id: str) -> str:
+    """Cache tag for results scoped to a single textbook"""
+    return f"textbook:{textbook_id}"
+
 
 class CacheStrategy(Enum):
     """Caching strategies"""
@@ -55,6 +80,7 @@ class CacheEntry:
     access_count: int = 1
     size_bytes: int = 0
     ttl_seconds: Optional[int] = None
+    tags: Set[str] = field(default_factory=set)
     
     def is_expired(self) -> bool:
         """Check if entry has expired"""
@@ -334,15 +360,22 @@ class Neo4jQueryCache:
     - Multiple caching strategies
     - TTL support
     - Size-based eviction
+    - Tag-based invalidation
     - Cache warming
     - Statistics tracking
+    
+    Every entry is tagged with the node labels its query reads and, when the
+    query takes a textbook_id/textbook_ids parameter, the textbooks it is
+    scoped to. Writers call invalidate_tags with what they wrote so only the
+    affected entries are dropped.
     """
     
     def __init__(
         self,
         strategy: CacheStrategy = CacheStrategy.ADAPTIVE,
         max_size_mb: int = 100,
-        default_ttl_seconds: int = 3600
+        default_ttl_seconds: int = 3600,
+        adaptive_sample_size: int = 16
     ):
         """
         Initialize query cache.
@@ -351,14 +384,22 @@ class Neo4jQueryCache:
             strategy: Caching strategy to use
             max_size_mb: Maximum cache size in MB
             default_ttl_seconds: Default TTL for entries
+            adaptive_sample_size: Least recently used entries scored per ADAPTIVE eviction
         """
         self.strategy = strategy
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.default_ttl = default_ttl_seconds
+        self.adaptive_sample_size = adaptive_sample_size
         
         self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self.current_size_bytes = 0
-        self.stats: Dict[str, QueryStats] = defaultdict(QueryStats)
+        self.stats: Dict[str, QueryStats] = {}
+        self.tag_invalidations = 0
+        
+        # Eviction bookkeeping, updated on every insert/access/removal
+        self._frequency_buckets: Dict[int, OrderedDict[str, None]] = {}  # LFU: hits -> keys, oldest first
+        self._min_frequency = 0
+        self._tag_index: Dict[str, Set[str]] = defaultdict(set)  # tag -> keys
         
         self._lock = asyncio.Lock()
         
@@ -393,7 +434,7 @@ class Neo4jQueryCache:
                 return None
             
             # Update access info
-            entry.touch()
+            self._record_access(entry)
             
             # Move to end for LRU
             if self.strategy in [CacheStrategy.LRU, CacheStrategy.ADAPTIVE]:
@@ -407,7 +448,8 @@ class Neo4jQueryCache:
         query: str,
         parameters: Dict[str, Any],
         result: Any,
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
     ) -> None:
         """
         Cache query result.
@@ -417,11 +459,18 @@ class Neo4jQueryCache:
             parameters: Query parameters
             result: Query result
             ttl_seconds: Optional TTL override
+            tags: Extra dependency tags beyond those derived from the query
         """
         cache_key = self._generate_cache_key(query, parameters)
         result_size = self._estimate_size(result)
+        entry_tags = self._derive_tags(query, parameters)
+        if tags:
+            entry_tags.update(tags)
         
         async with self._lock:
+            # A replaced entry must not count against the size limit
+            self._evict_entry(cache_key)
+            
             # Check if we need to evict entries
             while self.current_size_bytes + result_size > self.max_size_bytes:
                 if not self._evict_one():
@@ -437,12 +486,14 @@ class Neo4jQueryCache:
                 created_at=datetime.utcnow(),
                 last_accessed=datetime.utcnow(),
                 size_bytes=result_size,
-                ttl_seconds=ttl_seconds or self.default_ttl
+                ttl_seconds=ttl_seconds or self.default_ttl,
+                tags=entry_tags
             )
             
             # Add to cache
             self.cache[cache_key] = entry
             self.current_size_bytes += result_size
+            self._track_insert(entry)
     
     async def invalidate(
         self,
@@ -463,6 +514,9 @@ class Neo4jQueryCache:
                 count = len(self.cache)
                 self.cache.clear()
                 self.current_size_bytes = 0
+                self._frequency_buckets.clear()
+                self._min_frequency = 0
+                self._tag_index.clear()
                 return count
             
             # Invalidate matching entries
@@ -476,6 +530,44 @@ class Neo4jQueryCache:
             
             return len(to_remove)
     
+    async def invalidate_tags(
+        self,
+        tags: Iterable[str],
+        textbook_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Invalidate entries that depend on any of the given tags.
+        
+        Entries whose query has no recognizable node label, or picks labels
+        at run time, are always invalidated.
+        
+        Args:
+            tags: Tags touched by a write, e.g. label_tag("Chunk")
+            textbook_ids: Textbooks the write was limited to; entries scoped
+                to other textbooks are kept, unscoped entries are invalidated
+            
+        Returns:
+            Number of entries invalidated
+        """
+        scope = None
+        if textbook_ids is not None:
+            scope = {textbook_tag(textbook_id) for textbook_id in textbook_ids}
+        
+        async with self._lock:
+            keys = set(self._tag_index.get(label_tag("*"), ()))
+            for tag in tags:
+                keys.update(self._tag_index.get(tag, ()))
+            
+            to_remove = [
+                key for key in keys
+                if scope is None or self._in_scope(self.cache[key].tags, scope)
+            ]
+            for key in to_remove:
+                self._evict_entry(key)
+            
+            self.tag_invalidations += len(to_remove)
+            return len(to_remove)
+    
     async def warm_cache(
         self,
         queries: List[Tuple[str, Dict[str, Any]]],
@@ -527,6 +619,8 @@ class Neo4jQueryCache:
             "total_hits": total_hits,
             "total_misses": total_misses,
             "query_patterns": len(self.stats),
+            "tags": len(self._tag_index),
+            "tag_invalidations": self.tag_invalidations,
             "strategy": self.strategy.value
         }
     
@@ -546,17 +640,58 @@ class Neo4jQueryCache:
         content = f"{normalized_query}:{param_str}"
         return hashlib.sha256(content.encode()).hexdigest()
     
+    def _derive_tags(
+        self,
+        query: str,
+        parameters: Dict[str, Any]
+    ) -> Set[str]:
+        """Dependency tags for a query: node labels read and textbook scope"""
+        code = _STRING_LITERAL_PATTERN.sub("''", query)
+        labels = {quoted or name for quoted, name in _LABEL_PATTERN.findall(code)}
+        if labels and not _DYNAMIC_LABEL_PATTERN.search(code):
+            tags = {label_tag(label) for label in labels}
+        else:
+            tags = {label_tag("*")}
+        
+        textbook_id = parameters.get("textbook_id")
+        if isinstance(textbook_id, str):
+            tags.add(textbook_tag(textbook_id))
+        textbook_ids = parameters.get("textbook_ids")
+        if isinstance(textbook_ids, (list, tuple)):
+            tags.update(textbook_tag(t) for t in textbook_ids if isinstance(t, str))
+        
+        return tags
+    
+    @staticmethod
+    def _in_scope(tags: Set[str], scope: Set[str]) -> bool:
+        """Whether an entry may depend on any textbook in scope"""
+        textbook_tags = {tag for tag in tags if tag.startswith("textbook:")}
+        return not textbook_tags or not textbook_tags.isdisjoint(scope)
+    
     def _estimate_size(self, obj: Any) -> int:
-        """Estimate size of object in bytes"""
+        """
+        Estimate size of object in bytes.
+        
+        Long lists and dicts are extrapolated from their first _SIZE_SAMPLE
+        items, so the cost does not grow with the size of the result.
+        """
         if isinstance(obj, (str, bytes)):
             return len(obj)
         elif isinstance(obj, (list, tuple)):
-            return sum(self._estimate_size(item) for item in obj)
+            if not obj:
+                return 0
+            sample = obj[:_SIZE_SAMPLE]
+            sampled = sum(self._estimate_size(item) for item in sample)
+            return sampled * len(obj) // len(sample)
         elif isinstance(obj, dict):
-            return sum(
+            if not obj:
+                return 0
+            sample = list(itertools.islice(obj.items(), _SIZE_SAMPLE))
+            sampled = sum(
                 self._estimate_size(k) + self._estimate_size(v)
-                for k, v in obj.items()
+                for k, v in sample
             )
+            return sampled * len(obj) // len(sample)
         else:
             # Rough estimate for other types
             return 64
@@ -566,38 +701,72 @@ class Neo4jQueryCache:
         if not self.cache:
             return False
         
-        if self.strategy == CacheStrategy.LRU:
-            # Remove least recently used (first item)
-            key = next(iter(self.cache))
-        elif self.strategy == CacheStrategy.LFU:
-            # Remove least frequently used
-            key = min(
-                self.cache.keys(),
-                key=lambda k: self.cache[k].access_count
-            )
-        elif self.strategy == CacheStrategy.TTL:
-            # Remove oldest
-            key = min(
-                self.cache.keys(),
-                key=lambda k: self.cache[k].created_at
-            )
-        else:  # ADAPTIVE
-            # Combine factors
+        if self.strategy == CacheStrategy.LFU:
+            # Remove least frequently used (oldest key in the lowest bucket)
+            bucket = self._frequency_buckets.get(self._min_frequency)
+            if not bucket:
+                self._min_frequency = min(self._frequency_buckets)
+                bucket = self._frequency_buckets[self._min_frequency]
+            key = next(iter(bucket))
+        elif self.strategy == CacheStrategy.ADAPTIVE:
+            # Combine factors over the least recently used entries
             now = datetime.utcnow()
+            candidates = itertools.islice(self.cache.values(), self.adaptive_sample_size)
             key = min(
-                self.cache.keys(),
-                key=lambda k: self._calculate_eviction_score(self.cache[k], now)
-            )
+                candidates,
+                key=lambda entry: self._calculate_eviction_score(entry, now)
+            ).key
+        else:
+            # LRU: least recently used; TTL: oldest, since entries are never
+            # reordered on access and replaced entries are reinserted
+            key = next(iter(self.cache))
         
         self._evict_entry(key)
         return True
     
     def _evict_entry(self, key: str) -> None:
         """Evict a specific entry"""
-        if key in self.cache:
-            entry = self.cache[key]
-            self.current_size_bytes -= entry.size_bytes
-            del self.cache[key]
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return
+        
+        self.current_size_bytes -= entry.size_bytes
+        
+        bucket = self._frequency_buckets.get(entry.access_count)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._frequency_buckets[entry.access_count]
+        
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+    
+    def _track_insert(self, entry: CacheEntry) -> None:
+        """Register a newly stored entry with the eviction and tag structures"""
+        self._frequency_buckets.setdefault(entry.access_count, OrderedDict())[entry.key] = None
+        if len(self.cache) == 1 or entry.access_count < self._min_frequency:
+            self._min_frequency = entry.access_count
+        
+        for tag in entry.tags:
+            self._tag_index[tag].add(entry.key)
+    
+    def _record_access(self, entry: CacheEntry) -> None:
+        """Touch an entry and move it to the next LFU frequency bucket"""
+        frequency = entry.access_count
+        entry.touch()
+        
+        bucket = self._frequency_buckets.get(frequency)
+        if bucket is not None:
+            bucket.pop(entry.key, None)
+            if not bucket:
+                del self._frequency_buckets[frequency]
+                if self._min_frequency == frequency:
+                    self._min_frequency = entry.access_count
+        self._frequency_buckets.setdefault(entry.access_count, OrderedDict())[entry.key] = None
     
     def _calculate_eviction_score(
         self,
@@ -620,13 +789,19 @@ class Neo4jQueryCache:
     
     def _record_hit(self, query: str) -> None:
         """Record cache hit"""
-        pattern = self._extract_query_pattern(query)
-        self.stats[pattern].record_execution(0.0, cache_hit=True)
+        self._pattern_stats(query).record_execution(0.0, cache_hit=True)
     
     def _record_miss(self, query: str) -> None:
         """Record cache miss"""
+        self._pattern_stats(query).record_execution(0.0, cache_hit=False)
+    
+    def _pattern_stats(self, query: str) -> QueryStats:
+        """Statistics for the pattern of a query, created on first use"""
         pattern = self._extract_query_pattern(query)
-        self.stats[pattern].record_execution(0.0, cache_hit=False)
+        stats = self.stats.get(pattern)
+        if stats is None:
+            stats = self.stats[pattern] = QueryStats(pattern=pattern)
+        return stats
     
     def _extract_query_pattern(self, query: str) -> str:
         """Extract query pattern for statistics"""
@@ -651,7 +826,8 @@ class Neo4jQueryOptimizer:
         connection_manager: Neo4jConnectionManager,
         cache_strategy: CacheStrategy = CacheStrategy.ADAPTIVE,
         cache_size_mb: int = 100,
-        enable_optimization: bool = True
+        enable_optimization: bool = True,
+        cache_ttl_seconds: int = 3600
     ):
         """
         Initialize query optimizer with cache.
@@ -661,12 +837,14 @@ class Neo4jQueryOptimizer:
             cache_strategy: Caching strategy
             cache_size_mb: Maximum cache size
             enable_optimization: Whether to enable query optimization
+            cache_ttl_seconds: Default TTL for cached results
         """
         self.connection = connection_manager
         self.optimizer = QueryOptimizer() if enable_optimization else None
         self.cache = Neo4jQueryCache(
             strategy=cache_strategy,
-            max_size_mb=cache_size_mb
+            max_size_mb=cache_size_mb,
+            default_ttl_seconds=cache_ttl_seconds
         )
         self.enable_optimization = enable_optimization
         
@@ -675,7 +853,8 @@ class Neo4jQueryOptimizer:
         query: str,
         parameters: Optional[Dict[str, Any]] = None,
         use_cache: bool = True,
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[int] = None,
+        cache_tags: Optional[List[str]] = None
     ) -> Tuple[Any, Dict[str, Any]]:
         """
         Execute query with optimization and caching.
@@ -685,6 +864,7 @@ class Neo4jQueryOptimizer:
             parameters: Query parameters
             use_cache: Whether to use cache
             ttl_seconds: Optional TTL for cache
+            cache_tags: Extra dependency tags for the cached result
             
         Returns:
             Query result and execution metadata
@@ -723,7 +903,7 @@ class Neo4jQueryOptimizer:
             
             # Cache result
             if use_cache:
-                await self.cache.put(query, parameters, result, ttl_seconds)
+                await self.cache.put(query, parameters, result, ttl_seconds, cache_tags)
             
             metadata["execution_time"] = time.time() - start_time
             return result, metadata
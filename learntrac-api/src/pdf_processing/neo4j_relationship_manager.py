@@ -9,15 +9,20 @@ Manages complex relationships between educational content including:
 - Concept evolution and versioning
 """
 
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional, Tuple, Set
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
+import uuid
 import networkx as nx
+import numpy as np
 from collections import defaultdict
 
 from .neo4j_connection_manager import Neo4jConnectionManager
+from .chunk_similarity_table import blocked_top_k
+from .neo4j_query_optimizer import Neo4jQueryCache, label_tag
 
 logger = logging.getLogger(__name__)
 
@@ -125,14 +130,20 @@ class Neo4jRelationshipManager:
     - Concept clustering
     """
     
-    def __init__(self, connection_manager: Neo4jConnectionManager):
+    def __init__(
+        self,
+        connection_manager: Neo4jConnectionManager,
+        query_cache: Optional[Neo4jQueryCache] = None
+    ):
         """
         Initialize relationship manager.
         
         Args:
             connection_manager: Neo4j connection manager
+            query_cache: Optional query cache to invalidate after writes
         """
         self.connection = connection_manager
+        self.query_cache = query_cache
         
     async def create_concept_relationship(
         self,
@@ -191,6 +202,7 @@ class Neo4jRelationshipManager:
                     "metadata": metadata or {}
                 }
             )
+            await self._invalidate_cached_reads("Concept")
             
             logger.info(f"Created relationship: {source_concept} -{relationship_type.value}-> {target_concept}")
             return True
@@ -239,6 +251,8 @@ class Neo4jRelationshipManager:
                 }
             )
             
+            await self._invalidate_cached_reads("Chunk", "Concept")
+            
             count = results[0]["count"] if results else 0
             logger.info(f"Created {count} chunk-concept relationships for chunk {chunk_id}")
             return count
@@ -732,72 +746,249 @@ class Neo4jRelationshipManager:
     async def update_similarity_relationships(
         self,
         threshold: float = 0.7,
-        batch_size: int = 100
+        batch_size: int = 1000,
+        k: int = 10,
+        incremental: bool = False,
+        block_size: int = 1024
     ) -> int:
         """
         Update similarity relationships between chunks based on embeddings.
         
+        Builds a kNN graph locally: embeddings are streamed out once with
+        keyset pagination, each chunk's top-k neighbours are found with blocked
+        matrix products, and SIMILAR_TO edges are written back in bulk.
+        
+        A full build replaces every chunk SIMILAR_TO edge, deleting stale
+        edges batch_size at a time. An incremental run only processes chunks
+        not indexed since they were last written: their old edges are
+        replaced, and existing chunks gain edges to them when they rank in the
+        top k among the processed chunks. Existing chunks can then hold more
+        than k edges until the next full build.
+        
+        Similarities use the vector index scale, (1 + cosine) / 2, for both
+        the threshold and the similarity stored on each edge.
+        
         Args:
             threshold: Minimum similarity score
-            batch_size: Batch size for processing
+            batch_size: Chunks per page when streaming embeddings, and stale
+                edges deleted per query
+            k: Neighbours per chunk
+            incremental: Only process chunks added or changed since the last run
+            block_size: Rows/columns per matrix product tile
             
         Returns:
             Number of relationships created/updated
         """
         try:
-            # Get total chunk count
-            count_query = """
-                MATCH (c:Chunk)
-                WHERE c.embedding IS NOT NULL
-                RETURN count(c) as total
-            """
-            
-            count_result = await self.connection.execute_query(count_query)
-            total_chunks = count_result[0]["total"] if count_result else 0
+            chunk_ids, vectors, pending = await self._stream_chunk_embeddings(batch_size)
+            if not chunk_ids:
+                return 0
             
-            if total_chunks == 0:
+            query_rows = np.flatnonzero(pending) if incremental else np.arange(len(chunk_ids))
+            if len(query_rows) == 0:
+                logger.info("No new chunks to add to the similarity graph")
                 return 0
             
-            relationships_created = 0
-            
-            # Process in batches
-            for offset in range(0, total_chunks, batch_size):
-                # Use vector index for similarity search
-                batch_query = """
-                    MATCH (c:Chunk)
-                    WHERE c.embedding IS NOT NULL
-                    SKIP $offset LIMIT $batch_size
-                    CALL db.index.vector.queryNodes('chunkEmbedding', 10, c.embedding)
-                    YIELD node, score
-                    WHERE node.chunk_id <> c.chunk_id
-                    AND score >= $threshold
-                    MERGE (c)-[r:SIMILAR_TO]-(node)
-                    SET r.similarity = score,
-                        r.updated_at = datetime()
-                    RETURN count(r) as count
-                """
-                
-                results = await self.connection.execute_query(
-                    batch_query,
-                    {
-                        "offset": offset,
-                        "batch_size": batch_size,
-                        "threshold": threshold
-                    }
-                )
-                
-                if results:
-                    relationships_created += sum(r["count"] for r in results)
-                
-                logger.info(f"Processed {min(offset + batch_size, total_chunks)}/{total_chunks} chunks")
+            # The matrix products are CPU-bound; keep them off the event loop.
+            # They yield raw cosines, so convert the threshold from index scale
+            edges = await asyncio.to_thread(
+                self._similarity_edges,
+                vectors, query_rows, pending if incremental else None,
+                k, block_size, 2 * threshold - 1
+            )
             
-            logger.info(f"Created/updated {relationships_created} similarity relationships")
+            logger.info(
+                f"Computed {len(edges)} similarity edges for {len(query_rows)}/{len(chunk_ids)} chunks"
+            )
+            
+            build_id = uuid.uuid4().hex
+            processed_ids = [chunk_ids[row] for row in query_rows]
+            
+            if incremental:
+                # Edges of changed chunks are stale
+                await self.connection.execute_batch_write("""
+                    MATCH (c:Chunk {chunk_id: $chunk_id})-[r:SIMILAR_TO]-(:Chunk)
+                    DELETE r
+                """, [{"chunk_id": chunk_id} for chunk_id in processed_ids])
+            
+            write_summary = await self.connection.execute_batch_write("""
+                MATCH (a:Chunk {chunk_id: $source_id})
+                MATCH (b:Chunk {chunk_id: $target_id})
+                MERGE (a)-[r:SIMILAR_TO]-(b)
+                SET r.similarity = $similarity,
+                    r.build_id = $build_id,
+                    r.updated_at = datetime()
+            """, [
+                {
+                    "source_id": chunk_ids[source],
+                    "target_id": chunk_ids[target],
+                    "similarity": (1 + score) / 2,
+                    "build_id": build_id
+                }
+                for (source, target), score in edges.items()
+            ])
+            
+            if not incremental and write_summary["failed"] == 0:
+                # Drop edges that the rebuilt graph no longer contains
+                await self._delete_stale_similarities(build_id, batch_size)
+            
+            await self.connection.execute_batch_write("""
+                MATCH (c:Chunk {chunk_id: $chunk_id})
+                SET c.similarity_indexed_at = datetime()
+            """, [{"chunk_id": chunk_id} for chunk_id in processed_ids])
+            await self._invalidate_cached_reads("Chunk")
+            
+            relationships_created = write_summary["processed"]
+            logger.info(
+                f"Created/updated {relationships_created} similarity relationships "
+                f"({write_summary['rows_per_second']:.0f} rows/s)"
+            )
             return relationships_created
             
         except Exception as e:
             logger.error(f"Failed to update similarity relationships: {e}")
             return 0
     
+    async def _delete_stale_similarities(self, build_id: str, batch_size: int) -> int:
+        """Delete chunk SIMILAR_TO edges from other builds, one bounded transaction at a time"""
+        query = """
+            MATCH (:Chunk)-[r:SIMILAR_TO]->(:Chunk)
+            WHERE r.build_id IS NULL OR r.build_id <> $build_id
+            WITH r LIMIT $batch_size
+            DELETE r
+            RETURN count(r) as deleted
+        """
+        
+        total_deleted = 0
+        while True:
+            results = await self.connection.execute_query(
+                query,
+                {"build_id": build_id, "batch_size": batch_size}
+            )
+            deleted = results[0]["deleted"] if results else 0
+            total_deleted += deleted
+            if deleted < batch_size:
+                break
+        
+        if total_deleted:
+            logger.info(f"Deleted {total_deleted} stale similarity relationships")
+        return total_deleted
+    
+    async def _stream_chunk_embeddings(
+        self,
+        page_size: int
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Read every chunk embedding once, paging by chunk_id.
+        
+        Returns:
+            (chunk_ids, vectors, pending) where pending marks chunks not
+            indexed in the similarity graph since they were last written
+        """
+        query = """
+            MATCH (c:Chunk)
+            WHERE c.embedding IS NOT NULL AND c.chunk_id > $after
+            WITH c ORDER BY c.chunk_id LIMIT $page_size
+            RETURN c.chunk_id as chunk_id,
+                   c.embedding as embedding,
+                   c.similarity_indexed_at IS NULL as pending
+        """
+        
+        chunk_ids: List[str] = []
+        pages: List[np.ndarray] = []
+        pending: List[bool] = []
+        dimensions = None
+        skipped = 0
+        after = ""
+        
+        while True:
+            records = await self.connection.execute_query(
+                query,
+                {"after": after, "page_size": page_size}
+            )
+            if not records:
+                break
+            after = records[-1]["chunk_id"]
+            
+            if dimensions is None:
+                dimensions = len(records[0]["embedding"])
+            page = [r for r in records if len(r["embedding"]) == dimensions]
+            skipped += len(records) - len(page)
+            
+            if page:
+                chunk_ids.extend(r["chunk_id"] for r in page)
+                pages.append(np.asarray([r["embedding"] for r in page], dtype=np.float32))
+                pending.extend(bool(r["pending"]) for r in page)
+            
+            if len(records) < page_size:
+                break
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} chunk embeddings with dimensions other than {dimensions}")
+        
+        vectors = np.vstack(pages) if pages else np.zeros((0, 0), dtype=np.float32)
+        return chunk_ids, vectors, np.asarray(pending, dtype=bool)
+    
+    @classmethod
+    def _similarity_edges(
+        cls,
+        vectors: np.ndarray,
+        query_rows: np.ndarray,
+        pending: Optional[np.ndarray],
+        k: int,
+        block_size: int,
+        threshold: float
+    ) -> Dict[Tuple[int, int], float]:
+        """
+        Top-k similarity edges of the query rows over the whole corpus.
+        
+        When pending is given (incremental runs), the remaining rows also
+        take the query rows as new neighbour candidates.
+        """
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        
+        # Top-k neighbours of the processed chunks over the whole corpus
+        edges: Dict[Tuple[int, int], float] = {}
+        indices, scores = blocked_top_k(
+            vectors[query_rows], vectors, k, block_size, exclude=query_rows
+        )
+        cls._collect_edges(edges, query_rows, indices, scores, threshold)
+        
+        # Existing chunks only take the processed chunks as new candidates
+        if pending is not None:
+            existing_rows = np.flatnonzero(~pending)
+            if len(existing_rows):
+                indices, scores = blocked_top_k(
+                    vectors[existing_rows], vectors[query_rows], k, block_size
+                )
+                valid = indices >= 0
+                indices[valid] = query_rows[indices[valid]]
+                cls._collect_edges(edges, existing_rows, indices, scores, threshold)
+        
+        return edges
+    
+    @staticmethod
+    def _collect_edges(
+        edges: Dict[Tuple[int, int], float],
+        rows: np.ndarray,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        threshold: float
+    ) -> None:
+        """Add top-k rows above the threshold as undirected edges keyed by (low, high) row"""
+        for row, neighbour_indices, neighbour_scores in zip(rows, indices, scores):
+            for index, score in zip(neighbour_indices, neighbour_scores):
+                if index < 0 or score < threshold:
+                    break
+                edges[(int(min(row, index)), int(max(row, index)))] = float(score)
+    
+    async def _invalidate_cached_reads(self, *labels: str) -> None:
+        """Drop cached query results that read the written labels"""
+        if self.query_cache is not None:
+            await self.query_cache.invalidate_tags([label_tag(label) for label in labels])
+    
     def _would_create_cycle(
         self,
         source: str,
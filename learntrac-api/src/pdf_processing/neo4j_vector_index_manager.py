@@ -5,16 +5,20 @@ Manages vector indexes in Neo4j including:
 - Index creation and configuration
 - Index maintenance and optimization
 - Vector similarity search
+- Local ANN fallback when native vector search is unavailable
 - Index statistics and monitoring
 """
 
+import asyncio
 import logging
+import time
 from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
 
 from .neo4j_connection_manager import Neo4jConnectionManager, ConnectionConfig
+from .local_ann_index import LocalANNIndex, ANNIndexConfig
 
 logger = logging.getLogger(__name__)
 
@@ -94,18 +98,41 @@ class Neo4jVectorIndexManager:
     - Perform vector similarity searches
     - Manage multiple indexes
     - Index optimization and maintenance
+    - In-process ANN index for servers without native vector search
     """
     
-    def __init__(self, connection_manager: Neo4jConnectionManager):
+    def __init__(
+        self,
+        connection_manager: Neo4jConnectionManager,
+        local_index_config: Optional[ANNIndexConfig] = None,
+        local_index_page_size: int = 5000,
+        filter_oversampling: int = 5,
+        native_retry_interval: float = 300.0
+    ):
         """
         Initialize vector index manager.
         
         Args:
             connection_manager: Neo4j connection manager instance
+            local_index_config: Configuration for local ANN fallback indexes
+            local_index_page_size: Embeddings fetched per page when building local indexes
+            filter_oversampling: Candidate multiplier for filtered local searches
+            native_retry_interval: Seconds before retrying native search after a failure
         """
         self.connection = connection_manager
         self.index_configs: Dict[str, VectorIndexConfig] = {}
         
+        # Local ANN fallback state
+        self.local_index_config = local_index_config or ANNIndexConfig()
+        self.local_index_page_size = local_index_page_size
+        self.filter_oversampling = filter_oversampling
+        self.local_indexes: Dict[str, LocalANNIndex] = {}
+        self.local_index_sources: Dict[str, Tuple[str, str]] = {}
+        self.native_retry_interval = native_retry_interval
+        self.native_search_available: Dict[str, bool] = {}
+        self._native_search_failed_at: Dict[str, float] = {}
+        self._local_index_locks: Dict[str, asyncio.Lock] = {}
+        
     async def create_index(
         self,
         config: VectorIndexConfig,
@@ -423,143 +450,80 @@ class Neo4jVectorIndexManager:
                 raise ValueError(f"Index {index_name} not found")
             
             # Try native vector search first (Neo4j 5.13+)
-            try:
-                # Build native vector search query
-                query_parts = []
-                
-                if filters:
-                    filter_conditions = []
-                    for prop, value in filters.items():
-                        if isinstance(value, str):
-                            filter_conditions.append(f"node.{prop} = $filter_{prop}")
-                        else:
-                            filter_conditions.append(f"node.{prop} = $filter_{prop}")
+            if self._should_try_native_search(index_name):
+                try:
+                    # Build native vector search query
+                    if filters:
+                        filter_conditions = []
+                        for prop, value in filters.items():
+                            if isinstance(value, str):
+                                filter_conditions.append(f"node.{prop} = $filter_{prop}")
+                            else:
+                                filter_conditions.append(f"node.{prop} = $filter_{prop}")
                     
-                    if filter_conditions:
-                        filter_clause = "WHERE " + " AND ".join(filter_conditions)
+                        if filter_conditions:
+                            filter_clause = "WHERE " + " AND ".join(filter_conditions)
+                        else:
+                            filter_clause = ""
                     else:
                         filter_clause = ""
-                else:
-                    filter_clause = ""
-                
-                # Native vector search query
-                native_query = f"""
-                    CALL db.index.vector.queryNodes('{index_name}', $limit, $query_vector)
-                    YIELD node, score
-                    {filter_clause}
-                    RETURN id(node) as node_id, score, node
-                    ORDER BY score DESC
-                """
-                
-                params = {
-                    "query_vector": query_vector,
-                    "limit": limit
-                }
                 
-                # Add filter parameters
-                if filters:
-                    for prop, value in filters.items():
-                        params[f"filter_{prop}"] = value
+                    # Native vector search query
+                    native_query = f"""
+                        CALL db.index.vector.queryNodes('{index_name}', $limit, $query_vector)
+                        YIELD node, score
+                        {filter_clause}
+                        RETURN id(node) as node_id, score, node
+                        ORDER BY score DESC
+                    """
                 
-                results = await self.connection.execute_query(native_query, params)
-                
-                # Format native results
-                search_results = []
-                for record in results:
-                    score = float(record["score"])
-                    if min_score is None or score >= min_score:
-                        node_props = dict(record["node"])
-                        # Remove embedding from properties to avoid sending large arrays
-                        node_props.pop(index_info.property_name, None)
-                        
-                        search_results.append(VectorSearchResult(
-                            node_id=str(record["node_id"]),
-                            score=score,
-                            node_properties=node_props
-                        ))
-                
-                logger.debug(f"Native vector search returned {len(search_results)} results")
-                return search_results
-                
-            except Exception as native_error:
-                logger.warning(f"Native vector search failed ({native_error}), falling back to manual search")
-                
-                # Fallback to manual similarity search
-                query_parts = [
-                    f"MATCH (node:{index_info.node_label})",
-                    f"WHERE node.{index_info.property_name} IS NOT NULL"
-                ]
-                
-                # Add property filters
-                if filters:
-                    filter_conditions = []
-                    for prop, value in filters.items():
-                        if isinstance(value, str):
-                            filter_conditions.append(f"node.{prop} = '{value}'")
-                        else:
-                            filter_conditions.append(f"node.{prop} = {value}")
-                    
-                    if filter_conditions:
-                        query_parts.append("AND " + " AND ".join(filter_conditions))
-                
-                # Build return clause
-                if return_properties:
-                    return_props = [f"node.{prop} as {prop}" for prop in return_properties]
-                    return_clause = f"RETURN id(node) as node_id, node.{index_info.property_name} as embedding, {', '.join(return_props)}"
-                else:
-                    return_clause = f"RETURN id(node) as node_id, node.{index_info.property_name} as embedding, node"
-                
-                query_parts.append(return_clause)
-                query = "\n".join(query_parts)
+                    params = {
+                        "query_vector": query_vector,
+                        "limit": limit
+                    }
                 
-                # Execute search to get all nodes
-                results = await self.connection.execute_query(query)
+                    # Add filter parameters
+                    if filters:
+                        for prop, value in filters.items():
+                            params[f"filter_{prop}"] = value
                 
-                # Calculate similarities in-memory using pure Python
-                def cosine_similarity(vec1, vec2):
-                    """Calculate cosine similarity between two vectors"""
-                    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-                    norm1 = (sum(a * a for a in vec1)) ** 0.5
-                    norm2 = (sum(b * b for b in vec2)) ** 0.5
-                    
-                    if norm1 > 0 and norm2 > 0:
-                        return dot_product / (norm1 * norm2)
-                    return 0.0
+                    results = await self.connection.execute_query(native_query, params)
                 
-                scored_results = []
-                for record in results:
-                    embedding = record.get("embedding")
-                    if embedding and len(embedding) == len(query_vector):
-                        score = cosine_similarity(query_vector, embedding)
-                        
+                    # Format native results
+                    search_results = []
+                    for record in results:
+                        score = float(record["score"])
                         if min_score is None or score >= min_score:
-                            scored_results.append((float(score), record))
-                
-                # Sort by score and limit
-                scored_results.sort(key=lambda x: x[0], reverse=True)
-                scored_results = scored_results[:limit]
+                            node_props = dict(record["node"])
+                            # Remove embedding from properties to avoid sending large arrays
+                            node_props.pop(index_info.property_name, None)
+                        
+                            search_results.append(VectorSearchResult(
+                                node_id=str(record["node_id"]),
+                                score=score,
+                                node_properties=node_props
+                            ))
                 
-                # Format results
-                search_results = []
-                for score, record in scored_results:
-                    if "node" in record:
-                        # Full node returned
-                        node_props = dict(record["node"])
-                        # Remove embedding from properties to avoid sending large arrays
-                        node_props.pop(index_info.property_name, None)
-                    else:
-                        # Specific properties returned
-                        node_props = {k: v for k, v in record.items() 
-                                     if k not in ["node_id", "embedding"]}
-                    
-                    search_results.append(VectorSearchResult(
-                        node_id=str(record["node_id"]),
-                        score=score,
-                        node_properties=node_props
-                    ))
+                    self.native_search_available[index_name] = True
+                    logger.debug(f"Native vector search returned {len(search_results)} results")
+                    return search_results
                 
-                logger.debug(f"Manual vector search returned {len(search_results)} results")
-                return search_results
+                except Exception as native_error:
+                    logger.warning(f"Native vector search failed ({native_error}), falling back to local ANN index")
+                    self.native_search_available[index_name] = False
+                    self._native_search_failed_at[index_name] = time.time()
+            
+            # Fallback to in-process approximate nearest neighbour search
+            results = await self._local_vector_search(
+                index_name,
+                index_info,
+                [query_vector],
+                limit,
+                min_score,
+                filters,
+                return_properties
+            )
+            return results[0]
             
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
@@ -575,6 +539,9 @@ class Neo4jVectorIndexManager:
         """
         Perform batch vector similarity searches.
         
+        When native vector search is known to be unavailable, all queries are
+        answered by the local ANN index with one node lookup for the batch.
+        
         Args:
             index_name: Name of the vector index
             query_vectors: List of query embedding vectors
@@ -584,10 +551,30 @@ class Neo4jVectorIndexManager:
         Returns:
             List of search results for each query
         """
+        if not query_vectors:
+            return []
+        
+        if not self._should_try_native_search(index_name):
+            try:
+                index_info = await self.get_index_info(index_name)
+                if not index_info:
+                    raise ValueError(f"Index {index_name} not found")
+                
+                return await self._local_vector_search(
+                    index_name,
+                    index_info,
+                    query_vectors,
+                    limit_per_query,
+                    min_score
+                )
+                
+            except Exception as e:
+                logger.error(f"Batch vector search failed: {e}")
+                return [[] for _ in query_vectors]
+        
         results = []
         
         # Process in parallel using async
-        import asyncio
         tasks = [
             self.vector_search(
                 index_name,
@@ -609,6 +596,326 @@ class Neo4jVectorIndexManager:
         
         return results
     
+    async def get_local_index(
+        self,
+        index_name: str,
+        index_info: Optional[VectorIndexInfo] = None
+    ) -> LocalANNIndex:
+        """
+        Get the local ANN index for a vector index, building it on first use.
+        
+        Args:
+            index_name: Name of the vector index
+            index_info: Index information (looked up if not provided)
+            
+        Returns:
+            Local ANN index
+        """
+        local_index = self.local_indexes.get(index_name)
+        if local_index is not None:
+            return local_index
+        
+        lock = self._local_index_locks.setdefault(index_name, asyncio.Lock())
+        async with lock:
+            local_index = self.local_indexes.get(index_name)
+            if local_index is None:
+                local_index = await self.build_local_index(index_name, index_info)
+            return local_index
+    
+    async def build_local_index(
+        self,
+        index_name: str,
+        index_info: Optional[VectorIndexInfo] = None
+    ) -> LocalANNIndex:
+        """
+        Build a local ANN index from the index's node label and property.
+        
+        Embeddings are streamed in pages with keyset pagination on node id,
+        which keeps each result page bounded without OFFSET. Internal ids are
+        not indexed, so every page still scans the label and filters on id.
+        Clustering and recall measurement run in a worker thread so the event
+        loop is not blocked.
+        
+        Args:
+            index_name: Name of the vector index
+            index_info: Index information (looked up if not provided)
+            
+        Returns:
+            Local ANN index
+        """
+        if index_info is None:
+            index_info = await self.get_index_info(index_name)
+            if not index_info:
+                raise ValueError(f"Index {index_name} not found")
+        
+        query = f"""
+            MATCH (n:{index_info.node_label})
+            WHERE n.{index_info.property_name} IS NOT NULL AND id(n) > $last_id
+            RETURN id(n) as node_id, n.{index_info.property_name} as embedding
+            ORDER BY node_id
+            LIMIT $page_size
+        """
+        
+        node_ids: List[str] = []
+        embeddings: List[List[float]] = []
+        dimensions = index_info.dimensions
+        last_id = -1
+        
+        while True:
+            page = await self.connection.execute_query(
+                query,
+                {"last_id": last_id, "page_size": self.local_index_page_size}
+            )
+            if not page:
+                break
+            
+            for record in page:
+                embedding = record["embedding"]
+                if dimensions is None:
+                    dimensions = len(embedding)
+                if len(embedding) == dimensions:
+                    node_ids.append(str(record["node_id"]))
+                    embeddings.append(embedding)
+            
+            last_id = page[-1]["node_id"]
+            if len(page) < self.local_index_page_size:
+                break
+        
+        local_index = LocalANNIndex(dimensions or 0, self.local_index_config)
+        if embeddings:
+            await asyncio.to_thread(local_index.build, node_ids, embeddings)
+            recall = await asyncio.to_thread(local_index.measure_recall)
+            logger.info(
+                f"Local ANN index for {index_name}: {len(local_index)} vectors, "
+                f"recall@{recall['k']}={recall['recall']:.3f}, "
+                f"{recall['approximate_latency_ms']:.2f}ms/query "
+                f"(exact {recall['exact_latency_ms']:.2f}ms/query)"
+            )
+        
+        self.local_indexes[index_name] = local_index
+        self.local_index_sources[index_name] = (index_info.node_label, index_info.property_name)
+        return local_index
+    
+    async def refresh_local_indexes(
+        self,
+        node_label: str,
+        key_property: str,
+        keys: List[Any]
+    ) -> int:
+        """
+        Upsert newly ingested nodes into any local ANN index built for their label.
+        
+        Args:
+            node_label: Label of the ingested nodes
+            key_property: Property identifying the ingested nodes
+            keys: Values of the key property
+            
+        Returns:
+            Number of vectors written across local indexes
+        """
+        written = 0
+        if not keys:
+            return written
+        
+        for index_name, (label, property_name) in list(self.local_index_sources.items()):
+            local_index = self.local_indexes.get(index_name)
+            if label != node_label or local_index is None:
+                continue
+            
+            try:
+                query = f"""
+                    MATCH (n:{label})
+                    WHERE n.{key_property} IN $keys AND n.{property_name} IS NOT NULL
+                    RETURN id(n) as node_id, n.{property_name} as embedding
+                """
+                
+                records = await self.connection.execute_query(query, {"keys": keys})
+                
+                if not local_index.dimensions and records:
+                    # Index was built empty; rebuild with the new dimensions
+                    self.local_indexes.pop(index_name, None)
+                    await self.get_local_index(index_name)
+                    written += len(records)
+                    continue
+                
+                records = [r for r in records if len(r["embedding"]) == local_index.dimensions]
+                # May retrain the quantizer; keep k-means off the event loop
+                written += await asyncio.to_thread(
+                    local_index.add,
+                    [str(r["node_id"]) for r in records],
+                    [r["embedding"] for r in records]
+                )
+                
+            except Exception as e:
+                logger.error(f"Failed to refresh local index {index_name}: {e}")
+                self.invalidate_local_index(index_name)
+        
+        return written
+    
+    def invalidate_local_index(self, index_name: Optional[str] = None) -> None:
+        """
+        Drop local ANN indexes so they are rebuilt on next use.
+        
+        Args:
+            index_name: Index to drop, or all indexes if None
+        """
+        if index_name is None:
+            self.local_indexes.clear()
+            self.local_index_sources.clear()
+        else:
+            self.local_indexes.pop(index_name, None)
+            self.local_index_sources.pop(index_name, None)
+    
+    def get_local_index_stats(self, index_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get recall and latency statistics for local ANN indexes.
+        
+        Args:
+            index_name: Index to report, or all indexes if None
+            
+        Returns:
+            Statistics keyed by index name
+        """
+        names = [index_name] if index_name else list(self.local_indexes)
+        return {
+            name: {
+                **self.local_indexes[name].get_statistics(),
+                "native_search_available": self.native_search_available.get(name)
+            }
+            for name in names
+            if name in self.local_indexes
+        }
+    
+    def _should_try_native_search(self, index_name: str) -> bool:
+        """Check whether native vector search should be attempted for an index"""
+        if self.native_search_available.get(index_name, True):
+            return True
+        
+        failed_at = self._native_search_failed_at.get(index_name, 0.0)
+        return time.time() - failed_at >= self.native_retry_interval
+    
+    async def _local_vector_search(
+        self,
+        index_name: str,
+        index_info: VectorIndexInfo,
+        query_vectors: List[List[float]],
+        limit: int,
+        min_score: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        return_properties: Optional[List[str]] = None
+    ) -> List[List[VectorSearchResult]]:
+        """
+        Search the local ANN index and hydrate matching nodes in one query.
+        
+        Args:
+            index_name: Name of the vector index
+            index_info: Index information
+            query_vectors: Query embedding vectors
+            limit: Maximum results per query
+            min_score: Minimum similarity score
+            filters: Additional node property filters
+            return_properties: Specific properties to return
+            
+        Returns:
+            Search results for each query
+        """
+        local_index = await self.get_local_index(index_name, index_info)
+        
+        # Filters are applied after retrieval, so fetch extra candidates
+        k = limit * self.filter_oversampling if filters else limit
+        neighbours = local_index.search_batch(query_vectors, k)
+        
+        candidate_ids = {
+            node_id
+            for query_neighbours in neighbours
+            for node_id, score in query_neighbours
+            if min_score is None or score >= min_score
+        }
+        if not candidate_ids:
+            return [[] for _ in query_vectors]
+        
+        nodes = await self._fetch_nodes_by_id(
+            index_info,
+            list(candidate_ids),
+            filters,
+            return_properties
+        )
+        
+        all_results = []
+        for query_neighbours in neighbours:
+            search_results = []
+            for node_id, score in query_neighbours:
+                if min_score is not None and score < min_score:
+                    continue
+                if node_id not in nodes:
+                    continue
+                
+                search_results.append(VectorSearchResult(
+                    node_id=node_id,
+                    score=score,
+                    node_properties=dict(nodes[node_id])
+                ))
+                if len(search_results) >= limit:
+                    break
+            
+            all_results.append(search_results)
+        
+        logger.debug(f"Local ANN search answered {len(query_vectors)} queries")
+        return all_results
+    
+    async def _fetch_nodes_by_id(
+        self,
+        index_info: VectorIndexInfo,
+        node_ids: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        return_properties: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch node properties for search candidates.
+        
+        Args:
+            index_info: Index information
+            node_ids: Candidate node ids
+            filters: Additional node property filters
+            return_properties: Specific properties to return
+            
+        Returns:
+            Node properties keyed by node id
+        """
+        conditions = ["id(node) IN $node_ids"]
+        params: Dict[str, Any] = {"node_ids": [int(node_id) for node_id in node_ids]}
+        
+        if filters:
+            for prop, value in filters.items():
+                conditions.append(f"node.{prop} = $filter_{prop}")
+                params[f"filter_{prop}"] = value
+        
+        if return_properties:
+            return_props = [f"node.{prop} as {prop}" for prop in return_properties]
+            return_clause = f"RETURN id(node) as node_id, {', '.join(return_props)}"
+        else:
+            return_clause = "RETURN id(node) as node_id, node"
+        
+        query = f"""
+            MATCH (node:{index_info.node_label})
+            WHERE {' AND '.join(conditions)}
+            {return_clause}
+        """
+        
+        records = await self.connection.execute_query(query, params)
+        
+        nodes = {}
+        for record in records:
+            if "node" in record:
+                node_props = dict(record["node"])
+                # Remove embedding from properties to avoid sending large arrays
+                node_props.pop(index_info.property_name, None)
+            else:
+                node_props = {k: v for k, v in record.items() if k != "node_id"}
+            nodes[str(record["node_id"])] = node_props
+        
+        return nodes
+    
     async def update_index_config(
         self,
         index_name: str,
@@ -7,22 +7,32 @@ Provides advanced vector search capabilities including:
 - Learning path-aware search
 - Search result ranking and re-ranking
 - Query expansion and refinement
+- Result caching for repeated and near-identical queries
 """
 
 import logging
+import json
 from typing import List, Dict, Any, Optional, Tuple, Set, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict, replace
 from enum import Enum
 from datetime import datetime
 import numpy as np
-import asyncio
 
 from .neo4j_connection_manager import Neo4jConnectionManager
 from .neo4j_vector_index_manager import Neo4jVectorIndexManager, VectorSearchResult
 from .chunk_metadata import ChunkMetadata, ContentType
+from .search_result_cache import SearchResultCache
 
 logger = logging.getLogger(__name__)
 
+# Hybrid search weight of each strategy's score
+DEFAULT_STRATEGY_WEIGHTS = {
+    "semantic": 0.4,
+    "contextual": 0.2,
+    "conceptual": 0.3,
+    "learning_path": 0.1
+}
+
 
 class SearchMode(Enum):
     """Different search modes for educational content"""
@@ -123,7 +133,10 @@ class Neo4jVectorSearch:
         self,
         connection_manager: Neo4jConnectionManager,
         index_manager: Neo4jVectorIndexManager,
-        embedding_dimension: int = 768
+        embedding_dimension: int = 768,
+        result_cache: Optional[SearchResultCache] = None,
+        strategy_weights: Optional[Dict[str, float]] = None,
+        candidate_pool_factor: int = 2
     ):
         """
         Initialize vector search engine.
@@ -132,10 +145,18 @@ class Neo4jVectorSearch:
             connection_manager: Neo4j connection manager
             index_manager: Vector index manager
             embedding_dimension: Dimension of embeddings
+            result_cache: Optional cache of complete search results
+            strategy_weights: Hybrid search weights keyed by strategy
+                (semantic, contextual, conceptual, learning_path)
+            candidate_pool_factor: Hybrid search retrieves this many times
+                the requested results as candidates
         """
         self.connection = connection_manager
         self.index_manager = index_manager
         self.embedding_dimension = embedding_dimension
+        self.result_cache = result_cache
+        self.strategy_weights = {**DEFAULT_STRATEGY_WEIGHTS, **(strategy_weights or {})}
+        self.candidate_pool_factor = candidate_pool_factor
         
     async def search(
         self,
@@ -171,6 +192,19 @@ class Neo4jVectorSearch:
                     f"doesn't match expected {self.embedding_dimension}"
                 )
             
+            # Reuse results of an identical or near-identical query
+            cache_scope = None
+            if self.result_cache is not None:
+                cache_scope = self._result_cache_scope(mode, filters, context, limit, expand_query)
+                cached = self.result_cache.get(cache_scope, query_embedding)
+                if cached is not None:
+                    return replace(
+                        cached,
+                        query_embedding=query_embedding,
+                        results=list(cached.results),
+                        search_time=(datetime.utcnow() - start_time).total_seconds()
+                    )
+            
             # Perform search based on mode
             if mode == SearchMode.SEMANTIC:
                 raw_results = await self._semantic_search(
@@ -218,7 +252,7 @@ class Neo4jVectorSearch:
             # Calculate search time
             search_time = (datetime.utcnow() - start_time).total_seconds()
             
-            return SearchResults(
+            search_results = SearchResults(
                 query="",  # Would be set by caller
                 query_embedding=query_embedding,
                 mode=mode,
@@ -231,6 +265,16 @@ class Neo4jVectorSearch:
                 related_concepts=related_concepts
             )
             
+            if cache_scope is not None:
+                self.result_cache.put(
+                    cache_scope,
+                    query_embedding,
+                    replace(search_results, results=list(final_results)),
+                    filters.textbook_ids
+                )
+            
+            return search_results
+            
         except Exception as e:
             logger.error(f"Search failed: {e}")
             raise
@@ -480,63 +524,171 @@ class Neo4jVectorSearch:
         context: Optional[SearchContext],
         limit: int
     ) -> List[VectorSearchResult]:
-        """Combine multiple search strategies"""
-        # Run searches in parallel
-        search_tasks = [
-            self._semantic_search(query_embedding, filters, limit),
-            self._contextual_search(query_embedding, filters, context, limit),
-            self._conceptual_search(query_embedding, filters, context, limit)
-        ]
+        """
+        Combine multiple search strategies over one candidate pool.
         
-        if context and context.learning_history:
-            search_tasks.append(
-                self._learning_path_search(query_embedding, filters, context, limit)
-            )
+        A single vector retrieval fetches an oversized candidate pool, and a
+        single query fetches the graph features every strategy needs (plus the
+        metadata used by _enhance_results). Strategy scores are then computed
+        locally, so chunks outside the pool are never considered.
+        """
+        pool = await self._semantic_search(
+            query_embedding, filters, limit * self.candidate_pool_factor
+        )
+        if not pool:
+            return []
         
-        all_results = await asyncio.gather(*search_tasks)
+        chunk_ids = [r.node_properties.get("chunk_id", r.node_id) for r in pool]
+        history = context.learning_history[-10:] if context and context.learning_history else []
         
-        # Merge results with weighted scoring
-        merged_results = {}
-        weights = [0.4, 0.2, 0.3, 0.1]  # Weights for each search type
+        features_query = """
+            OPTIONAL MATCH (current:Chunk {chunk_id: $current_id})
+            OPTIONAL MATCH (current)-[:BELONGS_TO_SECTION]->(current_section:Section)
+            OPTIONAL MATCH (current)-[:BELONGS_TO_CHAPTER]->(current_chapter:Chapter)
+            WITH current_section.section_id as current_section_id,
+                 current_chapter.chapter_id as current_chapter_id
+            UNWIND $chunk_ids as chunk_id
+            MATCH (c:Chunk {chunk_id: chunk_id})
+            OPTIONAL MATCH (c)-[:BELONGS_TO_TEXTBOOK]->(t:Textbook)
+            OPTIONAL MATCH (c)-[:BELONGS_TO_CHAPTER]->(ch:Chapter)
+            OPTIONAL MATCH (c)-[:BELONGS_TO_SECTION]->(s:Section)
+            OPTIONAL MATCH (c)-[:MENTIONS_CONCEPT]->(concept:Concept)
+            OPTIONAL MATCH (c)-[:REQUIRES_CONCEPT]->(prereq:Concept)
+            WITH current_section_id, current_chapter_id, c, t, ch, s,
+                 collect(distinct concept.name) as concepts,
+                 collect(distinct prereq.name) as prerequisites
+            OPTIONAL MATCH (learned:Chunk)-[:NEXT*1..3]->(c)
+            WHERE learned.chunk_id IN $history
+            RETURN c.chunk_id as chunk_id,
+                   c.text as text,
+                   c.content_type as content_type,
+                   c.difficulty_score as difficulty,
+                   c.concepts as chunk_concepts,
+                   c.start_position as start_position,
+                   c.end_position as end_position,
+                   c.confidence_score as confidence_score,
+                   t.title as textbook_title,
+                   ch.title as chapter_title,
+                   s.title as section_title,
+                   concepts,
+                   prerequisites,
+                   coalesce(s.section_id, c.parent_section_id) = current_section_id as same_section,
+                   coalesce(ch.chapter_id, c.parent_chapter_id) = current_chapter_id as same_chapter,
+                   count(distinct learned) as precedent_count
+        """
         
-        for i, results in enumerate(all_results):
-            weight = weights[i] if i < len(weights) else 0.1
-            
-            for result in results:
-                if result.node_id in merged_results:
-                    # Average the scores with weights
-                    existing = merged_results[result.node_id]
-                    total_weight = existing["weight"] + weight
-                    new_score = (
-                        existing["score"] * existing["weight"] + 
-                        result.score * weight
-                    ) / total_weight
-                    
-                    merged_results[result.node_id] = {
-                        "result": result,
-                        "score": new_score,
-                        "weight": total_weight
-                    }
-                else:
-                    merged_results[result.node_id] = {
-                        "result": result,
-                        "score": result.score,
-                        "weight": weight
-                    }
-        
-        # Extract and sort final results
-        final_results = []
-        for node_id, data in merged_results.items():
-            result = data["result"]
-            final_results.append(VectorSearchResult(
-                node_id=result.node_id,
-                score=data["score"],
-                node_properties=result.node_properties,
-                metadata=result.metadata
+        records = await self.connection.execute_query(
+            features_query,
+            {
+                "chunk_ids": chunk_ids,
+                "current_id": context.current_chunk_id if context else None,
+                "history": history
+            }
+        )
+        features = {record["chunk_id"]: record for record in records}
+        
+        scores = self._score_candidate_pool(pool, chunk_ids, features, filters, context, limit)
+        
+        order = np.argsort(-scores, kind="stable")
+        results = []
+        for i in order[:limit]:
+            if np.isnan(scores[i]):
+                break
+            results.append(VectorSearchResult(
+                node_id=chunk_ids[i],
+                score=float(scores[i]),
+                node_properties=pool[i].node_properties,
+                metadata={**(pool[i].metadata or {}), "enhancement": features.get(chunk_ids[i], {})}
+            ))
+        return results
+    
+    def _score_candidate_pool(
+        self,
+        pool: List[VectorSearchResult],
+        chunk_ids: List[str],
+        features: Dict[str, Dict[str, Any]],
+        filters: SearchFilters,
+        context: Optional[SearchContext],
+        limit: int
+    ) -> np.ndarray:
+        """
+        Weighted hybrid score of every candidate (NaN if no strategy selects it).
+        
+        Candidates are ordered by semantic score. Each strategy selects and
+        scores candidates the way the standalone strategy would:
+        semantic and contextual keep the top limit, conceptual and learning
+        path keep the top limit // 2 plus up to limit // 2 graph-related
+        candidates.
+        """
+        n = len(pool)
+        semantic = np.array([r.score for r in pool], dtype=np.float64)
+        rank = np.empty(n, dtype=np.int64)
+        rank[np.argsort(-semantic, kind="stable")] = np.arange(n)
+        top = rank < limit
+        base = rank < limit // 2
+        
+        def feature(name: str, default: Any) -> List[Any]:
+            return [features.get(chunk_id, {}).get(name) or default for chunk_id in chunk_ids]
+        
+        excluded = np.array([
+            chunk_id in (filters.exclude_chunk_ids or ()) for chunk_id in chunk_ids
+        ], dtype=bool)
+        
+        def select_related(strength: np.ndarray) -> np.ndarray:
+            """Up to limit // 2 related candidates outside base, strongest first"""
+            eligible = np.flatnonzero((strength > 0) & ~base & ~excluded)
+            eligible = eligible[np.lexsort((rank[eligible], -strength[eligible]))]
+            selected = np.zeros(n, dtype=bool)
+            selected[eligible[:limit // 2]] = True
+            return selected
+        
+        strategies = [("semantic", semantic, top)]
+        
+        # Contextual: boost candidates from the current section/chapter
+        boost = np.ones(n)
+        if context and context.current_chunk_id:
+            same_chapter = np.array(feature("same_chapter", False), dtype=bool)
+            same_section = np.array(feature("same_section", False), dtype=bool)
+            boost = np.where(same_section, 1.3, np.where(same_chapter, 1.15, 1.0))
+        strategies.append(("contextual", np.minimum(1.0, semantic * boost), top))
+        
+        # Conceptual: candidates sharing >= 2 concepts with the top limit // 2 results
+        seed_concepts = set()
+        for i in np.flatnonzero(base):
+            seed_concepts.update(pool[i].node_properties.get("concepts") or [])
+        concept_matches = np.array([
+            len(seed_concepts.intersection(concepts)) for concepts in feature("concepts", [])
+        ], dtype=np.float64)
+        related = select_related(np.where(concept_matches >= 2, concept_matches, 0))
+        strategies.append((
+            "conceptual",
+            np.where(related, np.minimum(1.0, semantic * (1 + 0.1 * concept_matches)), semantic),
+            base | related
+        ))
+        
+        # Learning path: candidates following recently learned chunks
+        if context and context.learning_history:
+            learned = np.array([
+                chunk_id in context.learning_history for chunk_id in chunk_ids
+            ], dtype=bool)
+            precedents = np.array(feature("precedent_count", 0), dtype=np.float64)
+            related = select_related(np.where(learned, 0, precedents))
+            strategies.append((
+                "learning_path",
+                np.where(related, np.minimum(1.0, semantic * 1.2), semantic),
+                base | related
             ))
         
-        final_results.sort(key=lambda x: x.score, reverse=True)
-        return final_results[:limit]
+        # Weighted average over the strategies that selected each candidate
+        weighted = np.zeros(n)
+        total_weight = np.zeros(n)
+        for name, strategy_scores, selected in strategies:
+            weight = self.strategy_weights.get(name, 0.0) * selected
+            weighted += weight * strategy_scores
+            total_weight += weight
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total_weight > 0, weighted / total_weight, np.nan)
     
     async def _enhance_results(
         self,
@@ -548,6 +700,15 @@ class Neo4jVectorSearch:
         if not raw_results:
             return []
         
+        # Hybrid search prefetches enhancements with its candidate features
+        prefetched = [(r.metadata or {}).get("enhancement") for r in raw_results]
+        if all(e is not None for e in prefetched):
+            return self._build_search_results(
+                raw_results,
+                {r.node_id: e for r, e in zip(raw_results, prefetched)},
+                context
+            )
+        
         # Batch fetch additional data
         chunk_ids = [r.node_id for r in raw_results]
         
@@ -582,6 +743,15 @@ class Neo4jVectorSearch:
         # Create enhancement lookup
         enhancement_map = {e["chunk_id"]: e for e in enhancements}
         
+        return self._build_search_results(raw_results, enhancement_map, context)
+    
+    def _build_search_results(
+        self,
+        raw_results: List[VectorSearchResult],
+        enhancement_map: Dict[str, Dict[str, Any]],
+        context: Optional[SearchContext]
+    ) -> List[SearchResult]:
+        """Combine raw results with their educational metadata"""
         # Build enhanced results
         enhanced_results = []
         for raw_result in raw_results:
@@ -666,6 +836,34 @@ class Neo4jVectorSearch:
         results.sort(key=lambda x: x.score, reverse=True)
         return results
     
+    def _result_cache_scope(
+        self,
+        mode: SearchMode,
+        filters: SearchFilters,
+        context: Optional[SearchContext],
+        limit: int,
+        expand_query: bool
+    ) -> str:
+        """Everything besides the query embedding that determines search results"""
+        def encode(value: Any) -> Any:
+            if isinstance(value, Enum):
+                return value.value
+            if isinstance(value, (set, frozenset)):
+                return sorted(value)
+            return str(value)
+        
+        return json.dumps(
+            {
+                "mode": mode.value,
+                "limit": limit,
+                "expand_query": expand_query,
+                "filters": asdict(filters),
+                "context": asdict(context) if context else None
+            },
+            sort_keys=True,
+            default=encode
+        )
+    
     def _build_property_filters(
         self,
         filters: SearchFilters
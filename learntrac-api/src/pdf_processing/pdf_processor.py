@@ -6,9 +6,12 @@ and pdfplumber and pypdf as fallback options for robust text extraction.
 """
 
 import logging
+import multiprocessing
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
+from dataclasses import dataclass, field
 from enum import Enum
 
 # Primary PDF library
@@ -52,12 +55,63 @@ class ExtractionResult:
 
 @dataclass
 class PageMetadata:
-    """Metadata for individual PDF pages"""
+    """Metadata for individual PDF pages (None when the value was not analysed)"""
     page_number: int
     text_length: int
-    extraction_confidence: float
-    has_images: bool
-    has_tables: bool
+    extraction_confidence: Optional[float]
+    has_images: Optional[bool]
+    has_tables: Optional[bool]
+
+
+@dataclass
+class PageAnalysisOptions:
+    """Per-page analysis performed during extraction; everything is opt-in"""
+    confidence: bool = False
+    images: bool = False
+    tables: bool = False  # find_tables() is often the slowest step of extraction
+
+
+@dataclass
+class PageContent:
+    """Text and metadata for a single extracted page"""
+    page_number: int
+    text: str
+    metadata: PageMetadata
+
+
+@dataclass
+class PageRange:
+    """A contiguous run of extracted pages"""
+    start_page: int  # 1-based, inclusive
+    end_page: int    # 1-based, inclusive
+    pages: List[PageContent] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(page.text for page in self.pages)
+
+
+class PageRangeTimeoutError(RuntimeError):
+    """A worker process did not finish extracting a page range in time"""
+
+
+# Document and processor owned by the current shard worker process
+_shard_document: Any = None
+_shard_processor: Optional['PDFProcessor'] = None
+_shard_analysis: Optional[PageAnalysisOptions] = None
+
+
+def _open_shard_document(pdf_path: str, max_file_size_mb: int, analysis: PageAnalysisOptions) -> None:
+    """Open the document once when a shard worker process starts"""
+    global _shard_document, _shard_processor, _shard_analysis
+    _shard_processor = PDFProcessor(max_file_size_mb=max_file_size_mb)
+    _shard_analysis = analysis
+    _shard_document = fitz.open(pdf_path)
+
+
+def _read_shard(start: int, stop: int) -> List[PageContent]:
+    """Extract pages [start, stop) from the worker's open document"""
+    return list(_shard_processor._iter_fitz_document(_shard_document, start, stop, _shard_analysis))
 
 
 class PDFProcessor:
@@ -71,16 +125,22 @@ class PDFProcessor:
     - Comprehensive error handling and logging
     - Page-level metadata extraction
     - Confidence scoring for extraction quality
+    - Streaming page and page-range extraction, optionally sharded across processes
     """
     
-    def __init__(self, max_file_size_mb: int = 100):
+    def __init__(self,
+                 max_file_size_mb: int = 100,
+                 page_analysis: Optional[PageAnalysisOptions] = None):
         """
         Initialize PDFProcessor with configuration options.
         
         Args:
             max_file_size_mb: Maximum allowed PDF file size in megabytes
+            page_analysis: Per-page analysis for extract_text. Defaults to
+                confidence and image detection; table detection is opt-in.
         """
         self.max_file_size_mb = max_file_size_mb
+        self.page_analysis = page_analysis or PageAnalysisOptions(confidence=True, images=True)
         self.logger = logging.getLogger(__name__)
         
         # Log available libraries
@@ -165,6 +225,206 @@ class PDFProcessor:
         if not pdf_file.suffix.lower() == '.pdf':
             raise ValueError(f"File is not a PDF: {pdf_file}")
     
+    def iter_pages(self,
+                   pdf_path: str,
+                   first_page: int = 1,
+                   last_page: Optional[int] = None,
+                   analysis: Optional[PageAnalysisOptions] = None) -> Iterator[PageContent]:
+        """
+        Lazily extract pages in order, one at a time.
+        
+        Uses the first available library; there is no fallback on empty text
+        because pages have already been handed to the caller.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            first_page: First page to extract (1-based)
+            last_page: Last page to extract (1-based, inclusive), None for the end
+            analysis: Per-page analysis to perform, none by default
+            
+        Yields:
+            PageContent for each page
+        """
+        pdf_file = Path(pdf_path)
+        self._validate_pdf_file(pdf_file)
+        
+        analysis = analysis or PageAnalysisOptions()
+        start = max(0, first_page - 1)
+        stop = last_page
+        
+        method = self.streaming_method
+        if method == ExtractionMethod.FITZ:
+            iterator = self._iter_fitz_pages(pdf_file, start, stop, analysis)
+        elif method == ExtractionMethod.PDFPLUMBER:
+            iterator = self._iter_pdfplumber_pages(pdf_file, start, stop, analysis)
+        else:
+            iterator = self._iter_pypdf_pages(pdf_file, start, stop, analysis)
+        
+        yield from iterator
+    
+    @property
+    def streaming_method(self) -> ExtractionMethod:
+        """Library used by iter_pages and iter_page_ranges: the first one available"""
+        if HAS_FITZ:
+            return ExtractionMethod.FITZ
+        if HAS_PDFPLUMBER:
+            return ExtractionMethod.PDFPLUMBER
+        return ExtractionMethod.PYPDF
+    
+    def extract_text_streaming(self,
+                               pdf_path: str,
+                               on_text: Callable[[str], None],
+                               pages_per_range: int = 25,
+                               max_workers: int = 1,
+                               range_timeout: Optional[float] = 300.0) -> ExtractionResult:
+        """
+        Extract text range by range, handing each range to on_text as it arrives.
+        
+        The pieces passed to on_text add up to the returned text, which is what
+        extract_text returns with the same library. There is no fallback to
+        other libraries; callers can use extract_text when the text is empty.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            on_text: Called with the text of each page range, in order
+            pages_per_range: Number of pages in each range
+            max_workers: Number of worker processes, 1 to extract in this process
+            range_timeout: Seconds to wait for a worker to extract one range
+            
+        Returns:
+            ExtractionResult for the whole document
+            
+        Raises:
+            PageRangeTimeoutError: If a worker takes longer than range_timeout
+        """
+        pages: List[PageContent] = []
+        for page_range in self.iter_page_ranges(
+            pdf_path, pages_per_range, max_workers, self.page_analysis, range_timeout
+        ):
+            text = page_range.text
+            on_text('\n' + text if pages else text)
+            pages.extend(page_range.pages)
+        
+        return self._build_result(pages, self.streaming_method, {})
+    
+    def iter_page_ranges(self,
+                         pdf_path: str,
+                         pages_per_range: int = 25,
+                         max_workers: int = 1,
+                         analysis: Optional[PageAnalysisOptions] = None,
+                         range_timeout: Optional[float] = 300.0) -> Iterator[PageRange]:
+        """
+        Lazily extract the document as consecutive page ranges, in order.
+        
+        With max_workers > 1 (and PyMuPDF available) the ranges are extracted
+        by worker processes that each open the document once. At most two
+        ranges per worker are in flight, so memory stays bounded when the
+        consumer is slower than extraction.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            pages_per_range: Number of pages in each range
+            max_workers: Number of worker processes, 1 to extract in this process
+            analysis: Per-page analysis to perform, none by default
+            range_timeout: Seconds to wait for a worker to extract one range,
+                None to wait indefinitely
+            
+        Yields:
+            PageRange for each run of pages
+            
+        Raises:
+            PageRangeTimeoutError: If a worker takes longer than range_timeout
+        """
+        pages_per_range = max(1, pages_per_range)
+        analysis = analysis or PageAnalysisOptions()
+        
+        if max_workers > 1 and HAS_FITZ:
+            yield from self._iter_page_ranges_parallel(
+                pdf_path, pages_per_range, max_workers, analysis, range_timeout
+            )
+            return
+        
+        pages = self.iter_pages(pdf_path, analysis=analysis)
+        while True:
+            batch = list(islice(pages, pages_per_range))
+            if not batch:
+                return
+            yield PageRange(start_page=batch[0].page_number, end_page=batch[-1].page_number, pages=batch)
+    
+    def _iter_page_ranges_parallel(self,
+                                   pdf_path: str,
+                                   pages_per_range: int,
+                                   max_workers: int,
+                                   analysis: PageAnalysisOptions,
+                                   range_timeout: Optional[float]) -> Iterator[PageRange]:
+        """Extract page ranges on worker processes, yielding them in order"""
+        pdf_file = Path(pdf_path)
+        self._validate_pdf_file(pdf_file)
+        
+        # Opening in the parent validates the file before any worker starts
+        doc = fitz.open(str(pdf_file))
+        try:
+            page_count = doc.page_count
+        finally:
+            doc.close()
+        
+        ranges = iter([(start, min(start + pages_per_range, page_count))
+                       for start in range(0, page_count, pages_per_range)])
+        workers = min(max_workers, -(-page_count // pages_per_range))
+        if workers <= 1:
+            yield from self.iter_page_ranges(pdf_path, pages_per_range, 1, analysis)
+            return
+        
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(
+            processes=workers,
+            initializer=_open_shard_document,
+            initargs=(str(pdf_file), self.max_file_size_mb, analysis)
+        )
+        try:
+            in_flight = deque()
+            for start, stop in islice(ranges, workers * 2):
+                in_flight.append((start, stop, pool.apply_async(_read_shard, (start, stop))))
+            
+            while in_flight:
+                start, stop, pending = in_flight.popleft()
+                try:
+                    pages = pending.get(timeout=range_timeout)
+                except multiprocessing.TimeoutError:
+                    # The finally clause terminates the stuck worker
+                    raise PageRangeTimeoutError(
+                        f"Extracting pages {start + 1}-{stop} of {pdf_file.name} "
+                        f"took longer than {range_timeout}s"
+                    ) from None
+                
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    in_flight.append((*next_range, pool.apply_async(_read_shard, next_range)))
+                
+                yield PageRange(start_page=start + 1, end_page=stop, pages=pages)
+        finally:
+            pool.terminate()
+            pool.join()
+    
+    def _build_result(self,
+                      pages: List[PageContent],
+                      method: ExtractionMethod,
+                      doc_metadata: Dict[str, Any]) -> ExtractionResult:
+        """Assemble an ExtractionResult from extracted pages"""
+        page_metadata = [page.metadata for page in pages]
+        doc_metadata['pages'] = page_metadata
+        
+        confidences = [m.extraction_confidence for m in page_metadata if m.extraction_confidence is not None]
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        
+        return ExtractionResult(
+            text='\n'.join(page.text for page in pages),
+            page_count=len(pages),
+            method_used=method,
+            confidence_score=avg_confidence,
+            metadata=doc_metadata
+        )
+    
     def _extract_with_fitz(self, pdf_file: Path) -> ExtractionResult:
         """Extract text using PyMuPDF (fitz) - primary method"""
         if not HAS_FITZ:
@@ -173,46 +433,52 @@ class PDFProcessor:
         doc = fitz.open(str(pdf_file))
         
         try:
-            text_parts = []
-            page_metadata = []
-            total_confidence = 0.0
-            
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                page_text = page.get_text()
-                
-                # Calculate confidence based on text quality indicators
-                confidence = self._calculate_fitz_confidence(page, page_text)
-                total_confidence += confidence
-                
-                # Collect page metadata
-                page_meta = PageMetadata(
-                    page_number=page_num + 1,
-                    text_length=len(page_text),
-                    extraction_confidence=confidence,
-                    has_images=len(page.get_images()) > 0,
-                    has_tables=len(page.find_tables()) > 0
-                )
-                page_metadata.append(page_meta)
-                
-                text_parts.append(page_text)
-            
-            # Extract document metadata
-            doc_metadata = self._extract_fitz_metadata(doc)
-            doc_metadata['pages'] = page_metadata
-            
-            avg_confidence = total_confidence / doc.page_count if doc.page_count > 0 else 0.0
+            pages = list(self._iter_fitz_document(doc, 0, None, self.page_analysis))
+            return self._build_result(pages, ExtractionMethod.FITZ, self._extract_fitz_metadata(doc))
+        finally:
+            doc.close()
+    
+    def _iter_fitz_pages(self,
+                         pdf_file: Path,
+                         start: int,
+                         stop: Optional[int],
+                         analysis: PageAnalysisOptions) -> Iterator[PageContent]:
+        """Open a document with PyMuPDF and yield pages [start, stop)"""
+        doc = fitz.open(str(pdf_file))
+        try:
+            yield from self._iter_fitz_document(doc, start, stop, analysis)
+        finally:
+            doc.close()
+    
+    def _iter_fitz_document(self,
+                            doc,
+                            start: int,
+                            stop: Optional[int],
+                            analysis: PageAnalysisOptions) -> Iterator[PageContent]:
+        """Yield pages [start, stop) from an open PyMuPDF document"""
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        
+        for page_num in range(start, stop):
+            page = doc[page_num]
+            page_text = page.get_text()
             
-            return ExtractionResult(
-                text='\n'.join(text_parts),
-                page_count=doc.page_count,
-                method_used=ExtractionMethod.FITZ,
-                confidence_score=avg_confidence,
-                metadata=doc_metadata
+            page_meta = PageMetadata(
+                page_number=page_num + 1,
+                text_length=len(page_text),
+                extraction_confidence=(
+                    self._calculate_fitz_confidence(page, page_text) if analysis.confidence else None
+                ),
+                has_images=len(page.get_images()) > 0 if analysis.images else None,
+                has_tables=self._fitz_page_has_tables(page) if analysis.tables else None
             )
             
-        finally:
-            doc.close()
+            yield PageContent(page_number=page_num + 1, text=page_text, metadata=page_meta)
+    
+    def _fitz_page_has_tables(self, page) -> bool:
+        """Check whether a PyMuPDF page contains tables"""
+        tables = page.find_tables()
+        # Newer PyMuPDF returns a TableFinder holding the tables
+        return len(getattr(tables, 'tables', tables)) > 0
     
     def _extract_with_pdfplumber(self, pdf_file: Path) -> ExtractionResult:
         """Extract text using pdfplumber - good for complex layouts"""
@@ -220,42 +486,46 @@ class PDFProcessor:
             raise ImportError("pdfplumber not available")
         
         with pdfplumber.open(str(pdf_file)) as pdf:
-            text_parts = []
-            page_metadata = []
-            total_confidence = 0.0
-            
-            for page_num, page in enumerate(pdf.pages):
-                page_text = page.extract_text() or ""
-                
-                # Calculate confidence based on extraction quality
-                confidence = self._calculate_pdfplumber_confidence(page, page_text)
-                total_confidence += confidence
-                
-                # Collect page metadata
-                page_meta = PageMetadata(
-                    page_number=page_num + 1,
-                    text_length=len(page_text),
-                    extraction_confidence=confidence,
-                    has_images=len(page.images) > 0,
-                    has_tables=len(page.extract_tables()) > 0
-                )
-                page_metadata.append(page_meta)
-                
-                text_parts.append(page_text)
+            pages = list(self._iter_pdfplumber_document(pdf, 0, None, self.page_analysis))
+            return self._build_result(pages, ExtractionMethod.PDFPLUMBER, self._extract_pdfplumber_metadata(pdf))
+    
+    def _iter_pdfplumber_pages(self,
+                               pdf_file: Path,
+                               start: int,
+                               stop: Optional[int],
+                               analysis: PageAnalysisOptions) -> Iterator[PageContent]:
+        """Open a document with pdfplumber and yield pages [start, stop)"""
+        with pdfplumber.open(str(pdf_file)) as pdf:
+            yield from self._iter_pdfplumber_document(pdf, start, stop, analysis)
+    
+    def _iter_pdfplumber_document(self,
+                                  pdf,
+                                  start: int,
+                                  stop: Optional[int],
+                                  analysis: PageAnalysisOptions) -> Iterator[PageContent]:
+        """Yield pages [start, stop) from an open pdfplumber document"""
+        stop = len(pdf.pages) if stop is None else min(stop, len(pdf.pages))
+        
+        for page_num in range(start, stop):
+            page = pdf.pages[page_num]
+            page_text = page.extract_text() or ""
             
-            # Extract document metadata
-            doc_metadata = self._extract_pdfplumber_metadata(pdf)
-            doc_metadata['pages'] = page_metadata
+            has_tables = len(page.extract_tables()) > 0 if analysis.tables else None
+            page_meta = PageMetadata(
+                page_number=page_num + 1,
+                text_length=len(page_text),
+                extraction_confidence=(
+                    self._calculate_pdfplumber_confidence(page, page_text, has_tables)
+                    if analysis.confidence else None
+                ),
+                has_images=len(page.images) > 0 if analysis.images else None,
+                has_tables=has_tables
+            )
             
-            avg_confidence = total_confidence / len(pdf.pages) if pdf.pages else 0.0
+            # pdfplumber caches parsed layout objects on the page
+            page.flush_cache()
             
-            return ExtractionResult(
-                text='\n'.join(text_parts),
-                page_count=len(pdf.pages),
-                method_used=ExtractionMethod.PDFPLUMBER,
-                confidence_score=avg_confidence,
-                metadata=doc_metadata
-            )
+            yield PageContent(page_number=page_num + 1, text=page_text, metadata=page_meta)
     
     def _extract_with_pypdf(self, pdf_file: Path) -> ExtractionResult:
         """Extract text using pypdf - final fallback method"""
@@ -264,40 +534,41 @@ class PDFProcessor:
         
         with open(pdf_file, 'rb') as file:
             reader = pypdf.PdfReader(file)
+            pages = list(self._iter_pypdf_document(reader, 0, None, self.page_analysis))
+            return self._build_result(pages, ExtractionMethod.PYPDF, self._extract_pypdf_metadata(reader))
+    
+    def _iter_pypdf_pages(self,
+                          pdf_file: Path,
+                          start: int,
+                          stop: Optional[int],
+                          analysis: PageAnalysisOptions) -> Iterator[PageContent]:
+        """Open a document with pypdf and yield pages [start, stop)"""
+        with open(pdf_file, 'rb') as file:
+            yield from self._iter_pypdf_document(pypdf.PdfReader(file), start, stop, analysis)
+    
+    def _iter_pypdf_document(self,
+                             reader,
+                             start: int,
+                             stop: Optional[int],
+                             analysis: PageAnalysisOptions) -> Iterator[PageContent]:
+        """Yield pages [start, stop) from an open pypdf reader"""
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        
+        for page_num in range(start, stop):
+            page_text = reader.pages[page_num].extract_text()
             
-            text_parts = []
-            page_metadata = []
-            
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                
-                # pypdf has limited confidence calculation options
-                confidence = 0.7 if page_text.strip() else 0.1
-                
-                page_meta = PageMetadata(
-                    page_number=page_num + 1,
-                    text_length=len(page_text),
-                    extraction_confidence=confidence,
-                    has_images=False,  # pypdf doesn't easily provide image info
-                    has_tables=False   # pypdf doesn't easily provide table info
-                )
-                page_metadata.append(page_meta)
-                
-                text_parts.append(page_text)
-            
-            # Extract basic metadata
-            doc_metadata = self._extract_pypdf_metadata(reader)
-            doc_metadata['pages'] = page_metadata
-            
-            avg_confidence = sum(p.extraction_confidence for p in page_metadata) / len(page_metadata) if page_metadata else 0.0
+            # pypdf has limited confidence calculation options
+            confidence = 0.7 if page_text.strip() else 0.1
             
-            return ExtractionResult(
-                text='\n'.join(text_parts),
-                page_count=len(reader.pages),
-                method_used=ExtractionMethod.PYPDF,
-                confidence_score=avg_confidence,
-                metadata=doc_metadata
+            page_meta = PageMetadata(
+                page_number=page_num + 1,
+                text_length=len(page_text),
+                extraction_confidence=confidence if analysis.confidence else None,
+                has_images=False if analysis.images else None,  # pypdf doesn't easily provide image info
+                has_tables=False if analysis.tables else None   # pypdf doesn't easily provide table info
             )
+            
+            yield PageContent(page_number=page_num + 1, text=page_text, metadata=page_meta)
     
     def _calculate_fitz_confidence(self, page, text: str) -> float:
         """Calculate extraction confidence for PyMuPDF results"""
@@ -320,7 +591,7 @@ class PDFProcessor:
         
         return max(0.0, min(1.0, confidence))
     
-    def _calculate_pdfplumber_confidence(self, page, text: str) -> float:
+    def _calculate_pdfplumber_confidence(self, page, text: str, has_tables: Optional[bool] = None) -> float:
         """Calculate extraction confidence for pdfplumber results"""
         if not text.strip():
             return 0.0
@@ -328,7 +599,9 @@ class PDFProcessor:
         confidence = 0.7  # Base confidence for pdfplumber
         
         # pdfplumber is good with tables and structured content
-        if page.extract_tables():
+        if has_tables is None:
+            has_tables = bool(page.extract_tables())
+        if has_tables:
             confidence += 0.1
         
         # Adjust based on text quality
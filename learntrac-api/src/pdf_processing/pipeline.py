@@ -12,10 +12,11 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
-from .pdf_processor import PDFProcessor, ExtractionResult
+from .pdf_processor import PDFProcessor, ExtractionResult, PageRangeTimeoutError
 from .text_cleaner import TextCleaner, CleaningResult
 from .structure_detector import StructureDetector, DetectionResult, StructureElement
 from .content_filter import ContentFilter, FilteringResult
+from .worker_pool import WorkerPool, WorkerPoolConfig, ExecutionMode
 
 
 class ProcessingStage(Enum):
@@ -126,6 +127,8 @@ class PDFProcessingPipeline:
     - Validation and error handling
     - Performance monitoring
     - Detailed reporting and recommendations
+    - Thread or process-pool execution for multi-document batches
+    - Page ranges cleaned while the rest of the PDF is still being extracted
     """
     
     def __init__(self,
@@ -133,7 +136,13 @@ class PDFProcessingPipeline:
                  min_retention_ratio: float = 0.5,
                  quality_threshold: float = 0.7,
                  preserve_mathematical: bool = True,
-                 aggressive_filtering: bool = False):
+                 aggressive_filtering: bool = False,
+                 execution_mode: ExecutionMode = ExecutionMode.THREAD,
+                 max_workers: int = 4,
+                 document_timeout: Optional[float] = None,
+                 fused_cleaning: bool = False,
+                 pages_per_range: int = 25,
+                 extraction_workers: int = 1):
         """
         Initialize PDF processing pipeline.
         
@@ -143,22 +152,42 @@ class PDFProcessingPipeline:
             quality_threshold: Minimum quality score for acceptance
             preserve_mathematical: Preserve mathematical expressions
             aggressive_filtering: Use aggressive content filtering
+            execution_mode: Default execution mode for batch processing
+            max_workers: Number of threads or worker processes for batches
+            document_timeout: Per-document time limit in seconds for batches
+            fused_cleaning: Clean text in bounded windows (same result as
+                cleaning the whole text in one pass)
+            pages_per_range: Pages extracted and cleaned together in process_pdf
+            extraction_workers: Worker processes extracting page ranges in
+                process_pdf, 1 to extract in the calling process
         """
         self.min_chapters = min_chapters
         self.min_retention_ratio = min_retention_ratio
         self.quality_threshold = quality_threshold
         self.preserve_mathematical = preserve_mathematical
         self.aggressive_filtering = aggressive_filtering
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers
+        self.document_timeout = document_timeout
+        self.fused_cleaning = fused_cleaning
+        self.pages_per_range = pages_per_range
+        self.extraction_workers = extraction_workers
         
         self.logger = logging.getLogger(__name__)
         
+        # Worker pools are created on first batch use and kept for reuse
+        self._worker_pools: Dict[Tuple[ExecutionMode, int], WorkerPool] = {}
+        
         # Initialize components
         self._initialize_components()
     
     def _initialize_components(self) -> None:
         """Initialize all processing components"""
         self.pdf_processor = PDFProcessor()
-        self.text_cleaner = TextCleaner(preserve_mathematical=self.preserve_mathematical)
+        self.text_cleaner = TextCleaner(
+            preserve_mathematical=self.preserve_mathematical,
+            fused=self.fused_cleaning
+        )
         self.structure_detector = StructureDetector(
             min_chapters=self.min_chapters,
             confidence_threshold=0.3
@@ -191,35 +220,13 @@ class PDFProcessingPipeline:
         self.logger.info(f"Starting PDF processing pipeline for: {pdf_path}")
         
         # Initialize metadata
-        metadata = ProcessingMetadata(
-            file_path=str(file_path),
-            file_size_bytes=file_path.stat().st_size,
-            processing_start_time=start_time,
-            processing_end_time=None,
-            total_processing_time=None,
-            stage_timings={},
-            pdf_processor_method="",
-            text_cleaner_settings={},
-            structure_detector_settings={},
-            content_filter_settings={},
-            original_text_length=0,
-            cleaned_text_length=0,
-            filtered_text_length=0,
-            chapters_detected=0,
-            sections_detected=0
-        )
-        
-        warnings = []
-        errors = []
-        recommendations = []
+        metadata = self._create_metadata(str(file_path), file_path.stat().st_size, start_time)
         
         try:
-            # Stage 1: PDF Text Extraction
-            stage_start = time.time()
+            # Stage 1: PDF Text Extraction, cleaning each page range as it arrives
             self.logger.info("Stage 1: PDF text extraction")
             
-            extraction_result = self.pdf_processor.extract_text(pdf_path)
-            metadata.stage_timings[ProcessingStage.PDF_EXTRACTION] = time.time() - stage_start
+            extraction_result, cleaning_result = self._extract_and_clean(pdf_path, metadata)
             metadata.pdf_processor_method = extraction_result.method_used.value
             metadata.original_text_length = len(extraction_result.text)
             
@@ -231,98 +238,312 @@ class PDFProcessingPipeline:
                     metadata
                 )
             
-            # Stage 2: Text Cleaning
-            stage_start = time.time()
-            self.logger.info("Stage 2: Text cleaning and normalization")
-            
-            cleaning_result = self.text_cleaner.clean_text(extraction_result.text)
-            metadata.stage_timings[ProcessingStage.TEXT_CLEANING] = time.time() - stage_start
-            metadata.cleaned_text_length = len(cleaning_result.cleaned_text)
-            
-            warnings.extend(cleaning_result.warnings)
-            
-            # Stage 3: Structure Detection
-            stage_start = time.time()
-            self.logger.info("Stage 3: Document structure detection")
-            
-            detection_result = self.structure_detector.detect_structure(cleaning_result.cleaned_text)
-            metadata.stage_timings[ProcessingStage.STRUCTURE_DETECTION] = time.time() - stage_start
-            metadata.chapters_detected = detection_result.hierarchy.total_chapters
-            metadata.sections_detected = detection_result.hierarchy.total_sections
-            
-            warnings.extend(detection_result.warnings)
-            
-            # Stage 4: Content Filtering
-            stage_start = time.time()
-            self.logger.info("Stage 4: Content filtering")
-            
-            filtering_result = self.content_filter.filter_content(
-                cleaning_result.cleaned_text,
-                detection_result.hierarchy.elements
-            )
-            metadata.stage_timings[ProcessingStage.CONTENT_FILTERING] = time.time() - stage_start
-            metadata.filtered_text_length = len(filtering_result.filtered_text)
-            
-            warnings.extend(filtering_result.warnings)
+            return self._run_processing_stages(extraction_result, metadata, start_time, cleaning_result)
             
-            # Stage 5: Quality Assessment
-            stage_start = time.time()
-            self.logger.info("Stage 5: Quality assessment")
-            
-            quality_metrics = self._calculate_quality_metrics(
-                extraction_result,
-                cleaning_result,
-                detection_result,
-                filtering_result
-            )
-            metadata.stage_timings[ProcessingStage.QUALITY_ASSESSMENT] = time.time() - stage_start
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                quality_metrics,
-                detection_result,
-                filtering_result
+        except Exception as e:
+            error_msg = f"Pipeline failed: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return self._create_error_result(pdf_path, error_msg, start_time, metadata)
+    
+    def _extract_and_clean(self,
+                           pdf_path: str,
+                           metadata: ProcessingMetadata) -> Tuple[ExtractionResult, Optional[CleaningResult]]:
+        """
+        Extract page ranges and feed each one to a cleaning stream as it arrives.
+        
+        The streamed cleaning result is the same as cleaning the whole text.
+        If streaming fails or finds no text, the PDF is extracted again with
+        the library fallbacks of extract_text and no cleaning result is
+        returned, leaving cleaning to the next stage.
+        """
+        stage_start = time.time()
+        stream = self.text_cleaner.stream()
+        cleaning_time = 0.0
+        
+        def clean_range(text: str) -> None:
+            nonlocal cleaning_time
+            clean_start = time.time()
+            stream.feed(text)
+            cleaning_time += time.time() - clean_start
+        
+        try:
+            extraction_result = self.pdf_processor.extract_text_streaming(
+                pdf_path, clean_range, self.pages_per_range, self.extraction_workers
             )
+        except PageRangeTimeoutError:
+            raise
+        except Exception as e:
+            self.logger.warning(f"Streaming extraction failed, retrying with fallbacks: {str(e)}")
+            extraction_result = None
+        
+        if extraction_result is None or not extraction_result.text.strip():
+            extraction_result = self.pdf_processor.extract_text(pdf_path)
+            metadata.stage_timings[ProcessingStage.PDF_EXTRACTION] = time.time() - stage_start
+            return extraction_result, None
+        
+        clean_start = time.time()
+        cleaning_result = stream.result()
+        cleaning_time += time.time() - clean_start
+        
+        metadata.stage_timings[ProcessingStage.PDF_EXTRACTION] = time.time() - stage_start - cleaning_time
+        metadata.stage_timings[ProcessingStage.TEXT_CLEANING] = cleaning_time
+        return extraction_result, cleaning_result
+    
+    def process_text(self, text: str, source_name: str = "<text>") -> ProcessingResult:
+        """
+        Process already extracted text through the cleaning, detection,
+        filtering and quality stages.
+        
+        Args:
+            text: Extracted document text
+            source_name: Name recorded as the file path in the result metadata
             
-            # Determine final status
-            status = self._determine_processing_status(quality_metrics, warnings, errors)
-            
-            # Finalize metadata
-            end_time = time.time()
-            metadata.processing_end_time = end_time
-            metadata.total_processing_time = end_time - start_time
+        Returns:
+            ProcessingResult with processed content and quality metrics
+        """
+        start_time = time.time()
+        
+        if not text.strip():
+            return self._create_error_result(source_name, "No text provided", start_time)
+        
+        metadata = self._create_metadata(source_name, len(text.encode('utf-8')), start_time)
+        metadata.pdf_processor_method = "text"
+        metadata.original_text_length = len(text)
+        
+        extraction_result = ExtractionResult(
+            text=text,
+            page_count=0,
+            method_used=None,
+            confidence_score=1.0,
+            metadata={}
+        )
+        
+        try:
+            return self._run_processing_stages(extraction_result, metadata, start_time)
+        except Exception as e:
+            error_msg = f"Pipeline failed: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            return self._create_error_result(source_name, error_msg, start_time, metadata)
+    
+    def process_pdf_batch(self,
+                          pdf_paths: List[str],
+                          execution_mode: Optional[ExecutionMode] = None,
+                          max_workers: Optional[int] = None,
+                          document_timeout: Optional[float] = None) -> List[ProcessingResult]:
+        """
+        Process several PDF files in parallel.
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+            execution_mode: Override the default execution mode
+            max_workers: Override the default number of workers
+            document_timeout: Override the default per-document time limit
             
-            # Generate processing summary
-            summary = self._generate_processing_summary(
-                status,
-                quality_metrics,
-                metadata,
-                warnings,
-                recommendations
-            )
+        Returns:
+            One ProcessingResult per path, in input order
+        """
+        return self._run_batch(
+            'process_pdf', [(path,) for path in pdf_paths], pdf_paths,
+            execution_mode, max_workers, document_timeout
+        )
+    
+    def process_text_batch(self,
+                           texts: List[str],
+                           source_names: Optional[List[str]] = None,
+                           execution_mode: Optional[ExecutionMode] = None,
+                           max_workers: Optional[int] = None,
+                           document_timeout: Optional[float] = None) -> List[ProcessingResult]:
+        """
+        Process several extracted texts in parallel.
+        
+        Args:
+            texts: Extracted document texts
+            source_names: Names recorded in the result metadata
+            execution_mode: Override the default execution mode
+            max_workers: Override the default number of workers
+            document_timeout: Override the default per-document time limit
             
-            self.logger.info(f"PDF processing completed in {metadata.total_processing_time:.2f}s with status: {status.value}")
+        Returns:
+            One ProcessingResult per text, in input order
+        """
+        source_names = source_names or [f"<text {i}>" for i in range(len(texts))]
+        return self._run_batch(
+            'process_text', list(zip(texts, source_names)), source_names,
+            execution_mode, max_workers, document_timeout
+        )
+    
+    def _run_batch(self,
+                   method_name: str,
+                   task_args: List[Tuple[Any, ...]],
+                   source_names: List[str],
+                   execution_mode: Optional[ExecutionMode],
+                   max_workers: Optional[int],
+                   document_timeout: Optional[float]) -> List[ProcessingResult]:
+        """Run a pipeline method over a batch on the selected worker pool"""
+        start_time = time.time()
+        execution_mode = execution_mode or self.execution_mode
+        max_workers = max_workers or self.max_workers
+        document_timeout = document_timeout if document_timeout is not None else self.document_timeout
+        
+        self.logger.info(f"Processing batch of {len(task_args)} documents "
+                        f"with {max_workers} {execution_mode.value} workers")
+        
+        pool = self.get_worker_pool(execution_mode, max_workers)
+        outcomes = pool.run(method_name, task_args, task_timeout=document_timeout)
+        
+        results = []
+        for source_name, outcome in zip(source_names, outcomes):
+            if outcome.succeeded:
+                results.append(outcome.result)
+            else:
+                self.logger.error(f"Batch processing failed for {source_name}: {outcome.error}")
+                results.append(self._create_error_result(source_name, outcome.error, start_time))
+        
+        self.logger.info(f"Batch processing completed in {time.time() - start_time:.2f}s")
+        return results
+    
+    def get_worker_pool(self, execution_mode: ExecutionMode, max_workers: int) -> WorkerPool:
+        """Get the long-lived worker pool for an execution mode, creating it if needed"""
+        key = (execution_mode, max_workers)
+        pool = self._worker_pools.get(key)
+        
+        if pool is None:
+            if execution_mode == ExecutionMode.PROCESS:
+                # Each worker process builds its own pipeline with these settings
+                factory, factory_kwargs = PDFProcessingPipeline, self._component_settings()
+            else:
+                factory, factory_kwargs = (lambda: self), {}
             
-            return ProcessingResult(
-                status=status,
-                final_text=filtering_result.filtered_text,
-                structure_elements=detection_result.hierarchy.elements,
-                quality_metrics=quality_metrics,
-                metadata=metadata,
-                extraction_result=extraction_result,
-                cleaning_result=cleaning_result,
-                detection_result=detection_result,
-                filtering_result=filtering_result,
-                warnings=warnings,
-                errors=errors,
-                recommendations=recommendations,
-                processing_summary=summary
-            )
+            pool = WorkerPool(factory, factory_kwargs, WorkerPoolConfig(
+                mode=execution_mode,
+                max_workers=max_workers
+            ))
+            self._worker_pools[key] = pool
+        
+        return pool
+    
+    def close(self) -> None:
+        """Shut down any worker pools started for batch processing"""
+        for pool in self._worker_pools.values():
+            pool.close()
+        self._worker_pools.clear()
+    
+    def _component_settings(self) -> Dict[str, Any]:
+        """Settings needed to build an equivalent pipeline in a worker process"""
+        return {
+            'min_chapters': self.min_chapters,
+            'min_retention_ratio': self.min_retention_ratio,
+            'quality_threshold': self.quality_threshold,
+            'preserve_mathematical': self.preserve_mathematical,
+            'aggressive_filtering': self.aggressive_filtering,
+            'fused_cleaning': self.fused_cleaning,
+            'pages_per_range': self.pages_per_range,
+            'extraction_workers': self.extraction_workers
+        }
+    
+    def _run_processing_stages(self,
+                               extraction_result: ExtractionResult,
+                               metadata: ProcessingMetadata,
+                               start_time: float,
+                               cleaning_result: Optional[CleaningResult] = None) -> ProcessingResult:
+        """
+        Run cleaning, structure detection, filtering and quality assessment.
+        
+        Cleaning is skipped when a cleaning result streamed during extraction
+        is passed in.
+        """
+        warnings = []
+        errors = []
+        recommendations = []
+        
+        # Stage 2: Text Cleaning
+        if cleaning_result is None:
+            stage_start = time.time()
+            self.logger.info("Stage 2: Text cleaning and normalization")
             
-        except Exception as e:
-            error_msg = f"Pipeline failed: {str(e)}"
-            self.logger.error(error_msg, exc_info=True)
-            return self._create_error_result(pdf_path, error_msg, start_time, metadata)
+            cleaning_result = self.text_cleaner.clean_text(extraction_result.text)
+            metadata.stage_timings[ProcessingStage.TEXT_CLEANING] = time.time() - stage_start
+        metadata.cleaned_text_length = len(cleaning_result.cleaned_text)
+        
+        warnings.extend(cleaning_result.warnings)
+        
+        # Stage 3: Structure Detection
+        stage_start = time.time()
+        self.logger.info("Stage 3: Document structure detection")
+        
+        detection_result = self.structure_detector.detect_structure(cleaning_result.cleaned_text)
+        metadata.stage_timings[ProcessingStage.STRUCTURE_DETECTION] = time.time() - stage_start
+        metadata.chapters_detected = detection_result.hierarchy.total_chapters
+        metadata.sections_detected = detection_result.hierarchy.total_sections
+        
+        warnings.extend(detection_result.warnings)
+        
+        # Stage 4: Content Filtering
+        stage_start = time.time()
+        self.logger.info("Stage 4: Content filtering")
+        
+        filtering_result = self.content_filter.filter_content(
+            cleaning_result.cleaned_text,
+            detection_result.hierarchy.elements
+        )
+        metadata.stage_timings[ProcessingStage.CONTENT_FILTERING] = time.time() - stage_start
+        metadata.filtered_text_length = len(filtering_result.filtered_text)
+        
+        warnings.extend(filtering_result.warnings)
+        
+        # Stage 5: Quality Assessment
+        stage_start = time.time()
+        self.logger.info("Stage 5: Quality assessment")
+        
+        quality_metrics = self._calculate_quality_metrics(
+            extraction_result,
+            cleaning_result,
+            detection_result,
+            filtering_result
+        )
+        metadata.stage_timings[ProcessingStage.QUALITY_ASSESSMENT] = time.time() - stage_start
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(
+            quality_metrics,
+            detection_result,
+            filtering_result
+        )
+        
+        # Determine final status
+        status = self._determine_processing_status(quality_metrics, warnings, errors)
+        
+        # Finalize metadata
+        end_time = time.time()
+        metadata.processing_end_time = end_time
+        metadata.total_processing_time = end_time - start_time
+        
+        # Generate processing summary
+        summary = self._generate_processing_summary(
+            status,
+            quality_metrics,
+            metadata,
+            warnings,
+            recommendations
+        )
+        
+        self.logger.info(f"PDF processing completed in {metadata.total_processing_time:.2f}s with status: {status.value}")
+        
+        return ProcessingResult(
+            status=status,
+            final_text=filtering_result.filtered_text,
+            structure_elements=detection_result.hierarchy.elements,
+            quality_metrics=quality_metrics,
+            metadata=metadata,
+            extraction_result=extraction_result,
+            cleaning_result=cleaning_result,
+            detection_result=detection_result,
+            filtering_result=filtering_result,
+            warnings=warnings,
+            errors=errors,
+            recommendations=recommendations,
+            processing_summary=summary
+        )
     
     def _calculate_quality_metrics(self,
                                  extraction_result: ExtractionResult,
@@ -532,7 +753,7 @@ class PDFProcessingPipeline:
                 "",
                 f"Warnings ({len(warnings)}):",
                 *[f"  • {warning}" for warning in warnings[:3]],
-                *["  • ..." if len(warnings) > 3 else []]
+                *(["  • ..."] if len(warnings) > 3 else [])
             ])
         
         if recommendations:
@@ -545,6 +766,26 @@ class PDFProcessingPipeline:
         
         return "\n".join(summary_parts)
     
+    def _create_metadata(self, file_path: str, file_size_bytes: int, start_time: float) -> ProcessingMetadata:
+        """Create empty processing metadata for a new document"""
+        return ProcessingMetadata(
+            file_path=file_path,
+            file_size_bytes=file_size_bytes,
+            processing_start_time=start_time,
+            processing_end_time=None,
+            total_processing_time=None,
+            stage_timings={},
+            pdf_processor_method="",
+            text_cleaner_settings={},
+            structure_detector_settings={},
+            content_filter_settings={},
+            original_text_length=0,
+            cleaned_text_length=0,
+            filtered_text_length=0,
+            chapters_detected=0,
+            sections_detected=0
+        )
+    
     def _create_error_result(self,
                            pdf_path: str,
                            error_message: str,
@@ -0,0 +1,276 @@
+"""
+Search Result Cache - Reuse vector search results for repeated queries
+
+Caches complete search results in front of the vector search engine:
+- Keys combine a search scope (mode, filters, context) with a quantized
+  query embedding, so equivalent queries hit the same entry
+- Optional near-duplicate lookup reuses results of a cached query whose
+  embedding is within a cosine similarity threshold
+- Bounded LRU with TTL expiry
+- Invalidation by textbook when content is re-ingested
+- Hit-rate statistics
+"""
+
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Sequence, Set, FrozenSet
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedSearch:
+    """A cached result with the embedding it was computed for"""
+    scope: str
+    vector: np.ndarray
+    value: Any
+    textbook_ids: Optional[FrozenSet[str]]
+    expires_at: float
+
+
+class SearchResultCache:
+    """
+    LRU/TTL cache of search results keyed by scope and query embedding.
+
+    The scope is an opaque string describing everything besides the query
+    embedding that affects the result. Embeddings are normalized and
+    quantized to quantization_levels steps per unit before hashing.
+
+    Entries record the textbooks their search was filtered to. Entries
+    without a textbook filter may contain chunks of any textbook and are
+    invalidated whenever any textbook changes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 900,
+        quantization_levels: int = 127,
+        similarity_threshold: Optional[float] = None
+    ):
+        """
+        Initialize search result cache.
+
+        Args:
+            max_entries: Maximum cached searches
+            ttl_seconds: Lifetime of a cached search
+            quantization_levels: Quantization steps per unit of a normalized
+                embedding component; fewer steps merge more queries
+            similarity_threshold: Minimum cosine similarity for reusing a
+                cached query's results (None disables near-duplicate lookup)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.quantization_levels = quantization_levels
+        self.similarity_threshold = similarity_threshold
+
+        self.entries: OrderedDict[str, _CachedSearch] = OrderedDict()
+
+        self._scope_keys: Dict[str, Dict[str, None]] = {}
+        self._scope_matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._textbook_keys: Dict[str, Set[str]] = {}
+        self._unscoped_keys: Set[str] = set()
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, scope: str, embedding: Sequence[float]) -> Optional[Any]:
+        """
+        Look up cached results for a query.
+
+        Args:
+            scope: Search scope (mode, filters, context)
+            embedding: Query embedding
+
+        Returns:
+            Cached value or None
+        """
+        vector = self._normalize(embedding)
+        key = self._make_key(scope, vector)
+
+        entry = self._get_live(key)
+        if entry is not None:
+            self.hits += 1
+            return entry.value
+
+        if self.similarity_threshold is not None:
+            key = self._find_near_duplicate(scope, vector)
+            entry = self._get_live(key) if key is not None else None
+            if entry is not None:
+                self.near_hits += 1
+                return entry.value
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        scope: str,
+        embedding: Sequence[float],
+        value: Any,
+        textbook_ids: Optional[Sequence[str]] = None
+    ) -> None:
+        """
+        Cache results for a query.
+
+        Args:
+            scope: Search scope (mode, filters, context)
+            embedding: Query embedding
+            value: Results to cache
+            textbook_ids: Textbooks the search was filtered to (None if unfiltered)
+        """
+        vector = self._normalize(embedding)
+        key = self._make_key(scope, vector)
+        self._remove(key)
+
+        while len(self.entries) >= self.max_entries:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+        textbooks = frozenset(textbook_ids) if textbook_ids else None
+        self.entries[key] = _CachedSearch(
+            scope=scope,
+            vector=vector,
+            value=value,
+            textbook_ids=textbooks,
+            expires_at=time.time() + self.ttl_seconds
+        )
+
+        self._scope_keys.setdefault(scope, {})[key] = None
+        self._scope_matrices.pop(scope, None)
+        if textbooks is None:
+            self._unscoped_keys.add(key)
+        else:
+            for textbook_id in textbooks:
+                self._textbook_keys.setdefault(textbook_id, set()).add(key)
+
+    def invalidate_textbook(self, textbook_id: str) -> int:
+        """
+        Drop cached searches that may include a textbook's content.
+
+        Args:
+            textbook_id: Textbook that was ingested, re-ingested or deleted
+
+        Returns:
+            Number of entries removed
+        """
+        keys = self._textbook_keys.get(textbook_id, set()) | self._unscoped_keys
+        for key in keys:
+            self._remove(key)
+
+        self.invalidations += len(keys)
+        if keys:
+            logger.debug(f"Invalidated {len(keys)} cached searches for textbook {textbook_id}")
+        return len(keys)
+
+    async def on_textbook_ingested(
+        self,
+        textbook_id: str,
+        chunk_ids: Optional[List[str]] = None,
+        removed_chunk_ids: Optional[List[str]] = None
+    ) -> None:
+        """Ingestion listener: invalidate searches affected by a textbook"""
+        self.invalidate_textbook(textbook_id)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self.entries.clear()
+        self._scope_keys.clear()
+        self._scope_matrices.clear()
+        self._textbook_keys.clear()
+        self._unscoped_keys.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Cache size and hit-rate statistics"""
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "near_duplicate_lookup": self.similarity_threshold is not None
+        }
+
+    def _get_live(self, key: str) -> Optional[_CachedSearch]:
+        """Unexpired entry for a key, marked as recently used"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.time():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _find_near_duplicate(self, scope: str, vector: np.ndarray) -> Optional[str]:
+        """Key of the most similar cached query in the scope, if above the threshold"""
+        keys = self._scope_keys.get(scope)
+        if not keys:
+            return None
+
+        cached = self._scope_matrices.get(scope)
+        if cached is None:
+            key_list = list(keys)
+            matrix = np.vstack([self.entries[key].vector for key in key_list])
+            cached = self._scope_matrices[scope] = (key_list, matrix)
+
+        key_list, matrix = cached
+        if matrix.shape[1] != len(vector):
+            return None
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        return key_list[best]
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its index records"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+
+        scope_keys = self._scope_keys.get(entry.scope)
+        if scope_keys is not None:
+            scope_keys.pop(key, None)
+            if not scope_keys:
+                del self._scope_keys[entry.scope]
+        self._scope_matrices.pop(entry.scope, None)
+
+        if entry.textbook_ids is None:
+            self._unscoped_keys.discard(key)
+        else:
+            for textbook_id in entry.textbook_ids:
+                keys = self._textbook_keys.get(textbook_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._textbook_keys[textbook_id]
+
+    def _make_key(self, scope: str, vector: np.ndarray) -> str:
+        """Hash of the scope and the quantized embedding"""
+        quantized = np.round(vector * self.quantization_levels).astype(np.int16)
+        digest = hashlib.sha256(scope.encode())
+        digest.update(quantized.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """Unit-length float32 copy of an embedding"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
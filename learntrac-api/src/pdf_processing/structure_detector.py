@@ -171,6 +171,93 @@ class StructureDetector:
                 re.MULTILINE
             )
         }
+        
+        # All of the above combined into one pattern that is run over the full text
+        self.line_pattern, self._line_alternatives = self._compile_line_pattern()
+    
+    def _compile_line_pattern(self) -> Tuple['re.Pattern', Dict[str, Tuple[StructureType, str]]]:
+        """
+        Combine the chapter, section and heading patterns into one alternation.
+        
+        Alternatives are tried in the same order as the per-line detectors, so
+        the first alternative that matches is the element those detectors
+        would have returned. Each pattern is rewritten to match a stripped line
+        in place: whitespace never crosses a newline and '$' means the end of
+        the line's non-whitespace content.
+        """
+        alternatives = []
+        names = {}
+        
+        pattern_groups = [
+            (StructureType.CHAPTER, self.chapter_patterns),
+            (StructureType.SECTION, self.section_patterns),
+            (StructureType.HEADING, self.heading_patterns)
+        ]
+        for kind, patterns in pattern_groups:
+            for pattern_name, pattern in patterns.items():
+                group_name = f"{kind.value}__{pattern_name}"
+                source = self._rewrite_line_pattern(pattern.pattern, group_name)
+                if pattern.flags & re.IGNORECASE:
+                    source = f"(?i:{source})"
+                alternatives.append(f"(?P<{group_name}>{source})")
+                names[group_name] = (kind, pattern_name)
+        
+        # Skip the line's leading whitespace, then try every alternative
+        combined = r'^[^\S\n]*(?=\S)(?:' + '|'.join(alternatives) + ')'
+        return re.compile(combined, re.MULTILINE), names
+    
+    @staticmethod
+    def _rewrite_line_pattern(source: str, group_name: str) -> str:
+        """Rewrite a pattern written for a single stripped line so it matches in place in the full text"""
+        parts = []
+        group_count = 0
+        in_class = False
+        class_start = 0
+        class_has_space = False
+        class_index = 0
+        i = 0
+        
+        while i < len(source):
+            char = source[i]
+            if char == '\\':
+                escape = source[i:i + 2]
+                if escape == '\\s' and in_class:
+                    class_has_space = True
+                    parts.append(escape)
+                elif escape == '\\s':
+                    parts.append(r'[^\S\n]')
+                else:
+                    parts.append(escape)
+                i += 2
+                continue
+            
+            if in_class:
+                parts.append(char)
+                if char == ']' and i > class_start + 1:
+                    in_class = False
+                    if class_has_space:
+                        # Exclude the newline from a class containing \s
+                        class_source = ''.join(parts[class_index:])
+                        del parts[class_index:]
+                        parts.append(f'(?:(?!\n){class_source})')
+            elif char == '[':
+                in_class = True
+                class_start = i + (1 if source[i + 1:i + 2] == '^' else 0)
+                class_has_space = False
+                class_index = len(parts)
+                parts.append(char)
+            elif char == '(' and source[i + 1:i + 2] != '?':
+                group_count += 1
+                parts.append(f'(?P<{group_name}_{group_count}>')
+            elif char == '^' and i == 0:
+                pass  # The combined pattern anchors at the stripped line start
+            elif char == '$':
+                parts.append(r'(?<=\S)(?=[^\S\n]*$)')
+            else:
+                parts.append(char)
+            i += 1
+        
+        return ''.join(parts)
     
     def detect_structure(self, text: str) -> DetectionResult:
         """
@@ -220,33 +307,37 @@ class StructureDetector:
         )
     
     def _detect_all_elements(self, text: str) -> List[StructureElement]:
-        """Detect all structure elements from text"""
+        """Detect all structure elements from text in a single pass"""
         elements = []
-        lines = text.split('\n')
-        
-        for line_num, line in enumerate(lines):
-            line = line.strip()
-            if not line or len(line) < 2:
+        alternatives = self._line_alternatives
+        
+        # Only lines matching one of the patterns produce a match
+        for match in self.line_pattern.finditer(text):
+            group_name = match.lastgroup
+            line_end = text.find('\n', match.end())
+            line = text[match.start(group_name):line_end if line_end >= 0 else len(text)].rstrip()
+            if len(line) < 2:
                 continue
             
-            position = sum(len(lines[i]) + 1 for i in range(line_num))
-            
-            # Try to detect chapters first (highest priority)
-            chapter_element = self._detect_chapter(line, position, line_num)
-            if chapter_element:
-                elements.append(chapter_element)
-                continue
+            kind, pattern_name = alternatives[group_name]
+            position = match.start()
             
-            # Try to detect sections
-            section_element = self._detect_section(line, position, line_num)
-            if section_element:
-                elements.append(section_element)
-                continue
+            if kind == StructureType.CHAPTER:
+                element = self._build_chapter_element(
+                    pattern_name, match.group(f"{group_name}_1"), match.group(f"{group_name}_2"), line, position
+                )
+            elif kind == StructureType.SECTION:
+                element = self._build_section_element(
+                    pattern_name, match.group(f"{group_name}_1"), match.group(f"{group_name}_2"), line, position
+                )
+            elif self._calculate_heading_confidence(pattern_name, line) >= 0.3:
+                element = self._build_heading_element(pattern_name, line, position)
+            else:
+                # A later heading pattern may still accept the line
+                element = self._detect_heading(line, position, 0)
             
-            # Try to detect general headings
-            heading_element = self._detect_heading(line, position, line_num)
-            if heading_element:
-                elements.append(heading_element)
+            if element:
+                elements.append(element)
         
         return elements
     
@@ -256,70 +347,87 @@ class StructureDetector:
             match = pattern.match(line)
             if match:
                 number = match.group(1) if match.groups() else None
-                title = match.group(2) if len(match.groups()) > 1 and match.group(2) else line
-                
-                # Calculate confidence based on pattern type and context
-                confidence = self._calculate_chapter_confidence(pattern_name, line, number)
-                
-                # Determine numbering style
-                numbering_style = self._determine_numbering_style(number)
-                
-                return StructureElement(
-                    type=StructureType.CHAPTER,
-                    title=title.strip() if title else line,
-                    number=number,
-                    level=0,
-                    start_position=position,
-                    end_position=None,
-                    page_number=None,  # Would need page mapping
-                    confidence=confidence,
-                    numbering_style=numbering_style,
-                    raw_text=line
-                )
+                title = match.group(2) if len(match.groups()) > 1 else None
+                return self._build_chapter_element(pattern_name, number, title, line, position)
         
         return None
     
+    def _build_chapter_element(self,
+                               pattern_name: str,
+                               number: Optional[str],
+                               title: Optional[str],
+                               line: str,
+                               position: int) -> StructureElement:
+        """Create a chapter element from a pattern match"""
+        title = title or line
+        
+        # Calculate confidence based on pattern type and context
+        confidence = self._calculate_chapter_confidence(pattern_name, line, number)
+        
+        # Determine numbering style
+        numbering_style = self._determine_numbering_style(number)
+        
+        return StructureElement(
+            type=StructureType.CHAPTER,
+            title=title.strip() if title else line,
+            number=number,
+            level=0,
+            start_position=position,
+            end_position=None,
+            page_number=None,  # Would need page mapping
+            confidence=confidence,
+            numbering_style=numbering_style,
+            raw_text=line
+        )
+    
     def _detect_section(self, line: str, position: int, line_num: int) -> Optional[StructureElement]:
         """Detect section-level elements"""
         for pattern_name, pattern in self.section_patterns.items():
             match = pattern.match(line)
             if match:
-                number = match.group(1)
                 title = match.group(2) if len(match.groups()) > 1 else line
-                
-                # Determine section level based on numbering
-                level = self._calculate_section_level(number, pattern_name)
-                
-                # Calculate confidence
-                confidence = self._calculate_section_confidence(pattern_name, line, number)
-                
-                # Determine structure type based on level
-                if level == 1:
-                    struct_type = StructureType.SECTION
-                elif level == 2:
-                    struct_type = StructureType.SUBSECTION
-                elif level == 3:
-                    struct_type = StructureType.SUBSUBSECTION
-                else:
-                    struct_type = StructureType.SECTION
-                
-                numbering_style = self._determine_numbering_style(number)
-                
-                return StructureElement(
-                    type=struct_type,
-                    title=title.strip(),
-                    number=number,
-                    level=level,
-                    start_position=position,
-                    end_position=None,
-                    page_number=None,
-                    confidence=confidence,
-                    numbering_style=numbering_style,
-                    raw_text=line
-                )
+                return self._build_section_element(pattern_name, match.group(1), title, line, position)
         
         return None
     
+    def _build_section_element(self,
+                               pattern_name: str,
+                               number: str,
+                               title: str,
+                               line: str,
+                               position: int) -> StructureElement:
+        """Create a section element from a pattern match"""
+        # Determine section level based on numbering
+        level = self._calculate_section_level(number, pattern_name)
+        
+        # Calculate confidence
+        confidence = self._calculate_section_confidence(pattern_name, line, number)
+        
+        # Determine structure type based on level
+        if level == 1:
+            struct_type = StructureType.SECTION
+        elif level == 2:
+            struct_type = StructureType.SUBSECTION
+        elif level == 3:
+            struct_type = StructureType.SUBSUBSECTION
+        else:
+            struct_type = StructureType.SECTION
+        
+        numbering_style = self._determine_numbering_style(number)
+        
+        return StructureElement(
+            type=struct_type,
+            title=title.strip(),
+            number=number,
+            level=level,
+            start_position=position,
+            end_position=None,
+            page_number=None,
+            confidence=confidence,
+            numbering_style=numbering_style,
+            raw_text=line
+        )
+    
     def _detect_heading(self, line: str, position: int, line_num: int) -> Optional[StructureElement]:
         """Detect general heading elements"""
         # Skip very short or very long lines
@@ -330,27 +438,32 @@ class StructureDetector:
         for pattern_name, pattern in self.heading_patterns.items():
             match = pattern.match(line)
             if match:
-                confidence = self._calculate_heading_confidence(pattern_name, line)
-                
                 # Only accept headings with reasonable confidence
-                if confidence < 0.3:
+                if self._calculate_heading_confidence(pattern_name, line) < 0.3:
                     continue
                 
-                return StructureElement(
-                    type=StructureType.HEADING,
-                    title=line.strip(),
-                    number=None,
-                    level=2,  # Default level for general headings
-                    start_position=position,
-                    end_position=None,
-                    page_number=None,
-                    confidence=confidence,
-                    numbering_style=NumberingStyle.NONE,
-                    raw_text=line
-                )
+                return self._build_heading_element(pattern_name, line, position)
         
         return None
     
+    def _build_heading_element(self, pattern_name: str, line: str, position: int) -> Optional[StructureElement]:
+        """Create a heading element, skipping very short or very long lines"""
+        if len(line) < 3 or len(line) > 200:
+            return None
+        
+        return StructureElement(
+            type=StructureType.HEADING,
+            title=line.strip(),
+            number=None,
+            level=2,  # Default level for general headings
+            start_position=position,
+            end_position=None,
+            page_number=None,
+            confidence=self._calculate_heading_confidence(pattern_name, line),
+            numbering_style=NumberingStyle.NONE,
+            raw_text=line
+        )
+    
     def _assign_hierarchy_levels(self, elements: List[StructureElement]) -> None:
         """Assign proper hierarchy levels to elements"""
         current_chapter_level = 0
@@ -0,0 +1,134 @@
+"""
+Unit tests for ChunkSimilarityTable
+
+Tests blocked top-k computation against a dense reference and incremental
+maintenance of the chunk neighbour table.
+"""
+
+import numpy as np
+import pytest
+
+from .chunk_similarity_table import ChunkSimilarityTable, blocked_top_k
+
+
+def dense_top_k(vectors: np.ndarray, k: int):
+    """Reference top-k over the full similarity matrix, excluding self"""
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ normalized.T
+    np.fill_diagonal(scores, -np.inf)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+
+class TestBlockedTopK:
+    """Test suite for blocked_top_k"""
+
+    def test_matches_dense_computation(self):
+        """Tiled results equal the full matrix product"""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(257, 24)).astype(np.float32)
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        indices, scores = blocked_top_k(
+            normalized, normalized, k=7, block_size=32, exclude=np.arange(257)
+        )
+        expected_indices, expected_scores = dense_top_k(vectors, 7)
+
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+        assert (indices == expected_indices).mean() > 0.99
+
+    def test_k_larger_than_corpus(self):
+        """Unfilled slots are marked with index -1"""
+        vectors = np.eye(3, dtype=np.float32)
+        indices, scores = blocked_top_k(vectors, vectors, k=5, exclude=np.arange(3))
+
+        assert indices.shape == (3, 3)
+        assert (indices[:, -1] == -1).all()
+        assert np.isneginf(scores[:, -1]).all()
+
+
+class TestChunkSimilarityTable:
+    """Test suite for ChunkSimilarityTable"""
+
+    def setup_method(self):
+        rng = np.random.default_rng(1)
+        self.vectors = rng.normal(size=(200, 16)).astype(np.float32)
+        self.ids = [f"chunk_{i}" for i in range(200)]
+
+    def test_build_neighbours(self):
+        """Every chunk gets k neighbours, none of them itself"""
+        table = ChunkSimilarityTable(k=5, block_size=64)
+        table.build(self.ids, self.vectors)
+
+        expected_indices, expected_scores = dense_top_k(self.vectors, 5)
+        neighbours = table.get_neighbours("chunk_0")
+        assert len(neighbours) == 5
+        assert "chunk_0" not in dict(neighbours)
+        assert [n for n, _ in neighbours] == [self.ids[i] for i in expected_indices[0]]
+        assert neighbours[0][1] == pytest.approx(expected_scores[0][0], rel=1e-5)
+
+    def test_pair_lookup(self):
+        """Pair similarity is available from either side"""
+        table = ChunkSimilarityTable(k=5)
+        table.build(self.ids, self.vectors)
+
+        neighbour_id, score = table.get_neighbours("chunk_3")[0]
+        assert table.get_similarity("chunk_3", neighbour_id) == score
+        assert table.get_similarity(neighbour_id, "chunk_3") == pytest.approx(score)
+        assert table.get_similarity("chunk_3", "missing") is None
+
+    def test_incremental_add_matches_full_build(self):
+        """Adding a batch gives the same table as building from scratch"""
+        incremental = ChunkSimilarityTable(k=6, block_size=50)
+        incremental.build(self.ids[:150], self.vectors[:150])
+        changed = incremental.add(self.ids[150:], self.vectors[150:])
+
+        full = ChunkSimilarityTable(k=6)
+        full.build(self.ids, self.vectors)
+
+        assert set(self.ids[150:]).issubset(changed)
+        for chunk_id in self.ids:
+            assert list(incremental.neighbours[chunk_id]) == list(full.neighbours[chunk_id])
+
+    def test_replacing_chunks_matches_full_build(self):
+        """Lists that referenced a replaced chunk are refilled, not left short"""
+        table = ChunkSimilarityTable(k=6, block_size=50)
+        table.build(self.ids, self.vectors)
+
+        rng = np.random.default_rng(2)
+        replaced = self.ids[:10]
+        new_vectors = rng.normal(size=(10, 16)).astype(np.float32)
+        affected = {c for c, n in table.neighbours.items() if set(replaced) & set(n)} - set(replaced)
+        changed = table.add(replaced, new_vectors)
+
+        vectors = self.vectors.copy()
+        vectors[:10] = new_vectors
+        full = ChunkSimilarityTable(k=6)
+        full.build(self.ids, vectors)
+
+        assert affected and affected.issubset(changed)
+        for chunk_id in self.ids:
+            assert set(table.neighbours[chunk_id]) == set(full.neighbours[chunk_id])
+
+    def test_remove(self):
+        """Removed chunks disappear from every neighbour list"""
+        table = ChunkSimilarityTable(k=5)
+        table.build(self.ids, self.vectors)
+        target = table.get_neighbours("chunk_0")[0][0]
+
+        changed = table.remove([target])
+        assert "chunk_0" in changed
+        assert target not in table.neighbours
+        assert all(target not in n for n in table.neighbours.values())
+
+    def test_min_similarity_and_persistence_rows(self):
+        """Low scores are dropped and rows round-trip through load_rows"""
+        table = ChunkSimilarityTable(k=5, min_similarity=0.2)
+        table.build(self.ids, self.vectors)
+        rows = list(table.iter_rows())
+        assert all(score >= 0.2 for _, _, score in rows)
+
+        restored = ChunkSimilarityTable(k=5)
+        restored.load_rows(rows)
+        assert restored.neighbours == table.neighbours
+        assert not restored.has_vectors
@@ -5,9 +5,14 @@ Tests chunking with mathematical textbooks, verifies preservation of equations
 and definitions, and validates educational content coherence.
 """
 
+import random
+import re
+import time
+
 import pytest
 from .content_aware_chunker import (
     ContentAwareChunker,
+    BoundaryPlanner,
     ChunkingResult,
     ChunkBoundary,
     MathematicalContentDetector,
@@ -578,5 +583,132 @@ class TestContentAwareChunker:
         assert isinstance(stats['content_type_distribution'], dict)
 
 
+
+def window_scan_boundary(min_chunk_size: int, text: str, start_pos: int, target_pos: int, protected_regions):
+    """Reference for BoundaryPlanner.find_best_boundary that scans the window around target"""
+    search_start = max(start_pos + min_chunk_size, target_pos - 200)
+    search_end = min(len(text), target_pos + 200)
+    
+    for pstart, pend, ptype in protected_regions:
+        if pstart <= target_pos <= pend:
+            if pend < search_end:
+                return ChunkBoundary(position=pend, boundary_type='protected_region',
+                                     quality_score=0.9, context=f"After {ptype}")
+            elif pstart > search_start:
+                return ChunkBoundary(position=pstart, boundary_type='protected_region',
+                                     quality_score=0.8, context=f"Before {ptype}")
+    
+    candidates = []
+    for pattern, boundary_type, quality in ((r'\n\s*\n', 'paragraph', 0.9),
+                                            (r'[.!?]\s+', 'sentence', 0.7),
+                                            (r'\s+', 'word', 0.5)):
+        for match in re.finditer(pattern, text[search_start:search_end]):
+            candidates.append(ChunkBoundary(position=search_start + match.end(),
+                                            boundary_type=boundary_type, quality_score=quality))
+    
+    if not candidates:
+        return ChunkBoundary(position=target_pos, boundary_type='forced', quality_score=0.2)
+    
+    def score(candidate):
+        distance_score = max(0, 1.0 - abs(candidate.position - target_pos) / 200)
+        return candidate.quality_score * 0.7 + distance_score * 0.3
+    
+    return max(candidates, key=score)
+
+
+def window_scan_boundaries(chunker: ContentAwareChunker, text: str, protected_regions):
+    """Reference boundary planning that scans a window per chunk"""
+    boundaries = []
+    current_pos = 0
+    while current_pos < len(text):
+        target_pos = current_pos + chunker.target_chunk_size
+        if target_pos >= len(text):
+            boundaries.append(ChunkBoundary(position=len(text), boundary_type='end', quality_score=1.0))
+            break
+        boundary = window_scan_boundary(chunker.min_chunk_size, text, current_pos, target_pos, protected_regions)
+        boundaries.append(boundary)
+        current_pos = boundary.position
+    return boundaries
+
+
+def textbook_section(paragraphs: int, seed: int = 0) -> str:
+    """Generate a long textbook-like section with irregular whitespace"""
+    rng = random.Random(seed)
+    words = ["force", "mass", "acceleration", "energy", "the", "a", "body", "$F = ma$", "velocity"]
+    parts = []
+    for _ in range(paragraphs):
+        for _ in range(rng.randint(2, 8)):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(4, 20)))
+            parts.append(sentence.capitalize() + rng.choice([". ", "! ", "?  ", ".\n", ". \t"]))
+        parts.append(rng.choice(["\n\n", "\n \n", "\n\n\n", " \n\t\n "]))
+    return "".join(parts)
+
+
+class TestBoundaryPlanner:
+    """BoundaryPlanner must choose exactly the boundaries of the window scan"""
+    
+    def setup_method(self):
+        self.chunker = ContentAwareChunker()
+    
+    def test_matches_window_scan_on_random_text(self):
+        """Edge-clipped matches and tie-breaking agree on random whitespace-heavy text"""
+        pieces = ["word", "ab", ".", "!", "?", " ", "  ", "\n", "\n\n", " \n ", "\t", "\r\n"]
+        rng = random.Random(3)
+        for _ in range(300):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(50, 400)))
+            regions = []
+            position = rng.randint(0, 60)
+            while position < len(text) - 10 and rng.random() < 0.7:
+                end = position + rng.randint(1, 80)
+                regions.append((position, end, rng.choice(["math", "definition"])))
+                position = end + rng.randint(21, 150)
+            
+            min_chunk = rng.randint(0, 50)
+            window = rng.choice([5, 20, 200])
+            planner = BoundaryPlanner(text, regions, min_chunk, window)
+            for _ in range(20):
+                start = rng.randint(0, len(text))
+                target = start + rng.randint(0, 120)
+                if window == 200:
+                    expected = window_scan_boundary(min_chunk, text, start, target, regions)
+                    assert planner.find_best_boundary(start, target) == expected, (repr(text), start, target)
+                else:
+                    # Compare each boundary type directly for small windows
+                    a, b = max(start + min_chunk, target - window), min(len(text), target + window)
+                    if a >= b:
+                        continue
+                    window_text = text[a:b]
+                    assert planner._paragraph_positions(a, b) == [a + m.end() for m in re.finditer(r'\n\s*\n', window_text)]
+                    assert planner._sentence_positions(a, b) == [a + m.end() for m in re.finditer(r'[.!?]\s+', window_text)]
+                    assert planner._word_positions(a, b) == [a + m.end() for m in re.finditer(r'\s+', window_text)]
+    
+    def test_cut_points_match_window_scan(self):
+        """Whole-section planning produces identical cut points"""
+        text = textbook_section(300)
+        protected = self.chunker._find_protected_regions(text)
+        
+        expected = window_scan_boundaries(self.chunker, text, protected)
+        
+        assert len(expected) > 20
+        assert self.chunker._find_chunk_boundaries(text, protected) == expected
+    
+    def test_benchmark_textbook_section(self):
+        """Offline benchmark; prints timings against the window scan"""
+        text = textbook_section(3000, seed=1)
+        protected = self.chunker._find_protected_regions(text)
+        
+        start = time.perf_counter()
+        expected = window_scan_boundaries(self.chunker, text, protected)
+        scan_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        boundaries = self.chunker._find_chunk_boundaries(text, protected)
+        planner_time = time.perf_counter() - start
+        
+        assert boundaries == expected
+        print(f"\n{len(text)} chars, {len(boundaries)} chunks: "
+              f"window scan {scan_time:.3f}s, boundary planner {planner_time:.3f}s")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -526,9 +526,12 @@ class TestAdvancedEmbeddingCache(unittest.TestCase):
         )
         self.cache.put(new_text, model, content_type, new_embedding)
         
-        # First entry should be evicted (LRU)
-        evicted = self.cache.get("Text 0", model, content_type)
-        self.assertIsNone(evicted)
+        # First entry should be evicted from memory (LRU)
+        evicted_key = self.cache._generate_key("Text 0", model, content_type)
+        self.assertNotIn(evicted_key, self.cache.memory_cache)
+        
+        # Persistence still serves the evicted entry
+        self.assertIsNotNone(self.cache.get("Text 0", model, content_type))
         
         # New entry should be present
         new_cached = self.cache.get(new_text, model, content_type)
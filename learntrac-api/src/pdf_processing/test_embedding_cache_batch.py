@@ -0,0 +1,109 @@
+"""
+Unit tests for AdvancedEmbeddingCache batch operations
+
+Tests batched reads and writes and write-behind persistence.
+"""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from .embedding_cache import AdvancedEmbeddingCache, CacheConfig, CacheStrategy
+from .embedding_generator import EmbeddingResult, EmbeddingModel
+from .chunk_metadata import ContentType
+
+
+class TestBatchOperations(unittest.TestCase):
+    """Test batched reads and write-behind persistence"""
+    
+    def setUp(self):
+        """Set up cache with a small write batch"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = CacheConfig(
+            strategy=CacheStrategy.LRU,
+            max_size=100,
+            cache_directory=self.temp_dir,
+            enable_persistence=True,
+            enable_optimization=False,
+            enable_background_cleanup=False,
+            batch_write_size=4,
+            write_behind_interval=3600
+        )
+        self.cache = AdvancedEmbeddingCache(self.config)
+        self.model = EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET
+        self.texts = [f"Chunk text {i}" for i in range(3)]
+        self.results = [
+            EmbeddingResult(
+                text=text,
+                embedding=np.full(16, i, dtype=np.float32),
+                model=self.model,
+                dimensions=16,
+                generation_time=0.1,
+                token_count=3,
+                quality_score=0.8
+            )
+            for i, text in enumerate(self.texts)
+        ]
+    
+    def tearDown(self):
+        """Clean up test directory"""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_get_many_preserves_input_order(self):
+        """Test hits and misses come back in input order"""
+        self.cache.put_many(self.texts, self.model, ContentType.TEXT, self.results)
+        
+        results = self.cache.get_many(
+            [self.texts[2], "unknown", self.texts[0]], self.model, ContentType.TEXT
+        )
+        
+        self.assertIsNone(results[1])
+        self.assertEqual(results[0].embedding[0], 2)
+        self.assertEqual(results[2].embedding[0], 0)
+        self.assertEqual(self.cache.stats.cache_hits, 2)
+        self.assertEqual(self.cache.stats.cache_misses, 1)
+    
+    def test_writes_are_buffered_until_batch_is_full(self):
+        """Test write-behind flushes in batch_write_size transactions"""
+        persistent = self.cache.persistent_cache
+        self.cache.put_many(self.texts, self.model, ContentType.TEXT, self.results)
+        self.assertEqual(persistent.get_statistics()['total_entries'], 0)
+        
+        # Buffered entries are still readable after memory eviction
+        self.cache.memory_cache.clear()
+        self.assertIsNotNone(self.cache.get(self.texts[0], self.model, ContentType.TEXT))
+        
+        with patch.object(persistent, 'store_many', wraps=persistent.store_many) as store_many:
+            self.cache.put("One more chunk", self.model, ContentType.TEXT, self.results[0])
+        
+        store_many.assert_called_once()
+        self.assertEqual(persistent.get_statistics()['total_entries'], 4)
+    
+    def test_persistent_misses_resolved_in_one_query(self):
+        """Test memory misses are loaded together and access updates coalesced"""
+        self.cache.put_many(self.texts, self.model, ContentType.TEXT, self.results)
+        self.cache.flush()
+        
+        persistent = self.cache.persistent_cache
+        for _ in range(2):
+            self.cache.memory_cache.clear()
+            with patch.object(persistent, 'load_many', wraps=persistent.load_many) as load_many:
+                results = self.cache.get_many(self.texts, self.model, ContentType.TEXT)
+            load_many.assert_called_once()
+            self.assertTrue(all(result is not None for result in results))
+        
+        with patch.object(persistent, 'update_access_many',
+                          wraps=persistent.update_access_many) as update_access_many:
+            self.cache.flush()
+        update_access_many.assert_called_once()
+        
+        entry = persistent.load(self.cache._generate_key(self.texts[0], self.model, ContentType.TEXT))
+        self.assertEqual(entry.access_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Unit tests for AdvancedEmbeddingCache eviction
+
+Tests the LFU, TTL and sampled adaptive eviction structures, incremental
+memory accounting, and that put latency on a full cache stays flat.
+"""
+
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from .embedding_cache import AdvancedEmbeddingCache, CacheConfig, CacheStrategy
+from .embedding_generator import EmbeddingResult, EmbeddingModel
+from .chunk_metadata import ContentType
+
+
+class TestEvictionStrategies(unittest.TestCase):
+    """Test O(1) eviction for each caching strategy"""
+    
+    def setUp(self):
+        """Set up strategy testing"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test directory"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def create_cache_with_strategy(self, strategy: CacheStrategy) -> AdvancedEmbeddingCache:
+        """Helper to create cache with specific strategy"""
+        config = CacheConfig(
+            strategy=strategy,
+            max_size=3,  # Small for testing eviction
+            cache_directory=self.temp_dir,
+            enable_persistence=False,  # Disable for simpler testing
+            enable_background_cleanup=False
+        )
+        return AdvancedEmbeddingCache(config)
+    
+    def _put(self, cache, text, content_type=ContentType.TEXT):
+        """Helper to cache a small random embedding"""
+        model = EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET
+        cache.put(text, model, content_type, EmbeddingResult(
+            text=text,
+            embedding=np.random.rand(8).astype(np.float32),
+            model=model,
+            dimensions=8,
+            generation_time=0.1,
+            token_count=2
+        ))
+    
+    def test_lfu_strategy(self):
+        """Test LFU evicts the least hit entry, oldest first on ties"""
+        cache = self.create_cache_with_strategy(CacheStrategy.LFU)
+        model = EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET
+        
+        for i in range(3):
+            self._put(cache, f"LFU test {i}")
+        cache.get("LFU test 0", model, ContentType.TEXT)
+        cache.get("LFU test 0", model, ContentType.TEXT)
+        cache.get("LFU test 2", model, ContentType.TEXT)
+        
+        self._put(cache, "LFU test 3")
+        self.assertIsNone(cache.get("LFU test 1", model, ContentType.TEXT))
+        
+        # The new entry has no hits, so it goes next
+        self._put(cache, "LFU test 4")
+        self.assertIsNone(cache.get("LFU test 3", model, ContentType.TEXT))
+        self.assertIsNotNone(cache.get("LFU test 0", model, ContentType.TEXT))
+    
+    def test_ttl_strategy_evicts_expired_first(self):
+        """Test TTL eviction prefers expired entries over older live ones"""
+        cache = self.create_cache_with_strategy(CacheStrategy.TTL)
+        model = EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET
+        
+        cache.config.content_type_ttl[ContentType.MATH] = 0  # Expires immediately
+        
+        self._put(cache, "TTL test 0")
+        self._put(cache, "TTL test 1", ContentType.MATH)
+        self._put(cache, "TTL test 2")
+        expired_key = cache._generate_key("TTL test 1", model, ContentType.MATH)
+        time.sleep(0.01)
+        
+        self._put(cache, "TTL test 3")
+        self.assertNotIn(expired_key, cache.memory_cache)
+        self.assertIsNotNone(cache.get("TTL test 0", model, ContentType.TEXT))
+    
+    def test_adaptive_eviction_is_sampled(self):
+        """Test adaptive eviction scores a bounded sample of entries"""
+        cache = self.create_cache_with_strategy(CacheStrategy.ADAPTIVE)
+        cache.config.max_size = 200
+        for i in range(200):
+            self._put(cache, f"Adaptive test {i}")
+        
+        with patch.object(cache, '_adaptive_eviction_score',
+                          wraps=cache._adaptive_eviction_score) as score:
+            self._put(cache, "Adaptive overflow")
+        
+        self.assertEqual(score.call_count, cache.config.adaptive_sample_size)
+        self.assertEqual(len(cache.memory_cache), 200)
+    
+    def test_memory_accounting_is_incremental(self):
+        """Test tracked memory usage matches a full walk after churn"""
+        cache = self.create_cache_with_strategy(CacheStrategy.LFU)
+        for i in range(10):
+            self._put(cache, f"Memory test {i}")
+        self._put(cache, "Memory test 9")
+        
+        expected_bytes = sum(
+            entry.embedding.nbytes + len(str(entry.metadata)) * 4
+            for entry in cache.memory_cache.values()
+        )
+        self.assertAlmostEqual(cache._calculate_memory_usage(), expected_bytes / (1024 * 1024))
+        
+        # Direct modification of memory_cache is picked up
+        cache.memory_cache.clear()
+        self.assertEqual(cache.get_statistics().memory_usage_mb, 0.0)
+
+
+class TestEvictionPerformance(unittest.TestCase):
+    """Microbenchmark: put latency on a full cache should not grow with size"""
+    
+    def _median_put_latency(self, strategy: CacheStrategy, size: int) -> float:
+        """Median latency of puts that each trigger an eviction"""
+        cache = AdvancedEmbeddingCache(CacheConfig(
+            strategy=strategy,
+            max_size=size,
+            enable_persistence=False,
+            enable_optimization=False,
+            enable_background_cleanup=False
+        ))
+        model = EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET
+        result = EmbeddingResult(
+            text="benchmark",
+            embedding=np.zeros(8, dtype=np.float32),
+            model=model,
+            dimensions=8,
+            generation_time=0.0,
+            token_count=1
+        )
+        
+        for i in range(size):
+            cache.put(f"fill {i}", model, ContentType.TEXT, result)
+        for i in range(0, size, 7):
+            cache.get(f"fill {i}", model, ContentType.TEXT)
+        
+        latencies = []
+        for i in range(300):
+            start_time = time.perf_counter()
+            cache.put(f"overflow {i}", model, ContentType.TEXT, result)
+            latencies.append(time.perf_counter() - start_time)
+        
+        return float(np.median(latencies))
+    
+    def test_put_latency_is_flat(self):
+        """Test put latency at 20k entries stays close to 1k entries"""
+        for strategy in (CacheStrategy.LFU, CacheStrategy.TTL, CacheStrategy.ADAPTIVE):
+            small = self._median_put_latency(strategy, 1000)
+            large = self._median_put_latency(strategy, 20000)
+            print(f"{strategy.value}: 1k={small * 1e6:.1f}us 20k={large * 1e6:.1f}us")
+            # O(N) eviction would be ~20x slower here
+            self.assertLess(large, small * 4 + 1e-4, strategy.value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for EmbeddingGenerator micro-batching
+
+Tests that generate_batch_embeddings sends only cache misses to the
+provider, in token-budgeted micro-batches, and keeps input order.
+"""
+
+import time
+import unittest
+
+import numpy as np
+
+from .embedding_generator import EmbeddingGenerator, EmbeddingConfig, EmbeddingModel
+
+
+class TestMicroBatching(unittest.TestCase):
+    """Test provider-level micro-batching in generate_batch_embeddings"""
+    
+    def setUp(self):
+        """Set up generator with small batches"""
+        self.config = EmbeddingConfig(
+            model=EmbeddingModel.SENTENCE_TRANSFORMERS_MINILM,
+            dimensions=384,
+            max_tokens=512,
+            batch_size=4
+        )
+        self.generator = EmbeddingGenerator(default_config=self.config, max_workers=4)
+        self.provider = self.generator.providers[EmbeddingModel.SENTENCE_TRANSFORMERS_MINILM]
+    
+    def test_results_follow_input_order(self):
+        """Test results line up with input texts across parallel batches"""
+        texts = [f"Ordered sentence number {i}" for i in range(17)]
+        
+        batch_result = self.generator.generate_batch_embeddings(texts)
+        
+        self.assertEqual([r.text for r in batch_result.results], texts)
+        self.assertEqual(batch_result.batch_statistics['provider_requests'], 5)
+    
+    def test_only_cache_misses_are_sent(self):
+        """Test cached and duplicate texts are not re-embedded"""
+        self.generator.generate_batch_embeddings(["Cached one", "Cached two"])
+        requests_before = self.provider.request_count
+        
+        texts = ["New one", "Cached one", "New two", "New one", "Cached two"]
+        batch_result = self.generator.generate_batch_embeddings(texts)
+        
+        self.assertEqual([r.text for r in batch_result.results], texts)
+        self.assertEqual(self.provider.request_count - requests_before, 1)
+        self.assertEqual(self.generator.stats['cache_hits'], 2)
+        np.testing.assert_array_equal(
+            batch_result.results[0].embedding, batch_result.results[3].embedding
+        )
+    
+    def test_token_budget_splits_batches(self):
+        """Test micro-batches respect the token budget"""
+        config = EmbeddingConfig(
+            model=EmbeddingModel.SENTENCE_TRANSFORMERS_MINILM,
+            dimensions=384,
+            max_tokens=512,
+            batch_size=100,
+            max_batch_tokens=40
+        )
+        texts = [" ".join(["word"] * 10) + f" {i}" for i in range(6)]  # ~14 tokens each
+        
+        batches = self.generator.plan_micro_batches(texts, config)
+        
+        self.assertEqual([len(b) for b in batches], [2, 2, 2])
+        self.assertEqual(sum(batches, []), texts)
+    
+    def test_batch_matches_single_embeddings(self):
+        """Test batch embeddings equal single-text embeddings"""
+        texts = ["Definition: a set is a collection", "Example: x = 2"]
+        
+        batch_result = self.generator.generate_batch_embeddings(texts)
+        
+        fresh = EmbeddingGenerator(default_config=self.config, enable_cache=False)
+        for result in batch_result.results:
+            np.testing.assert_allclose(
+                result.embedding, fresh.generate_embedding(result.text).embedding, rtol=1e-6
+            )
+    
+    def test_batch_mode_benchmark(self):
+        """Offline benchmark: provider batch mode against one request per text"""
+        texts = [f"Benchmark sentence {i} about derivatives" for i in range(64)]
+        
+        timings = {}
+        for batch_mode in (False, True):
+            generator = EmbeddingGenerator(default_config=EmbeddingConfig(
+                model=EmbeddingModel.SENTENCE_TRANSFORMERS_MINILM,
+                dimensions=384,
+                max_tokens=512,
+                batch_size=32
+            ), enable_cache=False, max_workers=2)
+            for provider in generator.providers.values():
+                provider.batch_mode = batch_mode
+            
+            start_time = time.time()
+            batch_result = generator.generate_batch_embeddings(texts)
+            timings[batch_mode] = time.time() - start_time
+            self.assertEqual(batch_result.successful_embeddings, len(texts))
+        
+        print(f"per-text requests: {timings[False]:.3f}s, batched: {timings[True]:.3f}s")
+        self.assertLess(timings[True], timings[False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -371,17 +371,17 @@ class TestEmbeddingPipeline(unittest.TestCase):
         document = self.create_test_document("Test retry logic")
         
         # Mock embedding generator to fail first few times
-        original_generate = pipeline.embedding_generator.generate_embedding
+        original_generate = pipeline.embedding_generator.generate_embeddings
         call_count = 0
         
-        def mock_generate_with_retry(text, config=None):
+        def mock_generate_with_retry(texts, config=None):
             nonlocal call_count
             call_count += 1
             if call_count <= 2:  # Fail first 2 attempts
                 raise Exception("Simulated embedding failure")
-            return original_generate(text, config)
+            return original_generate(texts, config)
         
-        pipeline.embedding_generator.generate_embedding = mock_generate_with_retry
+        pipeline.embedding_generator.generate_embeddings = mock_generate_with_retry
         
         result = pipeline.process_document(document)
         
@@ -390,7 +390,7 @@ class TestEmbeddingPipeline(unittest.TestCase):
         # Some chunks might have succeeded with retries
         
         # Restore original method
-        pipeline.embedding_generator.generate_embedding = original_generate
+        pipeline.embedding_generator.generate_embeddings = original_generate
     
     def test_quality_filtering(self):
         """Test quality-based filtering of embeddings"""
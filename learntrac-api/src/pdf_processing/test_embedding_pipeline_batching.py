@@ -0,0 +1,182 @@
+"""
+Unit tests for EmbeddingPipeline chunk batching
+
+Tests adaptive batch embedding of a document's chunks, splitting of
+failed batches, backoff on transient errors and the fallback config.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from .embedding_pipeline import (
+    EmbeddingPipeline, PipelineConfig, create_fast_pipeline_config, create_batch_optimized_config
+)
+from .embedding_generator import EmbeddingConfig, EmbeddingModel
+from .chunk_metadata import ChunkMetadata
+
+
+class TestBatchChunkEmbedding(unittest.TestCase):
+    """Test adaptive batch embedding of a document's chunks"""
+    
+    def create_chunking_result(self, texts):
+        """Create a minimal chunking result for the given chunk texts"""
+        return Mock(
+            chunks=texts,
+            metadata_list=[
+                ChunkMetadata(book_id="batch_doc", chunk_id=f"chunk_{i}")
+                for i in range(len(texts))
+            ]
+        )
+    
+    def test_chunks_embedded_in_batches(self):
+        """Test fast and batch-optimized configs send batched requests"""
+        texts = [f"Chunk {i} about limits and continuity" for i in range(40)]
+        
+        for config in (create_fast_pipeline_config(), create_batch_optimized_config()):
+            pipeline = EmbeddingPipeline(config)
+            provider = pipeline.embedding_generator.providers[config.embedding_config.model]
+            
+            results = pipeline._generate_chunk_embeddings(
+                self.create_chunking_result(texts), "batch_doc"
+            )
+            
+            self.assertEqual([r.chunk_text for r in results], texts)
+            self.assertTrue(all(r.embedding_result is not None for r in results))
+            self.assertTrue(all(r.retry_count == 0 and r.processing_time > 0 for r in results))
+            self.assertLess(provider.request_count, len(texts) / 4)
+    
+    def test_failed_batch_is_split_without_sleeping(self):
+        """Test a bad chunk is isolated by splitting and never blocks on backoff"""
+        pipeline = EmbeddingPipeline(PipelineConfig(batch_size=8, max_retries=2))
+        texts = [f"Chunk {i} about vectors" for i in range(8)]
+        texts[5] = "poison chunk"
+        
+        original_generate = pipeline.embedding_generator.generate_embeddings
+        
+        def fail_on_poison(batch_texts, config=None):
+            if "poison chunk" in batch_texts:
+                raise RuntimeError("Simulated provider rejection")
+            return original_generate(batch_texts, config)
+        
+        pipeline.embedding_generator.generate_embeddings = fail_on_poison
+        for provider in pipeline.embedding_generator.providers.values():
+            provider.request_latency = provider.per_text_latency = 0.0
+        
+        with patch('time.sleep', side_effect=AssertionError("worker slept")):
+            results = pipeline._generate_chunk_embeddings(
+                self.create_chunking_result(texts), "batch_doc"
+            )
+        
+        poisoned = results[5]
+        self.assertIsNone(poisoned.embedding_result)
+        # Three failed batches (8, 4, 2 chunks), then its own max_retries + 1 attempts
+        self.assertEqual(poisoned.retry_count, 6)
+        self.assertIn("Simulated provider rejection", poisoned.error)
+        
+        # Neighbours shared 1-3 failed batches with the bad chunk, then succeeded
+        self.assertEqual([r.retry_count for r in results[4:8]], [3, 6, 2, 2])
+        self.assertEqual([r.retry_count for r in results[:4]], [1, 1, 1, 1])
+        self.assertTrue(all(r.embedding_result is not None and r.error is None
+                            for i, r in enumerate(results) if i != 5))
+        self.assertLess(pipeline._current_batch_size, 8)
+    
+    def test_transient_errors_back_off_without_splitting(self):
+        """Test rate limits retry the whole batch after jittered exponential backoff"""
+        pipeline = EmbeddingPipeline(PipelineConfig(
+            batch_size=8, max_retries=3, retry_base_delay=0.5, retry_max_delay=30.0
+        ))
+        texts = [f"Chunk {i} about vectors" for i in range(8)]
+        original_generate = pipeline.embedding_generator.generate_embeddings
+        calls = []
+        
+        class RateLimitError(Exception):
+            status_code = 429
+        
+        def rate_limited(batch_texts, config=None):
+            calls.append(len(batch_texts))
+            if len(calls) <= 2:
+                raise RateLimitError("Too many requests")
+            return original_generate(batch_texts, config)
+        
+        pipeline.embedding_generator.generate_embeddings = rate_limited
+        for provider in pipeline.embedding_generator.providers.values():
+            provider.request_latency = provider.per_text_latency = 0.0
+        
+        with patch('time.sleep') as sleep:
+            results = pipeline._generate_chunk_embeddings(
+                self.create_chunking_result(texts), "batch_doc"
+            )
+        
+        self.assertEqual(calls, [8, 8, 8])
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0)
+        self.assertTrue(all(r.embedding_result is not None and r.retry_count == 2
+                            for r in results))
+    
+    def test_backoff_does_not_hold_up_other_batches(self):
+        """Test batches behind a rate-limited one are sent before its retry"""
+        pipeline = EmbeddingPipeline(PipelineConfig(batch_size=4, max_retries=3))
+        texts = [f"Chunk {i} about vectors" for i in range(12)]
+        original_generate = pipeline.embedding_generator.generate_embeddings
+        calls = []
+        
+        class RateLimitError(Exception):
+            status_code = 429
+        
+        def rate_limited_once(batch_texts, config=None):
+            calls.append(batch_texts[0])
+            if len(calls) == 1:
+                raise RateLimitError("Too many requests")
+            return original_generate(batch_texts, config)
+        
+        pipeline.embedding_generator.generate_embeddings = rate_limited_once
+        pipeline._retry_delay = lambda attempt: 60.0
+        for provider in pipeline.embedding_generator.providers.values():
+            provider.request_latency = provider.per_text_latency = 0.0
+        
+        with patch('time.sleep') as sleep:
+            results = pipeline._generate_chunk_embeddings(
+                self.create_chunking_result(texts), "batch_doc"
+            )
+        
+        # The failed first batch is retried last, after one wait for what is left of its delay
+        self.assertEqual(calls[0], texts[0])
+        self.assertEqual(calls[-1], texts[0])
+        self.assertEqual(len(calls), 4)
+        self.assertNotIn(texts[0], calls[1:-1])
+        self.assertEqual(sleep.call_count, 1)
+        self.assertLessEqual(sleep.call_args.args[0], 60.0)
+        self.assertTrue(all(r.embedding_result is not None for r in results))
+        self.assertEqual([r.retry_count for r in results[:4]], [1, 1, 1, 1])
+    
+    def test_retries_use_fallback_config(self):
+        """Test retried batches switch to the fallback embedding config"""
+        config = PipelineConfig(
+            embedding_config=EmbeddingConfig(
+                model=EmbeddingModel.OPENAI_3_LARGE, dimensions=3072, max_tokens=512
+            ),
+            fallback_embedding_config=EmbeddingConfig(
+                model=EmbeddingModel.SENTENCE_TRANSFORMERS_MINILM, dimensions=384, max_tokens=512
+            )
+        )
+        pipeline = EmbeddingPipeline(config)
+        original_generate = pipeline.embedding_generator.generate_embeddings
+        
+        def fail_primary(batch_texts, embedding_config=None):
+            if embedding_config.model == EmbeddingModel.OPENAI_3_LARGE:
+                raise RuntimeError("Primary model unavailable")
+            return original_generate(batch_texts, embedding_config)
+        
+        pipeline.embedding_generator.generate_embeddings = fail_primary
+        results = pipeline._generate_chunk_embeddings(
+            self.create_chunking_result(["First chunk", "Second chunk"]), "batch_doc"
+        )
+        
+        for result in results:
+            self.assertEqual(result.embedding_result.model, EmbeddingModel.SENTENCE_TRANSFORMERS_MINILM)
+            self.assertEqual(result.retry_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for vectorized batch quality assessment
+
+Tests that EmbeddingQualityAssessor.assess_batch_quality, which computes
+embedding statistics with matrix operations, matches assessing each
+embedding on its own.
+"""
+
+import unittest
+
+import numpy as np
+
+from .embedding_quality_assessor import EmbeddingQualityAssessor
+from .embedding_generator import EmbeddingResult, EmbeddingModel
+from .chunk_metadata import ChunkMetadata, ContentType
+
+
+class TestVectorizedBatchAssessment(unittest.TestCase):
+    """Test that batch assessment matches per-embedding assessment"""
+    
+    def setUp(self):
+        """Set up a batch with mixed dimensions and content types"""
+        self.assessor = EmbeddingQualityAssessor()
+        rng = np.random.default_rng(0)
+        
+        embeddings = [rng.normal(0, 1, 768).astype(np.float32) for _ in range(40)]
+        embeddings += [embedding / np.linalg.norm(embedding) for embedding in embeddings[:10]]
+        embeddings += [rng.normal(0, 0.2, 384), np.zeros(768, dtype=np.float32),
+                       np.full(768, 0.5, dtype=np.float32), np.round(rng.normal(0, 1, 768), 1).astype(np.float32)]
+        
+        texts = ["Definition: a vector space is a set closed under addition.",
+                 "Example 1. Solve x + 2 = 5. Solution: x = 3.",
+                 "The integral ∫ x dx = x²/2 + C.",
+                 "Short text"]
+        content_types = [ContentType.DEFINITION, ContentType.EXAMPLE, ContentType.MATH, ContentType.TEXT]
+        
+        self.embedding_results = [
+            EmbeddingResult(
+                text=texts[i % 4],
+                embedding=embedding,
+                model=EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET,
+                dimensions=len(embedding),
+                generation_time=0.1,
+                token_count=10
+            )
+            for i, embedding in enumerate(embeddings)
+        ]
+        self.chunk_metadata_list = [
+            ChunkMetadata(
+                book_id="test_book",
+                chunk_id=f"chunk_{i}",
+                content_type=content_types[i % 4],
+                difficulty=0.5,
+                confidence_score=0.9,
+                chapter="Test Chapter",
+                section="Test Section"
+            )
+            for i in range(len(embeddings))
+        ]
+    
+    def assertScoresAlmostEqual(self, batch_value, single_value):
+        """Compare nested score details up to float32 rounding"""
+        if isinstance(single_value, dict):
+            self.assertEqual(batch_value.keys(), single_value.keys())
+            for key in single_value:
+                self.assertScoresAlmostEqual(batch_value[key], single_value[key])
+        elif isinstance(single_value, (float, np.floating)):
+            self.assertTrue(np.isclose(batch_value, single_value, rtol=1e-5, atol=1e-6),
+                            f"{batch_value} != {single_value}")
+        else:
+            self.assertEqual(batch_value, single_value)
+    
+    def test_batch_matches_single_assessments(self):
+        """Batch assessments equal assessing each embedding on its own"""
+        batch_assessment = self.assessor.assess_batch_quality(self.embedding_results, self.chunk_metadata_list)
+        
+        for batch, result, metadata in zip(batch_assessment.individual_assessments,
+                                           self.embedding_results, self.chunk_metadata_list):
+            single = self.assessor.assess_embedding_quality(result, metadata)
+            
+            self.assertEqual(batch.quality_grade, single.quality_grade)
+            self.assertAlmostEqual(batch.overall_quality, single.overall_quality, places=6)
+            self.assertEqual(sorted(batch.recommendations), sorted(single.recommendations))
+            self.assertEqual([s.metric for s in batch.individual_scores],
+                             [s.metric for s in single.individual_scores])
+            for batch_score, single_score in zip(batch.individual_scores, single.individual_scores):
+                self.assertAlmostEqual(batch_score.score, single_score.score, places=6)
+                self.assertScoresAlmostEqual(batch_score.details, single_score.details)
+            self.assertScoresAlmostEqual(batch.content_analysis, single.content_analysis)
+    
+    def test_batch_statistics_match_single_statistics(self):
+        """Matrix statistics, including histogram entropy, match the per-vector helpers"""
+        embeddings = [result.embedding for result in self.embedding_results]
+        
+        batch_statistics = self.assessor._calculate_batch_embedding_statistics(embeddings)
+        
+        for batch, embedding in zip(batch_statistics, embeddings):
+            single = self.assessor._calculate_embedding_statistics(embedding)
+            self.assertScoresAlmostEqual(vars(batch), vars(single))
+    
+    def test_invalid_embedding_raises_as_single(self):
+        """Embeddings the single path rejects are rejected by the batch path"""
+        nan_result = EmbeddingResult(
+            text="Test text",
+            embedding=np.full(768, np.nan, dtype=np.float32),
+            model=EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET,
+            dimensions=768,
+            generation_time=0.1,
+            token_count=2
+        )
+        
+        with self.assertRaises(ValueError):
+            self.assessor.assess_embedding_quality(nan_result)
+        with self.assertRaises(ValueError):
+            self.assessor.assess_batch_quality(self.embedding_results + [nan_result])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Unit tests for IntervalIndex
+
+Property tests comparing merging and every query with the linear scans
+the chunkers used before the index.
+"""
+
+import random
+
+import pytest
+from .interval_index import (
+    IntervalIndex,
+    merge_intervals,
+    join_labels,
+    join_distinct_labels,
+    keep_first_label
+)
+
+
+def linear_merge(regions, gap, combine):
+    """Merge as the detectors did, one region at a time"""
+    if not regions:
+        return []
+    sorted_regions = sorted(regions, key=lambda x: x[0])
+    merged = [sorted_regions[0]]
+    for current in sorted_regions[1:]:
+        last = merged[-1]
+        if current[0] <= last[1] + gap:
+            merged[-1] = (last[0], max(last[1], current[1]), combine(last[2], current[2]))
+        else:
+            merged.append(current)
+    return merged
+
+
+def random_regions(rng, count, length=500):
+    """Random, possibly overlapping labelled regions"""
+    regions = []
+    for _ in range(count):
+        start = rng.randrange(length)
+        end = min(length, start + rng.randint(1, 40))
+        regions.append((start, end, rng.choice(['math', 'definition', 'example'])))
+    return regions
+
+
+def touching_regions(rng, count):
+    """Sorted regions that may touch but not overlap, like regex match spans"""
+    regions = []
+    position = 0
+    for _ in range(count):
+        start = position + rng.choice([0, 0, 1, 5, 20])
+        end = start + rng.randint(1, 15)
+        regions.append((start, end, None))
+        position = end
+    return regions
+
+
+class TestMergeIntervals:
+    """Test merging against the per-detector merge loops"""
+
+    @pytest.mark.parametrize("gap, combine", [
+        (10, join_labels),
+        (0, keep_first_label),
+        (20, join_distinct_labels),
+    ])
+    def test_matches_linear_merge(self, gap, combine):
+        """Each detector's policy gives the same regions as its old loop"""
+        rng = random.Random(gap)
+        for _ in range(300):
+            regions = random_regions(rng, rng.randint(0, 30))
+            assert merge_intervals(regions, gap, combine) == linear_merge(regions, gap, combine)
+
+    def test_unlabelled_intervals(self):
+        """(start, end) pairs merge with a None label"""
+        merged = merge_intervals([(5, 9), (0, 3), (3, 4)])
+        assert merged == [(0, 4, None), (5, 9, None)]
+
+    def test_label_policies(self):
+        """Label policies combine in start order"""
+        regions = [(0, 5, 'math'), (3, 8, 'math'), (6, 9, 'example')]
+        assert merge_intervals(regions, combine=join_labels) == [(0, 9, 'math+math+example')]
+        assert merge_intervals(regions, combine=join_distinct_labels) == [(0, 9, 'math+example')]
+        assert merge_intervals(regions, combine=keep_first_label) == [(0, 9, 'math')]
+
+
+class TestIntervalIndex:
+    """Test index queries against linear scans"""
+
+    def setup_method(self):
+        rng = random.Random(7)
+        self.cases = [IntervalIndex.merged(random_regions(rng, rng.randint(0, 40)), gap=rng.choice([0, 10]))
+                      for _ in range(100)]
+        self.cases += [IntervalIndex(touching_regions(rng, rng.randint(0, 30))) for _ in range(100)]
+
+    def test_containing(self):
+        """Inclusive and strict containment match a scan of every region"""
+        for index in self.cases:
+            for position in range(-2, 600, 3):
+                inclusive = [r for r in index if r[0] <= position <= r[1]]
+                strict = [r for r in index if r[0] < position < r[1]]
+
+                assert (position in index) == bool(inclusive)
+                assert index.containing(position) == (inclusive[-1] if inclusive else None)
+                assert index.containing(position, inclusive=False) == (strict[0] if strict else None)
+
+    def test_overlapping_and_within(self):
+        """Overlap and enclosure queries match a scan of every region"""
+        rng = random.Random(11)
+        for index in self.cases:
+            for _ in range(30):
+                start = rng.randrange(-5, 600)
+                end = start + rng.randint(0, 80)
+
+                overlapping = [r for r in index if r[0] < end and r[1] > start]
+                assert index.overlapping(start, end) == overlapping
+                assert index.overlaps(start, end) == bool(overlapping)
+                assert index.within(start, end) == [r for r in index if r[0] >= start and r[1] <= end]
+
+    def test_nearest_edge(self):
+        """Nearest edge is the closest start or end, the earlier one on ties"""
+        for index in self.cases:
+            edges = sorted(edge for r in index for edge in r[:2])
+            for position in range(-2, 600, 7):
+                expected = min(edges, key=lambda e: (abs(e - position), e)) if edges else None
+                assert index.nearest_edge(position) == expected
+
+    def test_empty_index(self):
+        """Queries on an empty index find nothing"""
+        index = IntervalIndex()
+        assert len(index) == 0
+        assert 3 not in index
+        assert index.overlapping(0, 10) == []
+        assert index.within(0, 10) == []
+        assert index.nearest_edge(5) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,176 @@
+"""
+Unit tests for LocalANNIndex
+
+Tests the in-process IVF index used as the vector search fallback, including
+recall against exact search, incremental updates and the index manager fallback.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from .local_ann_index import LocalANNIndex, ANNIndexConfig
+from .neo4j_vector_index_manager import Neo4jVectorIndexManager
+
+
+def make_clustered_vectors(n: int, dims: int = 32, clusters: int = 20, seed: int = 0) -> np.ndarray:
+    """Generate vectors grouped around random cluster centres"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dims))
+    labels = rng.integers(0, clusters, size=n)
+    return (centres[labels] + 0.3 * rng.normal(size=(n, dims))).astype(np.float32)
+
+
+class TestLocalANNIndex:
+    """Test suite for LocalANNIndex"""
+
+    def test_small_index_uses_exact_search(self):
+        """Indexes below the training threshold search exactly"""
+        vectors = make_clustered_vectors(100)
+        index = LocalANNIndex(32, ANNIndexConfig(min_train_size=1000))
+        index.build([f"n{i}" for i in range(100)], vectors)
+
+        assert not index.is_trained
+        results = index.search(vectors[7], k=5)
+        assert results[0][0] == "n7"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert results == index.exact_search_batch([vectors[7]], k=5)[0]
+
+    def test_ivf_recall(self):
+        """Approximate search keeps high recall on clustered data"""
+        vectors = make_clustered_vectors(5000)
+        index = LocalANNIndex(32, ANNIndexConfig(min_train_size=1000, n_probe=8))
+        index.build([str(i) for i in range(5000)], vectors)
+
+        assert index.is_trained
+        report = index.measure_recall(k=10, sample_size=100)
+        assert report["recall"] >= 0.9
+        assert report["queries"] == 100
+        assert index.get_statistics()["last_recall"] == report["recall"]
+        # Recall measurement is not counted as served queries
+        assert index.get_statistics()["total_queries"] == 0
+
+    def test_batch_results_in_input_order(self):
+        """Batch search returns one list per query in input order"""
+        vectors = make_clustered_vectors(3000)
+        index = LocalANNIndex(32, ANNIndexConfig(min_train_size=1000))
+        index.build([str(i) for i in range(3000)], vectors)
+
+        queries = vectors[[10, 2000, 5]]
+        results = index.search_batch(queries, k=3)
+        assert [r[0][0] for r in results] == ["10", "2000", "5"]
+        assert all(len(r) == 3 for r in results)
+
+    def test_incremental_add_replace_and_remove(self):
+        """Upserts replace existing vectors and removals hide them"""
+        vectors = make_clustered_vectors(2000)
+        index = LocalANNIndex(32, ANNIndexConfig(min_train_size=1000))
+        index.build([str(i) for i in range(2000)], vectors)
+
+        new_vector = make_clustered_vectors(1, seed=99)
+        index.add(["new"], new_vector)
+        assert len(index) == 2001
+        assert index.search(new_vector[0], k=1)[0][0] == "new"
+
+        index.add(["5"], new_vector * 2)
+        assert len(index) == 2001
+        assert index.search(vectors[5], k=1)[0][0] != "5"
+
+        assert index.remove(["new", "missing"]) == 1
+        assert len(index) == 2000
+        assert all(item_id != "new" for item_id, _ in index.search(new_vector[0], k=10))
+
+    def test_growth_triggers_retrain(self):
+        """Adding past the growth factor retrains the quantizer"""
+        index = LocalANNIndex(32, ANNIndexConfig(min_train_size=500, retrain_growth_factor=2.0))
+        index.build([str(i) for i in range(500)], make_clustered_vectors(500))
+        lists_before = index.stats.n_lists
+
+        extra = make_clustered_vectors(1500, seed=1)
+        index.add([f"x{i}" for i in range(1500)], extra)
+
+        assert index.stats.n_lists > lists_before
+        assert index.search(extra[42], k=1)[0][0] == "x42"
+
+    def test_mismatched_lengths_rejected(self):
+        """ids and vectors must line up"""
+        index = LocalANNIndex(4)
+        with pytest.raises(ValueError):
+            index.add(["a", "b"], np.ones((3, 4)))
+
+    def test_latency_statistics(self):
+        """Search latency is recorded per query"""
+        index = LocalANNIndex(8)
+        index.build(["a", "b"], np.eye(2, 8))
+        index.search_batch(np.eye(2, 8), k=1)
+
+        stats = index.get_statistics()
+        assert stats["total_queries"] == 2
+        assert stats["average_latency_ms"] >= 0.0
+
+
+class FakeConnection:
+    """Connection stand-in whose native vector procedure is unavailable"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.queries = []
+
+    async def execute_query(self, query, params=None):
+        params = params or {}
+        self.queries.append(query)
+
+        if "SHOW INDEXES" in query:
+            return [{
+                "name": "chunkEmbeddingIndex",
+                "state": "ONLINE",
+                "labelsOrTypes": ["Chunk"],
+                "properties": ["embedding"],
+                "options": {"indexConfig": {"vector.dimensions": self.vectors.shape[1]}}
+            }]
+        if "count(n)" in query:
+            return [{"count": len(self.vectors)}]
+        if "db.index.vector.queryNodes" in query:
+            raise RuntimeError("There is no procedure with the name `db.index.vector.queryNodes`")
+        if "id(n) > $last_id" in query:
+            start = params["last_id"] + 1
+            end = min(start + params["page_size"], len(self.vectors))
+            return [
+                {"node_id": i, "embedding": self.vectors[i].tolist()}
+                for i in range(start, end)
+            ]
+        if "id(node) IN $node_ids" in query:
+            return [
+                {"node_id": i, "node": {"chunk_id": f"c{i}", "embedding": [0.0]}}
+                for i in params["node_ids"]
+            ]
+        return []
+
+
+class TestVectorIndexManagerFallback:
+    """Test local ANN fallback in Neo4jVectorIndexManager"""
+
+    def test_fallback_and_batch_search(self):
+        """Failed native search falls back to the local index for single and batch queries"""
+        vectors = make_clustered_vectors(300, dims=16)
+        connection = FakeConnection(vectors)
+        manager = Neo4jVectorIndexManager(connection, local_index_page_size=128)
+
+        results = asyncio.run(manager.vector_search("chunkEmbeddingIndex", vectors[3].tolist(), limit=3))
+        assert results[0].node_id == "3"
+        assert results[0].node_properties == {"chunk_id": "c3"}
+        assert manager.native_search_available["chunkEmbeddingIndex"] is False
+
+        native_calls = sum("db.index.vector.queryNodes" in q for q in connection.queries)
+        batch = asyncio.run(manager.batch_vector_search(
+            "chunkEmbeddingIndex",
+            [vectors[10].tolist(), vectors[20].tolist()],
+            limit_per_query=2
+        ))
+        assert [r[0].node_id for r in batch] == ["10", "20"]
+        assert sum("db.index.vector.queryNodes" in q for q in connection.queries) == native_calls
+
+        stats = manager.get_local_index_stats("chunkEmbeddingIndex")
+        assert stats["chunkEmbeddingIndex"]["size"] == 300
+        assert stats["chunkEmbeddingIndex"]["last_recall"] is not None
@@ -0,0 +1,213 @@
+"""
+Unit tests for Neo4jConnectionManager batch writes
+
+Tests the UNWIND rewrite of per-record queries, payload-bounded batching,
+splitting of failed batches, the per-record fallback for rejected bulk
+statements and the write summary.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from neo4j.exceptions import ClientError, CypherSyntaxError, DatabaseError, TransientError
+
+from . import neo4j_connection_manager as connection_module
+from .neo4j_connection_manager import ConnectionConfig, Neo4jConnectionManager
+
+QUERY = "MERGE (c:Chunk {chunk_id: $chunk_id}) SET c.text = $text"
+
+
+class FakeResult:
+    async def consume(self):
+        pass
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = []
+
+    async def run(self, query, parameters):
+        self.driver.statements.append(query)
+        rows = parameters["rows"] if query.startswith("UNWIND $rows") else [parameters]
+        failure = self.driver.fail(query, rows)
+        if failure:
+            raise failure
+        self.pending.extend(row["chunk_id"] for row in rows)
+        return FakeResult()
+
+    async def commit(self):
+        self.driver.committed.append(self.pending)
+
+    async def rollback(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def begin_transaction(self):
+        return FakeTransaction(self.driver)
+
+    async def close(self):
+        pass
+
+
+class FakeDriver:
+    """Records statements and committed transactions; fail decides which statements raise"""
+
+    def __init__(self, fail=None):
+        self.fail = fail or (lambda query, rows: None)
+        self.statements = []
+        self.committed = []
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+
+def records(count, text_size=10):
+    return [{"chunk_id": f"chunk_{i}", "text": "x" * text_size} for i in range(count)]
+
+
+class TestBulkQueryRewrite:
+    """Test suite for _build_bulk_query"""
+
+    def test_parameters_in_string_literals_are_kept(self):
+        bulk = Neo4jConnectionManager._build_bulk_query(
+            "MERGE (c:Chunk {chunk_id: $chunk_id}) SET c.note = 'costs $price', c.tag = \"$tag\""
+        )
+
+        assert bulk.startswith("UNWIND $rows AS __bulk_row_0\n")
+        assert "{chunk_id: __bulk_row_0.chunk_id}" in bulk
+        assert "'costs $price'" in bulk and '"$tag"' in bulk
+
+    def test_alias_does_not_collide(self):
+        """User variables named row and names like the alias are left alone"""
+        bulk = Neo4jConnectionManager._build_bulk_query(
+            "MERGE (row:Chunk {chunk_id: $chunk_id}) SET row.__bulk_row_0 = $value"
+        )
+
+        assert bulk.startswith("UNWIND $rows AS __bulk_row_1\n")
+        assert "(row:Chunk {chunk_id: __bulk_row_1.chunk_id})" in bulk
+        assert "row.__bulk_row_0 = __bulk_row_1.value" in bulk
+
+    def test_non_unwindable_queries_run_per_record(self):
+        for query in (
+            "MATCH (c:Chunk {chunk_id: $chunk_id}) WITH c MATCH (c)-[r]->() DELETE r",
+            "MATCH (c:Chunk {textbook_id: $textbook_id}) RETURN count(c) as count",
+            "MATCH (c:Chunk) WHERE c.score > $min RETURN c ORDER BY c.score LIMIT 5",
+        ):
+            assert Neo4jConnectionManager._build_bulk_query(query) is None
+
+        # STARTS WITH is a string operator, not a WITH clause
+        assert Neo4jConnectionManager._build_bulk_query(
+            "MATCH (c:Chunk) WHERE c.chunk_id STARTS WITH $prefix SET c.seen = true"
+        ) is not None
+        # Queries that already unwind their rows are sent unchanged
+        unwinding = "UNWIND $rows AS row MERGE (c:Chunk {chunk_id: row.chunk_id})"
+        assert Neo4jConnectionManager._build_bulk_query(unwinding) == unwinding
+
+
+class TestBatchSplitting:
+    """Test suite for _split_batches"""
+
+    def test_batches_bounded_by_payload_size(self):
+        rows = [{"chunk_id": f"chunk_{i}", "embedding": [0.1] * 100} for i in range(10)]
+        row_bytes = connection_module._estimate_payload_bytes(rows[0])
+
+        batches = Neo4jConnectionManager._split_batches(rows, 100, 3 * row_bytes)
+
+        assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+        assert [row for batch in batches for row in batch] == rows
+
+    def test_batch_size_and_oversized_rows(self):
+        rows = records(5)
+        assert [len(b) for b in Neo4jConnectionManager._split_batches(rows, 2, 10 ** 6)] == [2, 2, 1]
+        # A row larger than the limit still gets written, on its own
+        assert [len(b) for b in Neo4jConnectionManager._split_batches(rows, 10, 1)] == [1] * 5
+
+
+class TestBatchWrite:
+    """Test suite for execute_batch_write against a fake driver"""
+
+    def manager(self, driver, **config):
+        manager = Neo4jConnectionManager(ConnectionConfig(
+            uri="bolt://localhost:7687", username="neo4j", password="test",
+            retry_delay_seconds=0.0, **config
+        ))
+        manager.driver = driver
+        manager._initialized = True
+        return manager
+
+    def write(self, driver, data, **kwargs):
+        return asyncio.run(self.manager(driver).execute_batch_write(QUERY, data, **kwargs))
+
+    def test_failed_batch_is_split_to_isolate_bad_record(self):
+        def fail(query, rows):
+            if any(row["chunk_id"] == "chunk_5" for row in rows):
+                return DatabaseError("Node too large")
+
+        driver = FakeDriver(fail)
+        summary = self.write(driver, records(8), batch_size=8)
+
+        assert summary["processed"] == 7 and summary["failed"] == 1
+        assert summary["batch_splits"] == 3  # 8 -> 4 -> 2 -> 1
+        assert "Node too large" in summary["errors"][0]
+        committed = [chunk_id for batch in driver.committed for chunk_id in batch]
+        assert sorted(committed) == sorted(r["chunk_id"] for r in records(8) if r["chunk_id"] != "chunk_5")
+        # Only committed batches are counted
+        assert summary["batches"] == len(driver.committed) == 3
+
+    def test_rejected_bulk_statement_falls_back_per_record(self):
+        """A ClientError from the rewrite retries the batch with the original query"""
+        def fail(query, rows):
+            if query.startswith("UNWIND") and len(driver.statements) == 1:
+                return ClientError("Unsupported in UNWIND")
+
+        driver = FakeDriver(fail)
+        summary = self.write(driver, records(6), batch_size=3)
+
+        assert summary["processed"] == 6 and summary["failed"] == 0
+        assert summary["batch_splits"] == 0
+        # First batch: one rejected UNWIND, then three single records; second batch stays bulk
+        assert [s.startswith("UNWIND") for s in driver.statements] == [True, False, False, False, True]
+        assert summary["batches"] == 4
+        assert summary["mode"] == "unwind"
+
+    def test_syntax_error_disables_rewrite_for_later_batches(self):
+        def fail(query, rows):
+            if query.startswith("UNWIND"):
+                return CypherSyntaxError("Invalid input")
+
+        driver = FakeDriver(fail)
+        summary = self.write(driver, records(6), batch_size=3)
+
+        assert summary["processed"] == 6
+        assert sum(s.startswith("UNWIND") for s in driver.statements) == 1
+        assert summary["mode"] == "per_record"
+
+    def test_summary_counts_committed_batches_and_throughput(self, monkeypatch):
+        attempts = []
+
+        def fail(query, rows):
+            attempts.append(rows[0]["chunk_id"])
+            if len(attempts) == 1:
+                return TransientError("Lock timeout")
+
+        clock = iter([100.0, 104.0])
+        monkeypatch.setattr(connection_module, "time", SimpleNamespace(time=lambda: next(clock)))
+        driver = FakeDriver(fail)
+        summary = self.write(driver, records(10), batch_size=5)
+
+        # The retried first batch is counted once
+        assert attempts == ["chunk_0", "chunk_0", "chunk_5"]
+        assert summary["batches"] == 2
+        assert summary["processed"] == 10
+        assert summary["elapsed_seconds"] == pytest.approx(4.0)
+        assert summary["rows_per_second"] == pytest.approx(2.5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,229 @@
+"""
+Unit tests for Neo4jContentIngestion incremental re-ingestion
+
+Tests the content-hash chunk diff, chunk deletion and re-ingesting a
+textbook with added, changed, unchanged and removed chunks.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from .chunk_metadata import ChunkMetadata
+from .neo4j_content_ingestion import (
+    Neo4jContentIngestion, TextbookMetadata, chunk_content_hash
+)
+
+TEXTBOOK_ID = "tb_calculus"
+
+
+class FakeConnection:
+    """Keeps chunk nodes in a dict and answers the ingestion queries"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.created = []
+        self.restructured = []
+        self.queries = []
+
+    async def execute_query(self, query, parameters=None):
+        self.queries.append((query, parameters))
+        if "RETURN c.chunk_id as chunk_id, c.content_hash as content_hash" in query:
+            return [
+                {"chunk_id": chunk_id, "content_hash": chunk["content_hash"]}
+                for chunk_id, chunk in self.chunks.items()
+            ]
+        if "c.content_hash IN $hashes" in query:
+            return [
+                {"content_hash": chunk["content_hash"], "embedding": chunk["embedding"]}
+                for chunk in self.chunks.values()
+                if chunk["content_hash"] in parameters["hashes"]
+            ]
+        if "DETACH DELETE c" in query:
+            deleted = [i for i in parameters["chunk_ids"] if self.chunks.pop(i, None)]
+            return [{"count": len(deleted)}]
+        if "MERGE (c:Chunk {chunk_id: chunk.chunk_id})" in query:
+            for row in parameters["chunks"]:
+                self.created.append(row["chunk_id"])
+                self.chunks[row["chunk_id"]] = self.node(row, row["text"], row["embedding"])
+            return []
+        if "MATCH (c:Chunk {chunk_id: chunk.chunk_id})" in query:
+            for row in parameters["chunks"]:
+                self.restructured.append(row["chunk_id"])
+                stored = self.chunks[row["chunk_id"]]
+                self.chunks[row["chunk_id"]] = self.node(row, stored["text"], stored["embedding"])
+            return []
+        return []
+
+    @staticmethod
+    def node(row, text, embedding):
+        return {
+            "text": text,
+            "content_hash": chunk_content_hash(text),
+            "embedding": embedding,
+            "start_position": row["start_position"],
+            "section_id": row["parent_section_id"],
+        }
+
+
+class FakeIndexManager:
+    def __init__(self):
+        self.invalidated = 0
+
+    async def refresh_local_indexes(self, node_label, key_property, keys):
+        pass
+
+    def invalidate_local_index(self, index_name=None):
+        self.invalidated += 1
+
+
+class FakeQueryCache:
+    def __init__(self):
+        self.invalidations = []
+
+    async def invalidate_tags(self, tags, textbook_ids=None):
+        self.invalidations.append((set(tags), textbook_ids))
+        return 0
+
+
+def stored_chunk(text, embedding, start_position, section_id):
+    return {
+        "text": text,
+        "content_hash": chunk_content_hash(text),
+        "embedding": embedding,
+        "start_position": start_position,
+        "section_id": section_id,
+    }
+
+
+def structure_element(element_type, content, start, end):
+    return SimpleNamespace(
+        element_type=element_type, content=content, level=1,
+        start_position=start, end_position=end
+    )
+
+
+class TestIncrementalIngestion:
+    """Test suite for chunk diffing and incremental re-ingestion"""
+
+    def setup_method(self):
+        # Stored textbook: intro and limits in section 1, series in section 2
+        self.connection = FakeConnection({
+            "chunk_intro": stored_chunk("Intro to calculus", [0.1, 0.2], 0, f"{TEXTBOOK_ID}_sec_1"),
+            "chunk_limits": stored_chunk("Limits, first draft", [0.3, 0.4], 60, f"{TEXTBOOK_ID}_sec_1"),
+            "chunk_series": stored_chunk("Power series", [0.5, 0.6], 150, f"{TEXTBOOK_ID}_sec_2"),
+        })
+        self.index_manager = FakeIndexManager()
+        self.query_cache = FakeQueryCache()
+        self.ingestion = Neo4jContentIngestion(
+            self.connection, self.index_manager, query_cache=self.query_cache
+        )
+
+        # New edition: a preface moves intro into section 2, limits is rewritten,
+        # series is renumbered and the old chunk_series id disappears
+        self.new_chunks = [
+            self.chunk("chunk_preface", "Preface", 0, 40),
+            self.chunk("chunk_intro", "Intro to calculus", 110, 140),
+            self.chunk("chunk_limits", "Limits, second draft", 150, 190),
+            self.chunk("chunk_series_2", "Power series", 200, 240),
+        ]
+
+    @staticmethod
+    def chunk(chunk_id, text, start, end):
+        metadata = ChunkMetadata(
+            book_id=TEXTBOOK_ID, chunk_id=chunk_id, start_position=start, end_position=end
+        )
+        return metadata, text, None
+
+    def diff(self):
+        return asyncio.run(self.ingestion.diff_chunks(
+            TEXTBOOK_ID,
+            [(metadata.chunk_id, chunk_content_hash(text)) for metadata, text, _ in self.new_chunks]
+        ))
+
+    def test_diff_classifies_chunks(self):
+        """Chunks are matched by id and compared by content hash"""
+        diff = self.diff()
+
+        assert sorted(diff.new) == ["chunk_preface", "chunk_series_2"]
+        assert diff.changed == ["chunk_limits"]
+        assert diff.unchanged == ["chunk_intro"]
+        assert diff.removed == ["chunk_series"]
+        assert diff.to_write == {"chunk_preface", "chunk_series_2", "chunk_limits"}
+
+    def test_diff_reuses_embeddings_of_moved_content(self):
+        """Content stored under another id keeps its embedding"""
+        diff = self.diff()
+
+        assert diff.stored_embedding(chunk_content_hash("Power series")) == [0.5, 0.6]
+        assert diff.stored_embedding(chunk_content_hash("Preface")) is None
+        # Unchanged chunks are not written, so their embeddings are not fetched
+        assert diff.stored_embedding(chunk_content_hash("Intro to calculus")) is None
+
+    def test_delete_chunks(self):
+        """Deleted chunks drop local indexes and cached reads for the textbook"""
+        deleted = asyncio.run(self.ingestion.delete_chunks(
+            ["chunk_series", "chunk_missing"], TEXTBOOK_ID
+        ))
+
+        assert deleted == 1
+        assert set(self.connection.chunks) == {"chunk_intro", "chunk_limits"}
+        assert self.index_manager.invalidated == 1
+        assert self.query_cache.invalidations[-1][1] == [TEXTBOOK_ID]
+        assert asyncio.run(self.ingestion.delete_chunks([])) == 0
+
+    def test_reingest_writes_only_new_and_changed_chunks(self):
+        """Re-ingesting a textbook skips, updates and deletes the right chunks"""
+        notified = []
+
+        async def listener(textbook_id, chunk_ids, removed_chunk_ids):
+            notified.append((textbook_id, sorted(chunk_ids), removed_chunk_ids))
+
+        self.ingestion.add_ingestion_listener(listener)
+        processing_result = SimpleNamespace(structure_elements=[
+            structure_element("chapter", "Chapter 1 Foundations", 0, 300),
+            structure_element("section", "1.1 Preliminaries", 0, 100),
+            structure_element("section", "1.2 Limits and series", 101, 300),
+        ])
+        metadata = TextbookMetadata(
+            textbook_id=TEXTBOOK_ID, title="Calculus", subject="Mathematics", authors=[],
+            source_file="calculus.pdf", processing_date=datetime.utcnow(), processing_version="2.0",
+            quality_metrics=dict.fromkeys(
+                ["extraction_confidence", "structure_quality", "content_coherence", "overall_quality"], 0.9
+            ),
+            statistics=dict.fromkeys(["total_chapters", "total_sections", "total_words"], 1)
+        )
+
+        result = asyncio.run(self.ingestion.ingest_processing_result(
+            processing_result, self.new_chunks, metadata
+        ))
+
+        assert result.success, result.errors
+        assert sorted(self.connection.created) == ["chunk_limits", "chunk_preface", "chunk_series_2"]
+        assert result.chunks_skipped == ["chunk_intro"]
+        assert result.chunks_deleted == ["chunk_series"]
+        assert set(self.connection.chunks) == {
+            "chunk_preface", "chunk_intro", "chunk_limits", "chunk_series_2"
+        }
+
+        chunks = self.connection.chunks
+        assert chunks["chunk_limits"]["text"] == "Limits, second draft"
+        # Moved content reuses the embedding stored under its old id
+        assert chunks["chunk_series_2"]["embedding"] == [0.5, 0.6]
+        assert chunks["chunk_preface"]["embedding"] is None
+
+        # The unchanged chunk keeps its embedding but follows its new section
+        assert self.connection.restructured == ["chunk_intro"]
+        assert chunks["chunk_intro"]["embedding"] == [0.1, 0.2]
+        assert chunks["chunk_intro"]["start_position"] == 110
+        assert chunks["chunk_intro"]["section_id"] == f"{TEXTBOOK_ID}_sec_2"
+
+        assert notified == [(
+            TEXTBOOK_ID, ["chunk_limits", "chunk_preface", "chunk_series_2"], ["chunk_series"]
+        )]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
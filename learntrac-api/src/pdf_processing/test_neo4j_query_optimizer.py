@@ -0,0 +1,70 @@
+"""
+Unit tests for Neo4jQueryCache tag-based invalidation
+
+Tests that cached results are tagged with every label their query reads
+and are dropped when a write touches one of those labels.
+"""
+
+import asyncio
+
+import pytest
+
+from .neo4j_query_optimizer import Neo4jQueryCache, label_tag
+
+
+class TestQueryCacheTags:
+    """Test suite for Neo4jQueryCache dependency tags"""
+
+    def setup_method(self):
+        self.cache = Neo4jQueryCache()
+
+    def labels(self, query):
+        return {
+            tag for tag in self.cache._derive_tags(query, {})
+            if tag.startswith("label:")
+        }
+
+    def test_labels_in_where_and_label_chains(self):
+        """Labels outside the first node pattern position are found"""
+        assert label_tag("Chunk") in self.labels("MATCH (n) WHERE n:Chunk RETURN n")
+        assert self.labels("MATCH (n:Concept:Topic) RETURN n") >= {
+            label_tag("Concept"), label_tag("Topic")
+        }
+        assert self.labels("MATCH (n:`Section Title`|Chapter) RETURN n") >= {
+            label_tag("Section Title"), label_tag("Chapter")
+        }
+
+    def test_string_literals_are_ignored(self):
+        """Colons inside strings are not taken as labels"""
+        tags = self.labels("MATCH (c:Chunk) WHERE c.text = 'ratio 1:Chunky' RETURN c")
+        assert label_tag("Chunky") not in tags
+        assert label_tag("Chunk") in tags
+
+    def test_unknown_labels_are_tagged_conservatively(self):
+        """Queries without labels or with run-time labels depend on everything"""
+        for query in (
+            "MATCH (n) RETURN n",
+            "MATCH (n:Chunk) WHERE $label IN labels(n) RETURN n",
+            "MATCH (n:$($label)) RETURN n",
+        ):
+            assert self.labels(query) == {label_tag("*")}
+
+        assert self.labels("MATCH (c:Chunk {chunk_id: $id}) RETURN c") == {label_tag("Chunk")}
+
+    def test_write_invalidates_where_label_reads(self):
+        """A Chunk write drops results that filtered on n:Chunk only"""
+        async def run():
+            await self.cache.put("MATCH (n) WHERE n:Chunk RETURN n", {}, [1])
+            await self.cache.put("MATCH (t:Textbook) RETURN t", {}, [2])
+            removed = await self.cache.invalidate_tags([label_tag("Chunk")])
+            return (
+                removed,
+                await self.cache.get("MATCH (n) WHERE n:Chunk RETURN n", {}),
+                await self.cache.get("MATCH (t:Textbook) RETURN t", {})
+            )
+
+        assert asyncio.run(run()) == (1, None, [2])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
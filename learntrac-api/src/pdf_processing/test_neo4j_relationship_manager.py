@@ -0,0 +1,151 @@
+"""
+Unit tests for Neo4jRelationshipManager similarity graph updates
+
+Tests the corpus-wide blocked kNN against brute-force neighbours on a small
+corpus, for full builds and incremental runs, and batched deletion of stale
+edges.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from .neo4j_relationship_manager import Neo4jRelationshipManager
+
+
+class FakeConnection:
+    """Serves chunk embedding pages and records SIMILAR_TO writes"""
+
+    def __init__(self, vectors, indexed=None):
+        self.chunks = {
+            f"chunk-{i:03d}": (vector.tolist(), bool(indexed is not None and indexed[i]))
+            for i, vector in enumerate(vectors)
+        }
+        self.edges = {}
+        self.build_ids = {}
+        self.deletes = []
+
+    async def execute_query(self, query, parameters=None):
+        if "DELETE r" in query:
+            stale = [pair for pair in self.edges if self.build_ids.get(pair) != parameters["build_id"]]
+            for pair in stale[:parameters["batch_size"]]:
+                del self.edges[pair]
+            self.deletes.append(min(len(stale), parameters["batch_size"]))
+            return [{"deleted": self.deletes[-1]}]
+        if "c.embedding as embedding" not in query:
+            return []
+        records = [
+            {"chunk_id": chunk_id, "embedding": embedding, "pending": not indexed}
+            for chunk_id, (embedding, indexed) in sorted(self.chunks.items())
+            if chunk_id > parameters["after"]
+        ]
+        return records[:parameters["page_size"]]
+
+    async def execute_batch_write(self, query, data, **kwargs):
+        if "MERGE (a)-[r:SIMILAR_TO]-(b)" in query:
+            for row in data:
+                pair = tuple(sorted((row["source_id"], row["target_id"])))
+                self.edges[pair] = row["similarity"]
+                self.build_ids[pair] = row["build_id"]
+        return {"processed": len(data), "failed": 0, "rows_per_second": 0.0}
+
+
+def brute_force_edges(vectors, rows, candidates, k, threshold):
+    """Reference edges from the full similarity matrix, on the (1 + cosine) / 2 scale"""
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ normalized.T
+    np.fill_diagonal(scores, -np.inf)
+    edges = {}
+    for row in rows:
+        row_scores = np.full(len(vectors), -np.inf)
+        row_scores[candidates] = scores[row, candidates]
+        for index in np.argsort(-row_scores, kind="stable")[:k]:
+            similarity = (1 + float(row_scores[index])) / 2
+            if similarity >= threshold:
+                pair = tuple(sorted((f"chunk-{row:03d}", f"chunk-{index:03d}")))
+                edges[pair] = similarity
+    return edges
+
+
+class TestSimilarityRelationships:
+    """Test suite for update_similarity_relationships"""
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        centres = rng.normal(size=(4, 12))
+        self.vectors = np.vstack([
+            centre + 0.5 * rng.normal(size=(20, 12)) for centre in centres
+        ]).astype(np.float32)
+
+    def assert_edges_match(self, actual, expected):
+        assert set(actual) == set(expected)
+        for pair, score in expected.items():
+            assert actual[pair] == pytest.approx(score, abs=1e-5)
+
+    def test_full_build_matches_brute_force(self):
+        """Blocked kNN over the corpus equals brute-force neighbours"""
+        connection = FakeConnection(self.vectors)
+        manager = Neo4jRelationshipManager(connection)
+
+        created = asyncio.run(manager.update_similarity_relationships(
+            threshold=0.75, batch_size=16, k=5, block_size=7
+        ))
+
+        everything = np.arange(len(self.vectors))
+        expected = brute_force_edges(self.vectors, everything, everything, 5, 0.75)
+        self.assert_edges_match(connection.edges, expected)
+        assert created == len(expected)
+
+    def test_incremental_matches_brute_force(self):
+        """New chunks rank the whole corpus; existing chunks rank only new ones"""
+        indexed = np.arange(len(self.vectors)) % 3 != 0
+        connection = FakeConnection(self.vectors, indexed)
+        manager = Neo4jRelationshipManager(connection)
+
+        asyncio.run(manager.update_similarity_relationships(
+            threshold=0.75, batch_size=16, k=5, incremental=True, block_size=7
+        ))
+
+        new_rows = np.flatnonzero(~indexed)
+        expected = brute_force_edges(
+            self.vectors, new_rows, np.arange(len(self.vectors)), 5, 0.75
+        )
+        expected.update(brute_force_edges(
+            self.vectors, np.flatnonzero(indexed), new_rows, 5, 0.75
+        ))
+        self.assert_edges_match(connection.edges, expected)
+
+    def test_threshold_uses_index_scale(self):
+        """A threshold of 0.5 is cosine 0, so only opposing neighbours are dropped"""
+        connection = FakeConnection(np.array([[1, 0], [0.6, 0.8], [0, 1], [-1, 0.01]], dtype=np.float32))
+        manager = Neo4jRelationshipManager(connection)
+
+        asyncio.run(manager.update_similarity_relationships(threshold=0.5, k=3))
+
+        assert connection.edges == pytest.approx({
+            ("chunk-000", "chunk-001"): 0.8,
+            ("chunk-000", "chunk-002"): 0.5,
+            ("chunk-001", "chunk-002"): 0.9,
+            ("chunk-002", "chunk-003"): (1 + 0.01 / np.hypot(1, 0.01)) / 2,
+        })
+
+    def test_full_build_deletes_stale_edges_in_batches(self):
+        connection = FakeConnection(self.vectors)
+        stale = {(f"chunk-{i:03d}", f"chunk-{i + 40:03d}"): 0.9 for i in range(5)}
+        connection.edges.update(stale)
+        manager = Neo4jRelationshipManager(connection)
+
+        asyncio.run(manager.update_similarity_relationships(
+            threshold=0.75, batch_size=2, k=5, block_size=7
+        ))
+
+        everything = np.arange(len(self.vectors))
+        expected = brute_force_edges(self.vectors, everything, everything, 5, 0.75)
+        assert not set(stale) & set(expected)
+        self.assert_edges_match(connection.edges, expected)
+        assert connection.deletes == [2, 2, 1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
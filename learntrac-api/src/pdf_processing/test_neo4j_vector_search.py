@@ -0,0 +1,257 @@
+"""
+Unit tests for Neo4jVectorSearch hybrid search
+
+Tests candidate selection of each strategy over the shared candidate pool,
+configurable strategy weights, the single features query and agreement with
+merging separately run strategy searches.
+"""
+
+import asyncio
+import math
+
+import numpy as np
+import pytest
+
+from .neo4j_vector_index_manager import VectorSearchResult
+from .neo4j_vector_search import (
+    DEFAULT_STRATEGY_WEIGHTS, Neo4jVectorSearch, SearchContext, SearchFilters
+)
+
+QUERY = [1.0, 0.0]
+
+# Chunk c<i> is at angle 0.1 * i from the query, so semantic order is c0..c9
+CHUNKS = {
+    f"c{i}": {
+        "embedding": [math.cos(0.1 * i), math.sin(0.1 * i)],
+        "section_id": "sec_2_1",
+        "chapter_id": "ch_2",
+        "concepts": [],
+    }
+    for i in range(10)
+}
+CHUNKS["c1"].update(section_id="sec_1_1", chapter_id="ch_1", concepts=["limits"])
+CHUNKS["c4"].update(section_id="sec_1_2", chapter_id="ch_1")
+CHUNKS["c0"]["concepts"] = ["limits", "derivatives"]
+CHUNKS["c2"]["concepts"] = ["series"]
+CHUNKS["c5"]["concepts"] = ["limits"]
+CHUNKS["c7"]["concepts"] = ["limits", "derivatives"]
+CHUNKS["c8"]["concepts"] = ["limits", "series", "derivatives"]
+
+# The current chunk and learned chunks are not vector search results
+CURRENT = {"section_id": "sec_1_1", "chapter_id": "ch_1"}
+NEXT = {"h0": ["c9"], "c9": ["c6"], "h1": ["c6"]}
+HISTORY = ["h0", "h1"]
+
+
+def semantic_score(chunk_id):
+    return float(np.dot(QUERY, CHUNKS[chunk_id]["embedding"]))
+
+
+def node(chunk_id):
+    chunk = CHUNKS[chunk_id]
+    return {
+        "chunk_id": chunk_id,
+        "concepts": chunk["concepts"],
+        "parent_section_id": chunk["section_id"],
+        "parent_chapter_id": chunk["chapter_id"],
+    }
+
+
+def precedent_count(chunk_id, history):
+    """Learned chunks reaching chunk_id over 1 to 3 NEXT hops"""
+    count = 0
+    for learned in history:
+        frontier, reached = [learned], set()
+        for _ in range(3):
+            frontier = [n for f in frontier for n in NEXT.get(f, [])]
+            reached.update(frontier)
+        count += chunk_id in reached
+    return count
+
+
+class FakeIndexManager:
+    def __init__(self):
+        self.searches = []
+
+    async def vector_search(self, index_name, query_vector, limit, min_score, filters):
+        self.searches.append(limit)
+        results = [
+            VectorSearchResult(node_id=chunk_id, score=semantic_score(chunk_id), node_properties=node(chunk_id))
+            for chunk_id in CHUNKS
+        ]
+        results = [r for r in results if r.score >= min_score]
+        return sorted(results, key=lambda r: r.score, reverse=True)[:limit]
+
+
+class FakeConnection:
+    """Answers the standalone strategy queries and the hybrid features query"""
+
+    def __init__(self):
+        self.queries = []
+
+    async def execute_query(self, query, parameters=None):
+        self.queries.append((query, parameters))
+        if "as same_section" in query:
+            return [self.features(chunk_id, parameters) for chunk_id in parameters["chunk_ids"]]
+        if "RETURN section.section_id as section_id" in query:
+            return [CURRENT]
+        if "concept_matches >= 2" in query:
+            matches = {
+                chunk_id: len(set(chunk["concepts"]) & set(parameters["concepts"]))
+                for chunk_id, chunk in CHUNKS.items() if chunk_id not in parameters["exclude_ids"]
+            }
+            return self.related(matches, "concept_matches", 2, parameters["limit"])
+        if "ORDER BY precedent_count DESC" in query:
+            counts = {
+                chunk_id: precedent_count(chunk_id, parameters["history"])
+                for chunk_id in CHUNKS if chunk_id not in parameters["exclude_ids"]
+            }
+            return self.related(counts, "precedent_count", 1, parameters["limit"])
+        return []
+
+    @staticmethod
+    def related(strengths, name, minimum, limit):
+        """Records of chunks at or above minimum, strongest first"""
+        chunk_ids = sorted((c for c, s in strengths.items() if s >= minimum), key=lambda c: -strengths[c])
+        return [
+            {"chunk_id": c, "embedding": CHUNKS[c]["embedding"], "node": node(c), name: strengths[c]}
+            for c in chunk_ids[:limit]
+        ]
+
+    @staticmethod
+    def features(chunk_id, parameters):
+        chunk = CHUNKS[chunk_id]
+        current = CURRENT if parameters["current_id"] else {}
+        return {
+            "chunk_id": chunk_id,
+            "text": f"Text of {chunk_id}",
+            "content_type": "text",
+            "concepts": chunk["concepts"],
+            "prerequisites": [],
+            "same_section": chunk["section_id"] == current.get("section_id"),
+            "same_chapter": chunk["chapter_id"] == current.get("chapter_id"),
+            "precedent_count": precedent_count(chunk_id, parameters["history"]),
+        }
+
+
+async def separately_merged(search, filters, context, limit):
+    """Hybrid scoring before the candidate pool: each strategy searched on its own"""
+    strategies = [
+        search._semantic_search(QUERY, filters, limit),
+        search._contextual_search(QUERY, filters, context, limit),
+        search._conceptual_search(QUERY, filters, context, limit),
+    ]
+    if context and context.learning_history:
+        strategies.append(search._learning_path_search(QUERY, filters, context, limit))
+    all_results = [await strategy for strategy in strategies]
+
+    merged = {}
+    for weight, results in zip([0.4, 0.2, 0.3, 0.1], all_results):
+        for result in results:
+            score, total = merged.get(result.node_id, (0.0, 0.0))
+            merged[result.node_id] = ((score * total + result.score * weight) / (total + weight), total + weight)
+    ranked = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)
+    return [(chunk_id, score) for chunk_id, (score, _) in ranked[:limit]]
+
+
+class TestHybridSearch:
+    """Test suite for _hybrid_search and _score_candidate_pool"""
+
+    def setup_method(self):
+        self.context = SearchContext(current_chunk_id="current", learning_history=list(HISTORY))
+        self.filters = SearchFilters()
+
+    def search(self, strategy_weights=None):
+        self.index_manager = FakeIndexManager()
+        self.connection = FakeConnection()
+        return Neo4jVectorSearch(
+            self.connection, self.index_manager, embedding_dimension=2,
+            strategy_weights=strategy_weights
+        )
+
+    def hybrid(self, search, limit=6):
+        return asyncio.run(search._hybrid_search(QUERY, self.filters, self.context, limit))
+
+    def pool_scores(self, weights, limit=6):
+        """Scores of the whole fixture as the candidate pool"""
+        search = self.search(weights)
+        pool = asyncio.run(search._semantic_search(QUERY, self.filters, len(CHUNKS)))
+        chunk_ids = [r.node_id for r in pool]
+        features = {
+            chunk_id: FakeConnection.features(chunk_id, {"current_id": "current", "history": HISTORY})
+            for chunk_id in chunk_ids
+        }
+        scores = search._score_candidate_pool(pool, chunk_ids, features, self.filters, self.context, limit)
+        return dict(zip(chunk_ids, scores))
+
+    def selected_by(self, strategy):
+        weights = {name: float(name == strategy) for name in DEFAULT_STRATEGY_WEIGHTS}
+        return {chunk_id: score for chunk_id, score in self.pool_scores(weights).items() if not np.isnan(score)}
+
+    def test_candidate_selection_per_strategy(self):
+        """Each strategy selects the candidates its standalone search would return"""
+        semantic = self.selected_by("semantic")
+        assert sorted(semantic) == ["c0", "c1", "c2", "c3", "c4", "c5"]
+        assert semantic["c3"] == pytest.approx(semantic_score("c3"))
+
+        contextual = self.selected_by("contextual")
+        assert sorted(contextual) == sorted(semantic)
+        assert contextual["c1"] == pytest.approx(min(1.0, semantic_score("c1") * 1.3))
+        assert contextual["c4"] == pytest.approx(min(1.0, semantic_score("c4") * 1.15))
+        assert contextual["c3"] == pytest.approx(semantic_score("c3"))
+
+        # Top limit // 2 plus chunks sharing two concepts with them; c5 shares one
+        conceptual = self.selected_by("conceptual")
+        assert sorted(conceptual) == ["c0", "c1", "c2", "c7", "c8"]
+        assert conceptual["c8"] == pytest.approx(min(1.0, semantic_score("c8") * 1.3))
+
+        # Top limit // 2 plus chunks following learned chunks
+        learning_path = self.selected_by("learning_path")
+        assert sorted(learning_path) == ["c0", "c1", "c2", "c6", "c9"]
+        assert learning_path["c9"] == pytest.approx(semantic_score("c9") * 1.2)
+
+    def test_excluded_chunks_are_not_added_by_graph_strategies(self):
+        self.filters = SearchFilters(exclude_chunk_ids={"c8", "c6"})
+
+        assert sorted(self.selected_by("conceptual")) == ["c0", "c1", "c2", "c7"]
+        assert sorted(self.selected_by("learning_path")) == ["c0", "c1", "c2", "c9"]
+
+    def test_strategy_weights_change_ranking(self):
+        semantic_only = self.hybrid(self.search({"contextual": 0, "conceptual": 0, "learning_path": 0}))
+        assert [r.node_id for r in semantic_only] == ["c0", "c1", "c2", "c3", "c4", "c5"]
+
+        path_heavy = self.hybrid(self.search({"semantic": 0.1, "learning_path": 0.9}))
+        ranking = [r.node_id for r in path_heavy]
+        # Chunks following the learned ones now outrank most semantic matches
+        assert ranking.index("c6") < ranking.index("c2")
+        assert "c5" not in ranking
+
+    def test_one_vector_search_and_one_features_query(self):
+        """Features of the whole pool come from one query"""
+        search = self.search()
+        results = self.hybrid(search, limit=4)
+
+        assert self.index_manager.searches == [4 * search.candidate_pool_factor]
+        assert len(self.connection.queries) == 1
+        query, parameters = self.connection.queries[0]
+        assert parameters == {
+            "chunk_ids": [f"c{i}" for i in range(8)],
+            "current_id": "current",
+            "history": HISTORY,
+        }
+        # _enhance_results reuses the prefetched features instead of querying again
+        assert [r.metadata["enhancement"]["text"] for r in results] == [f"Text of {r.node_id}" for r in results]
+
+    def test_agrees_with_separately_merged_strategies(self):
+        """With every related chunk in the pool the ranking matches the old merge"""
+        search = self.search()
+        expected = asyncio.run(separately_merged(search, self.filters, self.context, 6))
+
+        results = self.hybrid(self.search())
+
+        assert [r.node_id for r in results] == [chunk_id for chunk_id, _ in expected]
+        assert [r.score for r in results] == pytest.approx([score for _, score in expected])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
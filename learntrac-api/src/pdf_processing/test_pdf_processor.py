@@ -6,11 +6,27 @@ Tests the multi-library PDF processing functionality with various scenarios.
 
 import pytest
 import tempfile
+import multiprocessing
 import os
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 
-from .pdf_processor import PDFProcessor, ExtractionMethod, ExtractionResult
+from . import pdf_processor as pdf_processor_module
+from .pdf_processor import (
+    PDFProcessor, ExtractionMethod, ExtractionResult, PageAnalysisOptions, PageRangeTimeoutError
+)
+
+
+def make_pdf(path: Path, page_count: int) -> None:
+    """Write a PDF with one numbered paragraph per page"""
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    for page_num in range(1, page_count + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {page_num}. Derivatives measure rates of change.")
+    doc.save(str(path))
+    doc.close()
 
 
 class TestPDFProcessor:
@@ -165,5 +181,129 @@ class TestPDFProcessor:
             os.unlink(temp_path)
 
 
+
+class TestStreamingExtraction:
+    """Test suite for streaming and page-range extraction"""
+    
+    def setup_method(self):
+        self.processor = PDFProcessor()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.temp_dir.name) / "textbook.pdf"
+        make_pdf(self.pdf_path, 23)
+    
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+    
+    def test_iter_pages_is_lazy_and_ordered(self):
+        """Pages are yielded one at a time in page order"""
+        pages = self.processor.iter_pages(str(self.pdf_path))
+        first = next(pages)
+        assert first.page_number == 1
+        assert "Page 1." in first.text
+        
+        rest = list(pages)
+        assert [p.page_number for p in rest] == list(range(2, 24))
+    
+    def test_iter_pages_range(self):
+        """first_page and last_page select an inclusive 1-based range"""
+        pages = list(self.processor.iter_pages(str(self.pdf_path), first_page=5, last_page=7))
+        assert [p.page_number for p in pages] == [5, 6, 7]
+        assert "Page 6." in pages[1].text
+    
+    @patch.object(pdf_processor_module, 'HAS_FITZ', True)
+    @patch.object(pdf_processor_module, 'fitz')
+    def test_page_analysis_is_opt_in(self, mock_fitz):
+        """Tables, images and confidence are only analysed when requested"""
+        mock_page = MagicMock()
+        mock_page.get_text.return_value = "Some page text. More text."
+        mock_doc = MagicMock()
+        mock_doc.page_count = 2
+        mock_doc.__getitem__.return_value = mock_page
+        mock_fitz.open.return_value = mock_doc
+        
+        pages = list(self.processor.iter_pages(str(self.pdf_path)))
+        assert pages[0].metadata.has_tables is None
+        assert pages[0].metadata.extraction_confidence is None
+        mock_page.find_tables.assert_not_called()
+        mock_page.get_images.assert_not_called()
+        
+        mock_page.find_tables.return_value = []
+        analysis = PageAnalysisOptions(confidence=True, images=True, tables=True)
+        pages = list(self.processor.iter_pages(str(self.pdf_path), analysis=analysis))
+        assert pages[0].metadata.has_tables is False
+        assert pages[0].metadata.extraction_confidence > 0
+        assert mock_page.find_tables.call_count == 2
+    
+    def test_extract_text_skips_tables_by_default(self):
+        """extract_text keeps confidence and images but not table detection"""
+        result = self.processor.extract_text(str(self.pdf_path))
+        assert result.page_count == 23
+        assert result.confidence_score > 0
+        assert all(page.has_tables is None for page in result.metadata['pages'])
+        assert all(page.has_images is False for page in result.metadata['pages'])
+    
+    def test_page_ranges_sequential(self):
+        """Ranges cover every page once, the last one possibly shorter"""
+        ranges = list(self.processor.iter_page_ranges(str(self.pdf_path), pages_per_range=10))
+        assert [(r.start_page, r.end_page) for r in ranges] == [(1, 10), (11, 20), (21, 23)]
+        assert "Page 11." in ranges[1].text
+    
+    def test_page_ranges_parallel_match_sequential(self):
+        """Process-sharded ranges are yielded in order with the same text"""
+        sequential = list(self.processor.iter_page_ranges(str(self.pdf_path), pages_per_range=4))
+        parallel = list(self.processor.iter_page_ranges(str(self.pdf_path), pages_per_range=4, max_workers=2))
+        
+        assert [(r.start_page, r.end_page) for r in parallel] == [(r.start_page, r.end_page) for r in sequential]
+        assert [r.text for r in parallel] == [r.text for r in sequential]
+        assert '\n'.join(r.text for r in parallel) == self.processor.extract_text(str(self.pdf_path)).text
+    
+    def test_page_ranges_parallel_missing_file(self):
+        """Validation errors surface before any worker starts"""
+        with pytest.raises(FileNotFoundError):
+            list(self.processor.iter_page_ranges("/nonexistent/book.pdf", max_workers=2))
+    
+    def test_page_ranges_parallel_timeout(self):
+        """A range that is not extracted in time raises and stops the workers"""
+        class HungResult:
+            def get(self, timeout=None):
+                timeouts.append(timeout)
+                raise multiprocessing.TimeoutError()
+        
+        class HungPool:
+            terminated = False
+            
+            def apply_async(self, func, args):
+                return HungResult()
+            
+            def terminate(self):
+                HungPool.terminated = True
+            
+            def join(self):
+                pass
+        
+        timeouts = []
+        context = SimpleNamespace(Pool=lambda **kwargs: HungPool())
+        with patch.object(pdf_processor_module.multiprocessing, 'get_context', return_value=context):
+            with pytest.raises(PageRangeTimeoutError, match="pages 1-4 of textbook.pdf"):
+                list(self.processor.iter_page_ranges(
+                    str(self.pdf_path), pages_per_range=4, max_workers=2, range_timeout=1.5
+                ))
+        
+        assert timeouts == [1.5]
+        assert HungPool.terminated
+    
+    def test_extract_text_streaming(self):
+        """Ranges are handed over in order and add up to the extract_text result"""
+        pieces = []
+        result = self.processor.extract_text_streaming(str(self.pdf_path), pieces.append, pages_per_range=10)
+        expected = self.processor.extract_text(str(self.pdf_path))
+        
+        assert len(pieces) == 3
+        assert ''.join(pieces) == result.text == expected.text
+        assert result.page_count == 23
+        assert result.method_used == ExtractionMethod.FITZ
+        assert result.confidence_score == expected.confidence_score
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Unit tests for PersistentCache vector storage
+
+Tests the memory-mapped vector file: zero-copy loads, half-precision
+storage, reopening, compaction and migration of pickled BLOB databases.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from .embedding_cache import CacheEntry, PersistentCache
+from .embedding_generator import EmbeddingModel
+from .chunk_metadata import ContentType
+
+
+class TestPersistentCacheStorage(unittest.TestCase):
+    """Test the memory-mapped vector file behind PersistentCache"""
+    
+    def setUp(self):
+        """Set up test persistent cache"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = PersistentCache(self.temp_dir, "test_embeddings.db")
+        
+        # Create test entry
+        self.test_embedding = np.random.rand(768).astype(np.float32)
+        self.test_entry = CacheEntry(
+            key="test_persistent",
+            embedding=self.test_embedding,
+            metadata={"test": "persistent"},
+            model=EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET,
+            content_type=ContentType.TEXT,
+            created_time=time.time(),
+            last_accessed=time.time(),
+            access_count=1,
+            ttl=3600,
+            quality_score=0.8,
+            generation_time=0.1
+        )
+    
+    def tearDown(self):
+        """Clean up test directory"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_loaded_embedding_is_zero_copy_view(self):
+        """Test loaded embeddings are read-only views into the vector file"""
+        self.cache.store(self.test_entry)
+        
+        loaded_entry = self.cache.load("test_persistent")
+        
+        self.assertEqual(loaded_entry.embedding.dtype, np.float32)
+        self.assertFalse(loaded_entry.embedding.flags.owndata)
+        self.assertFalse(loaded_entry.embedding.flags.writeable)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "test_embeddings.vectors")))
+    
+    def test_float16_storage(self):
+        """Test half-precision vector storage"""
+        cache = PersistentCache(self.temp_dir, "half.db", vector_dtype="float16")
+        cache.store(self.test_entry)
+        
+        loaded_entry = cache.load("test_persistent")
+        self.assertEqual(loaded_entry.embedding.dtype, np.float16)
+        np.testing.assert_allclose(loaded_entry.embedding, self.test_embedding, atol=1e-3)
+        self.assertEqual(
+            os.path.getsize(os.path.join(self.temp_dir, "half.vectors")),
+            self.test_embedding.size * 2
+        )
+        cache.close()
+    
+    def test_entries_survive_reopen(self):
+        """Test entries are readable after reopening the cache"""
+        self.cache.store(self.test_entry)
+        self.cache.close()
+        
+        reopened = PersistentCache(self.temp_dir, "test_embeddings.db")
+        loaded_entry = reopened.load("test_persistent")
+        np.testing.assert_array_equal(loaded_entry.embedding, self.test_embedding)
+        reopened.close()
+    
+    def test_compact_reclaims_dead_space(self):
+        """Test compaction after overwrites and deletes"""
+        self.cache.store(self.test_entry)
+        held_view = self.cache.load("test_persistent").embedding
+        
+        self.test_entry.embedding = self.test_embedding * 2
+        self.cache.store(self.test_entry)
+        stats = self.cache.get_statistics()
+        self.assertEqual(stats['dead_vector_bytes'], self.test_embedding.nbytes)
+        
+        reclaimed = self.cache.compact()
+        self.assertEqual(reclaimed, self.test_embedding.nbytes)
+        
+        loaded_entry = self.cache.load("test_persistent")
+        np.testing.assert_array_equal(loaded_entry.embedding, self.test_embedding * 2)
+        # Views handed out before compaction remain valid
+        np.testing.assert_array_equal(held_view, self.test_embedding)
+    
+    def _store_churned_entries(self):
+        """Store entries of mixed sizes, then overwrite and delete some"""
+        rng = np.random.default_rng(0)
+        expected = {}
+        for i in range(30):
+            self.test_entry.key = f"entry_{i}"
+            self.test_entry.embedding = rng.normal(size=16 + i % 5).astype(np.float32)
+            self.cache.store(self.test_entry)
+            expected[self.test_entry.key] = self.test_entry.embedding
+        for i in range(0, 30, 3):
+            self.test_entry.key = f"entry_{i}"
+            self.test_entry.embedding = rng.normal(size=8).astype(np.float32)
+            self.cache.store(self.test_entry)
+            expected[self.test_entry.key] = self.test_entry.embedding
+        for i in range(1, 30, 4):
+            self.cache.delete(f"entry_{i}")
+            del expected[f"entry_{i}"]
+        return expected
+    
+    def assertEntriesReadable(self, cache, expected):
+        loaded = cache.load_many(list(expected))
+        self.assertEqual(set(loaded), set(expected))
+        for key, embedding in expected.items():
+            np.testing.assert_array_equal(loaded[key].embedding, embedding)
+    
+    def test_compact_keeps_every_entry_readable(self):
+        """Test every live entry reads back unchanged after compaction and reopening"""
+        expected = self._store_churned_entries()
+    
+        self.assertGreater(self.cache.compact(), 0)
+        # Only alignment padding between vectors is left
+        self.assertLess(self.cache.get_statistics()['dead_vector_bytes'],
+                        len(expected) * PersistentCache.VECTOR_ALIGNMENT)
+        self.assertEntriesReadable(self.cache, expected)
+    
+        self.cache.close()
+        reopened = PersistentCache(self.temp_dir, "test_embeddings.db")
+        self.assertEntriesReadable(reopened, expected)
+        reopened.close()
+    
+    def test_interrupted_compaction_is_finished_on_open(self):
+        """Test a crash between the offset commit and the file swap loses nothing"""
+        expected = self._store_churned_entries()
+    
+        with patch('os.replace', side_effect=OSError("simulated crash")):
+            self.cache.compact()
+        self.assertTrue(self.cache.compacted_path.exists())
+    
+        reopened = PersistentCache(self.temp_dir, "test_embeddings.db")
+        self.assertFalse(reopened.compacted_path.exists())
+        self.assertEntriesReadable(reopened, expected)
+        reopened.close()
+    
+    def test_uncommitted_compaction_is_discarded_on_open(self):
+        """Test a rewritten file whose offsets never committed is ignored"""
+        expected = self._store_churned_entries()
+        self.cache.close()
+        with open(self.cache.compacted_path, "wb") as stray_file:
+            stray_file.write(b"\1" * 64)
+    
+        reopened = PersistentCache(self.temp_dir, "test_embeddings.db")
+        self.assertFalse(reopened.compacted_path.exists())
+        self.assertEntriesReadable(reopened, expected)
+        reopened.close()
+    
+    def test_legacy_database_migration(self):
+        """Test pickled BLOB databases are migrated on open"""
+        import gzip
+        import pickle
+        import sqlite3
+        
+        legacy_path = os.path.join(self.temp_dir, "legacy.db")
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("""
+                CREATE TABLE embeddings (
+                    key TEXT PRIMARY KEY, model TEXT NOT NULL, content_type TEXT NOT NULL,
+                    embedding BLOB NOT NULL, metadata TEXT NOT NULL, created_time REAL NOT NULL,
+                    last_accessed REAL NOT NULL, access_count INTEGER NOT NULL, ttl INTEGER,
+                    compressed BOOLEAN NOT NULL, optimized BOOLEAN NOT NULL,
+                    quality_score REAL NOT NULL, generation_time REAL NOT NULL
+                )
+            """)
+            for key, compressed in (("plain", False), ("gzipped", True)):
+                blob = pickle.dumps(self.test_embedding)
+                if compressed:
+                    blob = gzip.compress(blob)
+                conn.execute(
+                    "INSERT INTO embeddings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, EmbeddingModel.SENTENCE_TRANSFORMERS_MPNET.value, ContentType.TEXT.value,
+                     blob, '{"legacy": true}', time.time(), time.time(), 3, None,
+                     compressed, False, 0.7, 0.2)
+                )
+        
+        cache = PersistentCache(self.temp_dir, "legacy.db")
+        
+        for key in ("plain", "gzipped"):
+            loaded_entry = cache.load(key)
+            np.testing.assert_array_equal(loaded_entry.embedding, self.test_embedding)
+            self.assertEqual(loaded_entry.metadata, {"legacy": True})
+            self.assertEqual(loaded_entry.access_count, 3)
+        
+        # Migration is one-shot
+        self.assertEqual(cache.migrate_legacy_database(), 0)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
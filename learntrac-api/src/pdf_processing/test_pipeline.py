@@ -18,10 +18,11 @@ from .pipeline import (
     QualityMetrics,
     ProcessingResult
 )
-from .pdf_processor import ExtractionResult, ExtractionMethod
+from .pdf_processor import ExtractionResult, ExtractionMethod, PageRangeTimeoutError
 from .text_cleaner import CleaningResult, CleaningStats
 from .structure_detector import DetectionResult, StructureHierarchy, StructureElement, StructureType
 from .content_filter import FilteringResult, FilteringStats, ContentType
+from .test_pdf_processor import make_pdf
 
 
 class TestPDFProcessingPipeline:
@@ -89,7 +90,7 @@ class TestPDFProcessingPipeline:
                 confidence_score=0.9,
                 metadata={'title': 'Test Book'}
             )
-            mock_processor.return_value.extract_text.return_value = mock_extraction
+            mock_processor.return_value.extract_text_streaming.return_value = mock_extraction
             
             mock_cleaning = CleaningResult(
                 cleaned_text="Chapter 1: Introduction\nThis is educational content.\n\nChapter 2: Advanced Topics\nMore content here.",
@@ -97,7 +98,7 @@ class TestPDFProcessingPipeline:
                 quality_score=0.85,
                 warnings=[]
             )
-            mock_cleaner.return_value.clean_text.return_value = mock_cleaning
+            mock_cleaner.return_value.stream.return_value.result.return_value = mock_cleaning
             
             # Mock structure elements
             mock_elements = [
@@ -166,6 +167,7 @@ class TestPDFProcessingPipeline:
         
         try:
             # Mock extraction failure
+            mock_processor.return_value.extract_text_streaming.side_effect = RuntimeError("Extraction failed")
             mock_processor.return_value.extract_text.side_effect = RuntimeError("Extraction failed")
             
             result = self.pipeline.process_pdf(temp_path)
@@ -194,6 +196,7 @@ class TestPDFProcessingPipeline:
                 confidence_score=0.1,
                 metadata={}
             )
+            mock_processor.return_value.extract_text_streaming.return_value = mock_extraction
             mock_processor.return_value.extract_text.return_value = mock_extraction
             
             result = self.pipeline.process_pdf(temp_path)
@@ -412,6 +415,74 @@ class TestPDFProcessingPipeline:
         assert hasattr(pipeline.structure_detector, 'detect_structure')
         assert hasattr(pipeline.content_filter, 'filter_content')
 
+    
+    def test_fused_cleaning_matches_sequential_pipeline(self):
+        """Windowed cleaning gives the same cleaning and structure results"""
+        pipeline = PDFProcessingPipeline(fused_cleaning=True)
+        pipeline.text_cleaner.window_size = 64
+        text = "".join(
+            f"Chapter {n}: Topic {n}\n\nPage {n}\n\nSome text about topicNumber {n} and $x_{n}$.\n\n"
+            for n in range(1, 8)
+        )
+        
+        result = pipeline.process_text(text)
+        expected = PDFProcessingPipeline().process_text(text)
+        
+        assert result.cleaning_result.cleaned_text == expected.cleaning_result.cleaned_text
+        assert result.cleaning_result.stats == expected.cleaning_result.stats
+        assert result.structure_elements == expected.structure_elements
+        assert pipeline._component_settings()['fused_cleaning'] is True
+    
+    def test_process_pdf_cleans_page_ranges_as_extracted(self, tmp_path):
+        """Streamed extraction and cleaning match cleaning the extracted text"""
+        pdf_path = str(tmp_path / "textbook.pdf")
+        make_pdf(Path(pdf_path), 10)
+        pipeline = PDFProcessingPipeline(pages_per_range=3)
+        pipeline.text_cleaner.window_size = 64
+        
+        with patch.object(pipeline.pdf_processor, 'extract_text') as extract_text:
+            result = pipeline.process_pdf(pdf_path)
+        
+        extract_text.assert_not_called()
+        text = PDFProcessingPipeline().pdf_processor.extract_text(pdf_path).text
+        expected = PDFProcessingPipeline().process_text(text)
+        assert result.extraction_result.text == text
+        assert result.extraction_result.page_count == 10
+        assert result.cleaning_result.cleaned_text == expected.cleaning_result.cleaned_text
+        assert result.cleaning_result.stats == expected.cleaning_result.stats
+        assert ProcessingStage.TEXT_CLEANING in result.metadata.stage_timings
+    
+    def test_process_pdf_falls_back_when_streaming_finds_no_text(self, tmp_path):
+        """Empty streamed text is extracted again with the library fallbacks"""
+        pdf_path = str(tmp_path / "scanned.pdf")
+        make_pdf(Path(pdf_path), 1)
+        empty = ExtractionResult(text=" ", page_count=1, method_used=ExtractionMethod.FITZ,
+                                 confidence_score=0.0, metadata={})
+        fallback = ExtractionResult(text="Chapter 1: Limits\n\nLimits describe behaviour.", page_count=1,
+                                    method_used=ExtractionMethod.PDFPLUMBER, confidence_score=0.8, metadata={})
+        
+        with patch.object(self.pipeline.pdf_processor, 'extract_text_streaming', return_value=empty), \
+                patch.object(self.pipeline.pdf_processor, 'extract_text', return_value=fallback):
+            result = self.pipeline.process_pdf(pdf_path)
+        
+        assert result.extraction_result is fallback
+        assert result.metadata.pdf_processor_method == ExtractionMethod.PDFPLUMBER.value
+        assert result.cleaning_result == self.pipeline.text_cleaner.clean_text(fallback.text)
+    
+    def test_page_range_timeout_fails_document(self, tmp_path):
+        """A stuck extraction worker fails the document instead of retrying it"""
+        pdf_path = str(tmp_path / "textbook.pdf")
+        make_pdf(Path(pdf_path), 1)
+        timeout = PageRangeTimeoutError("Extracting pages 1-25 of textbook.pdf took longer than 300.0s")
+        
+        with patch.object(self.pipeline.pdf_processor, 'extract_text_streaming', side_effect=timeout), \
+                patch.object(self.pipeline.pdf_processor, 'extract_text') as extract_text:
+            result = self.pipeline.process_pdf(pdf_path)
+        
+        extract_text.assert_not_called()
+        assert result.status == ProcessingStatus.FAILED
+        assert "took longer than 300.0s" in result.errors[0]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Unit tests for SearchResultCache
+
+Tests exact and near-duplicate lookups, LRU/TTL bounds and textbook
+invalidation.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from .search_result_cache import SearchResultCache
+
+
+class TestSearchResultCache:
+    """Test suite for SearchResultCache"""
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(10, 32)).astype(np.float32)
+
+    def test_exact_hit_and_miss(self):
+        """Same scope and embedding hit; another scope misses"""
+        cache = SearchResultCache()
+        cache.put("hybrid", self.vectors[0], "results")
+
+        assert cache.get("hybrid", self.vectors[0]) == "results"
+        assert cache.get("semantic", self.vectors[0]) is None
+        assert cache.get("hybrid", self.vectors[1]) is None
+
+        stats = cache.get_statistics()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    def test_quantization_merges_tiny_differences(self):
+        """Scaled and slightly perturbed embeddings share a key"""
+        cache = SearchResultCache()
+        cache.put("hybrid", self.vectors[0], "results")
+
+        assert cache.get("hybrid", self.vectors[0] * 3.0) == "results"
+        assert cache.get("hybrid", self.vectors[0] + 1e-6) == "results"
+
+    def test_near_duplicate_lookup(self):
+        """Similar queries reuse results only when enabled and above the threshold"""
+        query = self.vectors[0] + 0.05 * self.vectors[1]
+
+        exact_only = SearchResultCache()
+        exact_only.put("hybrid", self.vectors[0], "results")
+        assert exact_only.get("hybrid", query) is None
+
+        cache = SearchResultCache(similarity_threshold=0.99)
+        cache.put("hybrid", self.vectors[0], "results")
+        cache.put("hybrid", self.vectors[2], "other")
+
+        assert cache.get("hybrid", query) == "results"
+        assert cache.get("hybrid", self.vectors[3]) is None
+        assert cache.get("semantic", query) is None
+        assert cache.get_statistics()["near_hits"] == 1
+
+    def test_lru_bound(self):
+        """The least recently used entry is evicted first"""
+        cache = SearchResultCache(max_entries=2)
+        cache.put("s", self.vectors[0], 0)
+        cache.put("s", self.vectors[1], 1)
+        cache.get("s", self.vectors[0])
+        cache.put("s", self.vectors[2], 2)
+
+        assert len(cache) == 2
+        assert cache.get("s", self.vectors[1]) is None
+        assert cache.get("s", self.vectors[0]) == 0
+        assert cache.get_statistics()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Expired entries are not returned"""
+        cache = SearchResultCache(ttl_seconds=0.01, similarity_threshold=0.9)
+        cache.put("s", self.vectors[0], "results")
+        time.sleep(0.02)
+
+        assert cache.get("s", self.vectors[0]) is None
+        assert len(cache) == 0
+
+    def test_invalidate_textbook(self):
+        """Entries filtered to other textbooks survive; unfiltered entries do not"""
+        cache = SearchResultCache()
+        cache.put("s", self.vectors[0], "book_a", textbook_ids=["a"])
+        cache.put("s", self.vectors[1], "book_b", textbook_ids=["b"])
+        cache.put("s", self.vectors[2], "both", textbook_ids=["a", "b"])
+        cache.put("s", self.vectors[3], "all")
+
+        assert cache.invalidate_textbook("a") == 3
+        assert cache.get("s", self.vectors[1]) == "book_b"
+        assert cache.get("s", self.vectors[0]) is None
+        assert cache.get("s", self.vectors[3]) is None
+
+    def test_ingestion_listener(self):
+        """The listener invalidates the ingested textbook"""
+        cache = SearchResultCache()
+        cache.put("s", self.vectors[0], "results", textbook_ids=["a"])
+
+        asyncio.run(cache.on_textbook_ingested("a", ["chunk_1"]))
+
+        assert len(cache) == 0
+        assert cache.get_statistics()["invalidations"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
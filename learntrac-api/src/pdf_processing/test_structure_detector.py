@@ -5,6 +5,9 @@ Tests comprehensive document structure detection including chapter/section recog
 confidence scoring, and hierarchy building.
 """
 
+import random
+import time
+
 import pytest
 from .structure_detector import (
     StructureDetector, 
@@ -414,5 +417,91 @@ class TestStructureDetector:
         assert "Mixed Case" in titles
 
 
+
+def per_line_elements(detector: StructureDetector, text: str):
+    """Reference detection that tries each pattern on each stripped line"""
+    elements = []
+    position = 0
+    for line_num, raw_line in enumerate(text.split('\n')):
+        line = raw_line.strip()
+        line_start = position
+        position += len(raw_line) + 1
+        if len(line) < 2:
+            continue
+        element = (detector._detect_chapter(line, line_start, line_num)
+                   or detector._detect_section(line, line_start, line_num)
+                   or detector._detect_heading(line, line_start, line_num))
+        if element:
+            elements.append(element)
+    return elements
+
+
+def synthetic_textbook(chapters: int, sections: int, paragraphs: int) -> str:
+    """Generate a large textbook-like text with mixed heading styles"""
+    parts = ["INTRODUCTION TO PHYSICS\n\nPreface\n"]
+    for chapter in range(1, chapters + 1):
+        parts.append(f"\n  Chapter {chapter}: Motion in {chapter} Dimensions  \n\n")
+        for section in range(1, sections + 1):
+            parts.append(f"{chapter}.{section} Forces and Energy\n")
+            parts.append(f"\t{chapter}.{section}.1 Worked Examples\r\n")
+            for paragraph in range(paragraphs):
+                parts.append(
+                    f"Newton's law {paragraph} relates force and acceleration. "
+                    "A body at rest stays at rest unless acted on by a net force.\n"
+                )
+            parts.append("Key Terms\nA. Velocity and speed\n**Summary**\n\n")
+    return "".join(parts)
+
+
+class TestSinglePassDetection:
+    """Regression tests for the single-pass element detection"""
+    
+    def setup_method(self):
+        self.detector = StructureDetector()
+    
+    def test_matches_per_line_detection(self):
+        """Single pass gives the same elements as trying each pattern per line"""
+        text = synthetic_textbook(chapters=12, sections=5, paragraphs=4)
+        expected = per_line_elements(self.detector, text)
+        
+        assert len(expected) > 100
+        assert self.detector._detect_all_elements(text) == expected
+    
+    def test_matches_per_line_detection_on_random_lines(self):
+        """Whitespace, casing and partial patterns are handled like the per-line detectors"""
+        pieces = ["Chapter", "ch.", "UNIT", "part", "Lesson", "Module", "1", "12", "IV", "iv",
+                  "A.", "b.", "1.2", "1.2.3", ":", ".", "-", " ", "\t", "\r", "\x0c", "\u00a0",
+                  "Intro", "Overview Of", "ABC", "AB CD", "**b**", "*i*", "*", "the", "\n", "\n"]
+        rng = random.Random(7)
+        for _ in range(2000):
+            text = "".join(rng.choice(pieces) + rng.choice(["", " ", "\n"])
+                           for _ in range(rng.randint(1, 25)))
+            assert self.detector._detect_all_elements(text) == per_line_elements(self.detector, text), repr(text)
+    
+    def test_positions_are_raw_line_offsets(self):
+        """start_position is the offset of the line, including its indentation"""
+        text = "Intro text here.\n   Chapter 2: Motion\n"
+        elements = self.detector._detect_all_elements(text)
+        
+        assert elements[0].start_position == text.index("   Chapter 2")
+        assert elements[0].raw_text == "Chapter 2: Motion"
+    
+    def test_benchmark_large_text(self):
+        """Offline benchmark; prints timings against the per-line reference"""
+        text = synthetic_textbook(chapters=40, sections=8, paragraphs=20)
+        
+        start = time.perf_counter()
+        expected = per_line_elements(self.detector, text)
+        per_line_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        elements = self.detector._detect_all_elements(text)
+        single_pass_time = time.perf_counter() - start
+        
+        print(f"\nStructure detection on {len(text)} chars, {text.count(chr(10))} lines: "
+              f"per-line {per_line_time:.3f}s, single pass {single_pass_time:.3f}s")
+        assert elements == expected
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -5,6 +5,8 @@ Tests comprehensive text cleaning functionality including space correction,
 whitespace normalization, and mathematical content preservation.
 """
 
+import random
+
 import pytest
 from .text_cleaner import TextCleaner, CleaningResult, TextIssueType
 
@@ -96,6 +98,32 @@ class TestTextCleaner:
         assert "equation" in result.cleaned_text
         assert len(result.cleaned_text) > 0
     
+    def test_math_placeholders_match_sequential_replacement(self):
+        """Placeholders match pattern-by-pattern string replacement"""
+        pieces = ["The", "value", "is.", "$a+b$", "$$\\int x$$", "\\frac{a}{b}",
+                  "sin(x)", "3 + 4", "\u03c0", "\u2264", "\n"]
+        
+        def sequential(text):
+            placeholders = {}
+            for pattern in self.cleaner.math_patterns:
+                for match in pattern.findall(text):
+                    placeholder = f"MATH_PLACEHOLDER_{len(placeholders):08d}"
+                    placeholders[placeholder] = match
+                    text = text.replace(match, placeholder, 1)
+            return placeholders, text
+        
+        rng = random.Random(5)
+        for _ in range(300):
+            text = " ".join(rng.choice(pieces) for _ in range(rng.randint(1, 60)))
+            assert self.cleaner._preserve_mathematical_content(text) == sequential(text), repr(text)
+    
+    def test_nested_math_is_restored(self):
+        """Math inside a later pattern's match is not left as a placeholder"""
+        result = self.cleaner.clean_text("We take log(2 + 3) and then stop.")
+        
+        assert "MATH_PLACEHOLDER" not in result.cleaned_text
+        assert "2 + 3" in result.cleaned_text
+    
     def test_artifact_removal(self):
         """Test removal of PDF artifacts"""
         test_text = """
@@ -164,7 +192,7 @@ class TestTextCleaner:
     
     def test_unicode_normalization(self):
         """Test Unicode character normalization"""
-        unicode_text = "Smart "quotes" and 'apostrophes' with em—dash and en–dash"
+        unicode_text = "Smart \u201cquotes\u201d and \u2018apostrophes\u2019 with em—dash and en–dash"
         result = self.cleaner.clean_text(unicode_text)
         
         # Should normalize to standard characters
@@ -263,5 +291,108 @@ class TestTextCleaner:
         assert "HTML5" in result.cleaned_text or "HTML 5" in result.cleaned_text
 
 
+
+class TestFusedCleaning:
+    """Tests for fused, windowed cleaning"""
+    
+    PIECES = ["helloWorld", "Page 3", "The", "cat.", "Chapter 2", "1.2", "$a+b$", "$$\\int x$$",
+              "\\frac{a}{b}", "sin(x)", "3 + 4", "\u03c0", "\u201cquote\u201d", "test123", "a,b",
+              "e.g.the", "x=y", "Copyright \u00a9 2020 Foo", "..... 12", "\u2014", "$", "\n", "\n\n", "\n \n", "  ",
+              "\\frac{a", "}", "log(", ")", "of 5", "12", "\uff13"]
+    
+    def setup_method(self):
+        self.reference = TextCleaner()
+    
+    @staticmethod
+    def _outcome(result: CleaningResult):
+        return result.cleaned_text, result.stats, result.quality_score, result.warnings
+    
+    def test_matches_sequential_cleaning(self):
+        """Text, stats and score equal clean_text for any window size or feed pattern"""
+        rng = random.Random(3)
+        for _ in range(500):
+            text = " ".join(rng.choice(self.PIECES) for _ in range(rng.randint(1, 150)))
+            window_size = rng.choice([1, 8, 40, 300])
+            expected = self._outcome(self.reference.clean_text(text))
+            
+            cleaner = TextCleaner(fused=True, window_size=window_size)
+            assert self._outcome(cleaner.clean_text(text)) == expected, repr(text)
+            
+            stream = cleaner.stream()
+            position = 0
+            while position < len(text):
+                size = rng.randint(1, 60)
+                stream.feed(text[position:position + size])
+                position += size
+            assert self._outcome(stream.result()) == expected, repr(text)
+    
+    def test_matches_sequential_document(self):
+        """A document with math across blank lines, artifacts and paragraphs cleans as clean_text does"""
+        paragraphs = []
+        for n in range(1, 30):
+            paragraphs.append(f"Page {n} of 30")
+            paragraphs.append(f"Chapter {n}")
+            paragraphs.append(f"theFirst paragraph {n}.It uses x=y and 2 + {n}, see \\cite{{ref{n}}}.\n"
+                              f"it continues here with sin(x) and \u03c0.")
+            paragraphs.append(f"Display math $a_{n} +\n\nb_{n}$ spans a blank line; log(t\n\n+ {n}) too.")
+            paragraphs.append(f"{n}.{n}")
+        text = "\n\n".join(paragraphs)
+        expected = self._outcome(self.reference.clean_text(text))
+        
+        for window_size in (16, 64, 256):
+            cleaner = TextCleaner(fused=True, window_size=window_size)
+            stream = cleaner.stream()
+            windows = list(stream.clean_windows(text[i:i + 100] for i in range(0, len(text), 100)))
+            
+            assert len(windows) > 1
+            assert self._outcome(stream.result()) == expected
+            assert self._outcome(cleaner.clean_text(text)) == expected
+    
+    def test_exact_counters(self):
+        """Each inserted space, removed artifact and preserved expression is counted once"""
+        text = "Page 1\n\nhelloWorld and x=y with $a+b$\n\n42\n"
+        result = TextCleaner(fused=True, window_size=4).clean_text(text)
+        
+        assert result.cleaned_text == "hello World and x = y with $a+b$"
+        # Counted as _correct_missing_spaces counts: 1, then 1 + 2 for the operator
+        assert result.stats.spaces_added == 4
+        assert result.stats.artifacts_removed == 2
+        assert result.stats.math_content_preserved == 1
+        assert result.stats.original_length == len(text)
+        assert result.stats.cleaned_length == len(result.cleaned_text)
+    
+    def test_clean_windows_yields_before_input_ends(self):
+        """Cleaned windows are produced while later pages are still unread"""
+        pages = [f"Page {n}\n\nparagraphOne on page {n}.\n\n" for n in range(1, 6)]
+        consumed = []
+        
+        def page_source():
+            for page in pages:
+                consumed.append(page)
+                yield page
+        
+        stream = TextCleaner(fused=True, window_size=10).stream()
+        windows = stream.clean_windows(page_source())
+        first = next(windows)
+        
+        assert first == "paragraph One on page 1."
+        assert len(consumed) < len(pages)
+        assert first + "".join(windows) == stream.result().cleaned_text
+    
+    def test_finished_stream_rejects_input(self):
+        """Feeding after finish raises"""
+        stream = TextCleaner(fused=True).stream()
+        stream.feed("Some text.")
+        stream.finish()
+        with pytest.raises(RuntimeError):
+            stream.feed("More text.")
+    
+    def test_empty_input(self):
+        """Whitespace-only input gives the empty result"""
+        result = TextCleaner(fused=True).clean_text("   \n\n  ")
+        assert result.cleaned_text == ""
+        assert result.warnings == ["Input text is empty"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Unit tests for WorkerPool and process-mode batch processing
+
+Tests thread and process execution, per-task timeouts and worker reuse, and
+benchmarks thread mode against process mode on a corpus of sample textbooks.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from .worker_pool import WorkerPool, WorkerPoolConfig, ExecutionMode
+from .pipeline import PDFProcessingPipeline, ProcessingStatus
+from .content_chunker import ContentChunker, ChunkingRequest
+
+
+def make_textbook(seed: int, chapters: int = 5, sections: int = 4) -> str:
+    """Generate the text of a small sample textbook"""
+    parts = [f"Introduction to Calculus, Volume {seed}\n"]
+    for chapter in range(1, chapters + 1):
+        parts.append(f"\nChapter {chapter}: Limits and Derivatives {seed}\n")
+        for section in range(1, sections + 1):
+            parts.append(f"\n{chapter}.{section} Rates of Change\n")
+            for paragraph in range(8):
+                parts.append(
+                    f"Definition {chapter}.{section}.{paragraph}: The derivative of "
+                    f"f(x) = x^{paragraph} + {seed}x measures how quickly f changes. "
+                    "Students should review limits and continuity before working "
+                    "through the exercises at the end of this section.\n"
+                    "Example: estimate the slope of the tangent line using secant lines "
+                    "through nearby points and take the limit as the points approach.\n"
+                )
+    return "".join(parts)
+
+
+def process_pool_config(**kwargs) -> WorkerPoolConfig:
+    """Process-mode pool config with small defaults for tests"""
+    return WorkerPoolConfig(mode=ExecutionMode.PROCESS, max_workers=kwargs.pop('max_workers', 2), **kwargs)
+
+
+class TestWorkerPool:
+    """Test suite for WorkerPool"""
+
+    @pytest.mark.parametrize("mode", list(ExecutionMode))
+    def test_results_in_input_order(self, mode):
+        """Outcomes line up with the submitted arguments"""
+        # threading.Event is a picklable factory whose wait() takes a timeout
+        config = WorkerPoolConfig(mode=mode, max_workers=3)
+        with WorkerPool(threading.Event, config=config) as pool:
+            outcomes = pool.run('wait', [(0.01 * (5 - i),) for i in range(5)])
+
+        assert [o.succeeded for o in outcomes] == [True] * 5
+        assert [o.result for o in outcomes] == [False] * 5
+        assert pool.get_statistics()['tasks_completed'] == 5
+
+    @pytest.mark.parametrize("mode", list(ExecutionMode))
+    def test_errors_are_reported_per_task(self, mode):
+        """A failing task does not affect the others"""
+        with WorkerPool(threading.Event, config=WorkerPoolConfig(mode=mode, max_workers=2)) as pool:
+            outcomes = pool.run('wait', [(0.0,), ("not a number",), (0.0,)])
+
+        assert outcomes[0].succeeded and outcomes[2].succeeded
+        assert not outcomes[1].succeeded
+        assert "TypeError" in outcomes[1].error
+
+    def test_timeout_restarts_process_pool(self):
+        """A hung worker is replaced and the remaining tasks still run"""
+        pool = WorkerPool(threading.Event, config=process_pool_config(task_timeout=0.5))
+        try:
+            start = time.time()
+            outcomes = pool.run('wait', [(0.05,), (30,), (0.05,), (0.05,)])
+            elapsed = time.time() - start
+        finally:
+            pool.terminate()
+
+        assert outcomes[1].timed_out
+        assert "timed out" in outcomes[1].error
+        assert all(outcomes[i].succeeded for i in (0, 2, 3))
+        assert elapsed < 10
+
+        stats = pool.get_statistics()
+        assert stats['tasks_timed_out'] == 1
+        assert stats['pool_starts'] == 2
+
+    def test_worker_initialization_failure(self):
+        """A factory that raises in the worker fails start() instead of hanging"""
+        pool = WorkerPool(threading.Event, {'unexpected': True}, process_pool_config(startup_timeout=30))
+        with pytest.raises(RuntimeError, match="initialization failed"):
+            pool.start()
+        assert not pool.is_running
+
+
+class TestPipelineExecutionModes:
+    """Test batch processing modes in PDFProcessingPipeline and ContentChunker"""
+
+    def setup_method(self):
+        self.texts = [make_textbook(i) for i in range(3)]
+
+    def test_process_mode_matches_thread_mode(self):
+        """Both modes produce the same results, and workers are reused across batches"""
+        pipeline = PDFProcessingPipeline(max_workers=2)
+        try:
+            thread_results = pipeline.process_text_batch(self.texts, execution_mode=ExecutionMode.THREAD)
+            process_results = pipeline.process_text_batch(self.texts, execution_mode=ExecutionMode.PROCESS)
+            pipeline.process_text_batch(self.texts[:1], execution_mode=ExecutionMode.PROCESS)
+
+            pool = pipeline.get_worker_pool(ExecutionMode.PROCESS, 2)
+            assert pool.get_statistics()['pool_starts'] == 1
+        finally:
+            pipeline.close()
+
+        for thread_result, process_result in zip(thread_results, process_results):
+            assert process_result.status == thread_result.status
+            assert process_result.status != ProcessingStatus.FAILED
+            assert process_result.final_text == thread_result.final_text
+            assert len(process_result.structure_elements) == len(thread_result.structure_elements)
+
+    def test_batch_errors_become_failed_results(self):
+        """Missing files give failed results in their input position"""
+        pipeline = PDFProcessingPipeline(max_workers=2, execution_mode=ExecutionMode.PROCESS)
+        try:
+            results = pipeline.process_pdf_batch(["/nonexistent/a.pdf", "/nonexistent/b.pdf"])
+        finally:
+            pipeline.close()
+
+        assert [r.status for r in results] == [ProcessingStatus.FAILED] * 2
+        assert "a.pdf" in results[0].errors[0]
+
+    def test_chunker_process_mode(self):
+        """chunk_batch in process mode keeps input order and parent statistics"""
+        chunker = ContentChunker(max_workers=2, execution_mode=ExecutionMode.PROCESS)
+        requests = [ChunkingRequest(text=text, book_id=f"book_{i}") for i, text in enumerate(self.texts)]
+        try:
+            batch = chunker.chunk_batch(requests)
+        finally:
+            chunker.close()
+
+        expected = ContentChunker().chunk_content(self.texts[1], "book_1")
+        assert batch.successful_documents == 3
+        assert batch.results[1].chunks == expected.chunks
+        assert chunker.get_processing_statistics()['total_documents'] == 3
+
+
+class TestExecutionModeBenchmark:
+    """Thread mode against process mode on a sample textbook corpus"""
+
+    def test_thread_vs_process_benchmark(self):
+        """Offline benchmark; prints timings, only checks that both modes agree"""
+        corpus = [make_textbook(i, chapters=8, sections=5) for i in range(8)]
+        workers = max(2, min(4, os.cpu_count() or 1))
+        pipeline = PDFProcessingPipeline(max_workers=workers)
+
+        try:
+            timings = {}
+            results = {}
+            for mode in ExecutionMode:
+                # Warm-up batch so process start-up is not counted
+                pipeline.process_text_batch(corpus[:workers], execution_mode=mode)
+                start = time.perf_counter()
+                results[mode] = pipeline.process_text_batch(corpus, execution_mode=mode)
+                timings[mode] = time.perf_counter() - start
+        finally:
+            pipeline.close()
+
+        print(f"\nPipeline on {len(corpus)} textbooks with {workers} workers "
+              f"({os.cpu_count()} CPUs): thread {timings[ExecutionMode.THREAD]:.2f}s, "
+              f"process {timings[ExecutionMode.PROCESS]:.2f}s")
+
+        assert [r.final_text for r in results[ExecutionMode.THREAD]] == \
+            [r.final_text for r in results[ExecutionMode.PROCESS]]
@@ -8,10 +8,12 @@ normalize whitespace, and handle special characters while preserving mathematica
 import re
 import logging
 import unicodedata
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Iterable, Iterator, List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from .interval_index import IntervalIndex
+
 
 class TextIssueType(Enum):
     """Types of text issues that can be detected and corrected"""
@@ -60,14 +62,22 @@ class TextCleaner:
     - Quality scoring and validation
     """
     
-    def __init__(self, preserve_mathematical: bool = True):
+    def __init__(self,
+                 preserve_mathematical: bool = True,
+                 fused: bool = False,
+                 window_size: int = 64 * 1024):
         """
         Initialize TextCleaner with configuration options.
         
         Args:
             preserve_mathematical: Whether to preserve mathematical expressions
+            fused: Clean in paragraph-aligned windows with combined patterns
+                instead of one full-document pass per step
+            window_size: Target window size in characters for fused cleaning
         """
         self.preserve_mathematical = preserve_mathematical
+        self.fused = fused
+        self.window_size = window_size
         self.logger = logging.getLogger(__name__)
         
         # Compile regex patterns for efficiency
@@ -122,16 +132,53 @@ class TextCleaner:
         
         # Special character normalization
         self.char_replacements = {
-            '"': '"',  # Smart quotes to regular
-            '"': '"',
-            ''': "'",
-            ''': "'",
+            '\u201c': '"',  # Smart quotes to regular
+            '\u201d': '"',
+            '\u2018': "'",
+            '\u2019': "'",
             '–': '-',  # En dash to hyphen
             '—': '-',  # Em dash to hyphen
             '…': '...',  # Ellipsis
-            ' ': ' ',  # Non-breaking space
-            '\u00A0': ' ',  # Another non-breaking space variant
+            '\u00A0': ' ',  # Non-breaking space
         }
+        
+        # Fixed-width placeholders, so restoring one never touches a longer one
+        self.placeholder_pattern = re.compile(r'MATH_PLACEHOLDER_\d{8}')
+        
+        self._compile_fused_patterns()
+    
+    def _compile_fused_patterns(self) -> None:
+        """
+        Compile the patterns used by fused cleaning.
+        
+        Space correction runs as two passes instead of one per pattern. Every
+        space pattern but the operator one inserts a space between two adjacent
+        characters, and no two of them apply to the same pair, so one pass of
+        zero-width boundaries (one group per pattern, for counting) inserts the
+        same spaces. The concatenated-word and abbreviation patterns never
+        match after the first and fourth boundaries and are left out.
+        """
+        # Spaced operators consume the letter after them, as the sequential pattern did
+        self.fused_operator_pattern = re.compile(r'([a-zA-Z])([+\-*/=])([a-zA-Z])')
+        
+        self.fused_boundary_pattern = re.compile('|'.join([
+            r'(?<=[a-z])(?=[A-Z])()',
+            r'(?<=[a-zA-Z])(?=\d)()',
+            r'(?<=\d)(?=[a-zA-Z])()',
+            r'(?<=[.!?])(?=[A-Z])()',
+            r'(?<=\.)(?=[a-z])()',
+            r'(?<=[,;:])(?=[A-Za-z])()',
+        ]))
+        self.operator_pattern_index = 6  # Position of the operator pattern in space_patterns
+        
+        # Math that is still open at the end of the buffered text
+        self.open_math_patterns = [
+            re.compile(r'\\[a-zA-Z]+\{[^}]*\Z'),  # LaTeX command without its closing brace
+            re.compile(r'\b(?:sin|cos|tan|log|ln|exp|lim|int|sum|prod|sqrt)\s*\([^)]*\Z'),
+        ]
+        
+        self.paragraph_break_pattern = re.compile(r'\n[^\S\n]*\n')
+        self.char_translation = str.maketrans(self.char_replacements)
     
     def clean_text(self, text: str) -> CleaningResult:
         """
@@ -151,6 +198,13 @@ class TextCleaner:
                 warnings=["Input text is empty"]
             )
         
+        if self.fused:
+            stream = self.stream()
+            for start in range(0, len(text), self.window_size):
+                stream.feed(text[start:start + self.window_size])
+            stream.finish()
+            return stream.result()
+        
         original_length = len(text)
         warnings = []
         issues_detected = {issue: 0 for issue in TextIssueType}
@@ -221,26 +275,38 @@ class TextCleaner:
         if not self.preserve_mathematical:
             return {}, text
         
+        # Earlier patterns take precedence; a match overlapping content they
+        # claimed stays text
+        claimed = IntervalIndex()
         math_placeholders = {}
-        modified_text = text
-        placeholder_counter = 0
         
         for pattern in self.math_patterns:
-            matches = pattern.findall(modified_text)
-            for match in matches:
-                placeholder = f"MATH_PLACEHOLDER_{placeholder_counter}"
-                math_placeholders[placeholder] = match
-                modified_text = modified_text.replace(match, placeholder, 1)
-                placeholder_counter += 1
-        
-        return math_placeholders, modified_text
+            matches = []
+            for match in pattern.finditer(text):
+                start, end = match.span()
+                if not claimed.overlaps(start, end):
+                    placeholder = f"MATH_PLACEHOLDER_{len(math_placeholders):08d}"
+                    math_placeholders[placeholder] = match.group()
+                    matches.append((start, end, placeholder))
+            if matches:
+                claimed = IntervalIndex(list(claimed) + matches)
+        
+        # Replace every claimed region in one pass
+        parts = []
+        position = 0
+        for start, end, placeholder in claimed:
+            parts.append(text[position:start])
+            parts.append(placeholder)
+            position = end
+        parts.append(text[position:])
+        
+        return math_placeholders, ''.join(parts)
     
     def _restore_mathematical_content(self, text: str, placeholders: Dict[str, str]) -> str:
         """Restore mathematical content from placeholders"""
-        restored_text = text
-        for placeholder, original in placeholders.items():
-            restored_text = restored_text.replace(placeholder, original)
-        return restored_text
+        if not placeholders:
+            return text
+        return self.placeholder_pattern.sub(lambda m: placeholders.get(m.group(0), m.group(0)), text)
     
     def _normalize_unicode(self, text: str) -> str:
         """Normalize Unicode characters and replace special characters"""
@@ -407,10 +473,27 @@ class TextCleaner:
         if not cleaned.strip():
             return 0.0
         
+        return self._score_text_counts(
+            len(original),
+            len(cleaned),
+            issues,
+            sentences=len(re.findall(r'[.!?]+', cleaned)),
+            words=len(cleaned.split()),
+            paragraphs=len(re.split(r'\n\s*\n', cleaned.strip()))
+        )
+    
+    def _score_text_counts(self,
+                           original_length: int,
+                           cleaned_length: int,
+                           issues: Dict[TextIssueType, int],
+                           sentences: int,
+                           words: int,
+                           paragraphs: int) -> float:
+        """Calculate quality score from counts gathered over the cleaned text"""
         base_score = 1.0
         
         # Penalize excessive changes
-        length_ratio = len(cleaned) / len(original) if original else 0
+        length_ratio = cleaned_length / original_length if original_length else 0
         if length_ratio < 0.5:
             base_score -= 0.3  # Significant text loss
         elif length_ratio < 0.8:
@@ -422,16 +505,328 @@ class TextCleaner:
             base_score += min(0.2, total_issues * 0.01)  # Small bonus for fixes
         
         # Check for sentence structure
-        sentences = len(re.findall(r'[.!?]+', cleaned))
-        words = len(cleaned.split())
         if words > 0:
             sentence_ratio = sentences / words * 100
             if 5 <= sentence_ratio <= 20:  # Reasonable sentence to word ratio
                 base_score += 0.1
         
         # Check for paragraph structure
-        paragraphs = len(re.split(r'\n\s*\n', cleaned.strip()))
         if paragraphs > 1:
             base_score += 0.05
         
-        return max(0.0, min(1.0, base_score))
\ No newline at end of file
+        return max(0.0, min(1.0, base_score))
+    
+    def stream(self, keep_text: bool = True) -> 'CleaningStream':
+        """
+        Start incremental fused cleaning of a document fed in pieces.
+        
+        Args:
+            keep_text: Keep the cleaned windows so result() can return the full text
+            
+        Returns:
+            CleaningStream to feed raw text into
+        """
+        return CleaningStream(self, keep_text=keep_text)
+    
+    def _clean_window(self, window: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Clean one window of a document the way clean_text cleans it.
+        
+        Math preservation and artifact removal are the sequential steps.
+        Whitespace normalization, sentence fixing and paragraph restructuring
+        are not run: space correction joins all words with single spaces, so
+        in clean_text they never change the text and always count 0.
+        
+        Returns:
+            Cleaned window and its counts; 'spaces' holds the spaces inserted
+            by each pattern of space_patterns, in order
+        """
+        math_placeholders, window = self._preserve_mathematical_content(window)
+        window = unicodedata.normalize('NFKC', window).translate(self.char_translation)
+        window, artifacts = self._remove_artifacts(window)
+        
+        # Space correction, counting the spaces each sequential pattern would insert
+        spaces = [0] * len(self.space_patterns)
+        window, operators = self.fused_operator_pattern.subn(r'\1 \2 \3', window)
+        spaces[self.operator_pattern_index] = operators * 2
+        
+        def insert_space(match):
+            spaces[match.lastindex - 1] += 1
+            return ' '
+        
+        window = self.fused_boundary_pattern.sub(insert_space, window)
+        window = ' '.join(window.split())
+        
+        window = self._restore_mathematical_content(window, math_placeholders)
+        return window, {'math': len(math_placeholders), 'artifacts': artifacts, 'spaces': spaces}
+    
+    @staticmethod
+    def _sequential_spaces_added(spaces: List[int]) -> int:
+        """
+        Spaces added as counted by _correct_missing_spaces.
+        
+        Every pattern that inserts at least one space adds the total number
+        of spaces inserted so far, including by earlier patterns.
+        """
+        added = inserted = 0
+        for count in spaces:
+            inserted += count
+            if count:
+                added += inserted
+        return added
+
+
+class CleaningStream:
+    """
+    Incremental fused cleaning of one document.
+    
+    Raw text is fed in arbitrary pieces (e.g. pages as they are extracted).
+    Text is cleaned in windows that end after a blank line, and the tail is
+    carried over to the next window. If no blank line appears, the window is
+    cut at any line break once it is twice the window size. A cut is only
+    made where no step of clean_text can act across it, so the cleaned text
+    and statistics are the same as TextCleaner.clean_text on the whole
+    document.
+    """
+    
+    def __init__(self, cleaner: TextCleaner, keep_text: bool = True):
+        """
+        Initialize cleaning stream.
+        
+        Args:
+            cleaner: TextCleaner providing patterns and settings
+            keep_text: Keep cleaned windows for result()
+        """
+        self.cleaner = cleaner
+        self.keep_text = keep_text
+        
+        self._buffer = ""
+        self._pieces: List[str] = []
+        self._finished = False
+        
+        self.original_length = 0
+        self.cleaned_length = 0
+        self.windows_cleaned = 0
+        self._counts = {'math': 0, 'artifacts': 0}
+        self._spaces = [0] * len(cleaner.space_patterns)
+        self._sentences = 0
+        self._words = 0
+        self._paragraph_breaks = 0
+        self._has_input = False
+        self._has_content = False
+    
+    def feed(self, text: str) -> str:
+        """
+        Add raw text and clean any complete windows.
+        
+        Args:
+            text: Next piece of the raw document
+            
+        Returns:
+            Cleaned text for the windows completed by this piece, prefixed with
+            a separating space when it follows earlier output; may be empty
+        """
+        if self._finished:
+            raise RuntimeError("Cleaning stream already finished")
+        
+        self.original_length += len(text)
+        self._has_input = self._has_input or bool(text.strip())
+        self._buffer += text
+        if len(self._buffer) < self.cleaner.window_size:
+            return ""
+        
+        cut = self._find_cut()
+        if cut <= 0:
+            return ""
+        
+        window, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._emit(window)
+    
+    def finish(self) -> str:
+        """
+        Clean the remaining carried-over text.
+        
+        Returns:
+            Cleaned text for the final window; may be empty
+        """
+        if self._finished:
+            return ""
+        self._finished = True
+        
+        window, self._buffer = self._buffer, ""
+        return self._emit(window) if window else ""
+    
+    def clean_windows(self, pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Feed raw pieces and yield cleaned windows as soon as they are ready.
+        
+        Args:
+            pieces: Raw document text in order
+            
+        Yields:
+            Non-empty cleaned text, with separators, in document order
+        """
+        for piece in pieces:
+            cleaned = self.feed(piece)
+            if cleaned:
+                yield cleaned
+        
+        cleaned = self.finish()
+        if cleaned:
+            yield cleaned
+    
+    def _find_cut(self) -> int:
+        """Find where the buffer can be split without changing the result"""
+        buffer = self._buffer
+        limit = self._open_math_start(buffer)
+        
+        math_regions = IntervalIndex()
+        if self.cleaner.preserve_mathematical:
+            # Single-character symbol matches cannot contain a cut
+            math_regions = IntervalIndex.merged(
+                match.span()
+                for index, pattern in enumerate(self.cleaner.math_patterns) if index != 3
+                for match in pattern.finditer(buffer)
+            )
+        
+        # Prefer the start of the line after the last blank line
+        candidates = [m.end() for m in self.cleaner.paragraph_break_pattern.finditer(buffer)]
+        if len(buffer) >= self.cleaner.window_size * 2:
+            candidates = [m.end() for m in re.finditer('\n', buffer)] + candidates
+        
+        for cut in reversed(candidates):
+            if cut <= limit and self._is_safe_cut(buffer, cut, math_regions):
+                return cut
+        return 0
+    
+    def _open_math_start(self, buffer: str) -> int:
+        """Start of the first math expression that later text could still close"""
+        limit = len(buffer)
+        if not self.cleaner.preserve_mathematical:
+            return limit
+        
+        # An unpaired last '$' may pair with one that has not arrived yet
+        dollar = buffer.rfind('$')
+        if dollar >= 0:
+            closed = any(m.end() == dollar + 1 for m in self.cleaner.math_patterns[0].finditer(buffer))
+            if not closed:
+                limit = dollar
+        
+        for pattern in self.cleaner.open_math_patterns:
+            match = pattern.search(buffer)
+            if match:
+                limit = min(limit, match.start())
+        return limit
+    
+    @staticmethod
+    def _is_safe_cut(buffer: str, cut: int, math_regions: IntervalIndex) -> bool:
+        """
+        Whether no cleaning step can act across a cut at a line start.
+        
+        Math expressions are checked directly. Artifact patterns may run
+        across line breaks through whitespace, but only into a line starting
+        with a digit or symbol or out of one ending with a digit, so the line
+        after the cut must start with a letter and the text before it must not
+        end with a digit. Across such a cut they can only differ in whitespace,
+        which space correction collapses.
+        """
+        if math_regions.containing(cut, inclusive=False) is not None:
+            return False
+        
+        after = cut
+        while after < len(buffer) and buffer[after].isspace():
+            after += 1
+        if after == len(buffer) or not unicodedata.normalize('NFKC', buffer[after])[:1].isalpha():
+            return False
+        
+        before = cut - 1
+        while before >= 0 and buffer[before].isspace():
+            before -= 1
+        return before < 0 or not unicodedata.normalize('NFKC', buffer[before])[-1:].isdigit()
+    
+    def _emit(self, window: str) -> str:
+        """Clean a window and update the running statistics"""
+        cleaned, counts = self.cleaner._clean_window(window)
+        self.windows_cleaned += 1
+        self._counts['math'] += counts['math']
+        self._counts['artifacts'] += counts['artifacts']
+        for index, count in enumerate(counts['spaces']):
+            self._spaces[index] += count
+        
+        if not cleaned:
+            return ""
+        
+        self._sentences += len(re.findall(r'[.!?]+', cleaned))
+        self._words += len(cleaned.split())
+        self._paragraph_breaks += len(re.split(r'\n\s*\n', cleaned)) - 1
+        
+        if self._has_content:
+            cleaned = ' ' + cleaned
+        self._has_content = True
+        
+        self.cleaned_length += len(cleaned)
+        if self.keep_text:
+            self._pieces.append(cleaned)
+        return cleaned
+    
+    def result(self) -> CleaningResult:
+        """
+        Build the cleaning result for everything fed so far.
+        
+        Returns:
+            CleaningResult with the same text and statistics as TextCleaner.clean_text
+        """
+        if not self._finished:
+            self.finish()
+        
+        cleaned_text = ''.join(self._pieces)
+        if not self._has_input:
+            return CleaningResult(
+                cleaned_text="",
+                stats=CleaningStats(0, 0, 0, 0, 0, 0, 0, 0, {}),
+                quality_score=0.0,
+                warnings=["Input text is empty"]
+            )
+        
+        spaces_added = self.cleaner._sequential_spaces_added(self._spaces)
+        issues_detected = {issue: 0 for issue in TextIssueType}
+        if self._counts['math']:
+            issues_detected[TextIssueType.SPECIAL_CHARACTERS] = self._counts['math']
+        issues_detected[TextIssueType.HEADER_FOOTER_ARTIFACTS] = self._counts['artifacts']
+        issues_detected[TextIssueType.MISSING_SPACES] = spaces_added
+        
+        quality_score = 0.0
+        if self._has_content:
+            quality_score = self.cleaner._score_text_counts(
+                self.original_length,
+                self.cleaned_length,
+                issues_detected,
+                sentences=self._sentences,
+                words=self._words,
+                paragraphs=self._paragraph_breaks + 1
+            )
+        
+        warnings = []
+        if quality_score < 0.5:
+            warnings.append(f"Low quality score: {quality_score:.2f}")
+        if self.cleaned_length < self.original_length * 0.5:
+            warnings.append(f"Significant text reduction: {self.cleaned_length}/{self.original_length}")
+        
+        stats = CleaningStats(
+            original_length=self.original_length,
+            cleaned_length=self.cleaned_length,
+            spaces_added=spaces_added,
+            whitespace_normalized=0,  # Always 0 after space correction, see _clean_window
+            sentences_fixed=0,
+            paragraphs_restructured=0,
+            math_content_preserved=self._counts['math'],
+            artifacts_removed=self._counts['artifacts'],
+            issues_detected=issues_detected
+        )
+        
+        return CleaningResult(
+            cleaned_text=cleaned_text.strip(),
+            stats=stats,
+            quality_score=quality_score,
+            warnings=warnings
+        )
@@ -4,9 +4,10 @@ Based on the successful custom processing approach
 """
 
 import re
+import asyncio
 import hashlib
 import logging
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Callable, List, Dict, Tuple, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 import fitz  # PyMuPDF
@@ -15,11 +16,15 @@ from .structure_detector import StructureElement, StructureType, NumberingStyle
 from .content_chunker import ChunkMetadata, ContentType
 from .neo4j_connection_manager import Neo4jConnectionManager
 from .neo4j_vector_index_manager import Neo4jVectorIndexManager
-from .neo4j_content_ingestion import Neo4jContentIngestion, TextbookMetadata
+from .neo4j_content_ingestion import Neo4jContentIngestion, TextbookMetadata, chunk_content_hash
 from ..services.embedding_service import EmbeddingService
 
 logger = logging.getLogger(__name__)
 
+# Called with a stage name ("extraction", "chunking", "embedding", "storage")
+# and the fraction of that stage completed
+ProgressCallback = Callable[[str, float], None]
+
 
 @dataclass
 class Chapter:
@@ -67,12 +72,16 @@ class ProcessingResult:
     embeddings_generated: int
     error: Optional[str] = None
     processing_time: float = 0.0
+    embeddings_reused: int = 0
+    chunks_skipped: List[str] = field(default_factory=list)  # Unchanged since the last ingestion
+    chunks_deleted: List[str] = field(default_factory=list)  # No longer in the textbook
     
     def summary(self) -> str:
         if self.success:
             return (f"Successfully processed textbook {self.textbook_id}: "
                    f"{len(self.chapters)} chapters, {len(self.sections)} sections, "
-                   f"{len(self.concepts)} concepts, {self.total_chunks} chunks")
+                   f"{len(self.concepts)} concepts, {self.total_chunks} chunks "
+                   f"({len(self.chunks_skipped)} unchanged, {len(self.chunks_deleted)} deleted)")
         else:
             return f"Processing failed: {self.error}"
 
@@ -83,7 +92,6 @@ class TOCPDFProcessor:
     """
     
     def __init__(self):
-        self.doc = None
         self.concept_patterns = [
             r'\b(?:Definition|Theorem|Lemma|Corollary|Proposition|Example|Algorithm|Concept)\s*\d*\.?\d*:?\s*([^\n]+)',
             r'\b(?:Key Concept|Important Concept|Main Idea):\s*([^\n]+)',
@@ -102,32 +110,49 @@ class TOCPDFProcessor:
                          connection_manager: Neo4jConnectionManager,
                          index_manager: Optional['Neo4jVectorIndexManager'] = None,
                          embedding_service: Optional[EmbeddingService] = None,
-                         max_chunks_to_embed: Optional[int] = None) -> ProcessingResult:
+                         max_chunks_to_embed: Optional[int] = None,
+                         progress_callback: Optional[ProgressCallback] = None,
+                         textbook_id: Optional[str] = None,
+                         owner_id: Optional[str] = None) -> ProcessingResult:
         """
         Process PDF using TOC-based approach
         
+        Chunks are diffed against the stored textbook by content hash: only
+        new or changed chunks are embedded and written, chunks whose content
+        is already stored reuse its embedding, and chunks no longer produced
+        are deleted.
+        
         Args:
             pdf_path: Path to PDF file
             connection_manager: Neo4j connection manager
             index_manager: Neo4j vector index manager
             embedding_service: Optional embedding service
             max_chunks_to_embed: Limit embeddings for testing
+            progress_callback: Optional per-stage progress callback. It may be
+                called from a worker thread, and may raise to abort processing.
+            textbook_id: Existing textbook to update, e.g. with a corrected
+                edition; derived from the file path if omitted. Callers must
+                check the uploader may modify it.
+            owner_id: User recorded as owner when the textbook is created
             
         Returns:
             ProcessingResult with all extracted data
         """
         import time
         start_time = time.time()
+        report = progress_callback or (lambda stage, fraction: None)
         
         try:
             # Generate textbook ID
-            textbook_id = f"textbook_{hashlib.md5(pdf_path.encode()).hexdigest()[:8]}"
+            textbook_id = textbook_id or f"textbook_{hashlib.md5(pdf_path.encode()).hexdigest()[:8]}"
             
             logger.info(f"Processing PDF: {pdf_path}")
             logger.info(f"Textbook ID: {textbook_id}")
             
-            # Extract chapters using TOC
-            chapters = self._extract_chapters_from_toc(pdf_path)
+            # PyMuPDF and regex extraction is blocking, so run it off the event loop
+            chapters, all_sections, all_concepts, all_chunks = await asyncio.to_thread(
+                self._extract_structure, pdf_path, textbook_id, report
+            )
             if not chapters:
                 return ProcessingResult(
                     success=False,
@@ -141,30 +166,40 @@ class TOCPDFProcessor:
                     error="No chapters found in table of contents"
                 )
             
-            # Extract sections and concepts from each chapter
-            all_sections = []
-            all_concepts = []
-            
-            for chapter in chapters:
-                sections = self._extract_sections_from_chapter(chapter)
-                chapter.sections = sections
-                all_sections.extend(sections)
-                
-                for section in sections:
-                    concepts = self._extract_concepts_from_section(section)
-                    section.concepts = concepts
-                    all_concepts.extend(concepts)
+            # Diff against the stored chunks so unchanged content is not re-embedded
+            ingestion = Neo4jContentIngestion(connection_manager, index_manager)
+            chunk_diff = await ingestion.diff_chunks(
+                textbook_id,
+                [(chunk_metadata.chunk_id, chunk_content_hash(text)) for chunk_metadata, text in all_chunks]
+            )
+            write_ids = chunk_diff.to_write
+            chunks_to_write = [
+                (chunk_metadata, text) for chunk_metadata, text in all_chunks
+                if chunk_metadata.chunk_id in write_ids
+            ]
+            unchanged_chunks = [
+                chunk_metadata for chunk_metadata, _ in all_chunks
+                if chunk_metadata.chunk_id not in write_ids
+            ]
             
-            # Create chunks
-            all_chunks = self._create_chunks(chapters, textbook_id)
+            embeddings_reused = 0
+            chunks_to_embed = []
+            for chunk_metadata, text in chunks_to_write:
+                embedding = chunk_diff.stored_embedding(chunk_content_hash(text))
+                if embedding is not None:
+                    chunk_metadata.embedding = embedding
+                    embeddings_reused += 1
+                else:
+                    chunks_to_embed.append((chunk_metadata, text))
             
             # Generate embeddings if service provided
             embeddings_generated = 0
             if embedding_service:
                 embeddings_generated = await self._generate_embeddings(
-                    all_chunks, 
+                    chunks_to_embed, 
                     embedding_service, 
-                    max_chunks_to_embed
+                    max_chunks_to_embed,
+                    report
                 )
             
             # Store in Neo4j
@@ -173,9 +208,15 @@ class TOCPDFProcessor:
                 chapters,
                 all_sections,
                 all_concepts,
-                all_chunks,
-                connection_manager
+                chunks_to_write,
+                connection_manager,
+                report,
+                total_chunks=len(all_chunks),
+                unchanged_chunks=unchanged_chunks,
+                owner_id=owner_id
             )
+            if chunk_diff.removed:
+                await ingestion.delete_chunks(chunk_diff.removed, textbook_id)
             
             processing_time = time.time() - start_time
             
@@ -188,7 +229,10 @@ class TOCPDFProcessor:
                 chunks=all_chunks,
                 total_chunks=len(all_chunks),
                 embeddings_generated=embeddings_generated,
-                processing_time=processing_time
+                processing_time=processing_time,
+                embeddings_reused=embeddings_reused,
+                chunks_skipped=chunk_diff.unchanged,
+                chunks_deleted=chunk_diff.removed
             )
             
         except Exception as e:
@@ -208,14 +252,53 @@ class TOCPDFProcessor:
                 error=str(e),
                 processing_time=time.time() - start_time
             )
-        finally:
-            if self.doc:
-                self.doc.close()
+    
+    def _extract_structure(self,
+                           pdf_path: str,
+                           textbook_id: str,
+                           report: ProgressCallback) -> Tuple[List[Chapter], List[Section],
+                                                              List[Concept], List[Tuple[ChunkMetadata, str]]]:
+        """Extract chapters, sections, concepts and chunks (blocking)"""
+        report("extraction", 0.0)
+        chapters = self._extract_chapters_from_toc(pdf_path)
+        if not chapters:
+            return [], [], [], []
+        
+        # Extract sections and concepts from each chapter
+        all_sections = []
+        all_concepts = []
+        
+        for i, chapter in enumerate(chapters):
+            sections = self._extract_sections_from_chapter(chapter)
+            chapter.sections = sections
+            all_sections.extend(sections)
+            
+            for section in sections:
+                concepts = self._extract_concepts_from_section(section)
+                section.concepts = concepts
+                all_concepts.extend(concepts)
+            
+            report("extraction", (i + 1) / len(chapters))
+        
+        # Create chunks
+        report("chunking", 0.0)
+        all_chunks = self._create_chunks(chapters, textbook_id)
+        report("chunking", 1.0)
+        
+        return chapters, all_sections, all_concepts, all_chunks
     
     def _extract_chapters_from_toc(self, pdf_path: str) -> List[Chapter]:
         """Extract chapters from PDF table of contents"""
-        self.doc = fitz.open(pdf_path)
-        toc = self.doc.get_toc()
+        # Document is local so concurrent jobs can share this processor
+        doc = fitz.open(pdf_path)
+        try:
+            return self._extract_chapters_from_document(doc)
+        finally:
+            doc.close()
+    
+    def _extract_chapters_from_document(self, doc) -> List[Chapter]:
+        """Extract chapters from an open document's table of contents"""
+        toc = doc.get_toc()
         
         chapters = []
         chapter_entries = []
@@ -238,10 +321,10 @@ class TOCPDFProcessor:
         # Create Chapter objects with content
         for i, (num, title, start_page) in enumerate(chapter_entries):
             # Determine end page
-            end_page = chapter_entries[i+1][2] if i+1 < len(chapter_entries) else len(self.doc)
+            end_page = chapter_entries[i+1][2] if i+1 < len(chapter_entries) else len(doc)
             
             # Extract chapter content
-            content = self._extract_page_range(start_page - 1, end_page)
+            content = self._extract_page_range(doc, start_page - 1, end_page)
             
             chapter = Chapter(
                 number=num,
@@ -255,11 +338,11 @@ class TOCPDFProcessor:
         logger.info(f"Extracted {len(chapters)} chapters from TOC")
         return chapters
     
-    def _extract_page_range(self, start_page: int, end_page: int) -> str:
+    def _extract_page_range(self, doc, start_page: int, end_page: int) -> str:
         """Extract text from page range"""
         content = ""
-        for page_num in range(start_page, min(end_page, len(self.doc))):
-            page = self.doc[page_num]
+        for page_num in range(start_page, min(end_page, len(doc))):
+            page = doc[page_num]
             content += page.get_text()
         return content
     
@@ -450,11 +533,14 @@ class TOCPDFProcessor:
     
     async def _generate_embeddings(self, chunks: List[Tuple[ChunkMetadata, str]], 
                                   embedding_service: EmbeddingService,
-                                  max_chunks: Optional[int] = None) -> int:
+                                  max_chunks: Optional[int] = None,
+                                  progress_callback: Optional[ProgressCallback] = None) -> int:
         """Generate embeddings for chunks"""
+        report = progress_callback or (lambda stage, fraction: None)
         chunks_to_process = chunks[:max_chunks] if max_chunks else chunks
         batch_size = 20
         embeddings_generated = 0
+        report("embedding", 0.0)
         
         logger.info(f"Generating embeddings for {len(chunks_to_process)} chunks...")
         
@@ -475,16 +561,41 @@ class TOCPDFProcessor:
                     logger.debug(f"Generated embedding for chunk {chunk_metadata.chunk_id} (dim: {len(embedding)})")
                 else:
                     logger.warning(f"Failed to generate embedding for chunk {chunk_metadata.chunk_id}")
+            
+            report("embedding", min(i + batch_size, len(chunks_to_process)) / len(chunks_to_process))
         
         logger.info(f"Generated {embeddings_generated}/{len(chunks_to_process)} embeddings successfully")
         return embeddings_generated
     
+    @staticmethod
+    def _chunk_placement(textbook_id: str, chunk_metadata: ChunkMetadata) -> Dict[str, Any]:
+        """Chunk properties that place it in the textbook structure"""
+        return {
+            "chunk_id": chunk_metadata.chunk_id,
+            "textbook_id": textbook_id,
+            "chapter_number": int(chunk_metadata.chapter.split()[1]),
+            "section_number": chunk_metadata.section,
+            "concept_name": chunk_metadata.title if "Section" not in chunk_metadata.title else None
+        }
+    
     async def _store_in_neo4j(self, textbook_id: str, chapters: List[Chapter],
                              sections: List[Section], concepts: List[Concept],
                              chunks: List[Tuple[ChunkMetadata, str]],
-                             connection: Neo4jConnectionManager):
-        """Store all data in Neo4j with relationships"""
+                             connection: Neo4jConnectionManager,
+                             progress_callback: Optional[ProgressCallback] = None,
+                             total_chunks: Optional[int] = None,
+                             unchanged_chunks: Optional[List[ChunkMetadata]] = None,
+                             owner_id: Optional[str] = None):
+        """
+        Store all data in Neo4j with relationships.
+        
+        chunks are the new or changed chunks to write; total_chunks is the
+        number of chunks in the textbook, including unchanged ones. Only the
+        chapter, section and concept of unchanged_chunks are updated.
+        """
+        report = progress_callback or (lambda stage, fraction: None)
         logger.info("Storing data in Neo4j...")
+        report("storage", 0.0)
         
         # Create textbook node
         await connection.execute_query("""
@@ -493,13 +604,15 @@ class TOCPDFProcessor:
                 t.subject = $subject,
                 t.processed_date = datetime(),
                 t.total_chapters = $total_chapters,
-                t.total_chunks = $total_chunks
+                t.total_chunks = $total_chunks,
+                t.owner_id = coalesce(t.owner_id, $owner_id)
         """, {
             "textbook_id": textbook_id,
+            "owner_id": owner_id,
             "title": "Uploaded Textbook",  # Can be extracted from metadata
             "subject": "Unknown",
             "total_chapters": len(chapters),
-            "total_chunks": len(chunks)
+            "total_chunks": len(chunks) if total_chunks is None else total_chunks
         })
         
         # Create chapters and PRECEDES relationships
@@ -539,6 +652,8 @@ class TOCPDFProcessor:
                     "curr": chapter.number
                 })
         
+        report("storage", 0.1)
+        
         # Create sections with relationships
         for i, section in enumerate(sections):
             await connection.execute_query("""
@@ -575,6 +690,8 @@ class TOCPDFProcessor:
                     "curr": section.section_number
                 })
         
+        report("storage", 0.3)
+        
         # Create concepts with relationships
         for i, concept in enumerate(concepts):
             await connection.execute_query("""
@@ -625,6 +742,8 @@ class TOCPDFProcessor:
                     "curr_name": concept.concept_name
                 })
         
+        report("storage", 0.5)
+        
         # Create chunks with relationships and embeddings
         batch_size = 50
         chunks_with_embeddings = 0
@@ -640,38 +759,57 @@ class TOCPDFProcessor:
                     chunks_with_embeddings += 1
                 
                 batch_data.append({
-                    "chunk_id": chunk_metadata.chunk_id,
-                    "textbook_id": textbook_id,
-                    "chapter_number": int(chunk_metadata.chapter.split()[1]),
-                    "section_number": chunk_metadata.section,
-                    "concept_name": chunk_metadata.title if "Section" not in chunk_metadata.title else None,
+                    **self._chunk_placement(textbook_id, chunk_metadata),
                     "text": chunk_text,
+                    "content_hash": chunk_content_hash(chunk_text),
                     "embedding": embedding,
                     "has_embedding": embedding is not None,
                     "char_count": len(chunk_text),
                     "word_count": len(chunk_text.split())
                 })
             
-            # Batch insert chunks with embeddings
+            # Batch upsert chunks with embeddings; changed chunks already exist
             await connection.execute_batch_write("""
-                CREATE (ch:Chunk {
-                    chunk_id: $chunk_id,
-                    textbook_id: $textbook_id,
-                    chapter_number: $chapter_number,
-                    section_number: $section_number,
-                    concept_name: $concept_name,
-                    text: $text,
-                    embedding: $embedding,
-                    has_embedding: $has_embedding,
-                    char_count: $char_count,
-                    word_count: $word_count,
-                    created_at: datetime()
-                })
+                MERGE (ch:Chunk {chunk_id: $chunk_id})
+                ON CREATE SET ch.created_at = datetime()
+                SET ch.textbook_id = $textbook_id,
+                    ch.chapter_number = $chapter_number,
+                    ch.section_number = $section_number,
+                    ch.concept_name = $concept_name,
+                    ch.text = $text,
+                    ch.content_hash = $content_hash,
+                    ch.embedding = $embedding,
+                    ch.has_embedding = $has_embedding,
+                    ch.similarity_indexed_at = null,
+                    ch.char_count = $char_count,
+                    ch.word_count = $word_count,
+                    ch.updated_at = datetime()
             """, batch_data, batch_size=batch_size)
+            
+            report("storage", 0.5 + 0.4 * min(i + batch_size, len(chunks)) / len(chunks))
         
         logger.info(f"Stored {len(chunks)} chunks, {chunks_with_embeddings} with embeddings")
         
-        # Create chunk relationships
+        # Unchanged content may still have moved to another section or concept
+        if unchanged_chunks:
+            await connection.execute_batch_write("""
+                MATCH (ch:Chunk {chunk_id: $chunk_id})
+                SET ch.textbook_id = $textbook_id,
+                    ch.chapter_number = $chapter_number,
+                    ch.section_number = $section_number,
+                    ch.concept_name = $concept_name,
+                    ch.updated_at = datetime()
+            """, [
+                self._chunk_placement(textbook_id, chunk_metadata)
+                for chunk_metadata in unchanged_chunks
+            ], batch_size=batch_size)
+        
+        # Create chunk relationships, dropping links to sections a chunk left
+        await connection.execute_query("""
+            MATCH (ch:Chunk {textbook_id: $textbook_id})-[r:BELONGS_TO]->(s:Section)
+            WHERE s.section_number <> ch.section_number
+            DELETE r
+        """, {"textbook_id": textbook_id})
         await connection.execute_query("""
             MATCH (ch:Chunk {textbook_id: $textbook_id})
             MATCH (s:Section {textbook_id: $textbook_id, section_number: ch.section_number})
@@ -709,4 +847,5 @@ class TOCPDFProcessor:
             except Exception as e:
                 logger.warning(f"Failed to create vector index: {e}")
         
+        report("storage", 1.0)
         logger.info("Neo4j storage completed")
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Worker Pool - Thread or process execution for CPU-bound pipeline stages
+
+Runs batches of document tasks either on threads or on a pool of long-lived
+worker processes. Each worker process builds its component once (e.g. a
+PDFProcessingPipeline) and reuses it, so compiled regexes and other setup are
+paid for once per worker rather than once per document.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from multiprocessing.pool import ThreadPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
+
+
+class ExecutionMode(Enum):
+    """How batch tasks are executed"""
+    THREAD = "thread"    # Threads in this process (limited by the GIL)
+    PROCESS = "process"  # Long-lived worker processes
+
+
+@dataclass
+class WorkerPoolConfig:
+    """Configuration for a worker pool"""
+    mode: ExecutionMode = ExecutionMode.PROCESS
+    max_workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    task_timeout: Optional[float] = None  # Seconds per task, measured from task start
+    start_method: Optional[str] = "spawn"  # multiprocessing start method, None for platform default
+    startup_timeout: float = 60.0  # Seconds to wait for workers to build their component
+
+
+@dataclass
+class TaskOutcome:
+    """Outcome of a single task run by the pool"""
+    result: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+# Component instance owned by the current worker process
+_worker_target: Any = None
+
+
+def _initialize_worker(factory: Callable[..., Any],
+                       factory_kwargs: Dict[str, Any],
+                       ready_queue: Any) -> None:
+    """Build the worker's component once when the process starts"""
+    global _worker_target
+    try:
+        _worker_target = factory(**factory_kwargs)
+    except Exception as e:
+        ready_queue.put(f"{type(e).__name__}: {e}")
+        raise
+    ready_queue.put(None)
+
+
+def _run_in_worker(method_name: str, args: Tuple[Any, ...]) -> Any:
+    """Call a method on the worker's component"""
+    return getattr(_worker_target, method_name)(*args)
+
+
+class WorkerPool:
+    """
+    Pool of workers that each hold one instance of a pipeline component.
+
+    In process mode the factory and its kwargs are sent to each worker process,
+    which builds the component once and keeps it for the life of the pool. In
+    thread mode one instance is built in this process and shared by the threads.
+
+    Tasks are submitted at most max_workers at a time so a task starts as soon
+    as it is submitted, which lets the timeout be measured per task. When a task
+    exceeds task_timeout the pool is terminated and restarted; tasks that were
+    still running alongside it are resubmitted.
+    """
+
+    def __init__(self,
+                 factory: Callable[..., Any],
+                 factory_kwargs: Optional[Dict[str, Any]] = None,
+                 config: Optional[WorkerPoolConfig] = None):
+        """
+        Initialize worker pool.
+
+        Args:
+            factory: Callable that builds the component. Must be picklable
+                (e.g. a class) in process mode.
+            factory_kwargs: Keyword arguments for the factory
+            config: Pool configuration
+        """
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs or {}
+        self.config = config or WorkerPoolConfig()
+
+        self.logger = logging.getLogger(__name__)
+
+        self._pool = None
+        self._local_target = None
+        self._generation = 0
+
+        self.stats = {
+            'tasks_completed': 0,
+            'tasks_failed': 0,
+            'tasks_timed_out': 0,
+            'pool_starts': 0,
+            'total_task_time': 0.0
+        }
+
+    def __enter__(self) -> 'WorkerPool':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def is_running(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        """Start the workers if they are not already running"""
+        if self._pool is not None:
+            return
+
+        workers = max(1, self.config.max_workers)
+
+        if self.config.mode == ExecutionMode.PROCESS:
+            self._pool = self._start_processes(workers)
+        else:
+            if self._local_target is None:
+                self._local_target = self.factory(**self.factory_kwargs)
+            self._pool = ThreadPool(processes=workers)
+
+        self._generation += 1
+        self.stats['pool_starts'] += 1
+        self.logger.info(f"Started {self.config.mode.value} worker pool with {workers} workers")
+
+    def _start_processes(self, workers: int) -> Any:
+        """Start worker processes and wait until each has built its component"""
+        context = multiprocessing.get_context(self.config.start_method)
+        ready_queue = context.Queue()
+        pool = context.Pool(
+            processes=workers,
+            initializer=_initialize_worker,
+            initargs=(self.factory, self.factory_kwargs, ready_queue)
+        )
+
+        # Wait for every worker so start-up time is not charged to the first tasks
+        try:
+            for _ in range(workers):
+                error = ready_queue.get(timeout=self.config.startup_timeout)
+                if error is not None:
+                    raise RuntimeError(f"Worker initialization failed: {error}")
+        except queue.Empty:
+            pool.terminate()
+            pool.join()
+            raise RuntimeError(f"Workers did not start within {self.config.startup_timeout:.0f}s")
+        except Exception:
+            pool.terminate()
+            pool.join()
+            raise
+
+        return pool
+
+    def close(self) -> None:
+        """Let running tasks finish and stop the workers"""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def terminate(self) -> None:
+        """Stop the workers immediately, abandoning running tasks"""
+        if self._pool is None:
+            return
+        self._pool.terminate()
+        # Threads cannot be killed; a hung thread is left to finish on its own
+        if self.config.mode == ExecutionMode.PROCESS:
+            self._pool.join()
+        self._pool = None
+
+    def run(self,
+            method_name: str,
+            task_args: Sequence[Tuple[Any, ...]],
+            task_timeout: Optional[float] = None) -> List[TaskOutcome]:
+        """
+        Call a component method once per argument tuple.
+
+        Args:
+            method_name: Name of the component method to call
+            task_args: Positional arguments for each call
+            task_timeout: Override the configured per-task timeout
+
+        Returns:
+            One TaskOutcome per task, in input order
+        """
+        timeout = task_timeout if task_timeout is not None else self.config.task_timeout
+        outcomes: List[Optional[TaskOutcome]] = [None] * len(task_args)
+        if not task_args:
+            return []
+
+        self.start()
+        completed: queue.Queue = queue.Queue()
+        pending = deque(range(len(task_args)))
+        running: Dict[int, float] = {}
+        workers = max(1, self.config.max_workers)
+
+        while pending or running:
+            while pending and len(running) < workers:
+                index = pending.popleft()
+                running[index] = time.monotonic()
+                self._submit(method_name, task_args[index], index, completed)
+
+            wait_time = None
+            if timeout is not None:
+                oldest_start = min(running.values())
+                wait_time = max(0.0, oldest_start + timeout - time.monotonic())
+
+            try:
+                generation, index, result, error = completed.get(timeout=wait_time)
+            except queue.Empty:
+                self._expire_tasks(running, pending, outcomes, timeout)
+                continue
+
+            # Ignore results from a pool that was restarted after a timeout
+            if generation != self._generation or index not in running:
+                continue
+
+            elapsed = time.monotonic() - running.pop(index)
+            self.stats['total_task_time'] += elapsed
+            if error is None:
+                self.stats['tasks_completed'] += 1
+                outcomes[index] = TaskOutcome(result=result, elapsed=elapsed)
+            else:
+                self.stats['tasks_failed'] += 1
+                outcomes[index] = TaskOutcome(error=error, elapsed=elapsed)
+
+        return outcomes
+
+    def _submit(self,
+                method_name: str,
+                args: Tuple[Any, ...],
+                index: int,
+                completed: queue.Queue) -> None:
+        """Submit one task, reporting its result or error on the completed queue"""
+        generation = self._generation
+
+        def on_result(result: Any) -> None:
+            completed.put((generation, index, result, None))
+
+        def on_error(error: BaseException) -> None:
+            completed.put((generation, index, None, f"{type(error).__name__}: {error}"))
+
+        if self.config.mode == ExecutionMode.PROCESS:
+            self._pool.apply_async(
+                _run_in_worker, (method_name, tuple(args)),
+                callback=on_result, error_callback=on_error
+            )
+        else:
+            self._pool.apply_async(
+                getattr(self._local_target, method_name), tuple(args),
+                callback=on_result, error_callback=on_error
+            )
+
+    def _expire_tasks(self,
+                      running: Dict[int, float],
+                      pending: deque,
+                      outcomes: List[Optional[TaskOutcome]],
+                      timeout: float) -> None:
+        """Record timed-out tasks and restart the pool, resubmitting the others"""
+        now = time.monotonic()
+        expired = [index for index, started in running.items() if now - started >= timeout]
+
+        for index in expired:
+            elapsed = now - running.pop(index)
+            self.stats['tasks_timed_out'] += 1
+            self.stats['total_task_time'] += elapsed
+            outcomes[index] = TaskOutcome(
+                error=f"Task timed out after {timeout:.1f}s",
+                timed_out=True,
+                elapsed=elapsed
+            )
+
+        if not expired:
+            return
+
+        self.logger.warning(f"{len(expired)} task(s) exceeded {timeout:.1f}s, restarting worker pool")
+
+        # The timed-out workers may never return, so replace the whole pool
+        pending.extendleft(sorted(running, reverse=True))
+        running.clear()
+        self.terminate()
+        self.start()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        stats = self.stats.copy()
+        stats['mode'] = self.config.mode.value
+        stats['max_workers'] = self.config.max_workers
+        stats['is_running'] = self.is_running
+
+        finished = stats['tasks_completed'] + stats['tasks_failed'] + stats['tasks_timed_out']
+        stats['average_task_time'] = stats['total_task_time'] / finished if finished else 0.0
+
+        return stats
@@ -108,8 +108,15 @@ async def logout(request: Request):
     Logout endpoint - clears session cookies
     
     Note: Actual session invalidation happens on the Trac side.
-    This endpoint just clears client-side cookies.
-    """
+    This endpoint revokes the token in every API worker's session cache
+    and clears client-side cookies. Without a shared session cache
+    (SESSION_CACHE_URL) only the worker handling the request drops the
+    token; other workers keep it until their cache entry expires.
+    """
+    session_token = session_validator.extract_session_token(request)
+    if session_token:
+        await session_validator.invalidate_session(session_token)
+    
     response = JSONResponse({"message": "Logged out successfully"})
     
     # Clear auth cookies
@@ -217,7 +224,8 @@ async def auth_health():
             "status": "healthy" if secret_configured else "degraded",
             "auth_handler": "modern_session",
             "secret_configured": secret_configured,
-            "session_validator": "initialized"
+            "session_validator": "initialized",
+            "session_cache": session_validator.get_cache_statistics()
         }
         
         if not secret_configured:
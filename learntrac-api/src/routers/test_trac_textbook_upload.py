@@ -0,0 +1,76 @@
+"""
+Unit tests for textbook upload authorization
+
+Tests that only the owner of a textbook, or an admin, may re-ingest it
+under its existing id, since re-ingestion deletes chunks.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from .trac import check_textbook_owner, upload_textbook_dev
+from ..services.auth_service import User
+
+OWNERS = {"tb_owned": "alice", "tb_anonymous": None}
+
+
+class FakeConnection:
+    async def execute_query(self, query, parameters=None):
+        textbook_id = parameters["textbook_id"]
+        if textbook_id not in OWNERS:
+            return []
+        return [{"owner_id": OWNERS[textbook_id]}]
+
+
+def user(user_id, role="student"):
+    return User(
+        id=user_id, email=f"{user_id}@example.com", username=user_id,
+        full_name=user_id.title(), role=role, is_active=True, created_at=datetime.utcnow()
+    )
+
+
+class TestTextbookOwnership:
+    """Test suite for check_textbook_owner"""
+
+    def setup_method(self):
+        self.trac_service = SimpleNamespace(neo4j_connection=FakeConnection())
+
+    def status(self, textbook_id, current_user):
+        try:
+            asyncio.run(check_textbook_owner(self.trac_service, textbook_id, current_user))
+        except HTTPException as e:
+            return e.status_code
+        return 200
+
+    def test_owner_and_admin_may_update(self):
+        assert self.status("tb_owned", user("alice")) == 200
+        assert self.status("tb_owned", user("root", role="admin")) == 200
+        assert self.status("tb_anonymous", user("root", role="admin")) == 200
+
+    def test_others_are_rejected(self):
+        """Anonymous callers, other users and ownerless textbooks are refused"""
+        assert self.status("tb_owned", None) == 401
+        assert self.status("tb_owned", user("mallory")) == 403
+        assert self.status("tb_owned", user("bob", role="instructor")) == 403
+        assert self.status("tb_anonymous", user("alice")) == 403
+        assert self.status("tb_missing", user("alice")) == 404
+
+    def test_dev_upload_rejects_existing_textbook(self):
+        """The unauthenticated endpoint cannot target an existing textbook"""
+        file = SimpleNamespace(filename="calculus.pdf")
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(upload_textbook_dev(
+                file=file, title=None, subject=None, wait=False, textbook_id="tb_owned",
+                trac_service=self.trac_service, job_manager=None
+            ))
+
+        assert exc_info.value.status_code == 403
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
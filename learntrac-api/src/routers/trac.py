@@ -14,18 +14,21 @@ import logging
 from typing import List, Dict, Any, Optional
 from fastapi import Request
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Body, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, EmailStr
 import aiofiles
 import os
-import tempfile
 
 from ..services.trac_service import TracService
 from ..services.auth_service import AuthService, User
 from ..db.database import DatabaseManager
 from ..services.redis_client import RedisCache
 from ..services.embedding_service import EmbeddingService
+from ..services.ingestion_jobs import (
+    IngestionJobManager, IngestionJob, ingestion_job_manager,
+    IngestionQueueFullError, UploadTooLargeError
+)
 from ..pdf_processing.neo4j_connection_manager import ConnectionConfig
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,7 @@ router = APIRouter(prefix="/api/trac", tags=["trac"])
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # ===== Request/Response Models =====
 
@@ -229,6 +233,42 @@ async def get_current_user(
     return user
 
 
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> Optional[User]:
+    """Get the authenticated user, or None for anonymous requests"""
+    if not credentials:
+        return None
+    return await get_current_user(credentials, auth_service)
+
+
+def get_owned_job(
+    job_manager: IngestionJobManager,
+    job_id: str,
+    current_user: Optional[User],
+    job_token: Optional[str] = None
+) -> IngestionJob:
+    """
+    Look up an ingestion job the caller may manage.
+    
+    The owner and admins may manage a job; anyone presenting the job's
+    access token may too, which is how anonymous uploads are managed.
+    """
+    job = job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    
+    if job.token_matches(job_token):
+        return job
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication or job token required")
+    if current_user.role != "admin" and (job.owner_id is None or job.owner_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not allowed to manage this ingestion job")
+    
+    return job
+
+
 # ===== Authentication Endpoints =====
 
 @router.post("/auth/register", response_model=UserProfile)
@@ -590,14 +630,43 @@ async def get_embedding_service(request: Request) -> EmbeddingService:
     return request.app.state.embedding_service
 
 
-@router.post("/textbooks/upload-dev")
-async def upload_textbook_dev(
-    file: UploadFile = File(...),
-    title: Optional[str] = None,
-    subject: Optional[str] = None,
-    trac_service: TracService = Depends(get_trac_service)
-):
-    """Development endpoint for textbook upload (no auth required)"""
+async def get_ingestion_job_manager(request: Request) -> IngestionJobManager:
+    """Get ingestion job manager"""
+    return getattr(request.app.state, "ingestion_job_manager", ingestion_job_manager)
+
+
+async def check_textbook_owner(
+    trac_service: TracService,
+    textbook_id: str,
+    current_user: Optional[User]
+) -> None:
+    """Ensure the current user may replace the content of an existing textbook"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required to update a textbook")
+    
+    results = await trac_service.neo4j_connection.execute_query("""
+        MATCH (t:Textbook {textbook_id: $textbook_id})
+        RETURN t.owner_id as owner_id
+    """, {"textbook_id": textbook_id})
+    if not results:
+        raise HTTPException(status_code=404, detail="Textbook not found")
+    
+    # Textbooks uploaded anonymously have no owner and only admins may update them
+    if current_user.role != "admin" and results[0]["owner_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to update this textbook")
+
+
+async def queue_textbook_ingestion(
+    file: UploadFile,
+    title: Optional[str],
+    subject: Optional[str],
+    trac_service: TracService,
+    job_manager: IngestionJobManager,
+    owner_id: Optional[str] = None,
+    wait: bool = False,
+    textbook_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Stream an uploaded PDF to disk and queue it for background ingestion"""
     # Validate file type
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(
@@ -605,31 +674,36 @@ async def upload_textbook_dev(
             detail="Only PDF files are supported"
         )
     
-    # Save uploaded file temporarily
+    # Stream upload to disk instead of reading it into memory
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            temp_path = tmp_file.name
-        
-        # Create metadata
-        from ..pdf_processing.neo4j_content_ingestion import TextbookMetadata
-        
-        textbook_metadata = TextbookMetadata(
-            textbook_id="",  # Will be generated
-            title=title or file.filename.replace('.pdf', ''),
-            subject=subject or "Computer Science",
-            authors=[],
-            source_file=file.filename,
-            processing_date=datetime.utcnow(),
-            processing_version="2.0",  # TOC-based version
-            quality_metrics={},
-            statistics={}
-        )
-        
+        file_path = await job_manager.save_upload(file, file.filename)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    # Create metadata
+    from ..pdf_processing.neo4j_content_ingestion import TextbookMetadata
+    
+    textbook_metadata = TextbookMetadata(
+        textbook_id=textbook_id or "",  # Generated if empty
+        title=title or file.filename.replace('.pdf', ''),
+        subject=subject or "Computer Science",
+        authors=[],
+        source_file=file.filename,
+        processing_date=datetime.utcnow(),
+        processing_version="2.0",  # TOC-based version
+        quality_metrics={},
+        statistics={},
+        owner_id=owner_id
+    )
+    
+    async def run_ingestion(job: IngestionJob) -> Dict[str, Any]:
         # Process textbook using TOC-based approach
-        logger.info(f"Processing textbook: {file.filename}")
-        result = await trac_service.ingest_textbook(temp_path, textbook_metadata)
+        logger.info(f"Processing textbook: {job.filename} (job {job.job_id})")
+        result = await trac_service.ingest_textbook(
+            job.file_path,
+            textbook_metadata,
+            progress_callback=job.report_progress
+        )
         
         if result["success"]:
             logger.info(f"Successfully processed textbook: {result['textbook_id']}")
@@ -637,33 +711,60 @@ async def upload_textbook_dev(
             logger.error(f"Failed to process textbook: {result['error']}")
         
         return result
-        
-    except Exception as e:
-        logger.error(f"Upload error: {e}")
-        import traceback
-        traceback.print_exc()
+    
+    try:
+        job = await job_manager.submit(file_path, file.filename, run_ingestion, owner_id=owner_id)
+    except IngestionQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    if wait:
+        job = await job_manager.wait_for(job.job_id)
+    
+    response = job.to_dict()
+    response["status_url"] = f"{router.prefix}/textbooks/jobs/{job.job_id}"
+    # Only returned here; send it as X-Ingestion-Job-Token to poll or cancel the job
+    response["job_token"] = job.access_token
+    return response
+
+
+@router.post("/textbooks/upload-dev", status_code=202)
+async def upload_textbook_dev(
+    file: UploadFile = File(...),
+    title: Optional[str] = None,
+    subject: Optional[str] = None,
+    wait: bool = Query(False, description="Wait for ingestion to finish before responding"),
+    textbook_id: Optional[str] = Query(None, description="Not supported; use /textbooks/upload"),
+    trac_service: TracService = Depends(get_trac_service),
+    job_manager: IngestionJobManager = Depends(get_ingestion_job_manager)
+):
+    """Development endpoint for textbook upload (no auth required)"""
+    # Anonymous uploads must not replace the chunks of an existing textbook
+    if textbook_id:
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to process textbook: {str(e)}"
+            status_code=403,
+            detail="Updating an existing textbook requires an authenticated upload"
         )
-    finally:
-        # Clean up temp file
-        if 'temp_path' in locals():
-            os.unlink(temp_path)
+    
+    return await queue_textbook_ingestion(
+        file, title, subject, trac_service, job_manager, wait=wait
+    )
 
 
-@router.post("/textbooks/upload")
+@router.post("/textbooks/upload", status_code=202)
 async def upload_textbook(
     request: Request,
     file: UploadFile = File(...),
     title: Optional[str] = None,
     subject: Optional[str] = None,
     session_id: Optional[str] = None,
-    current_user: Optional[User] = None,
+    wait: bool = Query(False, description="Wait for ingestion to finish before responding"),
+    textbook_id: Optional[str] = Query(None, description="Existing textbook to update incrementally"),
+    current_user: Optional[User] = Depends(get_optional_user),
     auth_service: AuthService = Depends(get_auth_service),
-    trac_service: TracService = Depends(get_trac_service)
+    trac_service: TracService = Depends(get_trac_service),
+    job_manager: IngestionJobManager = Depends(get_ingestion_job_manager)
 ):
-    """Upload and process a textbook PDF"""
+    """Upload a textbook PDF and queue it for processing"""
     # For development, allow anonymous uploads
     # In production, uncomment the permission check below
     # if current_user and not await auth_service.check_permission(
@@ -674,50 +775,61 @@ async def upload_textbook(
     #         detail="You don't have permission to upload textbooks"
     #     )
     
-    # Validate file type
-    if not file.filename.lower().endswith('.pdf'):
+    # Re-ingestion deletes chunks the new file no longer has
+    if textbook_id:
+        await check_textbook_owner(trac_service, textbook_id, current_user)
+    
+    return await queue_textbook_ingestion(
+        file, title, subject, trac_service, job_manager,
+        owner_id=current_user.id if current_user else None,
+        wait=wait,
+        textbook_id=textbook_id
+    )
+
+
+@router.get("/textbooks/jobs")
+async def list_ingestion_jobs(
+    current_user: User = Depends(get_current_user),
+    job_manager: IngestionJobManager = Depends(get_ingestion_job_manager)
+):
+    """List the current user's textbook ingestion jobs (all jobs for admins)"""
+    owner_id = None if current_user.role == "admin" else current_user.id
+    return {
+        "jobs": [job.to_dict() for job in job_manager.list_jobs(owner_id=owner_id)],
+        "statistics": job_manager.get_statistics()
+    }
+
+
+@router.get("/textbooks/jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: str,
+    current_user: Optional[User] = Depends(get_optional_user),
+    job_token: Optional[str] = Header(None, alias="X-Ingestion-Job-Token"),
+    job_manager: IngestionJobManager = Depends(get_ingestion_job_manager)
+):
+    """Get status and per-stage progress of an ingestion job"""
+    job = get_owned_job(job_manager, job_id, current_user, job_token)
+    
+    return job.to_dict()
+
+
+@router.post("/textbooks/jobs/{job_id}/cancel")
+async def cancel_ingestion_job(
+    job_id: str,
+    current_user: Optional[User] = Depends(get_optional_user),
+    job_token: Optional[str] = Header(None, alias="X-Ingestion-Job-Token"),
+    job_manager: IngestionJobManager = Depends(get_ingestion_job_manager)
+):
+    """Cancel a queued or running ingestion job owned by the caller"""
+    job = get_owned_job(job_manager, job_id, current_user, job_token)
+    
+    if not job_manager.cancel(job_id):
         raise HTTPException(
-            status_code=400,
-            detail="Only PDF files are supported"
+            status_code=409,
+            detail=f"Ingestion job already {job.status.value}"
         )
     
-    # Save uploaded file temporarily
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            temp_path = tmp_file.name
-        
-        # Create metadata
-        from ..pdf_processing.neo4j_content_ingestion import TextbookMetadata
-        
-        textbook_metadata = TextbookMetadata(
-            textbook_id="",  # Will be generated
-            title=title or file.filename.replace('.pdf', ''),
-            subject=subject or "Computer Science",
-            authors=[],
-            source_file=file.filename,
-            processing_date=datetime.utcnow(),
-            processing_version="2.0",  # TOC-based version
-            quality_metrics={},
-            statistics={}
-        )
-        
-        # Process textbook using TOC-based approach
-        logger.info(f"Processing textbook: {file.filename}")
-        result = await trac_service.ingest_textbook(temp_path, textbook_metadata)
-        
-        if result["success"]:
-            logger.info(f"Successfully processed textbook: {result['textbook_id']}")
-        else:
-            logger.error(f"Failed to process textbook: {result['error']}")
-        
-        return result
-        
-    finally:
-        # Clean up temp file
-        if 'temp_path' in locals():
-            os.unlink(temp_path)
+    return job.to_dict()
 
 
 @router.get("/textbooks")
@@ -27,6 +27,7 @@ class VectorSearchRequest(BaseModel):
     limit: int = Field(20, ge=1, le=100, description="Maximum results to return")
     include_prerequisites: bool = Field(False, description="Include prerequisite chains")
     include_dependents: bool = Field(False, description="Include dependent concepts")
+    exact: bool = Field(False, description="Score every chunk exactly instead of using the vector index")
 
 
 class ChunkCreate(BaseModel):
@@ -86,7 +87,8 @@ async def vector_search(
         results = await neo4j_aura_client.vector_search(
             embedding=query_embedding,
             min_score=request.min_score,
-            limit=request.limit
+            limit=request.limit,
+            exact=request.exact
         )
         
         # Enhance results with prerequisites/dependents if requested
@@ -261,6 +263,7 @@ async def bulk_vector_search(
     queries: List[str] = Body(..., description="List of search queries"),
     min_score: float = Body(0.65, ge=0.0, le=1.0),
     limit_per_query: int = Body(10, ge=1, le=50),
+    exact: bool = Body(False, description="Score every chunk exactly instead of using the vector index"),
     user: AuthenticatedUser = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
@@ -288,7 +291,8 @@ async def bulk_vector_search(
         results = await neo4j_aura_client.bulk_vector_search(
             embeddings=valid_embeddings,
             min_score=min_score,
-            limit_per_query=limit_per_query
+            limit_per_query=limit_per_query,
+            exact=exact
         )
         
         # Combine with original queries
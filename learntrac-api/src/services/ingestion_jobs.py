@@ -0,0 +1,468 @@
+"""
+Textbook Ingestion Job Service
+Runs textbook uploads as background jobs with per-stage progress, cancellation and status polling
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import tempfile
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+from enum import Enum
+
+import aiofiles
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class IngestionJobStatus(Enum):
+    """Lifecycle status of an ingestion job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class IngestionStage(Enum):
+    """Processing stages reported by an ingestion job"""
+    QUEUED = "queued"
+    EXTRACTION = "extraction"
+    CHUNKING = "chunking"
+    EMBEDDING = "embedding"
+    STORAGE = "storage"
+    FINALIZING = "finalizing"
+
+
+# Share of overall progress for each working stage
+STAGE_WEIGHTS = {
+    IngestionStage.EXTRACTION: 0.25,
+    IngestionStage.CHUNKING: 0.05,
+    IngestionStage.EMBEDDING: 0.40,
+    IngestionStage.STORAGE: 0.25,
+    IngestionStage.FINALIZING: 0.05,
+}
+
+
+class IngestionCancelledError(Exception):
+    """Raised from progress reporting when a job has been cancelled"""
+    pass
+
+
+class IngestionQueueFullError(Exception):
+    """Raised when the ingestion queue has no room for another job"""
+    pass
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+    pass
+
+
+@dataclass
+class IngestionJob:
+    """State of a single textbook ingestion job"""
+    job_id: str
+    filename: str
+    file_path: str
+    owner_id: Optional[str] = None
+    # Returned to the uploader only; lets anonymous uploaders poll and cancel their job
+    access_token: str = field(default_factory=lambda: secrets.token_urlsafe(24))
+    status: IngestionJobStatus = IngestionJobStatus.QUEUED
+    stage: IngestionStage = IngestionStage.QUEUED
+    stage_progress: Dict[str, float] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (
+            IngestionJobStatus.COMPLETED,
+            IngestionJobStatus.FAILED,
+            IngestionJobStatus.CANCELLED
+        )
+
+    @property
+    def progress(self) -> float:
+        """Overall progress from 0 to 1, weighted by stage"""
+        if self.status == IngestionJobStatus.COMPLETED:
+            return 1.0
+        return sum(
+            weight * self.stage_progress.get(stage.value, 0.0)
+            for stage, weight in STAGE_WEIGHTS.items()
+        )
+
+    def token_matches(self, token: Optional[str]) -> bool:
+        """Check a job access token in constant time"""
+        return bool(token) and secrets.compare_digest(token, self.access_token)
+
+    def report_progress(self, stage: str, fraction: float) -> None:
+        """
+        Record progress for a stage. Safe to call from worker threads.
+
+        Raises:
+            IngestionCancelledError: If the job has been cancelled, so the
+                caller stops at the next progress point
+        """
+        if self.cancel_requested:
+            raise IngestionCancelledError(f"Ingestion job {self.job_id} was cancelled")
+
+        current = IngestionStage(stage)
+
+        # Reaching a stage means the stages before it are done
+        for previous in STAGE_WEIGHTS:
+            if previous == current:
+                break
+            self.stage_progress[previous.value] = 1.0
+
+        self.stage = current
+        self.stage_progress[current.value] = min(max(fraction, 0.0), 1.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable job status"""
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status.value,
+            "stage": self.stage.value,
+            "progress": round(self.progress, 4),
+            "stage_progress": dict(self.stage_progress),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+JobRunner = Callable[[IngestionJob], Awaitable[Dict[str, Any]]]
+
+
+class IngestionJobManager:
+    """
+    Bounded background queue for textbook ingestion.
+
+    Uploads are streamed to disk and queued as jobs. A fixed number of worker
+    tasks take jobs off the queue and run them, so only max_workers
+    ingestions run at once and at most max_queue_size wait. Finished jobs are
+    kept for status polling until they expire.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        upload_dir: Optional[str] = None,
+        max_upload_bytes: Optional[int] = None,
+        job_retention_seconds: int = 3600,
+        max_retained_jobs: int = 500
+    ):
+        """
+        Initialize ingestion job manager.
+
+        Args:
+            max_workers: Number of jobs processed concurrently
+            max_queue_size: Maximum number of jobs waiting to run
+            upload_dir: Directory for uploaded files
+            max_upload_bytes: Maximum upload size in bytes
+            job_retention_seconds: How long finished jobs remain queryable
+            max_retained_jobs: Maximum number of finished jobs kept
+        """
+        self.max_workers = max_workers or settings.ingestion_workers
+        self.max_queue_size = max_queue_size or settings.ingestion_queue_size
+        self.upload_dir = upload_dir or settings.ingestion_upload_dir or tempfile.gettempdir()
+        self.max_upload_bytes = max_upload_bytes or settings.max_upload_size_mb * 1024 * 1024
+        self.job_retention_seconds = job_retention_seconds
+        self.max_retained_jobs = max_retained_jobs
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._runners: Dict[str, JobRunner] = {}
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """Start the worker tasks"""
+        if self._workers:
+            return
+
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+        logger.info(f"Started ingestion job manager with {self.max_workers} workers")
+
+    async def close(self) -> None:
+        """Stop workers and cancel any queued or running jobs"""
+        tasks = self._workers + list(self._running_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for job in self._jobs.values():
+            if not job.is_finished:
+                # Also stops work still running in threads at its next progress report
+                job.cancel_requested = True
+                self._finish(job, IngestionJobStatus.CANCELLED, error="Service shutting down")
+
+        self._workers = []
+        self._queue = None
+        logger.info("Ingestion job manager stopped")
+
+    async def save_upload(self, upload: Any, filename: str) -> str:
+        """
+        Stream an upload to disk in fixed-size chunks.
+
+        Args:
+            upload: Object with an async read(size) method, such as UploadFile
+            filename: Original filename, used for the suffix
+
+        Returns:
+            Path of the saved file
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds max_upload_bytes
+        """
+        suffix = os.path.splitext(filename)[1] or ".pdf"
+        path = os.path.join(self.upload_dir, f"upload_{uuid.uuid4().hex}{suffix}")
+        written = 0
+
+        try:
+            async with aiofiles.open(path, "wb") as out:
+                while True:
+                    chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > self.max_upload_bytes:
+                        raise UploadTooLargeError(
+                            f"Upload exceeds {self.max_upload_bytes // (1024 * 1024)}MB limit"
+                        )
+                    await out.write(chunk)
+        except BaseException:
+            self._remove_file(path)
+            raise
+
+        return path
+
+    async def submit(
+        self,
+        file_path: str,
+        filename: str,
+        runner: JobRunner,
+        owner_id: Optional[str] = None
+    ) -> IngestionJob:
+        """
+        Queue an ingestion job.
+
+        Args:
+            file_path: Path of the uploaded file; removed when the job finishes
+            filename: Original filename
+            runner: Coroutine function that performs the ingestion
+            owner_id: Optional id of the submitting user
+
+        Returns:
+            The queued job
+
+        Raises:
+            IngestionQueueFullError: If the queue is full. The uploaded file
+                is removed.
+        """
+        if not self._workers:
+            await self.start()
+
+        job = IngestionJob(
+            job_id=str(uuid.uuid4()),
+            filename=filename,
+            file_path=file_path,
+            owner_id=owner_id
+        )
+
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            self._remove_file(file_path)
+            raise IngestionQueueFullError(
+                f"Ingestion queue is full ({self.max_queue_size} jobs waiting)"
+            )
+
+        self._prune_jobs()
+        self._jobs[job.job_id] = job
+        self._runners[job.job_id] = runner
+        logger.info(f"Queued ingestion job {job.job_id} for {filename}")
+
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """Get a job by id"""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, owner_id: Optional[str] = None) -> List[IngestionJob]:
+        """List known jobs, newest first"""
+        jobs = [
+            job for job in self._jobs.values()
+            if owner_id is None or job.owner_id == owner_id
+        ]
+        return list(reversed(jobs))
+
+    async def wait_for(self, job_id: str, timeout: Optional[float] = None) -> Optional[IngestionJob]:
+        """Wait until a job has finished"""
+        deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+
+        while True:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_finished:
+                return job
+            if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+                return job
+            await asyncio.sleep(0.5)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Awaiting work is cancelled immediately; work running in a thread stops
+        at its next progress report.
+
+        Returns:
+            True if the job was found and had not already finished
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.is_finished:
+            return False
+
+        job.cancel_requested = True
+
+        if job.status == IngestionJobStatus.QUEUED:
+            # The worker skips it when it is dequeued
+            self._runners.pop(job_id, None)
+            self._finish(job, IngestionJobStatus.CANCELLED)
+        else:
+            task = self._running_tasks.get(job_id)
+            if task is not None:
+                task.cancel()
+
+        logger.info(f"Cancellation requested for ingestion job {job_id}")
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get queue statistics"""
+        counts = {status.value: 0 for status in IngestionJobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+
+        return {
+            "workers": self.max_workers,
+            "queue_capacity": self.max_queue_size,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running_tasks),
+            "jobs_by_status": counts
+        }
+
+    async def _worker(self, worker_id: int) -> None:
+        """Take jobs off the queue and run them one at a time"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion worker {worker_id} failed on job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        """Run a single job and record its outcome"""
+        job = self._jobs.get(job_id)
+        runner = self._runners.pop(job_id, None)
+        if job is None or runner is None or job.status != IngestionJobStatus.QUEUED:
+            return
+
+        job.status = IngestionJobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        logger.info(f"Starting ingestion job {job_id} ({job.filename})")
+
+        task = asyncio.create_task(runner(job))
+        self._running_tasks[job_id] = task
+
+        try:
+            result = await task
+
+            if job.cancel_requested:
+                self._finish(job, IngestionJobStatus.CANCELLED)
+            elif result.get("success", True):
+                self._finish(job, IngestionJobStatus.COMPLETED, result=result)
+            else:
+                self._finish(job, IngestionJobStatus.FAILED, result=result,
+                             error=result.get("error") or "Ingestion failed")
+        except (asyncio.CancelledError, IngestionCancelledError):
+            if not job.cancel_requested:
+                # The worker itself is being cancelled
+                raise
+            self._finish(job, IngestionJobStatus.CANCELLED)
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            self._finish(job, IngestionJobStatus.FAILED, error=str(e))
+        finally:
+            self._running_tasks.pop(job_id, None)
+
+    def _finish(
+        self,
+        job: IngestionJob,
+        status: IngestionJobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Record a job's final state and remove its upload"""
+        job.status = status
+        job.result = result
+        job.error = error or ("Cancelled" if status == IngestionJobStatus.CANCELLED else None)
+        job.finished_at = datetime.utcnow()
+        self._remove_file(job.file_path)
+        logger.info(f"Ingestion job {job.job_id} finished with status {status.value}")
+
+    def _prune_jobs(self) -> None:
+        """Drop finished jobs that have expired or exceed the retention limit"""
+        now = datetime.utcnow()
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        excess = len(finished) - self.max_retained_jobs
+
+        for job in finished:
+            expired = (now - job.finished_at).total_seconds() > self.job_retention_seconds
+            if expired or excess > 0:
+                del self._jobs[job.job_id]
+                excess -= 1
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        """Remove a file if it still exists"""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove upload {path}: {e}")
+
+
+# Create singleton instance
+ingestion_job_manager = IngestionJobManager()
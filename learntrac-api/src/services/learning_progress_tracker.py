@@ -20,7 +20,7 @@ import json
 
 from ..db.database import DatabaseManager
 from ..services.redis_client import RedisCache
-from ..pdf_processing.neo4j_search import Neo4jVectorSearch
+from ..pdf_processing.neo4j_vector_search import Neo4jVectorSearch
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +14,9 @@ from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Vector index created by Neo4jAuraClient.create_vector_index
+CHUNK_VECTOR_INDEX = "chunk_embeddings"
+
 
 class Neo4jAuraClient:
     """Neo4j Aura client for vector similarity search using GDS library"""
@@ -36,15 +39,20 @@ class Neo4jAuraClient:
         self, 
         embedding: List[float], 
         min_score: float = 0.65, 
-        limit: int = 20
+        limit: int = 20,
+        exact: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Perform vector similarity search on Chunk nodes
         
+        Uses the chunk vector index by default. The exact GDS full scan is kept
+        for recall checks and as a fallback when the index is unavailable.
+        
         Args:
             embedding: Query embedding vector
             min_score: Minimum cosine similarity score (default: 0.65)
             limit: Maximum number of results (default: 20)
+            exact: Score every chunk with gds.similarity.cosine instead of the index
             
         Returns:
             List of chunks with similarity scores
@@ -54,6 +62,31 @@ class Neo4jAuraClient:
             return []
         
         async with self.driver.session() as session:
+            if not exact:
+                try:
+                    # The index reports cosine as (1 + cos) / 2; convert back so
+                    # min_score means the same thing in both modes
+                    result = await session.run("""
+                        CALL db.index.vector.queryNodes($index_name, $limit, $embedding)
+                        YIELD node AS c, score AS index_score
+                        WITH c, 2 * index_score - 1 AS score
+                        WHERE score >= $min_score
+                        RETURN c.id AS id, 
+                               c.content AS content, 
+                               c.subject AS subject, 
+                               c.concept AS concept,
+                               c.has_prerequisite AS has_prerequisite, 
+                               c.prerequisite_for AS prerequisite_for, 
+                               score
+                        ORDER BY score DESC
+                    """, index_name=CHUNK_VECTOR_INDEX, embedding=embedding,
+                        min_score=min_score, limit=limit)
+                    
+                    return [record.data() async for record in result]
+                    
+                except Exception as e:
+                    logger.warning(f"Index vector search failed ({e}), falling back to exact search")
+            
             try:
                 result = await session.run("""
                     MATCH (c:Chunk)
@@ -220,37 +253,98 @@ class Neo4jAuraClient:
         self,
         embeddings: List[List[float]],
         min_score: float = 0.65,
-        limit_per_query: int = 10
+        limit_per_query: int = 10,
+        exact: bool = False
     ) -> List[List[Dict[str, Any]]]:
-        """Perform multiple vector searches in one batch"""
+        """
+        Perform multiple vector searches in one round-trip
+        
+        All query embeddings are sent as one UNWIND statement; results come
+        back tagged with their query position and are regrouped in input order.
+        
+        Args:
+            embeddings: Query embedding vectors
+            min_score: Minimum cosine similarity score
+            limit_per_query: Maximum results per query
+            exact: Score every chunk with gds.similarity.cosine instead of the index
+            
+        Returns:
+            One result list per query embedding
+        """
         if not self.driver:
             return []
         
-        results = []
+        if not embeddings:
+            return []
+        
         async with self.driver.session() as session:
-            for embedding in embeddings:
+            if not exact:
                 try:
                     result = await session.run("""
-                        MATCH (c:Chunk)
-                        WITH c, gds.similarity.cosine(c.embedding, $embedding) AS score
+                        UNWIND range(0, size($embeddings) - 1) AS query_index
+                        CALL db.index.vector.queryNodes($index_name, $limit, $embeddings[query_index])
+                        YIELD node AS c, score AS index_score
+                        WITH query_index, c, 2 * index_score - 1 AS score
                         WHERE score >= $min_score
-                        RETURN c.id AS id, 
+                        RETURN query_index,
+                               c.id AS id, 
                                c.content AS content, 
                                c.subject AS subject, 
                                c.concept AS concept,
                                score
-                        ORDER BY score DESC
-                        LIMIT $limit
-                    """, embedding=embedding, min_score=min_score, limit=limit_per_query)
+                        ORDER BY query_index, score DESC
+                    """, index_name=CHUNK_VECTOR_INDEX, embeddings=embeddings,
+                        min_score=min_score, limit=limit_per_query)
                     
-                    batch_results = [record.data() async for record in result]
-                    results.append(batch_results)
+                    return self._group_by_query_index(
+                        [record.data() async for record in result],
+                        len(embeddings)
+                    )
                     
                 except Exception as e:
-                    logger.error(f"Bulk search query failed: {e}")
-                    results.append([])
-        
-        return results
+                    logger.warning(f"Index bulk search failed ({e}), falling back to exact search")
+            
+            try:
+                result = await session.run("""
+                    UNWIND range(0, size($embeddings) - 1) AS query_index
+                    CALL {
+                        WITH query_index
+                        MATCH (c:Chunk)
+                        WITH c, gds.similarity.cosine(c.embedding, $embeddings[query_index]) AS score
+                        WHERE score >= $min_score
+                        RETURN c, score
+                        ORDER BY score DESC
+                        LIMIT $limit
+                    }
+                    RETURN query_index,
+                           c.id AS id, 
+                           c.content AS content, 
+                           c.subject AS subject, 
+                           c.concept AS concept,
+                           score
+                    ORDER BY query_index, score DESC
+                """, embeddings=embeddings, min_score=min_score, limit=limit_per_query)
+                
+                return self._group_by_query_index(
+                    [record.data() async for record in result],
+                    len(embeddings)
+                )
+                
+            except Exception as e:
+                logger.error(f"Bulk search query failed: {e}")
+                return [[] for _ in embeddings]
+    
+    @staticmethod
+    def _group_by_query_index(
+        records: List[Dict[str, Any]],
+        query_count: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Split UNWIND results back into one list per query"""
+        grouped: List[List[Dict[str, Any]]] = [[] for _ in range(query_count)]
+        for record in records:
+            query_index = record.pop("query_index")
+            grouped[query_index].append(record)
+        return grouped
     
     async def health_check(self) -> Dict[str, Any]:
         """Check Neo4j connection health"""
@@ -296,16 +390,16 @@ class Neo4jAuraClient:
         async with self.driver.session() as session:
             try:
                 # Create vector index for cosine similarity
-                await session.run("""
-                    CREATE VECTOR INDEX chunk_embeddings IF NOT EXISTS
+                await session.run(f"""
+                    CREATE VECTOR INDEX {CHUNK_VECTOR_INDEX} IF NOT EXISTS
                     FOR (c:Chunk)
                     ON (c.embedding)
-                    OPTIONS {
-                        indexConfig: {
+                    OPTIONS {{
+                        indexConfig: {{
                             `vector.dimensions`: 1536,
                             `vector.similarity_function`: 'cosine'
-                        }
-                    }
+                        }}
+                    }}
                 """)
                 
                 # Create regular indexes for faster lookups
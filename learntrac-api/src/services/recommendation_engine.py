@@ -22,7 +22,9 @@ import json
 
 from ..db.database import DatabaseManager
 from ..services.redis_client import RedisCache
-from ..pdf_processing.neo4j_search import Neo4jVectorSearch
+from ..pdf_processing.neo4j_vector_search import Neo4jVectorSearch
+from ..pdf_processing.chunk_similarity_table import ChunkSimilarityTable
+from ..pdf_processing.neo4j_content_ingestion import Neo4jContentIngestion
 from ..services.learning_progress_tracker import LearningProgressTracker
 from ..services.embedding_service import EmbeddingService
 
@@ -82,13 +84,18 @@ class RecommendationEngine:
     - Contextual factors (time, progress, goals)
     """
     
+    # Cypher expressions for chunk display metadata
+    _CHUNK_TITLE = "coalesce(c.section_title, c.concept_name, c.title)"
+    _CHUNK_CONCEPTS = "[(c)-[:MENTIONS_CONCEPT]->(k:Concept) | k.name][..5]"
+    
     def __init__(
         self,
         db_manager: DatabaseManager,
         redis_cache: RedisCache,
         neo4j_search: Neo4jVectorSearch,
         progress_tracker: LearningProgressTracker,
-        embedding_service: EmbeddingService
+        embedding_service: EmbeddingService,
+        content_ingestion: Optional[Neo4jContentIngestion] = None
     ):
         self.db_manager = db_manager
         self.redis_cache = redis_cache
@@ -102,6 +109,22 @@ class RecommendationEngine:
         self.exploration_rate = 0.2  # 20% exploration vs exploitation
         self.difficulty_tolerance = 0.3  # +/- 30% difficulty range
         
+        # Precomputed chunk neighbour table
+        self.similarity_neighbours = 20  # Neighbours stored per chunk
+        self.similarity_block_size = 1024  # Tile size for blocked matmul
+        self.similarity_page_size = 5000  # Embeddings fetched per Neo4j page
+        self.similarity_table = ChunkSimilarityTable(
+            k=self.similarity_neighbours,
+            block_size=self.similarity_block_size,
+            min_similarity=self.min_similarity_threshold
+        )
+        self._similarity_lock = asyncio.Lock()
+        self._similarity_tasks: Set[asyncio.Task] = set()
+        
+        # Merge newly ingested textbooks into the table as ingestion finishes
+        if content_ingestion is not None:
+            self.attach_to_ingestion(content_ingestion)
+        
         # Weights for hybrid scoring
         self.weights = {
             "content_similarity": 0.25,
@@ -160,21 +183,22 @@ class RecommendationEngine:
             user_id, user_profile, limit * 5  # Get more candidates for filtering
         )
         
-        # Score candidates using hybrid approach
+        # Score all candidates at once using hybrid approach
+        factor_scores = await self._score_candidates_batch(
+            candidates, user_id, user_profile, user_progress, context
+        )
+        
+        factors = list(self.weights)
+        score_matrix = np.column_stack([factor_scores[f] for f in factors]).reshape(-1, len(factors))
+        total_scores = score_matrix @ np.array([self.weights[f] for f in factors])
+        
         scored_candidates = []
-        for candidate in candidates:
-            scores = await self._score_candidate(
-                candidate, user_id, user_profile, user_progress, context
-            )
-            
-            total_score = sum(
-                self.weights[factor] * score 
-                for factor, score in scores.items()
-            )
+        for i, candidate in enumerate(candidates):
+            scores = {f: float(score_matrix[i, j]) for j, f in enumerate(factors)}
             
             # Create recommendation
             recommendation = await self._create_recommendation(
-                candidate, total_score, scores
+                candidate, float(total_scores[i]), scores
             )
             scored_candidates.append(recommendation)
         
@@ -279,6 +303,25 @@ class RecommendationEngine:
         Returns:
             List of similar content
         """
+        # Serve from the precomputed neighbour table when available
+        neighbours = self.similarity_table.get_neighbours(chunk_id, limit)
+        if neighbours:
+            # Lists loaded from content_similarity_cache carry no display metadata
+            metadata = self.similarity_table.chunk_metadata
+            missing = [n for n, _ in neighbours if n not in metadata]
+            if missing:
+                metadata.update(await self._load_chunk_metadata(missing))
+            
+            return [
+                {
+                    "chunk_id": neighbour_id,
+                    "similarity_score": score,
+                    "title": metadata.get(neighbour_id, {}).get("title"),
+                    "concepts": metadata.get(neighbour_id, {}).get("concepts", [])[:5]
+                }
+                for neighbour_id, score in neighbours
+            ]
+        
         # Get chunk embedding
         chunk_data = await self._get_chunk_data(chunk_id)
         if not chunk_data:
@@ -419,6 +462,324 @@ class RecommendationEngine:
         
         return scores
     
+    async def _score_candidates_batch(
+        self,
+        candidates: List[Dict[str, Any]],
+        user_id: str,
+        user_profile: UserProfile,
+        user_progress: Any,
+        context: Optional[Dict[str, Any]]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score all candidates with bulk lookups and vectorized factor math.
+        
+        Equivalent to calling _score_candidate for each candidate, but each
+        factor's inputs are fetched once for the whole candidate list and
+        mastery is calculated once per distinct prerequisite.
+        
+        Returns:
+            Dictionary of factor name to score array aligned with candidates
+        """
+        n = len(candidates)
+        if n == 0:
+            return {factor: np.zeros(0) for factor in self.weights}
+        
+        chunk_ids = [c["chunk_id"] for c in candidates]
+        concept_ids = [c["concept_id"] for c in candidates]
+        
+        (
+            user_interests,
+            candidate_embeddings,
+            similar_users,
+            prerequisite_rows,
+            last_reviewed,
+            recent_concept_ids
+        ) = await asyncio.gather(
+            self._get_user_interest_embedding(user_id),
+            self._get_candidate_embeddings(candidates),
+            self._get_similar_users(user_id, limit=10),
+            self._get_prerequisites_bulk(list(set(concept_ids))),
+            self._get_last_reviewed_bulk(chunk_ids, user_id),
+            self._get_recent_concept_ids(user_id)
+        )
+        
+        prerequisite_ids = list(dict.fromkeys(r["prerequisite_id"] for r in prerequisite_rows))
+        ratings, masteries = await asyncio.gather(
+            self._get_user_chunk_ratings_bulk(
+                [u["user_id"] for u in similar_users or []], chunk_ids
+            ),
+            asyncio.gather(*[
+                self.progress_tracker.calculate_concept_mastery(user_id, prerequisite_id)
+                for prerequisite_id in prerequisite_ids
+            ])
+        )
+        mastery_levels = {
+            prerequisite_id: mastery.mastery_level
+            for prerequisite_id, mastery in zip(prerequisite_ids, masteries)
+        }
+        
+        return {
+            "content_similarity": self._batch_content_similarity(
+                candidates, candidate_embeddings, user_interests, context
+            ),
+            "collaborative": self._batch_collaborative_scores(
+                chunk_ids, similar_users or [], ratings
+            ),
+            "prerequisite": self._batch_prerequisite_scores(
+                concept_ids, prerequisite_rows, mastery_levels
+            ),
+            "difficulty": self._batch_difficulty_scores(
+                np.array([c["difficulty"] for c in candidates], dtype=float),
+                user_profile,
+                user_progress
+            ),
+            "recency": self._batch_recency_scores(chunk_ids, last_reviewed),
+            "diversity": self._batch_diversity_scores(concept_ids, recent_concept_ids)
+        }
+    
+    def _batch_content_similarity(
+        self,
+        candidates: List[Dict[str, Any]],
+        embeddings: List[Optional[List[float]]],
+        user_interests: Optional[List[float]],
+        context: Optional[Dict[str, Any]]
+    ) -> np.ndarray:
+        """Vectorized counterpart of _calculate_content_similarity"""
+        scores = np.full(len(candidates), 0.5)
+        similarity = np.array([
+            self._lookup_precomputed_similarity(c["chunk_id"], context)
+            for c in candidates
+        ], dtype=float)
+        
+        if user_interests is not None:
+            interests = np.asarray(user_interests, dtype=float)
+            present = [
+                i for i, e in enumerate(embeddings)
+                if np.isnan(similarity[i]) and e is not None and len(e) == len(interests)
+            ]
+            if present:
+                matrix = np.asarray([embeddings[i] for i in present], dtype=float)
+                norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(interests)
+                similarity[present] = np.divide(
+                    matrix @ interests, norms,
+                    out=np.zeros(len(present)), where=norms > 0
+                )
+        
+        known = np.flatnonzero(~np.isnan(similarity))
+        if not len(known):
+            return scores
+        
+        # Boost if matches current context
+        if context and context.get("current_topic"):
+            topic_match = np.array([
+                context["current_topic"] in candidates[i].get("concepts", [])
+                for i in known
+            ])
+            similarity[known] = np.where(
+                topic_match, np.minimum(1.0, similarity[known] + 0.2), similarity[known]
+            )
+        
+        scores[known] = np.clip(similarity[known], 0, 1)
+        return scores
+    
+    def _batch_collaborative_scores(
+        self,
+        chunk_ids: List[str],
+        similar_users: List[Dict[str, Any]],
+        ratings: Dict[Tuple[str, str], float]
+    ) -> np.ndarray:
+        """Vectorized counterpart of _calculate_collaborative_score"""
+        if not similar_users:
+            return np.full(len(chunk_ids), 0.5)
+        
+        # Candidates x similar users, NaN where the user has not rated the chunk
+        rating_matrix = np.array([
+            [ratings.get((u["user_id"], chunk_id), np.nan) for u in similar_users]
+            for chunk_id in chunk_ids
+        ], dtype=float)
+        
+        rated = ~np.isnan(rating_matrix)
+        total_ratings = rated.sum(axis=1)
+        positive_ratings = (np.nan_to_num(rating_matrix, nan=0.0) > 0.7).sum(axis=1)
+        avg_similarity = np.mean([u["similarity"] for u in similar_users])
+        
+        weighted = np.divide(
+            positive_ratings, total_ratings,
+            out=np.zeros(len(chunk_ids)), where=total_ratings > 0
+        )
+        return np.where(total_ratings > 0, weighted * avg_similarity, 0.5)
+    
+    def _batch_prerequisite_scores(
+        self,
+        concept_ids: List[str],
+        prerequisite_rows: List[Dict[str, Any]],
+        mastery_levels: Dict[str, float]
+    ) -> np.ndarray:
+        """Vectorized counterpart of _calculate_prerequisite_score"""
+        concept_index = {cid: i for i, cid in enumerate(dict.fromkeys(concept_ids))}
+        total_weight = np.zeros(len(concept_index))
+        satisfied = np.zeros(len(concept_index))
+        has_prereqs = np.zeros(len(concept_index), dtype=bool)
+        
+        if prerequisite_rows:
+            rows = np.array([concept_index[r["concept_id"]] for r in prerequisite_rows])
+            weights = np.array([
+                1.0 if r.get("importance") is None else r["importance"] for r in prerequisite_rows
+            ], dtype=float)
+            mastery = np.array([mastery_levels[r["prerequisite_id"]] for r in prerequisite_rows], dtype=float)
+            
+            np.add.at(total_weight, rows, weights)
+            np.add.at(satisfied, rows, np.where(mastery >= 0.7, weights, 0.0))
+            has_prereqs[rows] = True
+        
+        per_concept = np.where(
+            has_prereqs,
+            np.divide(satisfied, total_weight, out=np.zeros_like(satisfied), where=total_weight > 0),
+            1.0  # No prerequisites
+        )
+        return per_concept[[concept_index[cid] for cid in concept_ids]]
+    
+    def _batch_difficulty_scores(
+        self,
+        difficulties: np.ndarray,
+        user_profile: UserProfile,
+        user_progress: Any
+    ) -> np.ndarray:
+        """Vectorized counterpart of _calculate_difficulty_score"""
+        current_level = user_progress.average_understanding
+        optimal_difficulty = min(0.9, current_level + 0.1)
+        
+        if user_profile.pace == "fast":
+            optimal_difficulty += 0.1
+        elif user_profile.pace == "slow":
+            optimal_difficulty -= 0.1
+        
+        optimal_difficulty = max(0.1, min(0.9, optimal_difficulty))
+        
+        distance = np.abs(difficulties - optimal_difficulty)
+        return np.clip(1.0 - (distance / self.difficulty_tolerance), 0, 1)
+    
+    def _batch_recency_scores(
+        self,
+        chunk_ids: List[str],
+        last_reviewed: Dict[str, datetime]
+    ) -> np.ndarray:
+        """Vectorized counterpart of _calculate_recency_score"""
+        now = datetime.utcnow()
+        days_since = np.array([
+            (now - last_reviewed[chunk_id]).days if last_reviewed.get(chunk_id) else np.inf
+            for chunk_id in chunk_ids
+        ], dtype=float)
+        
+        # Optimal spacing curve (simplified Ebbinghaus)
+        return np.select(
+            [days_since < 1, days_since < 3, days_since < 7, days_since < 14],
+            [0.2, 0.5, 0.8, 0.9],
+            default=1.0
+        )
+    
+    def _batch_diversity_scores(
+        self,
+        concept_ids: List[str],
+        recent_concept_ids: List[str]
+    ) -> np.ndarray:
+        """Vectorized counterpart of _calculate_diversity_score"""
+        first_position = {}
+        for position, cid in enumerate(recent_concept_ids):
+            first_position.setdefault(cid, position)
+        
+        positions = np.array([first_position.get(cid, -1) for cid in concept_ids], dtype=float)
+        
+        # More recent = lower score, new topics get a bonus
+        return np.where(positions >= 0, 0.5 - 0.05 * (10 - positions), 1.0)
+    
+    async def _get_candidate_embeddings(
+        self,
+        candidates: List[Dict[str, Any]]
+    ) -> List[Optional[List[float]]]:
+        """Collect candidate embeddings, fetching missing ones concurrently"""
+        embeddings: List[Optional[List[float]]] = [c.get("embedding") or None for c in candidates]
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        
+        if missing:
+            chunk_data = await asyncio.gather(*[
+                self._get_chunk_data(candidates[i]["chunk_id"]) for i in missing
+            ])
+            for i, data in zip(missing, chunk_data):
+                embeddings[i] = (data or {}).get("embedding") or None
+        
+        return embeddings
+    
+    async def _get_user_chunk_ratings_bulk(
+        self,
+        user_ids: List[str],
+        chunk_ids: List[str]
+    ) -> Dict[Tuple[str, str], float]:
+        """Fetch ratings for every (user, chunk) pair in one query"""
+        if not user_ids or not chunk_ids:
+            return {}
+        
+        rows = await self.db_manager.fetch_all(
+            """
+            SELECT user_id, chunk_id, rating
+            FROM user_content_ratings
+            WHERE user_id = ANY($1) AND chunk_id = ANY($2)
+            """,
+            user_ids, chunk_ids
+        )
+        
+        return {(r["user_id"], r["chunk_id"]): r["rating"] for r in rows}
+    
+    async def _get_prerequisites_bulk(
+        self,
+        concept_ids: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Fetch the prerequisites of many concepts"""
+        if not concept_ids:
+            return []
+        
+        return await self.db_manager.fetch_all(
+            """
+            SELECT concept_id, prerequisite_id, importance
+            FROM concept_prerequisites
+            WHERE concept_id = ANY($1)
+            """,
+            concept_ids
+        )
+    
+    async def _get_last_reviewed_bulk(
+        self,
+        chunk_ids: List[str],
+        user_id: str
+    ) -> Dict[str, datetime]:
+        """Fetch last review times for many chunks"""
+        rows = await self.db_manager.fetch_all(
+            """
+            SELECT chunk_id, last_reviewed
+            FROM user_chunk_progress
+            WHERE user_id = $1 AND chunk_id = ANY($2)
+            """,
+            user_id, chunk_ids
+        )
+        
+        return {r["chunk_id"]: r["last_reviewed"] for r in rows if r["last_reviewed"]}
+    
+    async def _get_recent_concept_ids(self, user_id: str) -> List[str]:
+        """Get concepts studied in the last day, most recent first"""
+        recent_concepts = await self.db_manager.fetch_all(
+            """
+            SELECT DISTINCT concept_id
+            FROM user_concept_progress
+            WHERE user_id = $1 
+                AND last_reviewed > $2
+            ORDER BY last_reviewed DESC
+            LIMIT 10
+            """,
+            user_id, datetime.utcnow() - timedelta(days=1)
+        )
+        
+        return [c["concept_id"] for c in recent_concepts]
+    
     async def _calculate_content_similarity(
         self,
         candidate: Dict[str, Any],
@@ -426,26 +787,30 @@ class RecommendationEngine:
         context: Optional[Dict[str, Any]]
     ) -> float:
         """Calculate content-based similarity score"""
-        # Get user interest embedding
-        user_interests = await self._get_user_interest_embedding(user_id)
-        
-        if user_interests is None:
-            return 0.5  # Neutral score
+        # Precomputed similarity to the chunk being studied, if stored
+        similarity = self._lookup_precomputed_similarity(candidate["chunk_id"], context)
         
-        # Get candidate embedding
-        candidate_embedding = candidate.get("embedding")
-        if not candidate_embedding:
-            chunk_data = await self._get_chunk_data(candidate["chunk_id"])
-            candidate_embedding = chunk_data.get("embedding", [])
-        
-        if not candidate_embedding:
-            return 0.5
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(
-            [user_interests],
-            [candidate_embedding]
-        )[0][0]
+        if similarity is None:
+            # Get user interest embedding
+            user_interests = await self._get_user_interest_embedding(user_id)
+            
+            if user_interests is None:
+                return 0.5  # Neutral score
+            
+            # Get candidate embedding
+            candidate_embedding = candidate.get("embedding")
+            if not candidate_embedding:
+                chunk_data = await self._get_chunk_data(candidate["chunk_id"])
+                candidate_embedding = chunk_data.get("embedding", [])
+            
+            if not candidate_embedding:
+                return 0.5
+            
+            # Calculate cosine similarity
+            similarity = cosine_similarity(
+                [user_interests],
+                [candidate_embedding]
+            )[0][0]
         
         # Boost if matches current context
         if context and context.get("current_topic"):
@@ -511,7 +876,9 @@ class RecommendationEngine:
                 user_id, prereq["concept_id"]
             )
             
-            weight = prereq.get("importance", 1.0)
+            weight = prereq.get("importance")
+            if weight is None:
+                weight = 1.0
             total_weight += weight
             
             if mastery.mastery_level >= 0.7:
@@ -585,19 +952,7 @@ class RecommendationEngine:
     ) -> float:
         """Calculate topic diversity score"""
         # Get recently studied concepts
-        recent_concepts = await self.db_manager.fetch_all(
-            """
-            SELECT DISTINCT concept_id
-            FROM user_concept_progress
-            WHERE user_id = $1 
-                AND last_reviewed > $2
-            ORDER BY last_reviewed DESC
-            LIMIT 10
-            """,
-            user_id, datetime.utcnow() - timedelta(days=1)
-        )
-        
-        recent_ids = [c["concept_id"] for c in recent_concepts]
+        recent_ids = await self._get_recent_concept_ids(user_id)
         
         if concept_id in recent_ids:
             # Penalty for repetition
@@ -850,11 +1205,252 @@ class RecommendationEngine:
         ])
     
     async def _precompute_similarities(self) -> None:
-        """Precompute content similarities for efficiency"""
-        # This would be done periodically in production
-        # For now, we compute on-demand and cache
+        """Load stored chunk neighbours and rebuild the table in the background"""
+        rows = await self.db_manager.fetch_all(
+            """
+            SELECT chunk_id_1, chunk_id_2, similarity_score
+            FROM content_similarity_cache
+            """
+        )
+        self.similarity_table.load_rows(
+            (r["chunk_id_1"], r["chunk_id_2"], r["similarity_score"]) for r in rows
+        )
+        logger.info(f"Loaded {len(self.similarity_table)} precomputed neighbour lists")
+        
+        self._run_in_background(self.rebuild_similarity_table())
         logger.info("Similarity precomputation scheduled")
     
+    def attach_to_ingestion(self, ingestion: Neo4jContentIngestion) -> None:
+        """
+        Keep the neighbour table current as textbooks are ingested.
+        
+        Args:
+            ingestion: Content ingestion pipeline to listen to
+        """
+        if self.schedule_similarity_update not in ingestion.ingestion_listeners:
+            ingestion.add_ingestion_listener(self.schedule_similarity_update)
+    
+    async def schedule_similarity_update(
+        self,
+        textbook_id: str,
+        chunk_ids: Optional[List[str]] = None,
+        removed_chunk_ids: Optional[List[str]] = None
+    ) -> None:
+        """Ingestion listener: update neighbours for a new textbook in the background"""
+        self._run_in_background(
+            self.update_similarities_for_textbook(textbook_id, chunk_ids, removed_chunk_ids)
+        )
+    
+    async def rebuild_similarity_table(self) -> Dict[str, Any]:
+        """
+        Rebuild the full chunk neighbour table from Neo4j embeddings.
+        
+        The top-k computation runs in a worker thread using memory-bounded
+        tiles, and the result replaces content_similarity_cache.
+        
+        Returns:
+            Similarity table statistics
+        """
+        async with self._similarity_lock:
+            chunk_ids, embeddings, metadata = await self._load_chunk_embeddings()
+            if not chunk_ids:
+                logger.info("No chunk embeddings found for similarity precomputation")
+                return self.similarity_table.get_statistics()
+            
+            await asyncio.to_thread(self.similarity_table.build, chunk_ids, embeddings, metadata)
+            
+            await self.db_manager.execute("DELETE FROM content_similarity_cache")
+            await self._store_similarity_rows(list(self.similarity_table.neighbours))
+            
+            return self.similarity_table.get_statistics()
+    
+    async def update_similarities_for_textbook(
+        self,
+        textbook_id: str,
+        chunk_ids: Optional[List[str]] = None,
+        removed_chunk_ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Incrementally apply a textbook ingestion to the neighbour table.
+        
+        Args:
+            textbook_id: Textbook identifier
+            chunk_ids: Chunks written by the ingestion (loaded by textbook if None)
+            removed_chunk_ids: Chunks the ingestion deleted
+            
+        Returns:
+            Ids of chunks whose neighbour lists changed
+        """
+        if not self.similarity_table.has_vectors:
+            # Nothing to merge into yet; a full build covers the new textbook
+            await self.rebuild_similarity_table()
+            return list(self.similarity_table.neighbours)
+        
+        async with self._similarity_lock:
+            changed = set()
+            if removed_chunk_ids:
+                changed.update(await asyncio.to_thread(
+                    self.similarity_table.remove, removed_chunk_ids
+                ))
+                await self.db_manager.execute(
+                    """
+                    DELETE FROM content_similarity_cache
+                    WHERE chunk_id_1 = ANY($1) OR chunk_id_2 = ANY($1)
+                    """,
+                    removed_chunk_ids
+                )
+            
+            new_ids, embeddings, metadata = await self._load_chunk_embeddings(
+                textbook_id=textbook_id, chunk_ids=chunk_ids
+            )
+            if new_ids:
+                changed.update(await asyncio.to_thread(
+                    self.similarity_table.add, new_ids, embeddings, metadata
+                ))
+            if not changed:
+                return []
+            
+            changed = list(changed)
+            await self.db_manager.execute(
+                "DELETE FROM content_similarity_cache WHERE chunk_id_1 = ANY($1)",
+                changed
+            )
+            await self._store_similarity_rows(changed)
+            
+            logger.info(f"Updated {len(changed)} neighbour lists for textbook {textbook_id}")
+            return changed
+    
+    def _lookup_precomputed_similarity(
+        self,
+        chunk_id: str,
+        context: Optional[Dict[str, Any]]
+    ) -> Optional[float]:
+        """Stored similarity between a candidate and the chunk being studied"""
+        if not context or not context.get("current_chunk_id"):
+            return None
+        return self.similarity_table.get_similarity(context["current_chunk_id"], chunk_id)
+    
+    async def _load_chunk_embeddings(
+        self,
+        textbook_id: Optional[str] = None,
+        chunk_ids: Optional[List[str]] = None
+    ) -> Tuple[List[str], np.ndarray, Dict[str, Dict[str, Any]]]:
+        """
+        Stream chunk embeddings from Neo4j with keyset pagination.
+        
+        Each page is converted to a float32 matrix as it arrives, so the
+        corpus is never held as Python float lists.
+        
+        Args:
+            textbook_id: Restrict to one textbook
+            chunk_ids: Restrict to these chunks
+            
+        Returns:
+            Chunk ids, (N, D) float32 embedding matrix and display metadata
+        """
+        conditions = ["c.embedding IS NOT NULL", "c.chunk_id > $last_id"]
+        if chunk_ids:
+            conditions.append("c.chunk_id IN $chunk_ids")
+        elif textbook_id:
+            conditions.append(
+                "(c.textbook_id = $textbook_id OR "
+                "(c)-[:BELONGS_TO_TEXTBOOK]->(:Textbook {textbook_id: $textbook_id}))"
+            )
+        
+        query = f"""
+            MATCH (c:Chunk)
+            WHERE {' AND '.join(conditions)}
+            RETURN c.chunk_id AS chunk_id,
+                   c.embedding AS embedding,
+                   {self._CHUNK_TITLE} AS title,
+                   {self._CHUNK_CONCEPTS} AS concepts
+            ORDER BY c.chunk_id
+            LIMIT $page_size
+        """
+        
+        ids: List[str] = []
+        pages: List[np.ndarray] = []
+        metadata: Dict[str, Dict[str, Any]] = {}
+        dimensions = None
+        last_id = ""
+        
+        while True:
+            page = await self.neo4j_search.connection.execute_query(query, {
+                "last_id": last_id,
+                "page_size": self.similarity_page_size,
+                "textbook_id": textbook_id,
+                "chunk_ids": chunk_ids or []
+            })
+            
+            page_embeddings = []
+            for record in page:
+                embedding = record["embedding"]
+                dimensions = dimensions or len(embedding)
+                if len(embedding) != dimensions:
+                    continue
+                ids.append(record["chunk_id"])
+                page_embeddings.append(embedding)
+                metadata[record["chunk_id"]] = {
+                    "title": record["title"],
+                    "concepts": record["concepts"] or []
+                }
+            if page_embeddings:
+                pages.append(np.asarray(page_embeddings, dtype=np.float32))
+            
+            if len(page) < self.similarity_page_size:
+                break
+            last_id = page[-1]["chunk_id"]
+        
+        embeddings = np.concatenate(pages) if pages else np.zeros((0, dimensions or 0), dtype=np.float32)
+        return ids, embeddings, metadata
+    
+    async def _load_chunk_metadata(self, chunk_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Display metadata (title, concepts) for chunks, keyed by chunk id"""
+        records = await self.neo4j_search.connection.execute_query(
+            f"""
+            MATCH (c:Chunk)
+            WHERE c.chunk_id IN $chunk_ids
+            RETURN c.chunk_id AS chunk_id,
+                   {self._CHUNK_TITLE} AS title,
+                   {self._CHUNK_CONCEPTS} AS concepts
+            """,
+            {"chunk_ids": chunk_ids}
+        )
+        return {
+            r["chunk_id"]: {"title": r["title"], "concepts": r["concepts"] or []}
+            for r in records
+        }
+    
+    async def _store_similarity_rows(self, chunk_ids: List[str], batch_size: int = 10000) -> None:
+        """Persist neighbour lists to content_similarity_cache"""
+        rows = list(self.similarity_table.iter_rows(chunk_ids))
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            await self.db_manager.execute(
+                """
+                INSERT INTO content_similarity_cache
+                    (chunk_id_1, chunk_id_2, similarity_score)
+                SELECT * FROM unnest($1::varchar[], $2::varchar[], $3::float8[])
+                ON CONFLICT (chunk_id_1, chunk_id_2)
+                DO UPDATE SET
+                    similarity_score = EXCLUDED.similarity_score,
+                    computed_at = NOW()
+                """,
+                [r[0] for r in batch], [r[1] for r in batch], [r[2] for r in batch]
+            )
+    
+    def _run_in_background(self, coro) -> None:
+        """Run a coroutine as a tracked background task"""
+        task = asyncio.create_task(coro)
+        self._similarity_tasks.add(task)
+        
+        def _done(finished: asyncio.Task) -> None:
+            self._similarity_tasks.discard(finished)
+            if not finished.cancelled() and finished.exception():
+                logger.error(f"Similarity precomputation failed: {finished.exception()}")
+        
+        task.add_done_callback(_done)
+    
     def _serialize_recommendations(self, recommendations: List[ContentRecommendation]) -> str:
         """Serialize recommendations for caching"""
         return json.dumps([
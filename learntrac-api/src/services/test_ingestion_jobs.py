@@ -0,0 +1,185 @@
+"""
+Unit tests for IngestionJobManager
+
+Tests the bounded queue, cancellation of queued and running jobs, pruning
+of finished jobs, the upload size limit and job access checks.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from .ingestion_jobs import (
+    IngestionJobManager, IngestionJobStatus, IngestionQueueFullError, UploadTooLargeError
+)
+from ..routers.trac import get_owned_job
+from .auth_service import User
+
+
+class FakeUpload:
+    """Upload that returns size bytes in read(n) pieces"""
+
+    def __init__(self, size):
+        self.remaining = size
+
+    async def read(self, n):
+        chunk = b"%" * min(n, self.remaining)
+        self.remaining -= len(chunk)
+        return chunk
+
+
+def user(user_id, role="student"):
+    return User(
+        id=user_id, email=f"{user_id}@example.com", username=user_id,
+        full_name=user_id.title(), role=role, is_active=True, created_at=datetime.utcnow()
+    )
+
+
+class TestIngestionJobManager:
+    """Test suite for IngestionJobManager"""
+
+    @pytest.fixture(autouse=True)
+    def upload_dir(self, tmp_path):
+        self.upload_dir = str(tmp_path)
+
+    def manager(self, max_queue_size=1, **kwargs):
+        return IngestionJobManager(
+            max_workers=1, max_queue_size=max_queue_size, upload_dir=self.upload_dir,
+            max_upload_bytes=4 * 1024 * 1024, **kwargs
+        )
+
+    def upload_file(self, name):
+        path = os.path.join(self.upload_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"%PDF")
+        return path
+
+    def test_full_queue_rejects_and_removes_upload(self):
+        async def run():
+            manager = self.manager()
+            release = asyncio.Event()
+
+            async def blocking(job):
+                await release.wait()
+                return {"success": True}
+
+            running = await manager.submit(self.upload_file("a.pdf"), "a.pdf", blocking)
+            await asyncio.sleep(0)  # the worker takes the first job off the queue
+            queued = await manager.submit(self.upload_file("b.pdf"), "b.pdf", blocking)
+            rejected_path = self.upload_file("c.pdf")
+            with pytest.raises(IngestionQueueFullError):
+                await manager.submit(rejected_path, "c.pdf", blocking)
+
+            statuses = (running.status, queued.status)
+            release.set()
+            await manager.wait_for(queued.job_id, timeout=5)
+            await manager.close()
+            return statuses, rejected_path, queued.status
+
+        statuses, rejected_path, final_status = asyncio.run(run())
+        assert statuses == (IngestionJobStatus.RUNNING, IngestionJobStatus.QUEUED)
+        assert not os.path.exists(rejected_path)
+        assert final_status == IngestionJobStatus.COMPLETED
+
+    def test_cancel_queued_and_running_jobs(self):
+        async def run():
+            manager = self.manager()
+            started = asyncio.Event()
+            ran = []
+
+            async def slow(job):
+                ran.append(job.filename)
+                started.set()
+                await asyncio.sleep(60)
+                return {"success": True}
+
+            running = await manager.submit(self.upload_file("a.pdf"), "a.pdf", slow)
+            await started.wait()
+            queued = await manager.submit(self.upload_file("b.pdf"), "b.pdf", slow)
+
+            assert manager.cancel(queued.job_id)
+            assert manager.cancel(running.job_id)
+            await manager.wait_for(running.job_id, timeout=5)
+            await asyncio.sleep(0)  # the worker dequeues the cancelled job and skips it
+
+            # Finished jobs cannot be cancelled again
+            assert not manager.cancel(running.job_id)
+            await manager.close()
+            return running, queued, ran
+
+        running, queued, ran = asyncio.run(run())
+        assert running.status == queued.status == IngestionJobStatus.CANCELLED
+        assert ran == ["a.pdf"]
+        assert not os.path.exists(running.file_path) and not os.path.exists(queued.file_path)
+
+    def test_prune_finished_jobs(self):
+        async def run():
+            manager = self.manager(max_retained_jobs=2)
+
+            async def done(job):
+                return {"success": True}
+
+            jobs = []
+            for i in range(3):
+                jobs.append(await manager.submit(self.upload_file(f"{i}.pdf"), f"{i}.pdf", done))
+                await manager.wait_for(jobs[-1].job_id, timeout=5)
+            jobs[1].finished_at -= timedelta(seconds=manager.job_retention_seconds + 1)
+
+            latest = await manager.submit(self.upload_file("3.pdf"), "3.pdf", done)
+            await manager.wait_for(latest.job_id, timeout=5)
+            await manager.close()
+            return manager, jobs, latest
+
+        manager, jobs, latest = asyncio.run(run())
+        # jobs[1] expired; of the rest only max_retained_jobs were kept when pruning
+        assert manager.get_job(jobs[1].job_id) is None
+        assert [job.job_id for job in manager.list_jobs()] == [latest.job_id, jobs[2].job_id]
+
+    def test_save_upload_size_limit(self):
+        manager = self.manager()
+        manager.max_upload_bytes = 3 * 1024 * 1024
+
+        path = asyncio.run(manager.save_upload(FakeUpload(3 * 1024 * 1024), "ok.pdf"))
+        assert os.path.getsize(path) == 3 * 1024 * 1024
+
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(manager.save_upload(FakeUpload(3 * 1024 * 1024 + 1), "big.pdf"))
+        assert os.listdir(self.upload_dir) == [os.path.basename(path)]
+
+    def test_job_access(self):
+        """Owners, admins and holders of the job token may manage a job"""
+        async def run():
+            manager = self.manager(max_queue_size=2)
+
+            async def done(job):
+                return {"success": True}
+
+            owned = await manager.submit(self.upload_file("a.pdf"), "a.pdf", done, owner_id="alice")
+            anonymous = await manager.submit(self.upload_file("b.pdf"), "b.pdf", done)
+            await manager.close()
+            return manager, owned, anonymous
+
+        manager, owned, anonymous = asyncio.run(run())
+
+        def status(job, current_user, token=None):
+            try:
+                get_owned_job(manager, job.job_id, current_user, token)
+            except HTTPException as e:
+                return e.status_code
+            return 200
+
+        assert status(owned, user("alice")) == 200
+        assert status(owned, user("root", role="admin")) == 200
+        assert status(owned, user("mallory")) == 403
+        assert status(owned, None) == 401
+        assert status(anonymous, None, anonymous.access_token) == 200
+        assert status(anonymous, None, owned.access_token) == 401
+        assert status(anonymous, user("mallory")) == 403
+        assert status(anonymous, user("root", role="admin")) == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
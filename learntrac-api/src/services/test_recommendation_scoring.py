@@ -0,0 +1,180 @@
+"""
+Unit tests for RecommendationEngine candidate scoring
+
+Tests that the batched scorer gives the same factor scores as scoring each
+candidate on its own.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from .recommendation_engine import RecommendationEngine, UserProfile
+
+NOW = datetime.utcnow()
+
+PREREQUISITES = [
+    {"concept_id": "vectors", "prerequisite_id": "algebra", "importance": 2.0},
+    {"concept_id": "vectors", "prerequisite_id": "geometry", "importance": None},
+    {"concept_id": "matrices", "prerequisite_id": "vectors", "importance": 0.0},
+    {"concept_id": "matrices", "prerequisite_id": "algebra", "importance": 1.0},
+]
+
+# Stored mastery differs from the calculated one, so the test notices which is used
+STORED_MASTERY = {"algebra": 0.2, "geometry": 0.9, "vectors": 0.9}
+CALCULATED_MASTERY = {"algebra": 0.8, "geometry": 0.5, "vectors": 0.3}
+
+RATINGS = {
+    ("bob", "c1"): 0.9, ("carol", "c1"): 0.4,
+    ("bob", "c3"): 0.8, ("carol", "c4"): 0.95,
+}
+
+LAST_REVIEWED = {
+    "c1": NOW - timedelta(hours=2),
+    "c2": NOW - timedelta(days=2),
+    "c4": NOW - timedelta(days=30),
+}
+
+RECENT_CONCEPTS = ["matrices", "limits"]
+
+
+class FakeDatabase:
+    """Answers the scoring queries from the fixtures above"""
+
+    async def fetch_all(self, query, *args):
+        if "FROM user_content_ratings" in query:
+            user_ids, chunk_ids = args
+            return [
+                {"user_id": u, "chunk_id": c, "rating": r}
+                for (u, c), r in RATINGS.items() if u in user_ids and c in chunk_ids
+            ]
+        if "FROM concept_prerequisites" in query:
+            return [r for r in PREREQUISITES if r["concept_id"] in args[0]]
+        if "FROM user_chunk_progress" in query:
+            return [
+                {"chunk_id": c, "last_reviewed": t}
+                for c, t in LAST_REVIEWED.items() if c in args[1]
+            ]
+        if "FROM user_concept_progress" in query:
+            return [{"concept_id": c} for c in RECENT_CONCEPTS]
+        raise AssertionError(f"Unexpected query: {query}")
+
+    async def fetch_one(self, query, user_id, chunk_id):
+        assert "FROM user_chunk_progress" in query
+        if chunk_id in LAST_REVIEWED:
+            return {"last_reviewed": LAST_REVIEWED[chunk_id]}
+        return None
+
+
+class FakeProgressTracker:
+    async def calculate_concept_mastery(self, user_id, concept_id):
+        return SimpleNamespace(mastery_level=CALCULATED_MASTERY[concept_id])
+
+
+class TestBatchScoring:
+    """Test suite for _score_candidates_batch"""
+
+    def setup_method(self):
+        self.engine = RecommendationEngine(
+            db_manager=FakeDatabase(),
+            redis_cache=None,
+            neo4j_search=None,
+            progress_tracker=FakeProgressTracker(),
+            embedding_service=None
+        )
+        rng = np.random.default_rng(0)
+        embeddings = {f"c{i}": rng.normal(size=8).tolist() for i in range(1, 6)}
+        interests = rng.normal(size=8).tolist()
+
+        async def user_interests(user_id):
+            return interests
+
+        async def similar_users(user_id, limit=10):
+            return [{"user_id": "bob", "similarity": 0.8}, {"user_id": "carol", "similarity": 0.6}]
+
+        async def chunk_rating(user_id, chunk_id):
+            return RATINGS.get((user_id, chunk_id))
+
+        async def chunk_data(chunk_id):
+            return {"embedding": embeddings[chunk_id]}
+
+        async def concept_prerequisites(concept_id):
+            return [
+                {"concept_id": r["prerequisite_id"], "importance": r["importance"],
+                 "mastery_level": STORED_MASTERY[r["prerequisite_id"]]}
+                for r in PREREQUISITES if r["concept_id"] == concept_id
+            ]
+
+        # Lookups the per-candidate path relies on
+        self.engine._get_user_interest_embedding = user_interests
+        self.engine._get_similar_users = similar_users
+        self.engine._get_user_chunk_rating = chunk_rating
+        self.engine._get_chunk_data = chunk_data
+        self.engine._get_concept_prerequisites = concept_prerequisites
+
+        self.candidates = [
+            {"chunk_id": "c1", "concept_id": "vectors", "difficulty": 0.4,
+             "embedding": embeddings["c1"], "concepts": ["vectors"]},
+            {"chunk_id": "c2", "concept_id": "matrices", "difficulty": 0.7,
+             "concepts": ["matrices"]},
+            {"chunk_id": "c3", "concept_id": "limits", "difficulty": 0.2,
+             "embedding": embeddings["c3"], "concepts": ["limits"]},
+            {"chunk_id": "c4", "concept_id": "vectors", "difficulty": 0.9,
+             "concepts": ["vectors", "matrices"]},
+            {"chunk_id": "c5", "concept_id": "series", "difficulty": 0.5,
+             "embedding": embeddings["c5"], "concepts": []},
+        ]
+        self.profile = UserProfile(
+            user_id="alice", learning_style="mixed", pace="fast", interests=[],
+            strengths=[], weaknesses=[], preferred_difficulty=0.5,
+            available_time_daily=30, goals=[]
+        )
+        self.progress = SimpleNamespace(average_understanding=0.45)
+
+    def score_both(self, context):
+        async def run():
+            batch = await self.engine._score_candidates_batch(
+                self.candidates, "alice", self.profile, self.progress, context
+            )
+            single = [
+                await self.engine._score_candidate(
+                    candidate, "alice", self.profile, self.progress, context
+                )
+                for candidate in self.candidates
+            ]
+            return batch, single
+
+        return asyncio.run(run())
+
+    def test_batch_matches_per_candidate_scores(self):
+        """Every factor agrees with _score_candidate"""
+        batch, single = self.score_both({"current_topic": "vectors"})
+
+        for factor in self.engine.weights:
+            expected = [scores[factor] for scores in single]
+            np.testing.assert_allclose(batch[factor], expected, atol=1e-9, err_msg=factor)
+
+    def test_prerequisites_use_calculated_mastery(self):
+        """Prerequisite scores come from calculate_concept_mastery"""
+        batch, _ = self.score_both(None)
+
+        # vectors: algebra (2.0) satisfied, geometry (1.0) not; matrices: algebra only counts
+        np.testing.assert_allclose(batch["prerequisite"], [2 / 3, 1.0, 1.0, 2 / 3, 1.0])
+
+    def test_precomputed_similarity_matches(self):
+        """Stored neighbour similarities are used by both paths"""
+        vectors = np.random.default_rng(1).normal(size=(6, 8)).astype(np.float32)
+        self.engine.similarity_table.min_similarity = -1.0
+        self.engine.similarity_table.build(["c0", "c1", "c2", "c3", "c4", "c5"], vectors)
+
+        batch, single = self.score_both({"current_chunk_id": "c0"})
+
+        expected = [scores["content_similarity"] for scores in single]
+        np.testing.assert_allclose(batch["content_similarity"], expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""
+Unit tests for RecommendationEngine similarity precomputation
+
+Tests that finished ingestions update the chunk neighbour table through the
+ingestion listener, and that neighbours served from the table carry display
+metadata.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from ..pdf_processing.neo4j_content_ingestion import Neo4jContentIngestion
+from .recommendation_engine import RecommendationEngine
+
+
+class FakeNeo4jConnection:
+    """Serves chunk pages and metadata lookups from an in-memory corpus"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def execute_query(self, query, parameters=None):
+        parameters = parameters or {}
+        if "c.embedding AS embedding" in query:
+            records = [
+                {"chunk_id": chunk_id, **chunk}
+                for chunk_id, chunk in sorted(self.chunks.items())
+                if chunk_id > parameters["last_id"]
+                and (not parameters["chunk_ids"] or chunk_id in parameters["chunk_ids"])
+                and (parameters["chunk_ids"] or not parameters["textbook_id"]
+                     or chunk["textbook_id"] == parameters["textbook_id"])
+            ]
+            return records[:parameters["page_size"]]
+        if "c.chunk_id IN $chunk_ids" in query:
+            return [
+                {"chunk_id": chunk_id, "title": self.chunks[chunk_id]["title"],
+                 "concepts": self.chunks[chunk_id]["concepts"]}
+                for chunk_id in parameters["chunk_ids"] if chunk_id in self.chunks
+            ]
+        return []
+
+
+class FakeDatabase:
+    """Records statements sent to PostgreSQL"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, query, *args):
+        self.statements.append((query, args))
+
+
+class FakeSearch:
+    def __init__(self, connection):
+        self.connection = connection
+
+
+def make_chunks(textbook_id, count, offset, rng):
+    """Chunks clustered around one direction so neighbours pass the threshold"""
+    centre = rng.normal(size=16)
+    return {
+        f"{textbook_id}-{i:03d}": {
+            "textbook_id": textbook_id,
+            "embedding": (centre + 0.1 * rng.normal(size=16)).tolist(),
+            "title": f"Section {offset + i}",
+            "concepts": [f"concept-{offset + i}"]
+        }
+        for i in range(count)
+    }
+
+
+class TestSimilarityIngestion:
+    """Test suite for ingestion-driven similarity updates"""
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.chunks = make_chunks("book-a", 12, 0, rng)
+        self.connection = FakeNeo4jConnection(self.chunks)
+        self.db = FakeDatabase()
+        self.ingestion = Neo4jContentIngestion(self.connection, index_manager=None)
+        self.engine = RecommendationEngine(
+            db_manager=self.db,
+            redis_cache=None,
+            neo4j_search=FakeSearch(self.connection),
+            progress_tracker=None,
+            embedding_service=None,
+            content_ingestion=self.ingestion
+        )
+        self.rng = rng
+
+    async def ingest(self, textbook_id, chunk_ids=None, removed_chunk_ids=None):
+        await self.ingestion.notify_textbook_ingested(textbook_id, chunk_ids, removed_chunk_ids)
+        await asyncio.gather(*self.engine._similarity_tasks)
+
+    def test_listener_registered_once(self):
+        """The engine registers itself with the ingestion pipeline"""
+        self.engine.attach_to_ingestion(self.ingestion)
+        assert self.ingestion.ingestion_listeners == [self.engine.schedule_similarity_update]
+
+    def test_ingestion_updates_table(self):
+        """Finished ingestions build, then extend, the neighbour table"""
+        asyncio.run(self.ingest("book-a"))
+        assert set(self.engine.similarity_table.neighbours) == set(self.chunks)
+
+        new_chunks = make_chunks("book-b", 5, 100, self.rng)
+        self.chunks.update(new_chunks)
+        asyncio.run(self.ingest("book-b", list(new_chunks)))
+
+        table = self.engine.similarity_table
+        assert set(table.neighbours) == set(self.chunks)
+        assert table._vectors.dtype == np.float32
+        assert any("unnest" in query for query, _ in self.db.statements)
+
+    def test_reingestion_drops_removed_chunks(self):
+        """Chunks deleted by a re-ingestion leave the table and the stored rows"""
+        asyncio.run(self.ingest("book-a"))
+        removed = ["book-a-000", "book-a-001"]
+        for chunk_id in removed:
+            del self.chunks[chunk_id]
+        rewritten = "book-a-002"
+        self.chunks[rewritten]["embedding"] = self.rng.normal(size=16).tolist()
+        self.db.statements.clear()
+
+        changed = asyncio.run(self.engine.update_similarities_for_textbook(
+            "book-a", [rewritten], removed
+        ))
+
+        table = self.engine.similarity_table
+        assert set(table.neighbours) == set(self.chunks)
+        assert table._vectors.shape[0] == len(self.chunks)
+        assert all(not set(removed) & set(neighbours) for neighbours in table.neighbours.values())
+        assert rewritten in changed and not set(removed) & set(changed)
+
+        removal = [args for query, args in self.db.statements if "chunk_id_2 = ANY($1)" in query]
+        assert removal == [(removed,)]
+        stored_ids = {
+            chunk_id for query, args in self.db.statements if "unnest" in query
+            for ids in args[:2] for chunk_id in ids
+        }
+        assert not set(removed) & stored_ids
+
+    def test_neighbours_from_cache_get_metadata(self):
+        """Neighbours without loaded metadata are filled in from Neo4j"""
+        asyncio.run(self.ingest("book-a"))
+        self.engine.similarity_table.chunk_metadata.clear()
+
+        similar = asyncio.run(self.engine.get_similar_content("book-a-000", limit=3))
+
+        assert len(similar) == 3
+        for item in similar:
+            assert item["title"] == self.chunks[item["chunk_id"]]["title"]
+            assert item["concepts"] == self.chunks[item["chunk_id"]]["concepts"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -28,11 +28,13 @@ from ..pdf_processing.neo4j_vector_search import (
 )
 from ..pdf_processing.neo4j_relationship_manager import Neo4jRelationshipManager
 from ..pdf_processing.neo4j_query_optimizer import Neo4jQueryOptimizer, CacheStrategy
+from ..pdf_processing.search_result_cache import SearchResultCache
 from ..pdf_processing.pipeline import PDFProcessingPipeline
 from ..pdf_processing.content_chunker import ContentChunker
 from ..pdf_processing.embedding_pipeline import EmbeddingPipeline
-from ..pdf_processing.toc_pdf_processor import TOCPDFProcessor
+from ..pdf_processing.toc_pdf_processor import TOCPDFProcessor, ProgressCallback
 from ..services.embedding_service import EmbeddingService
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -114,18 +116,32 @@ class TracService:
         # Initialize Neo4j components
         self.neo4j_connection = Neo4jConnectionManager(neo4j_config)
         self.neo4j_index_manager = Neo4jVectorIndexManager(self.neo4j_connection)
+        # Writes through this service invalidate affected cached results by tag;
+        # the TTL only bounds staleness from writes made elsewhere
+        self.neo4j_optimizer = Neo4jQueryOptimizer(
+            self.neo4j_connection,
+            cache_strategy=CacheStrategy.ADAPTIVE,
+            cache_ttl_seconds=settings.neo4j_cache_ttl
+        )
         self.neo4j_ingestion = Neo4jContentIngestion(
             self.neo4j_connection,
-            self.neo4j_index_manager
+            self.neo4j_index_manager,
+            query_cache=self.neo4j_optimizer.cache
+        )
+        self.search_result_cache = SearchResultCache(
+            max_entries=settings.search_cache_size,
+            ttl_seconds=settings.search_cache_ttl,
+            similarity_threshold=settings.search_cache_similarity or None
         )
+        self.neo4j_ingestion.add_ingestion_listener(self.search_result_cache.on_textbook_ingested)
         self.neo4j_search = Neo4jVectorSearch(
             self.neo4j_connection,
-            self.neo4j_index_manager
+            self.neo4j_index_manager,
+            result_cache=self.search_result_cache
         )
-        self.neo4j_relationships = Neo4jRelationshipManager(self.neo4j_connection)
-        self.neo4j_optimizer = Neo4jQueryOptimizer(
+        self.neo4j_relationships = Neo4jRelationshipManager(
             self.neo4j_connection,
-            cache_strategy=CacheStrategy.ADAPTIVE
+            query_cache=self.neo4j_optimizer.cache
         )
         
         # Initialize PDF processing components
@@ -169,18 +185,25 @@ class TracService:
     async def ingest_textbook(
         self,
         pdf_path: str,
-        metadata: Optional[TextbookMetadata] = None
+        metadata: Optional[TextbookMetadata] = None,
+        progress_callback: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """
         Ingest a textbook PDF into the system using TOC-based processing.
         
+        Re-ingesting an existing textbook (metadata.textbook_id set) only
+        embeds and writes chunks whose content changed.
+        
         Args:
             pdf_path: Path to PDF file
             metadata: Optional textbook metadata
+            progress_callback: Optional per-stage progress callback
             
         Returns:
             Ingestion result with statistics
         """
+        report = progress_callback or (lambda stage, fraction: None)
+        
         try:
             # Use TOC-based processor for textbook PDFs
             logger.info(f"Processing PDF using TOC-based approach: {pdf_path}")
@@ -202,7 +225,10 @@ class TracService:
                 connection_manager=self.neo4j_connection,
                 index_manager=self.neo4j_index_manager,
                 embedding_service=self.embedding_service,
-                max_chunks_to_embed=None  # Embed all chunks
+                max_chunks_to_embed=None,  # Embed all chunks
+                progress_callback=progress_callback,
+                textbook_id=metadata.textbook_id if metadata and metadata.textbook_id else None,
+                owner_id=metadata.owner_id if metadata else None
             )
             
             if not processing_result.success:
@@ -212,6 +238,14 @@ class TracService:
                     "details": {}
                 }
             
+            report("finalizing", 0.0)
+            
+            # Let ingestion listeners (e.g. similarity precomputation) catch up
+            await self.neo4j_ingestion.notify_textbook_ingested(
+                processing_result.textbook_id,
+                removed_chunk_ids=processing_result.chunks_deleted
+            )
+            
             # Create Trac tickets for main concepts
             await self._create_concept_tickets(processing_result.textbook_id)
             
@@ -222,6 +256,8 @@ class TracService:
                     metadata
                 )
             
+            report("finalizing", 1.0)
+            
             return {
                 "success": processing_result.success,
                 "textbook_id": processing_result.textbook_id,
@@ -231,6 +267,9 @@ class TracService:
                     "concepts": len(processing_result.concepts),
                     "chunks": processing_result.total_chunks,
                     "embeddings_generated": processing_result.embeddings_generated,
+                    "embeddings_reused": processing_result.embeddings_reused,
+                    "chunks_skipped": len(processing_result.chunks_skipped),
+                    "chunks_deleted": len(processing_result.chunks_deleted),
                     "processing_time": processing_result.processing_time,
                     "embedding_dimensions": embedding_dimensions,
                     "vector_indexes_created": sum(index_results.values()) if 'index_results' in locals() else 0
@@ -244,7 +283,9 @@ class TracService:
                             "sections": len(ch.sections)
                         }
                         for ch in processing_result.chapters[:5]  # First 5 chapters
-                    ]
+                    ],
+                    "skipped_chunk_ids": processing_result.chunks_skipped,
+                    "deleted_chunk_ids": processing_result.chunks_deleted
                 }
             }
             
@@ -314,6 +355,13 @@ class TracService:
         
         return results
     
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Hit rates and sizes of the Neo4j query and search result caches"""
+        return {
+            "query_cache": self.neo4j_optimizer.cache.get_stats(),
+            "search_results": self.search_result_cache.get_statistics()
+        }
+    
     # ===== Learning Progress Management =====
     
     async def get_user_profile(self, user_id: str) -> Optional[UserProfile]: